@@ -0,0 +1,234 @@
+import math
+import time
+import threading
+from flask import request, jsonify, g
+
+# Admission control: decide whether to do a request before doing any work
+# 1. Cost limits - reject requests that would be expensive to answer
+#    (per_page=1000000 loads and serialises the whole table) with a 400
+# 2. Rate limiting - every client has a token bucket; each request takes its
+#    endpoint's cost from it. An empty bucket means 429 + Retry-After
+# 3. Load shedding - when too many requests are already working on the
+#    database, new ones get 503 + Retry-After straight away instead of
+#    queueing up and making every request slow
+# Used by the Flask app (init_admission_control) and by asgi.py, which share
+# one AdmissionController per process.
+
+# Tokens each endpoint takes from the client's bucket (anything else costs 1)
+# The filter options scan the whole table, so they are the most expensive.
+# The FilterBar asks for the list, the facet counts and the suggestions as
+# the user types, so those stay cheap - typing must never run into a 429
+ENDPOINT_COSTS = {
+    'jobs.get_filters': 5,
+    'jobs.get_facets': 1,
+    'jobs.suggest': 0.5,
+    'jobs.create_job': 2,
+    'jobs.update_job': 2,
+    'jobs.patch_job': 2,
+    'jobs.delete_job': 2,
+    'saved_searches.create_saved_search': 2,
+}
+
+# Never limited: health checks and the stats pages
+EXEMPT_ENDPOINTS = {'health_check', 'readiness_check', 'admission_stats', 'compression_stats', 'static_shard_stats', 'static'}
+
+def cost_limit_error(args, limits):
+    """
+    Why the request asks for too much, or None if it is fine
+    `args` are the query parameters, `limits` a dict of max_per_page,
+    max_tags and max_search_length
+    """
+    for name in ('page', 'per_page'):
+        value = args.get(name)
+        if value is None:
+            continue
+        try:
+            value = int(value)
+        except ValueError:
+            continue  # not a number - the endpoint uses its default
+        # per_page=-1 would be LIMIT -1 (no limit at all on SQLite) and page=0 a negative OFFSET
+        if value < 1:
+            return f"{name} must be at least 1"
+        if name == 'per_page' and value > limits['max_per_page']:
+            return f"per_page can be at most {limits['max_per_page']}"
+
+    tags = args.get('tags')
+    if tags and len([tag for tag in tags.split(',') if tag.strip()]) > limits['max_tags']:
+        return f"At most {limits['max_tags']} tags can be used at once"
+
+    search = args.get('search')
+    if search and len(search) > limits['max_search_length']:
+        return f"search can be at most {limits['max_search_length']} characters"
+    return None
+
+class TokenBucketLimiter:
+    """
+    One token bucket per client: it refills at `rate` tokens per second and
+    holds at most `burst` tokens
+    """
+
+    MAX_CLIENTS = 10000  # buckets kept before full (idle) ones are dropped
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}  # client key -> [tokens, time of the last update]
+        self.lock = threading.Lock()
+
+    def take(self, key, cost=1, now=None):
+        """
+        Take `cost` tokens from the client's bucket
+        Returns 0 if the request may go ahead, otherwise the seconds until it could
+        """
+        now = time.monotonic() if now is None else now
+        cost = min(cost, self.burst)  # a request can never cost more than a full bucket
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                if len(self.buckets) >= self.MAX_CLIENTS:
+                    self._drop_idle(now)
+                bucket = self.buckets[key] = [self.burst, now]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens >= cost:
+                bucket[0] = tokens - cost
+                return 0
+            bucket[0] = tokens
+            return (cost - tokens) / self.rate
+
+    def _drop_idle(self, now):
+        # A bucket that has refilled completely is the same as a new one
+        for key in [key for key, (tokens, updated) in self.buckets.items()
+                    if tokens + (now - updated) * self.rate >= self.burst]:
+            del self.buckets[key]
+
+class AdmissionController:
+    """
+    Cost limits, rate limiting and load shedding for one process
+    """
+
+    def __init__(self, config):
+        self.limits = {
+            'max_per_page': config['ADMISSION_MAX_PER_PAGE'],
+            'max_tags': config['ADMISSION_MAX_TAGS'],
+            'max_search_length': config['ADMISSION_MAX_SEARCH_LENGTH']
+        }
+        self.endpoint_limits = config.get('ADMISSION_ENDPOINT_LIMITS') or {}
+        self.costs = dict(ENDPOINT_COSTS, **(config.get('ADMISSION_ENDPOINT_COSTS') or {}))
+        rate = config['ADMISSION_RATE']
+        self.limiter = TokenBucketLimiter(rate, config['ADMISSION_BURST']) if rate > 0 else None
+        self.max_in_flight = config['ADMISSION_MAX_IN_FLIGHT']
+        self.in_flight = 0
+        self.lock = threading.Lock()
+        self.counts = {'admitted': 0, 'too_expensive': 0, 'rate_limited': 0, 'shed': 0}
+
+    def admit(self, endpoint, client_key, args):
+        """
+        None if the request can go ahead (call release() when it is done),
+        otherwise (status, body, retry_after seconds or None) to answer with
+        """
+        limits = dict(self.limits, **self.endpoint_limits.get(endpoint, {}))
+        error = cost_limit_error(args, limits)
+        if error is not None:
+            self._count('too_expensive')
+            return 400, {'error': error}, None
+
+        if self.limiter is not None:
+            wait = self.limiter.take(client_key, self.costs.get(endpoint, 1))
+            if wait:
+                self._count('rate_limited')
+                retry_after = math.ceil(wait)
+                return 429, {'error': 'Too many requests', 'retry_after': retry_after}, retry_after
+
+        with self.lock:
+            if self.max_in_flight and self.in_flight >= self.max_in_flight:
+                self.counts['shed'] += 1
+                return 503, {'error': 'Server busy, try again shortly', 'retry_after': 1}, 1
+            self.in_flight += 1
+            self.counts['admitted'] += 1
+        return None
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def _count(self, name):
+        with self.lock:
+            self.counts[name] += 1
+
+    def stats(self):
+        with self.lock:
+            return dict(
+                self.counts,
+                in_flight=self.in_flight,
+                max_in_flight=self.max_in_flight,
+                clients=len(self.limiter.buckets) if self.limiter is not None else 0
+            )
+
+def client_key(remote_addr, forwarded_for, proxy_count):
+    """
+    Who is asking: the client's IP address
+    Behind `proxy_count` proxies it is that many entries from the end of
+    X-Forwarded-For (entries further left can be made up by the client)
+    """
+    if proxy_count and forwarded_for:
+        hops = [hop.strip() for hop in forwarded_for.split(',') if hop.strip()]
+        if len(hops) >= proxy_count:
+            return hops[-proxy_count]
+    return remote_addr or 'unknown'
+
+_controller = None
+_controller_lock = threading.Lock()
+
+def get_admission_controller(config):
+    """
+    The controller of this process (shared by the Flask app and asgi.py,
+    so the in-flight count covers both), or None if disabled
+    """
+    global _controller
+    if not config['ADMISSION_CONTROL_ENABLED']:
+        return None
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController(config)
+        return _controller
+
+def init_admission_control(app):
+    """
+    Check every API request before it runs (settings: ADMISSION_* in config.py)
+    """
+    controller = get_admission_controller(app.config)
+    if controller is None:
+        return None
+    app.extensions['admission'] = controller
+
+    @app.before_request
+    def admit_request():
+        # (the setting is read here too so it can be switched off at runtime)
+        if (not app.config['ADMISSION_CONTROL_ENABLED'] or request.method == 'OPTIONS'
+                or request.endpoint in EXEMPT_ENDPOINTS):
+            return None
+        key = client_key(request.remote_addr, request.headers.get('X-Forwarded-For'),
+                         app.config['ADMISSION_PROXY_COUNT'])
+        rejection = controller.admit(request.endpoint, key, request.args)
+        if rejection is None:
+            g.admitted = True
+            return None
+        status, body, retry_after = rejection
+        response = jsonify(body)
+        response.status_code = status
+        if retry_after is not None:
+            response.headers['Retry-After'] = str(retry_after)
+        return response
+
+    @app.teardown_request
+    def release_request(error=None):
+        if g.pop('admitted', False):
+            controller.release()
+
+    # Requests turned away and in flight right now
+    @app.route('/api/admission/stats')
+    def admission_stats():
+        return jsonify(controller.stats())
+
+    return controller
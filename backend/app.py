@@ -1,27 +1,42 @@
-from flask import Flask, jsonify
-from flask_cors import CORS
-from dotenv import load_dotenv
 import os
 
-# Import our database functions
-from db import init_database, test_database_connection
-
-# Import our routes (API endpoints)
-from routes.job_routes import job_bp
-
-# Load environment variables from .env file
-load_dotenv()
+# NOTE: importing this module does no work on purpose.
+# The app is only built when create_app() is called (or when something
+# asks for `app.app`, see __getattr__ at the bottom of this file).
+# Even Flask and SQLAlchemy are only imported inside create_app(), so
+# `import app` (what gunicorn/uvicorn do before forking workers) is cheap.
+# Creating tables is an explicit command: `python init_db.py` or `flask --app app init-db`.
 
 def create_app():
     """
     Create and configure the Flask application
     This is the main function that sets up our app
     """
+    from flask import Flask, jsonify
+
+    # Import our database functions
+    from db import db, init_database, create_tables, test_database_connection
+
+    # Load environment variables from .env file
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from flask_cors import CORS
+
+    # Import our routes (API endpoints)
+    from routes.job_routes import job_bp
+    from routes.saved_search_routes import saved_search_bp
+    from routes.stats_routes import stats_bp
+
     app = Flask(__name__)
-    
+
+    # Load our settings (see config.py) - they can all be overridden with environment variables
+    from config import Config
+    app.config.from_object(Config)
+
     # Enable CORS to allow frontend to communicate with backend
     CORS(app)
-    
+
     # Configure the database connection
     # Use DATABASE_URL from environment variables (PostgreSQL)
     database_url = os.environ.get('DATABASE_URL')
@@ -34,36 +49,192 @@ def create_app():
         database_path = os.path.join(backend_dir, 'jobs.db')
         app.config['DATABASE_URL'] = f'sqlite:///{database_path}'
         print(f"Using SQLite database: {database_path}")
-    
+
     # Initialize the database with our app
+    # This only configures SQLAlchemy - no connection is opened until the first query
     init_database(app)
-    
-    # Import and register our job routes
-    from routes.job_routes import job_bp
+
+    # Register our job routes
     app.register_blueprint(job_bp)
+    app.register_blueprint(saved_search_bp)
+    app.register_blueprint(stats_bp)
+
+    # Turn away requests that are too expensive, too frequent or come in while we are overloaded
+    from admission import init_admission_control
+    init_admission_control(app)
+
+    # Let identical concurrent list/filter requests share one run of their queries
+    from single_flight import init_single_flight
+    init_single_flight(app)
+
+    # Save concurrently posted jobs in shared transactions (only if GROUP_COMMIT_ENABLED)
+    from group_commit import init_group_commit
+    init_group_commit(app)
+
+    # Compress API responses (and cache the compressed bytes of hot responses)
+    from compression import init_compression
+    init_compression(app)
+
+    # Statement timeouts, read-only GETs and the query cost guard for every request
+    # (after compression, so its 503/422 answers are compressed like any other)
+    from query_guard import init_query_guard
+    init_query_guard(app)
+
+    # Serve the hottest list pages and the filter options from pre-rendered files (only if STATIC_SHARDS_ENABLED)
+    from static_shards import init_static_shards
+    init_static_shards(app)
+    
+    # Keep the similar jobs of new/edited jobs up to date (no work until a job changes)
+    from engines.similarity_updates import init_similar_jobs
+    init_similar_jobs(app)
+    
+    # Match new/edited jobs against the saved searches (no work until a job changes)
+    from engines.percolator import init_saved_search_alerts
+    init_saved_search_alerts(app)
     
+    # Keep the daily stats rollups up to date (no work until a job changes)
+    from rollups import init_rollups
+    init_rollups(app)
+    
+    # Derive job type, seniority and tags of new/edited jobs (no work until a job changes)
+    from enrichment import init_enrichment
+    init_enrichment(app)
+
     # Health check endpoint to test if the server is running
+    # This never touches the database so it stays fast (liveness probe)
     @app.route('/health')
     def health_check():
         return jsonify({'status': 'healthy', 'message': 'Job Listing API is running'})
-    
-    # Test database connection on startup
-    try:
-        test_database_connection()
-        print("Database connection test successful!")
-    except Exception as e:
-        print(f"Warning: Database connection test failed: {e}")
-        print("App will continue to run, but database operations may fail")
-    
+
+    # Readiness endpoint - checks the database connection on demand
+    # Load balancers should use this one before sending traffic to a worker
+    @app.route('/ready')
+    def readiness_check():
+        if test_database_connection():
+            return jsonify({'status': 'ready', 'database': 'ok'}), 200
+        return jsonify({'status': 'not ready', 'database': 'unavailable'}), 503
+
+    # Command to create the tables: flask --app app init-db
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create all database tables"""
+        if create_tables(app):
+            print("Database tables created successfully!")
+        else:
+            print("Failed to create database tables")
+
+    # Command to archive expired jobs: flask --app app archive-jobs
+    @app.cli.command('archive-jobs')
+    def archive_jobs_command():
+        """Move expired jobs to the jobs_archive table"""
+        from retention import archive_expired_jobs, ensure_partitions
+        with app.app_context():
+            ensure_partitions(db.engine)
+            archived = archive_expired_jobs(db.session, batch_size=app.config['ARCHIVE_BATCH_SIZE'])
+            print(f"Archived {archived} expired jobs")
+
+    # Command to recompute similar jobs: flask --app app similar-jobs
+    @app.cli.command('similar-jobs')
+    def similar_jobs_command():
+        """Recompute the similar jobs of every job"""
+        from engines.similarity import build_similarities
+        with app.app_context():
+            rows = build_similarities(
+                db.session, app.config['SIMILARITY_MODEL_PATH'], k=app.config['SIMILAR_JOBS_K'],
+                workers=app.config['SIMILARITY_WORKERS'] or None
+            )
+            print(f"Stored {rows} similar-job pairs")
+
+    # Command to regroup near-duplicate jobs: flask --app app dedupe-jobs
+    @app.cli.command('dedupe-jobs')
+    def dedupe_jobs_command():
+        """Find near-duplicate jobs and point them at their original"""
+        from dedupe import cluster_duplicates
+        with app.app_context():
+            duplicates, changed = cluster_duplicates(db.session)
+            print(f"{duplicates} duplicates ({changed} jobs changed)")
+
+    # Command to pre-render the hottest responses now: flask --app app prerender
+    @app.cli.command('prerender')
+    def prerender_command():
+        """Build the static shards (needs STATIC_SHARDS_ENABLED=true)"""
+        store = app.extensions.get('static_shards')
+        if store is None:
+            print("Static shards are disabled (STATIC_SHARDS_ENABLED=false)")
+            return
+        with app.app_context():
+            store.build()
+
+    # Command to write a new catalog snapshot: flask --app app build-snapshot
+    @app.cli.command('build-snapshot')
+    def build_snapshot_command():
+        """Write a catalog snapshot for READ_ENGINE=snapshot nodes"""
+        from engines.snapshot import build_snapshot
+        with app.app_context():
+            if build_snapshot(db.session, app.config['SNAPSHOT_DIR']) is None:
+                print("The current snapshot is up to date")
+
+    # Command to count every posting again for the stats: flask --app app rebuild-rollups
+    @app.cli.command('rebuild-rollups')
+    def rebuild_rollups_command():
+        """Recompute the job_rollups table behind /api/stats"""
+        from rollups import rebuild_rollups
+        with app.app_context():
+            rows = rebuild_rollups(db.session)
+            db.session.commit()
+            print(f"Stored {rows} rollup rows")
+
+    # Command to enrich new and changed jobs: flask --app app enrich-jobs
+    # (python enrich_jobs.py --all enriches every job again)
+    @app.cli.command('enrich-jobs')
+    def enrich_jobs_command():
+        """Derive job type, seniority and tags from the descriptions"""
+        from enrichment import enrich_jobs
+        with app.app_context():
+            enriched = enrich_jobs(db.session, workers=app.config['ENRICHMENT_WORKERS'] or None,
+                                   chunk_size=app.config['ENRICHMENT_CHUNK_SIZE'])
+            print(f"Enriched {enriched} jobs")
+
+    # Command to load the scraper's staging files: flask --app app load-staging
+    @app.cli.command('load-staging')
+    def load_staging_command():
+        """Load new scraper staging files into the jobs table"""
+        from bulk_load import load_staging_file
+        from load_staging import staging_files, DEFAULT_STAGING_DIR
+        with app.app_context():
+            for path in staging_files([DEFAULT_STAGING_DIR]):
+                load_staging_file(db.session, path, batch_size=app.config['BULK_LOAD_BATCH_SIZE'])
+
     return app
 
-# Create the app instance
-app = create_app()
+# The app instance is created the first time someone asks for it
+# (for example `gunicorn app:app` or `from app import app`)
+_app = None
+
+def __getattr__(name):
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == '__main__':
     print("Starting Job Listing Web App...")
     print("Backend server will be available at: http://localhost:5000")
     print("API endpoints will be available at: http://localhost:5000/api/")
-    
+
+    from db import test_database_connection
+    app = create_app()
+
+    # Test database connection before we start serving
+    # Only done here (not on import) so workers and scripts start quickly
+    with app.app_context():
+        if test_database_connection():
+            print("Database connection test successful!")
+        else:
+            print("Warning: Database connection test failed")
+            print("App will continue to run, but database operations may fail")
+
     # Run the Flask app
     app.run(debug=True, host='0.0.0.0', port=5000)
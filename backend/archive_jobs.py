@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Job Archival Script
+Moves expired job postings from the jobs table to jobs_archive
+Run it regularly (e.g. from cron) - it works in small batches so the API
+keeps running normally while it does
+"""
+
+import os
+import sys
+import argparse
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+def archive_jobs(batch_size=None, pause=0.05, max_batches=None):
+    """
+    Archive every expired job, batch by batch
+    """
+    try:
+        from db import db
+        from app import create_app
+        from retention import archive_expired_jobs, ensure_partitions
+
+        # Create the Flask app
+        app = create_app()
+
+        with app.app_context():
+            # Make sure next months' partitions exist (does nothing without partitioning)
+            ensure_partitions(db.engine)
+
+            archived = archive_expired_jobs(
+                db.session,
+                batch_size=batch_size or app.config['ARCHIVE_BATCH_SIZE'],
+                pause_seconds=pause,
+                max_batches=max_batches
+            )
+
+        print(f"\nArchival completed! {archived} expired jobs moved to jobs_archive")
+        return True
+
+    except Exception as e:
+        print(f"Error archiving jobs: {e}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Move expired jobs to the archive table')
+    parser.add_argument('--batch-size', type=int, default=None, help='Jobs per transaction (default: ARCHIVE_BATCH_SIZE)')
+    parser.add_argument('--pause', type=float, default=0.05, help='Seconds to wait between batches')
+    parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches')
+    args = parser.parse_args()
+
+    archive_jobs(args.batch_size, args.pause, args.max_batches)
@@ -0,0 +1,596 @@
+"""
+Async (ASGI) version of the Job Listing API
+This serves the same read endpoints as routes/job_routes.py
+(/api/jobs, /api/jobs/<id> and /api/jobs/filters) but every handler is
+async and talks to the database through an async SQLAlchemy engine,
+so a request waiting on the database does not hold a worker thread.
+Their answers are compressed like the Flask app's (compression.py).
+
+It also serves GET /api/jobs/stream (live job changes as Server-Sent
+Events, see streaming.py), and hands every other request to the Flask app
+in a thread pool - so one process can serve the whole API, and the writes
+it handles reach the stream straight away. That includes multi-gets
+(/api/jobs?ids=1,2,3&fields=..., fetch_jobs_by_ids in job_routes.py), so
+both ways of running the API answer them the same.
+
+Run it with: uvicorn asgi:app --port 5001
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import asyncio
+from urllib.parse import parse_qsl
+
+from sqlalchemy import select, func
+
+from config import Config
+from events import local_version
+from single_flight import AsyncSingleFlight, SingleFlightTimeout
+from query_guard import (
+    QueryTimeout, QueryTooExpensive, query_budget, budget_for, error_body, statement_over_cost_budget
+)
+from compression import get_compressor, compress_payload
+from models.job import Job
+from models.job_queries import (
+    parse_job_list_args, apply_job_filters, apply_job_sort,
+    build_page_response, build_filter_options, uses_enriched_filters
+)
+
+# Async drivers to use for each kind of database URL
+# postgresql:// and postgresql+pg8000:// become asyncpg, sqlite:// becomes aiosqlite
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite'
+}
+
+# The engine is created on the first request, not on import (same as app.py)
+_engine = None
+_session_factory = None
+
+# Identical list/filter requests running at the same time share one run (single_flight.py)
+_flights = AsyncSingleFlight()
+
+def get_database_url():
+    """
+    Work out the database URL the same way create_app() and init_database() do
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    database_url = os.environ.get('FORCE_DATABASE_URL') or os.environ.get('DATABASE_URL')
+    if not database_url:
+        # Fallback to the same SQLite file the Flask app uses
+        backend_dir = os.path.dirname(os.path.abspath(__file__))
+        database_url = f"sqlite:///{os.path.join(backend_dir, 'jobs.db')}"
+    return database_url
+
+def to_async_url(database_url):
+    """
+    Swap the driver in a database URL for its async equivalent
+    e.g. postgresql+pg8000://... -> postgresql+asyncpg://...
+    """
+    scheme, rest = database_url.split('://', 1)
+    dialect = scheme.split('+', 1)[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database type: {dialect}")
+    return f"{ASYNC_DRIVERS[dialect]}://{rest}"
+
+def get_session_factory():
+    """
+    Create the async engine the first time it is needed
+    """
+    global _engine, _session_factory
+    if _session_factory is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+        database_url = to_async_url(get_database_url())
+        pool_size = int(os.environ.get('ASYNC_DB_POOL_SIZE', 20))
+        engine_options = {}
+        if not database_url.startswith('sqlite'):
+            engine_options = {'pool_size': pool_size, 'max_overflow': pool_size}
+        _engine = create_async_engine(database_url, **engine_options)
+        _session_factory = async_sessionmaker(_engine, expire_on_commit=False)
+        print(f"Async engine created for: {database_url.split('://', 1)[0]}")
+    return _session_factory
+
+# ----------------------------
+# Handlers
+# ----------------------------
+async def get_jobs(session, args):
+    """
+    Async version of GET /api/jobs - same filters, sorting and pagination
+    """
+    params = parse_job_list_args(args)
+    page = params['page']
+    per_page = params['per_page']
+
+    # Count and page use the exact same filters as the Flask endpoint
+    filtered = apply_job_filters(select(Job), params)
+    sorted_query = apply_job_sort(filtered, params['sort'])
+    offset = (page - 1) * per_page
+
+    # Same cost guard as query_job_page: too expensive to count means one
+    # job more than the page instead, and the total is only a lower bound
+    degraded = await session.run_sync(statement_over_cost_budget, sorted_query)
+    if degraded:
+        jobs = (await session.execute(sorted_query.offset(offset).limit(per_page + 1))).scalars().all()
+        total_count = offset + len(jobs)
+        jobs = jobs[:per_page]
+    else:
+        count_query = select(func.count()).select_from(filtered.subquery())
+        total_count = (await session.execute(count_query)).scalar_one()
+        jobs = (await session.execute(sorted_query.offset(offset).limit(per_page))).scalars().all()
+
+    jobs_dict = [job.to_dict() for job in jobs]
+    body = build_page_response(jobs_dict, total_count, page, per_page)
+    if degraded:
+        body['total_is_estimate'] = True  # the query guard skipped the exact count
+    return 200, body
+
+async def get_job(session, job_id):
+    """
+    Async version of GET /api/jobs/<id>
+    """
+    job = await session.get(Job, job_id)
+    if job is None:
+        return 404, {'error': 'Resource not found'}
+    return 200, job.to_dict()
+
+async def get_filters(session, args):
+    """
+    Async version of GET /api/jobs/filters
+    """
+    db_job_types = (await session.execute(select(Job.job_type).distinct())).scalars().all()
+    locations = (await session.execute(select(Job.location).distinct())).scalars().all()
+    tag_values = (await session.execute(select(Job.tags).distinct())).scalars().all()
+    return 200, build_filter_options(db_job_types, locations, tag_values)
+
+# Routes: (path pattern, handler, error message used when the handler fails)
+# The handlers have the same names as the Flask views, so 'jobs.' + name is
+# the endpoint name admission control uses for costs and limits
+# Order matters - /api/jobs/filters must be checked before /api/jobs/<id>
+ROUTES = [
+    (re.compile(r'^/api/jobs/?$'), get_jobs, 'Failed to get jobs'),
+    (re.compile(r'^/api/jobs/filters/?$'), get_filters, 'Failed to get filters'),
+    (re.compile(r'^/api/jobs/(?P<job_id>\d+)/?$'), get_job, 'Failed to get job'),
+]
+
+# Catalog snapshot (READ_ENGINE=snapshot, see engines/snapshot.py) - opened on the first request
+_snapshots = None
+
+def get_snapshot():
+    """
+    The catalog snapshot to answer from, or None to use the database
+    """
+    global _snapshots
+    if Config.READ_ENGINE != 'snapshot':
+        return None
+    from engines.snapshot import np, SnapshotReader
+    if np is None:
+        return None
+    if _snapshots is None:
+        _snapshots = SnapshotReader(Config.SNAPSHOT_DIR, Config.SNAPSHOT_CHECK_SECONDS)
+    return _snapshots.current()
+
+def answer_from_snapshot(snapshot, handler, argument):
+    """
+    (status, encoded JSON) of a handler, answered from the snapshot without
+    the database - or None to ask the database instead (a job that isn't in
+    it may be newer, and the snapshot can't apply enriched filters)
+    """
+    if handler is get_jobs:
+        params = parse_job_list_args(argument)
+        if uses_enriched_filters(params):
+            return None  # the snapshot doesn't hold the enriched values
+        total_count, jobs_dict = snapshot.query(params)
+        return 200, encode_json(build_page_response(jobs_dict, total_count, params['page'], params['per_page']))
+    if handler is get_filters:
+        return 200, encode_json(snapshot.filter_options())
+    job_dict = snapshot.get(argument)
+    return None if job_dict is None else (200, encode_json(job_dict))
+
+async def run_handler(handler, argument):
+    """
+    Run a handler in its own session - returns (status, encoded JSON)
+    """
+    # Same statement timeout and read-only transaction as in the Flask app (query_guard.py)
+    with query_budget(budget_for(config_values(), 'jobs.' + handler.__name__, 'GET')):
+        async with get_session_factory()() as session:
+            status, body = await handler(session, argument)
+    return status, encode_json(body)
+
+def single_flight_key(handler, args):
+    """
+    Identical requests have the same key: the endpoint, its normalised
+    parameters and the data version (so nothing started before a write here
+    is shared with a request that came after it)
+    """
+    params = tuple(sorted(parse_job_list_args(args).items())) if handler is get_jobs else ()
+    return ('jobs.' + handler.__name__, params, local_version())
+
+# ----------------------------
+# Live changes (Server-Sent Events)
+# ----------------------------
+async def wait_for_disconnect(receive, subscription):
+    """
+    Close the subscription when the client goes away
+    """
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            subscription.close()
+            return
+
+async def stream_jobs(scope, receive, send):
+    """
+    GET /api/jobs/stream - push create/update/delete events as they happen
+    Takes the same filters as /api/jobs. A client reconnecting with the
+    Last-Event-ID header (or ?last_event_id=) first gets the events it missed;
+    if they are too old it gets a "resync" event and should reload the list.
+    """
+    from streaming import get_broker, HEARTBEAT
+
+    args = dict(parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+    headers = dict(scope['headers'])
+    last_event_id = headers.get(b'last-event-id', b'').decode('latin-1') or args.get('last_event_id')
+
+    broker = get_broker(get_session_factory())
+    subscription, backlog = broker.subscribe(parse_job_list_args(args), last_event_id)
+    watcher = asyncio.get_running_loop().create_task(wait_for_disconnect(receive, subscription))
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),  # stop nginx from buffering the stream
+                (b'access-control-allow-origin', b'*'),
+            ]
+        })
+        # Ask browsers to reconnect after 3 seconds if the connection drops
+        await send({'type': 'http.response.body', 'body': b'retry: 3000\n\n', 'more_body': True})
+
+        if backlog is None:
+            resync = f"id: {broker.event_id(subscription.after_id)}\nevent: resync\ndata: {{}}\n\n"
+            await send({'type': 'http.response.body', 'body': resync.encode(), 'more_body': True})
+        else:
+            for event in backlog:
+                await send({'type': 'http.response.body', 'body': event[3], 'more_body': True})
+
+        while not subscription.closed:
+            if subscription.overflowed:
+                # Too far behind: tell the client to reload, it reconnects with Last-Event-ID
+                await send({'type': 'http.response.body', 'body': b'event: resync\ndata: {}\n\n', 'more_body': True})
+                break
+            event = await subscription.next_event()
+            if event is None:
+                break  # closed
+            if event == HEARTBEAT:
+                # Comment line - keeps proxies from closing an idle connection
+                await send({'type': 'http.response.body', 'body': b': keep-alive\n\n', 'more_body': True})
+                continue
+            await send({'type': 'http.response.body', 'body': event[3], 'more_body': True})
+
+        if not subscription.closed:
+            await send({'type': 'http.response.body', 'body': b''})
+    except OSError:
+        pass  # the client went away while we were writing
+    finally:
+        broker.unsubscribe(subscription)
+        watcher.cancel()
+
+async def stream_stats(scope, receive, send):
+    """
+    GET /api/jobs/stream/stats - open streams and the newest event id
+    """
+    from streaming import get_broker
+    await send_json(send, 200, get_broker(get_session_factory()).stats())
+
+async def send_static_shard(scope, send, handler, args):
+    """
+    Send the pre-rendered file for this request if there is an up-to-date
+    one (static_shards.py) - returns True if it was sent
+    """
+    from static_shards import shard_key
+    store = get_flask_app().extensions.get('static_shards')
+    if store is None:
+        return False
+    headers = dict(scope.get('headers') or [])
+    kind, params = ('jobs', parse_job_list_args(args)) if handler is get_jobs else ('filters', {})
+
+    def find():
+        # The freshness check may read the table's fingerprint - in a thread, with an app context
+        with get_flask_app().app_context():
+            if kind == 'jobs':
+                store.count_request(params)
+            entry = store.lookup(shard_key(kind, params))
+            if entry is None:
+                return None
+            return entry, store.shard_path(entry, headers.get(b'accept-encoding', b'').decode('latin-1'))
+
+    found = await asyncio.to_thread(find)
+    if found is None:
+        return False
+    entry, (path, encoding) = found
+    etag = f'"{entry["etag"]}{encoding or ""}"'
+    response_headers = [(b'etag', etag.encode()), (b'vary', b'Accept-Encoding'), (b'x-static-shard', b'hit')]
+    if encoding is not None:
+        response_headers.append((b'content-encoding', encoding.encode()))
+    if headers.get(b'if-none-match', b'').decode('latin-1') == etag:
+        await send({'type': 'http.response.start', 'status': 304, 'headers': response_headers})
+        await send({'type': 'http.response.body', 'body': b''})
+        return True
+
+    if 'http.response.pathsend' in (scope.get('extensions') or {}):
+        # The server sends the file itself (sendfile)
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', b'application/json'),
+                        (b'content-length', str(os.path.getsize(path)).encode()),
+                        (b'access-control-allow-origin', b'*'), *response_headers]
+        })
+        await send({'type': 'http.response.pathsend', 'path': path})
+    else:
+        payload = await asyncio.to_thread(read_file, path)
+        await send_payload(send, 200, payload, response_headers)
+    return True
+
+def read_file(path):
+    with open(path, 'rb') as shard_file:
+        return shard_file.read()
+
+# ----------------------------
+# Everything else: the Flask app
+# ----------------------------
+_flask_app = None
+
+def get_flask_app():
+    global _flask_app
+    if _flask_app is None:
+        from app import create_app
+        _flask_app = create_app()
+    return _flask_app
+
+def build_environ(scope, body):
+    """
+    Translate an ASGI request into a WSGI environ
+    """
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        # The whole body has been read already - chunked requests have no
+        # Content-Length header, and without one Flask would read nothing
+        'wsgi.input_terminated': True,
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_LENGTH':
+            continue  # set from the body above
+        if name == 'CONTENT_TYPE':
+            environ[name] = value
+        else:
+            key = f'HTTP_{name}'
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+async def call_flask(scope, receive, send):
+    """
+    Run the request through the Flask app in a worker thread
+    """
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            break
+
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response['status'] = int(status.split(' ', 1)[0])
+        response['headers'] = [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+
+    def run():
+        result = get_flask_app()(build_environ(scope, body), start_response)
+        try:
+            return b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+    payload = await asyncio.to_thread(run)
+    await send({'type': 'http.response.start', 'status': response['status'], 'headers': response['headers']})
+    await send({'type': 'http.response.body', 'body': payload})
+
+# ----------------------------
+# ASGI plumbing
+# ----------------------------
+def encode_json(body):
+    # Keys sorted like Flask's jsonify
+    return json.dumps(body, sort_keys=True).encode('utf-8')
+
+async def send_json(send, status, body, headers=()):
+    """
+    Send a JSON response
+    """
+    await send_payload(send, status, encode_json(body), headers)
+
+async def send_payload(send, status, payload, headers=()):
+    """
+    Send JSON that is already encoded
+    """
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(payload)).encode()),
+            # Same as CORS(app) in the Flask app - allow the frontend to call us
+            (b'access-control-allow-origin', b'*'),
+            *headers
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': payload})
+
+def compress_answer(scope, handler, args, payload):
+    """
+    The payload compressed for the client and the headers that go with it -
+    same negotiation, size threshold and cache as the Flask app (compression.py)
+    """
+    config = config_values()
+    compressor = get_compressor(config)
+    if compressor is None:
+        return payload, []
+    accept_encoding = dict(scope.get('headers') or []).get(b'accept-encoding', b'').decode('latin-1')
+    # Same key as in the Flask app, so the two share cached copies
+    cache_key = (local_version(), scope['path'], tuple(sorted(args.items())))
+    payload, encoding = compress_payload(compressor, config, payload, accept_encoding,
+                                         cache_key, 'jobs.' + handler.__name__)
+    headers = [(b'vary', b'Accept-Encoding')]
+    if encoding is not None:
+        headers.append((b'content-encoding', encoding.encode()))
+    return payload, headers
+
+def config_values():
+    """The settings in config.py as a dict (like app.config)"""
+    return {name: getattr(Config, name) for name in dir(Config) if name.isupper()}
+
+def get_admission():
+    """
+    The admission controller of this process (the same one the Flask app uses)
+    """
+    from admission import get_admission_controller
+    return get_admission_controller(config_values())
+
+def admit(controller, scope, endpoint, args):
+    """
+    None if the request can go ahead, otherwise (status, body, headers) to answer with
+    """
+    from admission import client_key
+    headers = dict(scope.get('headers') or [])
+    forwarded_for = headers.get(b'x-forwarded-for', b'').decode('latin-1')
+    remote_addr = scope['client'][0] if scope.get('client') else None
+    rejection = controller.admit(endpoint, client_key(remote_addr, forwarded_for, Config.ADMISSION_PROXY_COUNT), args)
+    if rejection is None:
+        return None
+    status, body, retry_after = rejection
+    extra = [(b'retry-after', str(retry_after).encode())] if retry_after is not None else []
+    return status, body, extra
+
+async def handle_lifespan(receive, send):
+    """
+    Startup does nothing (the engine is lazy), shutdown closes the pool
+    """
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            from streaming import stop_broker
+            await stop_broker()
+            if _engine is not None:
+                await _engine.dispose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def app(scope, receive, send):
+    """
+    The ASGI application - point uvicorn (or any ASGI server) at this
+    """
+    if scope['type'] == 'lifespan':
+        await handle_lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    path = scope['path']
+    if path == '/health':
+        await send_json(send, 200, {'status': 'healthy', 'message': 'Job Listing API is running'})
+        return
+
+    if scope['method'] == 'GET' and path.rstrip('/') == '/api/jobs/stream':
+        await stream_jobs(scope, receive, send)
+        return
+    if scope['method'] == 'GET' and path.rstrip('/') == '/api/jobs/stream/stats':
+        await stream_stats(scope, receive, send)
+        return
+
+    for pattern, handler, error_message in ROUTES:
+        match = pattern.match(path)
+        if not match or scope['method'] != 'GET':
+            continue
+        query_string = scope.get('query_string', b'').decode('latin-1')
+        if handler is get_jobs and 'ids' in dict(parse_qsl(query_string, keep_blank_values=True)):
+            break  # a multi-get - the Flask view has the id cap, the order and the missing ids
+        args = dict(parse_qsl(query_string))
+        controller = get_admission()
+        if controller is not None:
+            rejection = admit(controller, scope, 'jobs.' + handler.__name__, args)
+            if rejection is not None:
+                await send_json(send, *rejection)
+                return
+        headers = ()
+        try:
+            argument = int(match.group('job_id')) if 'job_id' in match.groupdict() else args
+            # A memory-mapped snapshot answers without the database (in a thread: reading it may hit the disk)
+            snapshot = get_snapshot()
+            answer = await asyncio.to_thread(answer_from_snapshot, snapshot, handler, argument) if snapshot is not None else None
+            if (answer is None and Config.STATIC_SHARDS_ENABLED and handler is not get_job
+                    and await send_static_shard(scope, send, handler, args)):
+                return
+            if answer is not None:
+                status, payload = answer
+            elif handler is get_job:
+                status, payload = await run_handler(handler, argument)
+            elif Config.SINGLE_FLIGHT_ENABLED:
+                status, payload = await _flights.do(
+                    single_flight_key(handler, args), lambda: run_handler(handler, args),
+                    Config.SINGLE_FLIGHT_TIMEOUT_SECONDS
+                )
+            else:
+                status, payload = await run_handler(handler, args)
+        except SingleFlightTimeout as e:
+            print(f"Error handling {path}: {e}")
+            status, payload = 503, encode_json({'error': 'The server is busy, try again shortly'})
+            headers = [(b'retry-after', b'1')]
+        except (QueryTimeout, QueryTooExpensive) as e:
+            print(f"Error handling {path}: {e}")
+            status, body, retry_after = error_body(e.code)
+            payload = encode_json(body)
+            headers = [(b'retry-after', str(retry_after).encode())] if retry_after is not None else []
+        except Exception as e:
+            print(f"Error handling {path}: {e}")
+            status, payload = 500, encode_json({'error': error_message})
+        finally:
+            if controller is not None:
+                controller.release()
+        if status == 200:
+            payload, compression_headers = compress_answer(scope, handler, args, payload)
+            headers = [*headers, *compression_headers]
+        await send_payload(send, status, payload, headers)
+        return
+
+    # Writes and every other endpoint
+    await call_flask(scope, receive, send)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Bulk Load Benchmark
+Saves the same scraped jobs two ways: one at a time (what the scraper used to
+do while scraping - look up, insert and commit every job) and from a staging
+file with the bulk loader (bulk_load.py). Then loads the file again to show
+that a repeated load inserts nothing.
+
+Usage: cd backend && python benchmarks/bench_bulk_load.py --jobs 5000
+       (add --database-url postgresql://... to run it on PostgreSQL; the
+       jobs table there should be empty or disposable)
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from benchmarks.synthetic import create_bench_app, make_jobs
+
+COLUMNS = ['title', 'company', 'location', 'job_type', 'tags', 'description', 'salary_range', 'experience_level']
+
+def scraped_jobs(count):
+    """Job column dicts like the scraper produces (every title unique)"""
+    jobs = []
+    for number, job in enumerate(make_jobs(count, seed=7)):
+        fields = {name: job[name] for name in COLUMNS}
+        fields['title'] = f"{job['title']} #{number}"
+        fields['posting_date'] = job['posting_date']
+        jobs.append(fields)
+    return jobs
+
+def write_staging_file(jobs):
+    path = os.path.join(tempfile.mkdtemp(), 'run-bench.ndjson')
+    with open(path, 'w', encoding='utf-8') as staging_file:
+        for job in jobs:
+            staging_file.write(json.dumps(dict(job, posting_date=job['posting_date'].isoformat(), page=1)) + '\n')
+    return path
+
+def save_one_by_one(session, jobs):
+    """The old scraper loop: a duplicate check query and a commit per job"""
+    from models.job import Job
+    from dedupe import flag_duplicates
+    for fields in jobs:
+        if session.query(Job).filter(Job.title == fields['title'], Job.company == fields['company']).first():
+            continue
+        job = Job(**fields)
+        session.add(job)
+        session.flush()
+        flag_duplicates(session, [job])
+        session.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare saving jobs one by one with the bulk loader')
+    parser.add_argument('--jobs', type=int, default=5000, help='How many scraped jobs')
+    parser.add_argument('--existing', type=int, default=1000, help='Jobs already in the table')
+    parser.add_argument('--batch-size', type=int, default=1000, help='BULK_LOAD_BATCH_SIZE')
+    parser.add_argument('--database-url', help='Database to use (default: a fresh SQLite file per run)')
+    args = parser.parse_args()
+
+    import contextlib
+    import io
+    from db import db
+    from bulk_load import load_staging_file
+
+    print("Job Listing Web App - Bulk Load Benchmark")
+    print("=" * 60)
+    jobs = scraped_jobs(args.jobs)
+    path = write_staging_file(jobs)
+    print(f"{args.jobs} scraped jobs, staging file {os.path.getsize(path) / 1024:.0f} KB")
+
+    app = create_bench_app(args.existing, database_url=args.database_url)
+    with app.app_context():
+        start = time.perf_counter()
+        save_one_by_one(db.session, jobs)
+        seconds = time.perf_counter() - start
+        db.session.remove()
+    print(f"{'one by one':16} {args.jobs / seconds:8.0f} jobs/s   {seconds:6.2f} s")
+
+    # A fresh database so both start from the same table
+    app = create_bench_app(args.existing, database_url=args.database_url)
+    with app.app_context():
+        for label, force in (('bulk loader', False), ('same file again', True)):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                counts = load_staging_file(db.session, path, batch_size=args.batch_size, force=force)
+            seconds = time.perf_counter() - start
+            print(f"{label:16} {args.jobs / seconds:8.0f} jobs/s   {seconds:6.2f} s   inserted {counts['inserted']}")
+
+if __name__ == '__main__':
+    main()
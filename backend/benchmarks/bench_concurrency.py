@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Concurrency Benchmark: sync Flask app vs async (ASGI) app
+Opens many connections at once against both servers and reports
+throughput, latency percentiles and failed requests
+
+Each connection behaves like a slow client: it connects, waits a bit
+before sending its request (--slow-ms), then reads the response.
+A sync worker is stuck for that whole time, an async worker is not.
+
+Usage: cd backend && python benchmarks/bench_concurrency.py --connections 1000
+"""
+
+import os
+import sys
+import time
+import shlex
+import socket
+import asyncio
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+DEFAULT_SYNC_CMD = 'gunicorn --workers 4 --bind 127.0.0.1:{port} app:app'
+DEFAULT_ASYNC_CMD = 'uvicorn asgi:app --workers 4 --port {port} --log-level warning'
+
+def free_port():
+    """Ask the OS for a free TCP port"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_for_port(port, timeout=30):
+    """Wait until a server is listening on the port"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+async def one_client(port, path, slow_ms, timeout):
+    """
+    Open a connection, wait like a slow client, send one GET and read the reply
+    Returns the latency in ms, or None if the request failed
+    """
+    start = time.perf_counter()
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), timeout)
+        await asyncio.sleep(slow_ms / 1000)
+        writer.write(f'GET {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'.encode())
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+        writer.close()
+        if not response.startswith(b'HTTP/1.1 200') and not response.startswith(b'HTTP/1.0 200'):
+            return None
+        return (time.perf_counter() - start) * 1000
+    except (OSError, asyncio.TimeoutError):
+        return None
+
+async def run_load(port, path, connections, slow_ms, timeout):
+    """Fire all the connections at once and collect the results"""
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        one_client(port, path, slow_ms, timeout) for _ in range(connections)
+    ])
+    elapsed = time.perf_counter() - start
+    latencies = sorted(r for r in results if r is not None)
+    return elapsed, latencies, len(results) - len(latencies)
+
+def report(name, connections, elapsed, latencies, failed):
+    """Print one line of results"""
+    if latencies:
+        p50 = statistics.median(latencies)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    else:
+        p50 = p99 = float('nan')
+    print(f"{name:<6} {connections:>6} conns   {len(latencies) / elapsed:8.1f} req/s   "
+          f"p50 {p50:8.1f} ms   p99 {p99:8.1f} ms   failed {failed}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the sync and async apps under many open connections')
+    parser.add_argument('--connections', type=int, default=1000, help='Concurrent connections')
+    parser.add_argument('--slow-ms', type=int, default=200, help='How long each client waits before sending its request')
+    parser.add_argument('--timeout', type=float, default=60, help='Per request timeout in seconds')
+    parser.add_argument('--path', default='/api/jobs?page=1&per_page=5', help='Request path')
+    parser.add_argument('--sync-cmd', default=DEFAULT_SYNC_CMD, help='Command that starts the sync server ({port} is filled in)')
+    parser.add_argument('--async-cmd', default=DEFAULT_ASYNC_CMD, help='Command that starts the async server ({port} is filled in)')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # Every connection comes from this machine - don't let the rate limiter turn them away
+    env.setdefault('ADMISSION_CONTROL_ENABLED', 'false')
+    if not env.get('DATABASE_URL'):
+        # Throwaway SQLite database with a few jobs in it
+        env['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_concurrency.db')
+        subprocess.run([sys.executable, 'init_db.py'], cwd=backend_dir, env=env, capture_output=True)
+        subprocess.run([sys.executable, 'sample_data.py'], cwd=backend_dir, env=env, capture_output=True)
+
+    print("Job Listing Web App - Concurrency Benchmark")
+    print("=" * 70)
+    print(f"Path: {args.path}   slow client delay: {args.slow_ms} ms")
+    print("=" * 70)
+
+    for name, command in [('sync', args.sync_cmd), ('async', args.async_cmd)]:
+        port = free_port()
+        server = subprocess.Popen(
+            shlex.split(command.format(port=port)), cwd=backend_dir, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            if not wait_for_port(port):
+                print(f"{name}: server did not start ({command})")
+                continue
+            # Warm up (first request creates the engine and connection pool)
+            asyncio.run(run_load(port, args.path, 10, 0, args.timeout))
+            elapsed, latencies, failed = asyncio.run(
+                run_load(port, args.path, args.connections, args.slow_ms, args.timeout)
+            )
+            report(name, args.connections, elapsed, latencies, failed)
+        finally:
+            server.terminate()
+            server.wait()
+
+if __name__ == '__main__':
+    main()
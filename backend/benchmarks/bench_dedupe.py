@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Detection Benchmark
+Fills a database with synthetic jobs, then adds reposts of some of them
+(abbreviated titles, another city, a few description words changed) mixed
+with new jobs, one POST at a time. Reports how many reposts were caught,
+how many new jobs were wrongly flagged, the cost per insert, and how long
+the batch clustering takes
+
+Usage: cd backend && python benchmarks/bench_dedupe.py --jobs 50000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from benchmarks.synthetic import create_bench_app, make_jobs, LOCATIONS, WORDS
+from benchmarks.bench_read_engine import percentile
+
+def repost(job, rng):
+    """
+    A slightly reworded copy of a job, like the same role posted again
+    """
+    title = job['title'].replace('Senior ', 'Sr. ') if 'Senior ' in job['title'] else job['title'].replace('Sr. ', 'Senior ')
+    words = job['description'].split()
+    for _ in range(max(1, len(words) // 25)):  # change ~4% of the words
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return dict(job, title=title, location=rng.choice(LOCATIONS), description=' '.join(words))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark near-duplicate detection')
+    parser.add_argument('--jobs', type=int, default=50000, help='How many synthetic jobs')
+    parser.add_argument('--inserts', type=int, default=1000, help='How many jobs to POST (half of them reposts)')
+    args = parser.parse_args()
+
+    from db import db
+    from models.job import Job
+    from dedupe import cluster_duplicates
+
+    print("Job Listing Web App - Near-Duplicate Detection Benchmark")
+    print("=" * 60)
+    app = create_bench_app(args.jobs)
+
+    with app.app_context():
+        start = time.perf_counter()
+        cluster_duplicates(db.session)
+        print(f"Batch clustering of {args.jobs} jobs: {time.perf_counter() - start:.1f} s")
+        existing = [job.to_dict() for job in Job.query.order_by(Job.id).limit(args.inserts)]
+
+    rng = random.Random(5)
+    fresh = make_jobs(args.inserts, seed=99)
+    client = app.test_client()
+    timings = []
+    caught = false_alarms = 0
+    for i in range(args.inserts):
+        is_repost = i % 2 == 0
+        if is_repost:
+            original = existing[i]
+            job = repost(original, rng)
+            job['tags'] = ', '.join(job['tags'])
+        else:
+            job = {key: value for key, value in fresh[i].items() if isinstance(value, str)}
+        start = time.perf_counter()
+        response = client.post('/api/jobs', json=job)
+        timings.append((time.perf_counter() - start) * 1000)
+        canonical_id = response.get_json()['job']['canonical_id']
+        if is_repost:
+            caught += canonical_id == original['id']
+        else:
+            false_alarms += canonical_id is not None
+
+    reposts = (args.inserts + 1) // 2
+    print("=" * 60)
+    print(f"Reposts caught: {caught}/{reposts}   new jobs wrongly flagged: {false_alarms}/{args.inserts - reposts}")
+    print(f"POST /api/jobs   p50 {percentile(timings, 0.5):.2f} ms   p99 {percentile(timings, 0.99):.2f} ms")
+
+if __name__ == '__main__':
+    main()
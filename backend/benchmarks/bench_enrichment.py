@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Enrichment Benchmark
+Times the classifiers of enrichment.py on their own (one core) and the whole
+pipeline - read a chunk, classify it in the process pool, write it back - with
+more and more worker processes, in rows/sec and rows/sec per core
+
+Usage: cd backend && python benchmarks/bench_enrichment.py --jobs 100000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from benchmarks.synthetic import create_bench_app, make_jobs
+
+def worker_counts():
+    """1, 2, 4, ... up to the number of CPUs"""
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the enrichment classifiers and pipeline')
+    parser.add_argument('--jobs', type=int, default=100000, help='How many synthetic jobs')
+    parser.add_argument('--chunk-size', type=int, default=2000, help='Jobs per chunk')
+    args = parser.parse_args()
+
+    from db import db
+    from enrichment import classify_chunk, enrich_jobs
+
+    print("Job Listing Web App - Enrichment Benchmark")
+    print("=" * 60)
+
+    # 1. The classifiers alone, in this process
+    jobs = make_jobs(args.jobs)
+    rows = [(number, job['title'], job['description']) for number, job in enumerate(jobs)]
+    start = time.perf_counter()
+    results = classify_chunk(rows)
+    seconds = time.perf_counter() - start
+    print(f"Classifiers only: {len(rows) / seconds:,.0f} rows/s on one core")
+
+    # What the scraper's old substring check made of the same text
+    crude = sum(1 for job in jobs if 'r' in (job['title'] + ' ' + job['description']).lower())
+    derived = sum(1 for job_id, values in results if 'R' in values['enriched_tags'])
+    print(f"Tagged R: {crude / len(jobs):.0%} with \"r\" in text, {derived / len(jobs):.0%} by the classifiers")
+
+    # 2. The whole pipeline on a database
+    app = create_bench_app(args.jobs, ENRICHMENT_INCREMENTAL=False)
+    print(f"\n{'workers':>8} {'rows/s':>10} {'rows/s per core':>16} {'seconds':>9}")
+    with app.app_context():
+        for workers in worker_counts():
+            start = time.perf_counter()
+            enriched = enrich_jobs(db.session, workers=workers, chunk_size=args.chunk_size, everything=True)
+            seconds = time.perf_counter() - start
+            print(f"{workers:>8} {enriched / seconds:10,.0f} {enriched / seconds / workers:16,.0f} {seconds:9.1f}")
+
+        # 3. An incremental run when nothing changed
+        start = time.perf_counter()
+        enriched = enrich_jobs(db.session, chunk_size=args.chunk_size)
+        print(f"\nIncremental run with nothing to do: {enriched} jobs in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Facet Count Benchmark: SQL GROUP BY vs bitmap index
+Loads N synthetic jobs and computes drill-down facet counts for random
+filter selections both ways, reporting p50/p99 latency and index size
+
+Usage: cd backend && python benchmarks/bench_facets.py --jobs 100000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from benchmarks.synthetic import create_bench_app
+from benchmarks.bench_read_engine import random_params, percentile
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare SQL and bitmap facet counts')
+    parser.add_argument('--jobs', type=int, default=100000, help='How many synthetic jobs')
+    parser.add_argument('--queries', type=int, default=200, help='How many random selections')
+    args = parser.parse_args()
+
+    from db import db
+    from engines.facets import load_facet_index, count_facets_with_sql, search_job_ids
+
+    print("Job Listing Web App - Facet Count Benchmark")
+    print("=" * 60)
+    app = create_bench_app(args.jobs)
+
+    with app.app_context():
+        start = time.perf_counter()
+        index = load_facet_index(db.session)
+        print(f"Index built in {time.perf_counter() - start:.1f} s, "
+              f"{index.memory_usage() / 1e6:.1f} MB of bitmaps for {len(index)} jobs")
+
+        rng = random.Random(11)
+        workload = [random_params(rng) for _ in range(args.queries)]
+        timings = {'sql': [], 'bitmap': []}
+        mismatches = 0
+        for params in workload:
+            t0 = time.perf_counter()
+            sql_counts = count_facets_with_sql(db.session, params)
+            t1 = time.perf_counter()
+            search_ids = search_job_ids(db.session, params['search']) if params.get('search') else None
+            bitmap_counts = index.counts(params, search_ids)
+            t2 = time.perf_counter()
+            timings['sql'].append((t1 - t0) * 1000)
+            timings['bitmap'].append((t2 - t1) * 1000)
+            if sql_counts != bitmap_counts:
+                mismatches += 1
+
+    print("=" * 60)
+    for name, samples in timings.items():
+        print(f"{name:<7} p50 {percentile(samples, 0.5):8.2f} ms   p99 {percentile(samples, 0.99):8.2f} ms")
+    print("(bitmap times include the SQL lookup of search matches)")
+    print(f"Selections with different counts: {mismatches} of {len(workload)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Group Commit Benchmark
+Many clients POST jobs at the same time, once with a transaction per job and
+once with the group commit writer (group_commit.py). Prints jobs/s and the
+request latency of both.
+
+Usage: cd backend && python benchmarks/bench_group_commit.py --clients 32
+       (add --database-url postgresql://... to run it on PostgreSQL; the
+       jobs table there should be empty or disposable)
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from benchmarks.synthetic import create_bench_app, make_jobs
+from benchmarks.bench_read_engine import percentile
+
+def post_jobs(app, clients, per_client):
+    """
+    Every client posts its jobs one after another, all clients at once
+    Returns (seconds, latencies in ms, failed requests)
+    """
+    payloads = [
+        {key: value for key, value in job.items() if key in ('title', 'company', 'location', 'job_type', 'tags', 'description')}
+        for job in make_jobs(clients * per_client, seed=int(time.time()))
+    ]
+    latencies = []
+    failures = []
+    start_together = threading.Barrier(clients + 1)
+
+    def client(number):
+        test_client = app.test_client()
+        start_together.wait()
+        for payload in payloads[number::clients]:
+            started = time.perf_counter()
+            response = test_client.post('/api/jobs', json=payload)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 201:
+                failures.append(response.status_code)
+
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(clients)]
+    for thread in threads:
+        thread.start()
+    start_together.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies, len(failures)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare one transaction per job with group commit')
+    parser.add_argument('--clients', type=int, default=32, help='Clients posting at the same time')
+    parser.add_argument('--per-client', type=int, default=50, help='Jobs each client posts')
+    parser.add_argument('--max-delay-ms', type=float, default=5, help='GROUP_COMMIT_MAX_DELAY_MS')
+    parser.add_argument('--database-url', help='Database to use (default: a fresh SQLite file)')
+    args = parser.parse_args()
+
+    import contextlib
+    import io
+    from group_commit import init_group_commit
+
+    print("Job Listing Web App - Group Commit Benchmark")
+    print("=" * 60)
+    app = create_bench_app(1000, database_url=args.database_url, SAVED_SEARCH_ALERTS=False,
+                           GROUP_COMMIT_MAX_DELAY_MS=args.max_delay_ms)
+    total = args.clients * args.per_client
+    print(f"{args.clients} clients posting {total} jobs on {app.config['SQLALCHEMY_DATABASE_URI'].split(':')[0]}")
+
+    for mode in ('transaction per job', 'group commit'):
+        if mode == 'group commit':
+            app.config['GROUP_COMMIT_ENABLED'] = True
+            writer = init_group_commit(app)
+        # The routes print every job - keep the output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            seconds, latencies, failures = post_jobs(app, args.clients, args.per_client)
+        print(f"{mode:20} {total / seconds:8.0f} jobs/s   p50 {percentile(latencies, 0.5):6.1f} ms   "
+              f"p99 {percentile(latencies, 0.99):7.1f} ms   failed {failures}")
+    print(f"Group commit: {writer.jobs / max(writer.batches, 1):.1f} jobs per transaction on average")
+
+if __name__ == '__main__':
+    main()
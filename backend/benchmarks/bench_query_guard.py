@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Query Guard Benchmark
+Times GET /api/jobs with the query guard (query_guard.py) off and on: the
+overhead on normal requests, and the latency of expensive searches with a
+statement timeout (they should stop at the timeout with a 503) and with the
+cost guard degrading them (no exact count)
+
+Usage: cd backend && python benchmarks/bench_query_guard.py --jobs 200000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import contextlib
+import io
+from urllib.parse import urlencode
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from benchmarks.synthetic import create_bench_app
+from benchmarks.bench_read_engine import percentile, random_params
+
+# Searches that match nothing: the whole table is read for the count and the page
+EXPENSIVE = ['search=zzzz', 'search=nothing&tags=Python,SQL', 'search=qqq&location=Nowhere&sort=title_asc']
+
+# Guard settings compared, applied to app.config
+MODES = {
+    'off': {'STATEMENT_TIMEOUTS_ENABLED': False, 'READ_ONLY_GETS': False, 'QUERY_COST_GUARD': 'off'},
+    'timeouts': {'STATEMENT_TIMEOUTS_ENABLED': True, 'READ_ONLY_GETS': True, 'QUERY_COST_GUARD': 'off'},
+    'timeouts + degrade': {'STATEMENT_TIMEOUTS_ENABLED': True, 'READ_ONLY_GETS': True, 'QUERY_COST_GUARD': 'degrade'},
+}
+
+def time_requests(client, paths):
+    """Latencies in ms and the status codes of GET requests to `paths`"""
+    timings, statuses = [], []
+    for path in paths:
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = client.get(path)
+        timings.append((time.perf_counter() - start) * 1000)
+        statuses.append(response.status_code)
+    return timings, statuses
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the query guard on GET /api/jobs')
+    parser.add_argument('--jobs', type=int, default=200000, help='How many synthetic jobs')
+    parser.add_argument('--requests', type=int, default=200, help='Normal requests per mode')
+    parser.add_argument('--timeout-ms', type=int, default=500, help='Statement timeout of GET /api/jobs')
+    parser.add_argument('--budget', type=float, default=50000, help='QUERY_COST_BUDGET (rows scanned on SQLite)')
+    args = parser.parse_args()
+
+    print("Job Listing Web App - Query Guard Benchmark")
+    print("=" * 60)
+    # Every request runs its queries (no coalescing, no pre-rendered pages)
+    app = create_bench_app(args.jobs, SINGLE_FLIGHT_ENABLED=False, STATIC_SHARDS_ENABLED=False,
+                           STATEMENT_TIMEOUTS_MS={'jobs.get_jobs': args.timeout_ms}, QUERY_COST_BUDGET=args.budget)
+    client = app.test_client()
+    rng = random.Random(7)
+    normal = ['/api/jobs?' + urlencode(random_params(rng)) for _ in range(args.requests)]
+    expensive = ['/api/jobs?' + query for query in EXPENSIVE] * 5
+    print(f"{args.jobs} jobs, list timeout {args.timeout_ms} ms, cost budget {args.budget:.0f}")
+
+    print(f"{'mode':20} {'normal p50':>11} {'normal p99':>11} {'timed out':>10} {'expensive p50':>14} {'max':>9}  expensive answers")
+    for mode, settings in MODES.items():
+        app.config.update(settings)
+        time_requests(client, normal[:10])  # warm up (and EXPLAIN the shapes once)
+        normal_timings, normal_statuses = time_requests(client, normal)
+        expensive_timings, statuses = time_requests(client, expensive)
+        answers = ', '.join(f"{status} x{statuses.count(status)}" for status in sorted(set(statuses)))
+        print(f"{mode:20} {percentile(normal_timings, 0.5):8.2f} ms {percentile(normal_timings, 0.99):8.2f} ms "
+              f"{normal_statuses.count(503):10} "
+              f"{percentile(expensive_timings, 0.5):11.2f} ms {max(expensive_timings):6.0f} ms  {answers}")
+
+if __name__ == '__main__':
+    main()
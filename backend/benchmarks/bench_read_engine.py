@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Read Engine Benchmark: SQL vs in-memory columnar catalog
+Loads N synthetic jobs, then runs the same random get_jobs queries through
+both paths and reports memory use, p50/p99 latency and whether they agree
+
+Usage: cd backend && python benchmarks/bench_read_engine.py --jobs 100000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from benchmarks.synthetic import create_bench_app, LOCATIONS, TAGS, JOB_TYPES, WORDS
+
+SORTS = ['posting_date_desc', 'posting_date_asc', 'title_asc', 'company_desc']
+
+def random_params(rng):
+    """A get_jobs request like the frontend would send"""
+    params = {'page': rng.choice([1, 1, 1, 2, 3]), 'per_page': rng.choice([5, 10, 20]),
+              'sort': rng.choice(SORTS)}
+    if rng.random() < 0.4:
+        params['job_type'] = rng.choice(JOB_TYPES)
+    if rng.random() < 0.4:
+        params['location'] = rng.choice(LOCATIONS).split(',')[0]
+    if rng.random() < 0.4:
+        params['tags'] = rng.choice(TAGS)
+    if rng.random() < 0.3:
+        params['search'] = rng.choice(WORDS)
+    return params
+
+def sql_query(params):
+    """The SQL path of get_jobs"""
+    from models.job import Job
+    from models.job_queries import apply_job_filters, apply_job_sort
+    query = apply_job_sort(apply_job_filters(Job.query, params), params['sort'])
+    total = query.count()
+    jobs = query.offset((params['page'] - 1) * params['per_page']).limit(params['per_page']).all()
+    return total, [job.to_dict() for job in jobs]
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the SQL and columnar read paths')
+    parser.add_argument('--jobs', type=int, default=100000, help='How many synthetic jobs')
+    parser.add_argument('--queries', type=int, default=300, help='How many random queries')
+    args = parser.parse_args()
+
+    from db import db
+    from engines.columnar import load_catalog
+
+    print("Job Listing Web App - Read Engine Benchmark")
+    print("=" * 60)
+    start = time.perf_counter()
+    app = create_bench_app(args.jobs)
+    print(f"Created {args.jobs} synthetic jobs in {time.perf_counter() - start:.1f} s")
+
+    with app.app_context():
+        tracemalloc.start()
+        start = time.perf_counter()
+        catalog = load_catalog(db.session)
+        catalog.query({'page': 1, 'per_page': 5, 'sort': 'posting_date_desc', 'search': 'x'})
+        load_seconds = time.perf_counter() - start
+        traced, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"Catalog loaded in {load_seconds:.1f} s")
+        print(f"Memory: {traced / 1e6:.1f} MB traced, {catalog.memory_usage() / 1e6:.1f} MB estimated "
+              f"({traced / max(len(catalog), 1) * 100000 / 1e6:.1f} MB per 100k jobs)")
+
+        rng = random.Random(7)
+        workload = [random_params(rng) for _ in range(args.queries)]
+        timings = {'sql': [], 'columnar': []}
+        mismatches = 0
+        for params in workload:
+            t0 = time.perf_counter()
+            sql_result = sql_query(params)
+            t1 = time.perf_counter()
+            columnar_result = catalog.query(params)
+            t2 = time.perf_counter()
+            timings['sql'].append((t1 - t0) * 1000)
+            timings['columnar'].append((t2 - t1) * 1000)
+            if sql_result != columnar_result:
+                mismatches += 1
+
+    print("=" * 60)
+    for name, samples in timings.items():
+        print(f"{name:<9} p50 {percentile(samples, 0.5):8.2f} ms   p99 {percentile(samples, 0.99):8.2f} ms   "
+              f"max {max(samples):8.2f} ms")
+    print(f"Queries with different results: {mismatches} of {len(workload)}")
+
+if __name__ == '__main__':
+    main()
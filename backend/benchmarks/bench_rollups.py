@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Stats Rollups Benchmark
+Fills the database with a year of synthetic postings, builds the rollups
+(rollups.py) and times the /api/stats endpoints against the same reports
+computed from the jobs table with GROUP BY queries
+
+Usage: cd backend && python benchmarks/bench_rollups.py --jobs 100000
+"""
+
+import os
+import sys
+import time
+import argparse
+import contextlib
+import io
+from collections import Counter
+from datetime import datetime, timedelta
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from sqlalchemy import select, func
+from benchmarks.synthetic import create_bench_app, make_jobs
+from benchmarks.bench_read_engine import percentile
+
+def report_from_jobs(session, name):
+    """The same report straight from the jobs table (what we did before the rollups)"""
+    from models.job import Job
+    from models.job_queries import split_tags
+    since = datetime.utcnow() - timedelta(days=365)
+    if name == 'postings per day':
+        return session.execute(
+            select(func.date(Job.posting_date), func.count()).where(Job.posting_date >= since)
+            .group_by(func.date(Job.posting_date))
+        ).all()
+    if name == 'one company per week':
+        return session.execute(
+            select(func.date(Job.posting_date), func.count()).where(Job.posting_date >= since, Job.company == 'Aon')
+            .group_by(func.date(Job.posting_date))
+        ).all()
+    if name == 'top companies':
+        return session.execute(
+            select(Job.company, func.count()).where(Job.posting_date >= since)
+            .group_by(Job.company).order_by(func.count().desc()).limit(20)
+        ).all()
+    # Tags are a comma separated string - they can only be counted in Python
+    counts = Counter()
+    for (tags,) in session.execute(select(Job.tags).where(Job.posting_date >= since)):
+        counts.update(set(split_tags(tags)))
+    return counts.most_common(20)
+
+REPORTS = {
+    'postings per day': '/api/stats/postings',
+    'one company per week': '/api/stats/postings?company=Aon&interval=week',
+    'top companies': '/api/stats/companies',
+    'top tags': '/api/stats/tags',
+}
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the stats rollups with queries on the jobs table')
+    parser.add_argument('--jobs', type=int, default=100000, help='How many synthetic jobs (posted over a year)')
+    parser.add_argument('--requests', type=int, default=50, help='Requests per report and mode')
+    args = parser.parse_args()
+
+    from db import db
+    from models.job import Job
+    from rollups import rebuild_rollups
+
+    print("Job Listing Web App - Stats Rollups Benchmark")
+    print("=" * 60)
+    app = create_bench_app(0)
+    client = app.test_client()
+    with app.app_context():
+        db.session.execute(Job.__table__.insert(), make_jobs(args.jobs, days=365))
+        db.session.commit()
+        start = time.perf_counter()
+        rows = rebuild_rollups(db.session)
+        db.session.commit()
+        print(f"Rollups for {args.jobs} jobs: {rows} rows, built in {time.perf_counter() - start:.1f} s")
+
+        print(f"{'report':24} {'jobs table p50':>15} {'rollups p50':>12} {'rollups p99':>12}")
+        for name, path in REPORTS.items():
+            timings = {'jobs': [], 'rollups': []}
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                report_from_jobs(db.session, name)
+                timings['jobs'].append((time.perf_counter() - start) * 1000)
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    response = client.get(path)
+                timings['rollups'].append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    print(f"{path}: {response.status_code}")
+            print(f"{name:24} {percentile(timings['jobs'], 0.5):12.2f} ms {percentile(timings['rollups'], 0.5):9.2f} ms "
+                  f"{percentile(timings['rollups'], 0.99):9.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Similar Jobs Benchmark
+Times the batch (vectorising + blocked top-K search) with one process and
+with a pool, and the latency of GET /api/jobs/<id>/similar afterwards
+
+Usage: cd backend && python benchmarks/bench_similarity.py --jobs 50000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from benchmarks.synthetic import create_bench_app
+from benchmarks.bench_read_engine import percentile
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the similar jobs batch and endpoint')
+    parser.add_argument('--jobs', type=int, default=50000, help='How many synthetic jobs')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Processes for the pooled run')
+    parser.add_argument('--requests', type=int, default=500, help='How many endpoint requests')
+    args = parser.parse_args()
+
+    from db import db
+    from models.job import Job
+    from engines.similarity import SimilarityModel, compute_neighbours, build_similarities
+
+    print("Job Listing Web App - Similar Jobs Benchmark")
+    print("=" * 60)
+    app = create_bench_app(args.jobs)
+    model_path = os.path.join(tempfile.mkdtemp(), 'similarity_model.npz')
+
+    with app.app_context():
+        jobs = [
+            {'id': job.id, 'title': job.title, 'tags': job.tags, 'description': job.description}
+            for job in Job.query.all()
+        ]
+        start = time.perf_counter()
+        model = SimilarityModel.fit(jobs)
+        print(f"Vectorised {len(jobs)} jobs in {time.perf_counter() - start:.1f} s")
+
+        for workers in sorted({1, args.workers}):
+            start = time.perf_counter()
+            compute_neighbours(model, app.config['SIMILAR_JOBS_K'], workers=workers)
+            print(f"Top-K search with {workers} process(es): {time.perf_counter() - start:.1f} s")
+
+        print("-" * 60)
+        build_similarities(db.session, model_path, k=app.config['SIMILAR_JOBS_K'], workers=args.workers)
+        job_ids = [job['id'] for job in jobs]
+
+    client = app.test_client()
+    rng = random.Random(3)
+    timings = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        client.get(f'/api/jobs/{rng.choice(job_ids)}/similar')
+        timings.append((time.perf_counter() - start) * 1000)
+
+    print("=" * 60)
+    print(f"GET /api/jobs/<id>/similar   p50 {percentile(timings, 0.5):.2f} ms   p99 {percentile(timings, 0.99):.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Single-Flight Stress Test
+Sends bursts of identical concurrent requests (the front page and the
+filter options) and counts the SQL statements they cause, with and without
+request coalescing (single_flight.py). With coalescing the count should
+stay flat however many duplicates arrive at once.
+
+Usage: cd backend && python benchmarks/bench_single_flight.py --jobs 50000
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+import contextlib
+import io
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from benchmarks.synthetic import create_bench_app
+
+PATHS = ['/api/jobs?page=1&sort=posting_date_desc', '/api/jobs/filters']
+
+def burst(app, path, concurrency):
+    """
+    `concurrency` identical requests at once - returns (seconds, failed requests)
+    """
+    clients = [app.test_client() for _ in range(concurrency)]
+    start_together = threading.Barrier(concurrency + 1)
+    failures = []
+
+    def client(test_client):
+        start_together.wait()
+        if test_client.get(path).status_code != 200:
+            failures.append(path)
+
+    threads = [threading.Thread(target=client, args=(test_client,)) for test_client in clients]
+    for thread in threads:
+        thread.start()
+    start_together.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, len(failures)
+
+def main():
+    parser = argparse.ArgumentParser(description='Count queries for bursts of identical requests')
+    parser.add_argument('--jobs', type=int, default=50000, help='How many synthetic jobs')
+    parser.add_argument('--concurrency', default='1,4,16,64', help='Comma separated burst sizes')
+    args = parser.parse_args()
+
+    from sqlalchemy import event
+    from db import db
+    from single_flight import init_single_flight
+
+    print("Job Listing Web App - Single-Flight Stress Test")
+    print("=" * 60)
+    app = create_bench_app(args.jobs)
+
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', lambda *_: statements.append(1))
+
+    print(f"{'path':42} {'burst':>5} {'coalescing':>10} {'queries':>8} {'ms':>8} {'failed':>6}")
+    for path in PATHS:
+        for concurrency in [int(value) for value in args.concurrency.split(',')]:
+            for coalescing in (False, True):
+                app.extensions.pop('single_flight', None)
+                if coalescing:
+                    init_single_flight(app)
+                # The routes print every request - keep the output readable
+                with contextlib.redirect_stdout(io.StringIO()):
+                    burst(app, path, 1)  # warm up
+                    statements.clear()
+                    seconds, failures = burst(app, path, concurrency)
+                print(f"{path:42} {concurrency:5} {'on' if coalescing else 'off':>10} "
+                      f"{len(statements):8} {seconds * 1000:8.1f} {failures:6}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Catalog Snapshot Benchmark: SQL vs memory-mapped snapshot
+Loads N synthetic jobs, writes a snapshot (engines/snapshot.py), then runs
+the same random get_jobs queries and single job lookups through both paths
+and reports build/open time, memory, p50/p99 latency and whether they agree
+
+Usage: cd backend && python benchmarks/bench_snapshot.py --jobs 100000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from benchmarks.synthetic import create_bench_app
+from benchmarks.bench_read_engine import random_params, sql_query, percentile
+
+def same_result(params, sql_result, snapshot_result):
+    """
+    Same total and the same sort values on the page (SQL returns jobs with
+    equal titles or companies in no particular order, so their ids can differ)
+    """
+    field = params['sort'].rpartition('_')[0]
+    return (sql_result[0] == snapshot_result[0]
+            and [job[field] for job in sql_result[1]] == [job[field] for job in snapshot_result[1]])
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the SQL and snapshot read paths')
+    parser.add_argument('--jobs', type=int, default=100000, help='How many synthetic jobs')
+    parser.add_argument('--queries', type=int, default=300, help='How many random queries')
+    args = parser.parse_args()
+
+    from db import db
+    from models.job import Job
+    from engines.snapshot import build_snapshot, CatalogSnapshot
+
+    print("Job Listing Web App - Catalog Snapshot Benchmark")
+    print("=" * 60)
+    start = time.perf_counter()
+    app = create_bench_app(args.jobs)
+    print(f"Created {args.jobs} synthetic jobs in {time.perf_counter() - start:.1f} s")
+
+    with app.app_context():
+        path = build_snapshot(db.session, tempfile.mkdtemp())
+
+        # Opening only maps the file - nothing is read or copied yet
+        tracemalloc.start()
+        start = time.perf_counter()
+        snapshot = CatalogSnapshot(path)
+        open_ms = (time.perf_counter() - start) * 1000
+        traced, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"Snapshot opened in {open_ms:.2f} ms, {traced / 1e3:.0f} kB of Python memory "
+              f"({os.path.getsize(path) / 1e6:.1f} MB file, shared by every process that maps it)")
+
+        rng = random.Random(7)
+        workload = [random_params(rng) for _ in range(args.queries)]
+        job_ids = [rng.randint(1, args.jobs) for _ in range(args.queries)]
+        timings = {'sql list': [], 'snapshot list': [], 'sql job': [], 'snapshot job': []}
+        mismatches = 0
+        for params, job_id in zip(workload, job_ids):
+            t0 = time.perf_counter()
+            sql_result = sql_query(params)
+            t1 = time.perf_counter()
+            snapshot_result = snapshot.query(params)
+            t2 = time.perf_counter()
+            sql_job = db.session.get(Job, job_id).to_dict()
+            t3 = time.perf_counter()
+            snapshot_job = snapshot.get(job_id)
+            t4 = time.perf_counter()
+            timings['sql list'].append((t1 - t0) * 1000)
+            timings['snapshot list'].append((t2 - t1) * 1000)
+            timings['sql job'].append((t3 - t2) * 1000)
+            timings['snapshot job'].append((t4 - t3) * 1000)
+            if not same_result(params, sql_result, snapshot_result) or sql_job != snapshot_job:
+                mismatches += 1
+
+    print("=" * 60)
+    for name, samples in timings.items():
+        print(f"{name:<14} p50 {percentile(samples, 0.5):8.2f} ms   p99 {percentile(samples, 0.99):8.2f} ms   "
+              f"max {max(samples):8.2f} ms")
+    print(f"Requests with different results: {mismatches} of {len(workload)}")
+
+if __name__ == '__main__':
+    main()
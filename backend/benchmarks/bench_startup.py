@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark for Job Listing Web App
+Measures how long it takes to import the app, build it, and for a fresh
+worker process to answer its first request - and how much of that is just
+importing the libraries
+
+Usage: cd backend && python benchmarks/bench_startup.py [--runs 5]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+# Each snippet runs in a brand new Python process so we measure a real cold start.
+# They print a JSON dict of timings (in milliseconds) on the last line.
+SNIPPETS = {
+    # Just importing the module (what gunicorn/uvicorn do before forking workers)
+    'import': '''
+import time, json
+t0 = time.perf_counter()
+import app
+print(json.dumps({'import': (time.perf_counter() - t0) * 1000}))
+''',
+    # What importing the libraries costs on its own (create_app() loads Flask and
+    # SQLAlchemy; numpy and scipy only once a job is posted or changed)
+    'libraries': '''
+import time, json
+t0 = time.perf_counter()
+import flask, flask_cors
+t1 = time.perf_counter()
+import flask_sqlalchemy
+t2 = time.perf_counter()
+import numpy, scipy.sparse
+t3 = time.perf_counter()
+print(json.dumps({'flask': (t1 - t0) * 1000, 'sqlalchemy': (t2 - t1) * 1000, 'numpy_scipy': (t3 - t2) * 1000}))
+''',
+    # Lazy startup: build the app and answer /health without touching the database
+    'lazy_worker': '''
+import time, json
+t0 = time.perf_counter()
+from app import create_app
+application = create_app()
+t1 = time.perf_counter()
+application.test_client().get('/health')
+t2 = time.perf_counter()
+print(json.dumps({'create_app': (t1 - t0) * 1000, 'first_request': (t2 - t0) * 1000}))
+''',
+    # The old startup: create tables and run a test query before serving anything
+    'eager_worker': '''
+import time, json
+t0 = time.perf_counter()
+from app import create_app
+from db import create_tables, test_database_connection
+application = create_app()
+create_tables(application)
+with application.app_context():
+    test_database_connection()
+t1 = time.perf_counter()
+application.test_client().get('/health')
+t2 = time.perf_counter()
+print(json.dumps({'create_app': (t1 - t0) * 1000, 'first_request': (t2 - t0) * 1000}))
+''',
+    # Readiness probe: first request that actually connects to the database
+    'ready_probe': '''
+import time, json
+t0 = time.perf_counter()
+from app import create_app
+application = create_app()
+application.test_client().get('/ready')
+print(json.dumps({'first_ready': (time.perf_counter() - t0) * 1000}))
+''',
+}
+
+def run_snippet(code, env):
+    """Run one snippet in a fresh interpreter and return its timings"""
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=backend_dir, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else 'snippet failed')
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold start and worker spawn time')
+    parser.add_argument('--runs', type=int, default=5, help='How many fresh processes per scenario')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if not env.get('DATABASE_URL'):
+        # Use a throwaway SQLite file so the benchmark never touches real data
+        env['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_startup.db')
+
+    print("Job Listing Web App - Startup Benchmark")
+    print("=" * 60)
+    print(f"Database: {env['DATABASE_URL']}")
+    print(f"Runs per scenario: {args.runs}")
+    print("=" * 60)
+
+    results = {}
+    for name, code in SNIPPETS.items():
+        samples = {}
+        for _ in range(args.runs):
+            for key, value in run_snippet(code, env).items():
+                samples.setdefault(key, []).append(value)
+        for key, values in samples.items():
+            results[(name, key)] = values
+            print(f"{name:<14} {key:<15} median {statistics.median(values):8.1f} ms   "
+                  f"min {min(values):8.1f} ms   max {max(values):8.1f} ms")
+
+    # Say what was measured, not what we hoped for
+    print("=" * 60)
+    lazy = results[('lazy_worker', 'first_request')]
+    eager = results[('eager_worker', 'first_request')]
+    gap = statistics.median(eager) - statistics.median(lazy)
+    spread = max(lazy) - min(lazy)
+    print(f"Eager minus lazy first request: {gap:+.1f} ms (lazy runs spread over {spread:.1f} ms)")
+    if gap > spread:
+        print("-> lazy startup saves about that much: the schema check and connection test it skips")
+    else:
+        print("-> no saving measured (within the run-to-run noise, or eager was faster): against")
+        print("   this database the schema check and connection test cost too little to see")
+        print("   (a remote server adds its round trips - not measured here)")
+    libraries = sum(statistics.median(results[('libraries', key)]) for key in ('flask', 'sqlalchemy'))
+    print(f"Importing Flask and SQLAlchemy alone: {libraries:.1f} ms "
+          f"(lazy worker to a first answer: {statistics.median(lazy):.1f} ms)")
+    print(f"numpy and scipy ({statistics.median(results[('libraries', 'numpy_scipy')]):.1f} ms) are not loaded "
+          f"by create_app() - only by the first duplicate check or similar-jobs update")
+
+if __name__ == '__main__':
+    main()
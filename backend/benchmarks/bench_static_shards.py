@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Static Shards Benchmark
+Requests the front page of the job list and the filter options over and over,
+answered by the live queries and by the pre-rendered files (static_shards.py)
+
+Usage: cd backend && python benchmarks/bench_static_shards.py --jobs 50000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+import io
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from benchmarks.synthetic import create_bench_app
+from benchmarks.bench_read_engine import percentile
+
+PATHS = ['/api/jobs?page=1&per_page=5', '/api/jobs/filters']
+
+def measure(client, path, requests):
+    """Latencies in ms of `requests` GETs, and whether they were served from a shard"""
+    latencies = []
+    hit = False
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(path, headers={'Accept-Encoding': 'gzip'})
+        response.get_data()
+        latencies.append((time.perf_counter() - start) * 1000)
+        hit = response.headers.get('X-Static-Shard') == 'hit'
+    return latencies, hit
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare live queries with pre-rendered files')
+    parser.add_argument('--jobs', type=int, default=50000, help='How many synthetic jobs')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per path and mode')
+    args = parser.parse_args()
+
+    # Read by create_app(), so they must be set before the app is created
+    os.environ['STATIC_SHARDS_ENABLED'] = 'true'
+    os.environ['STATIC_SHARDS_DIR'] = tempfile.mkdtemp()
+
+    print("Job Listing Web App - Static Shards Benchmark")
+    print("=" * 60)
+    # Single flight off: every live request runs its own queries
+    app = create_bench_app(args.jobs, SINGLE_FLIGHT_ENABLED=False)
+    app.extensions.pop('single_flight', None)
+    store = app.extensions['static_shards']
+    client = app.test_client()
+
+    print(f"{'path':32} {'mode':8} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+    for mode in ('live', 'shards'):
+        if mode == 'live':
+            app.extensions.pop('static_shards')
+        else:
+            app.extensions['static_shards'] = store
+            with app.app_context():
+                store.build()
+        for path in PATHS:
+            # The routes print every request - keep the output readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                latencies, hit = measure(client, path, args.requests)
+            if mode == 'shards' and not hit:
+                print(f"{path}: not served from a shard")
+            print(f"{path:32} {mode:8} {percentile(latencies, 0.5):8.2f} {percentile(latencies, 0.99):8.2f} "
+                  f"{1000 * len(latencies) / sum(latencies):8.0f}")
+
+if __name__ == '__main__':
+    main()
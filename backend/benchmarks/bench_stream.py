@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Job Change Stream Benchmark
+Opens thousands of idle GET /api/jobs/stream connections on the ASGI app
+(in-process, no sockets), publishes job changes from another thread like the
+Flask routes do, and reports the memory per connection and how long it takes
+until every client has received each change
+
+Usage: cd backend && python benchmarks/bench_stream.py --subscribers 5000
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import threading
+import tracemalloc
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from benchmarks.synthetic import create_bench_app, make_jobs
+from benchmarks.bench_read_engine import percentile
+
+class FakeClient:
+    """
+    The receive/send pair of one streaming connection
+    """
+
+    def __init__(self, expected):
+        self.disconnect = asyncio.Event()
+        self.received = 0
+        self.expected = expected
+        self.done = asyncio.Event()
+        self.last_event_at = None
+
+    async def receive(self):
+        await self.disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message.get('body', b'').startswith(b'id:'):
+            self.received += 1
+            self.last_event_at = time.perf_counter()
+            if self.received == self.expected:
+                self.done.set()
+
+async def run(args):
+    import asgi
+    from events import publish_job_changes
+    from streaming import stop_broker
+
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': '/api/jobs/stream', 'headers': [],
+        'query_string': b'', 'server': ('localhost', 80), 'client': ('127.0.0.1', 0)
+    }
+    clients = [FakeClient(args.changes) for _ in range(args.subscribers)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tasks = [asyncio.create_task(asgi.app(scope, client.receive, client.send)) for client in clients]
+    await asyncio.sleep(1)  # let every connection subscribe
+    per_connection = (tracemalloc.get_traced_memory()[0] - before) / args.subscribers
+    tracemalloc.stop()
+
+    # Publish from a plain thread, like a Flask request would
+    jobs = make_jobs(args.changes, seed=7)
+    delays = []
+
+    def writer():
+        for i, job in enumerate(jobs):
+            job = {key: (value.isoformat() if hasattr(value, 'isoformat') else value) for key, value in job.items()}
+            job['id'] = 10 ** 6 + i
+            job['tags'] = job['tags'].split(', ')
+            delays.append(time.perf_counter())
+            publish_job_changes([('create', job)])
+            time.sleep(0.05)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    await asyncio.gather(*(client.done.wait() for client in clients))
+    thread.join()
+    fan_out = [client.last_event_at - delays[-1] for client in clients]
+
+    for client in clients:
+        client.disconnect.set()
+    await asyncio.gather(*tasks)
+    await stop_broker()
+
+    print("=" * 60)
+    print(f"Idle connections: {args.subscribers}   memory per connection: {per_connection / 1024:.1f} KB")
+    print(f"Every client got all {args.changes} changes")
+    print(f"Last change reached all clients within {max(fan_out) * 1000:.1f} ms "
+          f"(p50 {percentile([d * 1000 for d in fan_out], 0.5):.1f} ms)")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the job change stream')
+    parser.add_argument('--subscribers', type=int, default=5000, help='How many open streams')
+    parser.add_argument('--changes', type=int, default=20, help='How many job changes to publish')
+    args = parser.parse_args()
+
+    print("Job Listing Web App - Job Change Stream Benchmark")
+    print("=" * 60)
+    create_bench_app(100)  # a database for the stream's change poller
+    asyncio.run(run(args))
+
+if __name__ == '__main__':
+    main()
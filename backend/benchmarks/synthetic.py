@@ -0,0 +1,89 @@
+"""
+Synthetic job data for the benchmarks
+Builds realistic looking actuarial job postings in bulk, and a throwaway
+SQLite database filled with them
+"""
+
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+TITLES = [
+    'Actuarial Analyst', 'Senior Actuarial Analyst', 'Pricing Actuary', 'Reserving Actuary',
+    'Actuarial Consultant', 'Actuarial Intern', 'Chief Actuary', 'Valuation Actuary',
+    'Capital Modelling Actuary', 'Pension Actuary', 'Health Actuary', 'Life Actuary',
+    'Data Scientist', 'Risk Analyst', 'Actuarial Manager', 'Appointed Actuary'
+]
+PREFIXES = ['', '', '', 'Sr. ', 'Junior ', 'Lead ', 'Associate ', 'Principal ']
+COMPANIES = [
+    'MetLife', 'Prudential', 'AIG', 'Deloitte', 'Travelers', 'Swiss Re', 'Munich Re',
+    'Hannover Re', 'Liberty Mutual', 'State Farm', 'Guardian Life', 'WTW', 'SCOR',
+    'QBE', 'Bupa', 'KPMG', 'Milliman', 'Aon', 'Mercer', 'Allianz', 'Zurich', 'AXA',
+    'Chubb', 'Aviva', 'Legal & General', 'Lloyds', 'Hiscox', 'Beazley', 'Markel', 'Brit'
+]
+LOCATIONS = [
+    'New York, NY', 'Newark, NJ', 'Houston, TX', 'Chicago, IL', 'Hartford, CT', 'Boston, MA',
+    'London, UK', 'Manchester, UK', 'Toronto, Canada', 'Zurich, Switzerland', 'Munich, Germany',
+    'Singapore', 'Sydney, Australia', 'Remote', 'Dublin, Ireland', 'Paris, France'
+]
+JOB_TYPES = ['Full-time', 'Full-time', 'Full-time', 'Part-time', 'Contract', 'Internship', 'Temporary']
+EXPERIENCE = ['Entry Level', 'Mid Level', 'Senior Level', 'Not Specified']
+TAGS = [
+    'Life', 'Health', 'Pricing', 'Modelling', 'P&C', 'Reserving', 'Python', 'R', 'SQL', 'SAS',
+    'Machine Learning', 'Risk', 'Pension', 'Retirement', 'Analytics', 'Excel', 'VBA', 'Prophet',
+    'Solvency II', 'IFRS 17', 'Capital', 'Reinsurance', 'Consulting', 'Financial Reporting'
+]
+WORDS = (
+    'actuarial pricing reserving models insurance life health property casualty analysis '
+    'team clients reporting regulatory capital risk data python sql experience exams '
+    'support develop maintain review projections assumptions valuation reinsurance portfolio'
+).split()
+
+def make_jobs(count, seed=42, days=60):
+    """
+    Return `count` job dicts (same keys as the Job model columns)
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    jobs = []
+    for _ in range(count):
+        posted = now - timedelta(seconds=rng.randint(0, days * 86400))
+        low = rng.randrange(40, 200, 5)
+        jobs.append({
+            'title': rng.choice(PREFIXES) + rng.choice(TITLES),
+            'company': rng.choice(COMPANIES),
+            'location': rng.choice(LOCATIONS),
+            'job_type': rng.choice(JOB_TYPES),
+            'experience_level': rng.choice(EXPERIENCE),
+            'salary_range': f'${low},000 - ${low + rng.randrange(10, 60, 5)},000',
+            'tags': ', '.join(rng.sample(TAGS, rng.randint(1, 5))),
+            'description': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(20, 80))),
+            'posting_date': posted,
+            'created_at': posted,
+            'updated_at': posted
+        })
+    return jobs
+
+def create_bench_app(count, seed=42, database_url=None, **config):
+    """
+    Create the Flask app on a fresh SQLite file holding `count` synthetic jobs
+    Extra keyword arguments are set in app.config
+    Admission control is off unless asked for (every benchmark client has the same address)
+    """
+    from app import create_app
+    from db import db, create_tables
+    from models.job import Job
+
+    if database_url is None:
+        database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = database_url
+    app = create_app()
+    app.config.update(dict({'ADMISSION_CONTROL_ENABLED': False}, **config))
+    create_tables(app)
+
+    with app.app_context():
+        if count and db.session.query(Job.id).count() == 0:
+            db.session.execute(Job.__table__.insert(), make_jobs(count, seed))
+            db.session.commit()
+    return app
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Similar Jobs Script
+Recomputes the top-K most similar jobs of every job and stores them in the
+job_similarities table (used by GET /api/jobs/<id>/similar)
+Run it regularly (e.g. nightly from cron) - new and edited jobs are also
+updated right away by the API in between runs
+"""
+
+import os
+import sys
+import argparse
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+def build(k=None, workers=None, block_size=None):
+    """
+    Recompute all similar jobs
+    """
+    try:
+        from db import db
+        from app import create_app
+        from engines.similarity import build_similarities
+
+        # Create the Flask app
+        app = create_app()
+
+        with app.app_context():
+            rows = build_similarities(
+                db.session,
+                app.config['SIMILARITY_MODEL_PATH'],
+                k=k or app.config['SIMILAR_JOBS_K'],
+                workers=workers or app.config['SIMILARITY_WORKERS'] or None,
+                block_size=block_size
+            )
+
+        print(f"\nSimilar jobs updated! {rows} pairs stored")
+        return True
+
+    except Exception as e:
+        print(f"Error computing similar jobs: {e}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Recompute the similar jobs of every job')
+    parser.add_argument('--k', type=int, default=None, help='Similar jobs per job (default: SIMILAR_JOBS_K)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: one per CPU)')
+    parser.add_argument('--block-size', type=int, default=None, help='Jobs per block of the matrix product')
+    args = parser.parse_args()
+
+    build(args.k, args.workers, args.block_size)
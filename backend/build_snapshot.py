@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Catalog Snapshot Script
+Writes the jobs table to a read-only snapshot file (engines/snapshot.py) in
+SNAPSHOT_DIR, for API nodes running with READ_ENGINE=snapshot
+Run it once, from cron, or keep it running with --every: a new snapshot is
+only written when the jobs table has changed
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+def build(directory=None, force=False, every=None):
+    """
+    Write a snapshot (and keep writing them every `every` seconds, if given)
+    """
+    try:
+        from db import db
+        from app import create_app
+        from engines.snapshot import build_snapshot
+
+        # Create the Flask app
+        app = create_app()
+        directory = directory or app.config['SNAPSHOT_DIR']
+
+        while True:
+            with app.app_context():
+                if build_snapshot(db.session, directory, force=force) is None:
+                    print("The current snapshot is up to date")
+                db.session.remove()
+            if not every:
+                return True
+            force = False
+            time.sleep(every)
+
+    except KeyboardInterrupt:
+        return True
+    except Exception as e:
+        print(f"Error building the catalog snapshot: {e}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Write a catalog snapshot for READ_ENGINE=snapshot nodes')
+    parser.add_argument('--dir', default=None, help='Where to write it (default: SNAPSHOT_DIR)')
+    parser.add_argument('--force', action='store_true', help='Write a new snapshot even if the data has not changed')
+    parser.add_argument('--every', type=float, default=None, help='Keep running and check for changes every N seconds')
+    args = parser.parse_args()
+
+    build(args.dir, args.force, args.every)
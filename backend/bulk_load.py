@@ -0,0 +1,184 @@
+import os
+import json
+from datetime import datetime
+from sqlalchemy import select
+
+from dedupe import flag_duplicates
+from rollups import refresh_rollups, posting_day
+from enrichment import enrich_new_job, insert_enriched_tags
+from staging_format import manifest_path, file_sha256
+
+# Bulk loader for the scraper's staging files (scraper/staging.py)
+# A staging file has one JSON object per line with the Job columns (title,
+# company, location, posting_date as an ISO string, ...) and a manifest next
+# to it (run-X.ndjson -> run-X.manifest.json). Loading a file:
+# 1. validate every line (required columns, lengths, dates) - bad lines are
+#    counted and skipped, a half-written last line (scraper killed) is ignored
+# 2. drop repeats of the same (title, company) within the file, then the ones
+#    already in the jobs table (one query per batch instead of one per job)
+# 3. insert the rest in batches of BULK_LOAD_BATCH_SIZE, one transaction each,
+#    with near-duplicate detection, saved search matching and the daily stats
+#    (rollups.py) per batch
+# 4. record the file's checksum in staging_loads
+# Loading the same file again does nothing (step 4), and a load that stopped
+# halfway can simply be run again: the batches that were committed are
+# skipped as existing jobs (step 2). Run one loader at a time.
+
+REQUIRED_FIELDS = ['title', 'company', 'location', 'posting_date']
+OPTIONAL_FIELDS = ['job_type', 'tags', 'description', 'salary_range', 'experience_level', 'expires_at']
+DATE_FIELDS = ['posting_date', 'expires_at']
+MAX_ERRORS_SHOWN = 10  # rejected lines printed per file
+
+def read_manifest(path):
+    """The manifest of a staging file, or {} if it has none"""
+    try:
+        with open(manifest_path(path)) as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+
+def read_staging_file(path):
+    """
+    Yield (line number, record dict or None, error or None) for every line
+    """
+    with open(path, encoding='utf-8') as staging_file:
+        for number, line in enumerate(staging_file, start=1):
+            if not line.strip():
+                continue
+            if not line.endswith('\n'):
+                # The writer was stopped in the middle of this line - it never finished the page
+                print(f"  line {number}: incomplete last line ignored")
+                return
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield number, None, f"not valid JSON ({e})"
+                continue
+            if not isinstance(record, dict):
+                yield number, None, "not a JSON object"
+                continue
+            yield number, record, None
+
+def _column_lengths():
+    from models.job import Job
+    return {column.name: column.type.length for column in Job.__table__.columns
+            if getattr(column.type, 'length', None)}
+
+def validate_record(record, lengths):
+    """
+    The Job column values of a staging record, or (None, error)
+    """
+    fields = {}
+    for name in REQUIRED_FIELDS + OPTIONAL_FIELDS:
+        value = record.get(name)
+        if isinstance(value, str):
+            value = value.strip()
+        if value in (None, ''):
+            if name in REQUIRED_FIELDS:
+                return None, f"{name} is missing"
+            continue
+        if name == 'tags' and isinstance(value, list):
+            value = ', '.join(str(tag).strip() for tag in value if str(tag).strip())
+        if name in DATE_FIELDS:
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                return None, f"{name} is not an ISO date: {value!r}"
+        elif not isinstance(value, str):
+            return None, f"{name} must be a string"
+        elif name in lengths and len(value) > lengths[name]:
+            return None, f"{name} is longer than {lengths[name]} characters"
+        fields[name] = value
+    return fields, None
+
+def _insert_batch(session, batch, percolator):
+    """
+    Insert the jobs of the batch that aren't in the jobs table yet (one
+    transaction). Returns how many were inserted.
+    """
+    from models.job import Job
+    from engines.percolator import percolate_jobs
+
+    titles = {fields['title'] for fields in batch}
+    companies = {fields['company'] for fields in batch}
+    existing = set(session.execute(
+        select(Job.title, Job.company).where(Job.title.in_(titles), Job.company.in_(companies))
+    ).tuples())
+    new_jobs = [Job(**fields) for fields in batch if (fields['title'], fields['company']) not in existing]
+    if not new_jobs:
+        return 0
+    try:
+        # Derived job type, seniority and tags (enrichment.py) - the tags need the ids
+        now = datetime.utcnow()
+        enriched_tags = [enrich_new_job(job, now) for job in new_jobs]
+        session.add_all(new_jobs)
+        session.flush()  # gives the jobs their ids
+        insert_enriched_tags(session, [(job.id, tags) for job, tags in zip(new_jobs, enriched_tags)])
+        flag_duplicates(session, new_jobs)
+        if percolator is not None:
+            percolate_jobs(session, percolator, [job.to_dict() for job in new_jobs])
+        # The daily stats of the days these jobs were posted on, in the same transaction
+        refresh_rollups(session, {posting_day(job.posting_date) for job in new_jobs})
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return len(new_jobs)
+
+def load_staging_file(session, path, batch_size=1000, force=False, percolator=None):
+    """
+    Load one staging file (see the top of this file)
+    force: load it even if a file with the same contents was loaded before
+    percolator: match the new jobs against saved searches (engines/percolator.py)
+    Returns the counts of the file's lines (records, inserted, duplicates,
+    rejected) or None if the file was already loaded
+    """
+    from models.staging_load import StagingLoad
+
+    sha256 = file_sha256(path)
+    file_name = os.path.basename(path)
+    previous = session.execute(select(StagingLoad).where(StagingLoad.sha256 == sha256)).scalar_one_or_none()
+    if previous is not None and not force:
+        print(f"{file_name}: already loaded on {previous.loaded_at:%Y-%m-%d %H:%M} - skipped")
+        return None
+
+    manifest = read_manifest(path)
+    if manifest and not manifest.get('complete'):
+        print(f"{file_name}: the scraper run hasn't finished - loading what is there")
+
+    lengths = _column_lengths()
+    counts = {'records': 0, 'inserted': 0, 'duplicates': 0, 'rejected': 0}
+    seen = set()  # (title, company) already in a batch
+    batch = []
+    for number, record, error in read_staging_file(path):
+        counts['records'] += 1
+        fields = None
+        if error is None:
+            fields, error = validate_record(record, lengths)
+        if error is not None:
+            counts['rejected'] += 1
+            if counts['rejected'] <= MAX_ERRORS_SHOWN:
+                print(f"  line {number}: {error}")
+            continue
+        key = (fields['title'], fields['company'])
+        if key in seen:
+            continue
+        seen.add(key)
+        batch.append(fields)
+        if len(batch) >= batch_size:
+            counts['inserted'] += _insert_batch(session, batch, percolator)
+            batch = []
+    if batch:
+        counts['inserted'] += _insert_batch(session, batch, percolator)
+    counts['duplicates'] = counts['records'] - counts['rejected'] - counts['inserted']
+
+    if previous is None:
+        session.add(StagingLoad(sha256=sha256, file_name=file_name[:200], run=manifest.get('run'), **counts))
+    else:
+        for name, value in counts.items():
+            setattr(previous, name, value)
+        previous.loaded_at = datetime.utcnow()
+    session.commit()
+    print(f"{file_name}: {counts['records']} records, {counts['inserted']} inserted, "
+          f"{counts['duplicates']} duplicates, {counts['rejected']} rejected")
+    return counts
@@ -0,0 +1,222 @@
+import gzip
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from flask import request, jsonify, g
+
+from events import local_version
+
+# Brotli is optional - if the package is not installed we only offer gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Only these kinds of responses are worth compressing
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+
+class CompressedResponseCache:
+    """
+    A small LRU cache of compressed response bodies
+    Entries are keyed by dataset version + request, so a new version of the
+    data never reuses bytes compressed for an older one
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, digest):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != digest:
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, digest, data):
+        with self.lock:
+            self.entries[key] = (digest, data)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+class CompressionStats:
+    """
+    Per endpoint counters: bytes before/after compression, time spent compressing
+    and how often we could reuse cached compressed bytes
+    """
+
+    def __init__(self):
+        self.endpoints = {}
+        self.lock = threading.Lock()
+
+    def record(self, endpoint, bytes_in, bytes_out, seconds, cache_hit):
+        with self.lock:
+            stats = self.endpoints.setdefault(endpoint, {
+                'responses': 0,
+                'cache_hits': 0,
+                'bytes_in': 0,
+                'bytes_out': 0,
+                'compress_ms': 0.0
+            })
+            stats['responses'] += 1
+            stats['cache_hits'] += 1 if cache_hit else 0
+            stats['bytes_in'] += bytes_in
+            stats['bytes_out'] += bytes_out
+            stats['compress_ms'] += seconds * 1000
+
+    def report(self):
+        with self.lock:
+            report = {}
+            for endpoint, stats in self.endpoints.items():
+                report[endpoint] = dict(stats)
+                report[endpoint]['bytes_saved'] = stats['bytes_in'] - stats['bytes_out']
+                report[endpoint]['compress_ms'] = round(stats['compress_ms'], 3)
+            return report
+
+def choose_encoding(accept_encoding):
+    """
+    Pick the best encoding the client accepts: brotli if we can, then gzip
+    Returns None if the client accepts neither
+    """
+    offered = {}
+    for part in accept_encoding.split(','):
+        pieces = part.strip().split(';')
+        name = pieces[0].strip().lower()
+        quality = 1.0
+        for param in pieces[1:]:
+            param = param.strip()
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if name:
+            offered[name] = quality
+
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best = None
+    for encoding in candidates:
+        quality = offered.get(encoding, offered.get('*', 0.0))
+        if quality > 0 and (best is None or quality > best[1]):
+            best = (encoding, quality)
+    return best[0] if best else None
+
+def compress_bytes(data, encoding, config):
+    """
+    Compress with the configured level for the chosen encoding
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=config['COMPRESSION_BROTLI_LEVEL'])
+    return gzip.compress(data, compresslevel=config['COMPRESSION_GZIP_LEVEL'])
+
+def compress_payload(compressor, config, data, accept_encoding, cache_key, endpoint):
+    """
+    The body to send and its encoding: `data` compressed for a client sending
+    `accept_encoding`, or (data, None) if the client accepts no encoding we
+    have, the body is too small or compressing it didn't make it smaller
+    `cache_key` identifies the request (None = don't cache the result)
+    """
+    encoding = choose_encoding(accept_encoding)
+    if encoding is None or len(data) < config['COMPRESSION_MIN_SIZE']:
+        return data, None
+
+    cache = compressor['cache']
+    start = time.perf_counter()
+    compressed = None
+    digest = None
+    if cache_key is not None:
+        # Same data version + same request = same bytes, so reuse the compressed copy
+        # (the digest makes sure we never send bytes for a different body)
+        cache_key = cache_key + (encoding,)
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        compressed = cache.get(cache_key, digest)
+    cache_hit = compressed is not None
+    if compressed is None:
+        compressed = compress_bytes(data, encoding, config)
+        if cache_key is not None:
+            cache.put(cache_key, digest, compressed)
+
+    # Not worth it if compression didn't make it smaller
+    if len(compressed) >= len(data):
+        return data, None
+
+    compressor['stats'].record(endpoint, len(data), len(compressed), time.perf_counter() - start, cache_hit)
+    return compressed, encoding
+
+_compressor = None
+_compressor_lock = threading.Lock()
+
+def get_compressor(config):
+    """
+    The compressed response cache and stats of this process (shared by the
+    Flask app and asgi.py, so /api/compression/stats covers both), or None
+    if compression is disabled
+    """
+    global _compressor
+    if not config.get('COMPRESSION_ENABLED', True):
+        return None
+    with _compressor_lock:
+        if _compressor is None:
+            _compressor = {
+                'cache': CompressedResponseCache(config['COMPRESSION_CACHE_SIZE']),
+                'stats': CompressionStats()
+            }
+        return _compressor
+
+def init_compression(app):
+    """
+    Compress API responses the client can accept compressed
+    Settings come from config.py (COMPRESSION_*)
+    """
+    compressor = get_compressor(app.config)
+    if compressor is None:
+        return
+    app.extensions['compression'] = compressor
+
+    @app.before_request
+    def remember_data_version():
+        # The version the view reads - taken before it runs and without a
+        # database query (the cache also checks a digest of the body, so a
+        # version from this process alone is enough)
+        g.compression_version = local_version()
+
+    @app.after_request
+    def compress_response(response):
+        # Always tell caches that the body depends on Accept-Encoding
+        response.vary.add('Accept-Encoding')
+
+        # Only compress plain successful responses we have the body of
+        if (response.status_code != 200 or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or not response.mimetype.startswith(COMPRESSIBLE_TYPES)):
+            return response
+
+        accept_encoding = request.headers.get('Accept-Encoding', '')
+        if choose_encoding(accept_encoding) is None:
+            return response  # don't even read the body
+
+        cache_key = None
+        if request.method == 'GET':
+            cache_key = (g.get('compression_version'), request.path, tuple(sorted(request.args.items(multi=True))))
+        data, encoding = compress_payload(compressor, app.config, response.get_data(), accept_encoding,
+                                          cache_key, request.endpoint or request.path)
+        if encoding is None:
+            return response
+
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+        response.headers['Content-Length'] = str(len(data))
+        return response
+
+    # Bytes saved and compression time per endpoint
+    @app.route('/api/compression/stats')
+    def compression_stats():
+        return jsonify({
+            'encodings': ['br', 'gzip'] if brotli is not None else ['gzip'],
+            'cached_responses': len(compressor['cache'].entries),
+            'endpoints': compressor['stats'].report()
+        })
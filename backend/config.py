@@ -17,6 +17,134 @@ class Config:
     
     # Pagination
     JOBS_PER_PAGE = 20
+    
+    # Most jobs one multi-get request (?ids= or /api/jobs/batch) can ask for
+    JOBS_BATCH_MAX_IDS = int(os.environ.get('JOBS_BATCH_MAX_IDS', 100))
+    
+    # Admission control (admission.py): turn away requests before they do any work
+    ADMISSION_CONTROL_ENABLED = os.environ.get('ADMISSION_CONTROL_ENABLED', 'true').lower() == 'true'
+    # Cost limits - bigger requests get a 400
+    ADMISSION_MAX_PER_PAGE = int(os.environ.get('ADMISSION_MAX_PER_PAGE', 100))
+    ADMISSION_MAX_TAGS = int(os.environ.get('ADMISSION_MAX_TAGS', 10))
+    ADMISSION_MAX_SEARCH_LENGTH = int(os.environ.get('ADMISSION_MAX_SEARCH_LENGTH', 200))
+    # Limits for single endpoints, e.g. {'jobs.get_facets': {'max_tags': 5}}
+    ADMISSION_ENDPOINT_LIMITS = {}
+    # Tokens a request to an endpoint costs, e.g. {'jobs.get_filters': 10} (see ENDPOINT_COSTS)
+    ADMISSION_ENDPOINT_COSTS = {}
+    # Token bucket per client IP: refill rate (tokens per second, 0 = no rate limit) and size
+    # (a user typing in the search box takes about 2.5 tokens per character)
+    ADMISSION_RATE = float(os.environ.get('ADMISSION_RATE', 50))
+    ADMISSION_BURST = float(os.environ.get('ADMISSION_BURST', 100))
+    # Requests at work at once per process before new ones get a 503 (0 = never shed)
+    ADMISSION_MAX_IN_FLIGHT = int(os.environ.get('ADMISSION_MAX_IN_FLIGHT', 32))
+    # Proxies in front of the app (client IPs are then read from X-Forwarded-For)
+    # Behind nginx or a load balancer set this to 1 (or more) - with 0 every
+    # client has the proxy's IP and they all share one token bucket
+    ADMISSION_PROXY_COUNT = int(os.environ.get('ADMISSION_PROXY_COUNT', 0))
+
+    # Identical GET /api/jobs and /api/jobs/filters requests running at the same
+    # time share one run of their queries (single_flight.py)
+    SINGLE_FLIGHT_ENABLED = os.environ.get('SINGLE_FLIGHT_ENABLED', 'true').lower() == 'true'
+    SINGLE_FLIGHT_TIMEOUT_SECONDS = float(os.environ.get('SINGLE_FLIGHT_TIMEOUT_SECONDS', 10))  # longest wait for the shared run
+
+    # Query guard (query_guard.py): limits on what one request may ask of the database
+    # Statement timeouts - per endpoint (see ENDPOINT_TIMEOUTS_MS), STATEMENT_TIMEOUT_MS for the rest.
+    # A request that hits one gets 503 + Retry-After with code 'query_timeout'
+    STATEMENT_TIMEOUTS_ENABLED = os.environ.get('STATEMENT_TIMEOUTS_ENABLED', 'true').lower() == 'true'
+    STATEMENT_TIMEOUT_MS = int(os.environ.get('STATEMENT_TIMEOUT_MS', 10000))
+    # Other timeouts for single endpoints, e.g. {'jobs.get_jobs': 1500}
+    STATEMENT_TIMEOUTS_MS = {}
+    # GET requests run in read-only transactions
+    READ_ONLY_GETS = os.environ.get('READ_ONLY_GETS', 'true').lower() == 'true'
+    # Job list queries estimated (EXPLAIN) to cost more than QUERY_COST_BUDGET are
+    # 'degrade'd (no exact total), 'reject'ed with 422 - or 'off' to never check
+    # (PostgreSQL: planner cost units; SQLite: rows of the tables it has to scan)
+    QUERY_COST_GUARD = os.environ.get('QUERY_COST_GUARD', 'degrade')
+    QUERY_COST_BUDGET = float(os.environ.get('QUERY_COST_BUDGET', 1000000))
+
+    # Group commit for POST /api/jobs (group_commit.py): jobs posted at the same
+    # time are saved in one transaction instead of one each
+    GROUP_COMMIT_ENABLED = os.environ.get('GROUP_COMMIT_ENABLED', 'false').lower() == 'true'
+    GROUP_COMMIT_MAX_DELAY_MS = float(os.environ.get('GROUP_COMMIT_MAX_DELAY_MS', 5))  # longest a job waits for others
+    GROUP_COMMIT_MAX_ROWS = int(os.environ.get('GROUP_COMMIT_MAX_ROWS', 100))  # most jobs per transaction
+
+    # Jobs per transaction when loading scraper staging files (bulk_load.py)
+    BULK_LOAD_BATCH_SIZE = int(os.environ.get('BULK_LOAD_BATCH_SIZE', 1000))
+
+    # Posting retention (see retention.py)
+    # Jobs older than this many days (by posting_date) are hidden and archived
+    # 0 (the default) keeps them forever - only jobs past their own expires_at go
+    JOB_RETENTION_DAYS = int(os.environ.get('JOB_RETENTION_DAYS', 0))
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+    # PostgreSQL only: create the jobs table range-partitioned by posting_date (monthly)
+    JOBS_PARTITIONED = os.environ.get('JOBS_PARTITIONED', 'false').lower() == 'true'
+    
+    # Read engine for GET /api/jobs: 'sql' (default), 'columnar'
+    # (in-memory NumPy column store, see engines/columnar.py - needs numpy)
+    # or 'snapshot' (memory-mapped catalog file, engines/snapshot.py - also
+    # answers GET /api/jobs/<id> and /api/jobs/filters; needs numpy)
+    READ_ENGINE = os.environ.get('READ_ENGINE', 'sql')
+    READ_ENGINE_SYNC_SECONDS = float(os.environ.get('READ_ENGINE_SYNC_SECONDS', 5))  # catch up with other processes
+    # Where build_snapshot.py writes the snapshots (and READ_ENGINE=snapshot reads them)
+    SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'snapshots')
+    SNAPSHOT_CHECK_SECONDS = float(os.environ.get('SNAPSHOT_CHECK_SECONDS', 1))  # how often readers look for a newer one
+    
+    # GET /api/jobs/facets counts with in-memory bitmaps (engines/facets.py - needs numpy)
+    # instead of one GROUP BY per facet
+    FACET_INDEX_ENABLED = os.environ.get('FACET_INDEX_ENABLED', 'true').lower() == 'true'
+    
+    # Similar jobs (engines/similarity.py - needs numpy and scipy)
+    SIMILAR_JOBS_K = int(os.environ.get('SIMILAR_JOBS_K', 10))  # neighbours stored per job
+    SIMILARITY_WORKERS = int(os.environ.get('SIMILARITY_WORKERS', 0))  # processes for the batch (0 = one per CPU)
+    SIMILARITY_MODEL_PATH = os.environ.get(
+        'SIMILARITY_MODEL_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'similarity_model.npz')
+    )
+    # Update the neighbours of new/edited jobs right away instead of waiting for the next batch
+    SIMILAR_JOBS_INCREMENTAL = os.environ.get('SIMILAR_JOBS_INCREMENTAL', 'true').lower() == 'true'
+    
+    # Near-duplicate detection (dedupe.py - needs numpy)
+    # Share of equal MinHash values above which two jobs count as the same posting
+    DUPLICATE_THRESHOLD = float(os.environ.get('DUPLICATE_THRESHOLD', 0.7))
+    
+    # Saved searches: match new jobs against them as they are added (engines/percolator.py)
+    SAVED_SEARCH_ALERTS = os.environ.get('SAVED_SEARCH_ALERTS', 'true').lower() == 'true'
+    
+    # Daily stats rollups behind /api/stats (rollups.py): refreshed after API writes
+    # (waiting this long for more writes first); rebuild_rollups.py recounts everything
+    ROLLUPS_ENABLED = os.environ.get('ROLLUPS_ENABLED', 'true').lower() == 'true'
+    ROLLUPS_DEBOUNCE_SECONDS = float(os.environ.get('ROLLUPS_DEBOUNCE_SECONDS', 1))
+    
+    # Enrichment (enrichment.py): job type, seniority and tags derived from the descriptions
+    ENRICHMENT_WORKERS = int(os.environ.get('ENRICHMENT_WORKERS', 0))  # processes for the backlog (0 = one per CPU)
+    ENRICHMENT_CHUNK_SIZE = int(os.environ.get('ENRICHMENT_CHUNK_SIZE', 2000))  # jobs per chunk and transaction
+    # Enrich jobs created or edited through the API right away (waiting this long for more writes first)
+    ENRICHMENT_INCREMENTAL = os.environ.get('ENRICHMENT_INCREMENTAL', 'true').lower() == 'true'
+    ENRICHMENT_DEBOUNCE_SECONDS = float(os.environ.get('ENRICHMENT_DEBOUNCE_SECONDS', 1))
+    
+    # Live job changes over Server-Sent Events (streaming.py, served by asgi.py)
+    STREAM_REPLAY_SIZE = int(os.environ.get('STREAM_REPLAY_SIZE', 1000))  # events kept for Last-Event-ID
+    STREAM_QUEUE_SIZE = int(os.environ.get('STREAM_QUEUE_SIZE', 100))  # unsent events per client before it must resync
+    STREAM_HEARTBEAT_SECONDS = float(os.environ.get('STREAM_HEARTBEAT_SECONDS', 15))  # keeps idle connections open
+    STREAM_POLL_SECONDS = float(os.environ.get('STREAM_POLL_SECONDS', 2))  # how often to look for changes from other processes
+    
+    # Response compression (gzip, or brotli when the brotli package is installed)
+    COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 500))  # bytes
+    COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))  # 1-9
+    COMPRESSION_BROTLI_LEVEL = int(os.environ.get('COMPRESSION_BROTLI_LEVEL', 5))  # 0-11
+    COMPRESSION_CACHE_SIZE = int(os.environ.get('COMPRESSION_CACHE_SIZE', 256))  # responses
+    
+    # Pre-rendered JSON files for the hottest list pages and the filter options
+    # (static_shards.py) - rebuilt after every change, served straight from disk
+    STATIC_SHARDS_ENABLED = os.environ.get('STATIC_SHARDS_ENABLED', 'false').lower() == 'true'
+    STATIC_SHARDS_DIR = os.environ.get('STATIC_SHARDS_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static_shards')
+    STATIC_SHARDS_PAGES = int(os.environ.get('STATIC_SHARDS_PAGES', 5))  # first pages of every list rendered
+    # List queries always rendered, separated by ';' (e.g. 'per_page=5;per_page=5&sort=posting_date_asc')
+    STATIC_SHARDS_QUERIES = os.environ.get('STATIC_SHARDS_QUERIES', 'per_page=5')
+    STATIC_SHARDS_POPULAR = int(os.environ.get('STATIC_SHARDS_POPULAR', 5))  # plus the most requested other lists
+    STATIC_SHARDS_PRECOMPRESS = os.environ.get('STATIC_SHARDS_PRECOMPRESS', 'true').lower() == 'true'  # .gz/.br copies
+    STATIC_SHARDS_DEBOUNCE_SECONDS = float(os.environ.get('STATIC_SHARDS_DEBOUNCE_SECONDS', 1))  # wait for more changes before rebuilding
+    STATIC_SHARDS_MAX_AGE_SECONDS = float(os.environ.get('STATIC_SHARDS_MAX_AGE_SECONDS', 300))  # rebuilt at least this often (retention)
 
 class DevelopmentConfig(Config):
     """Development configuration"""
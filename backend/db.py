@@ -8,7 +8,8 @@ db = SQLAlchemy()
 def init_database(app):
     """
     Initialize the database with the Flask app
-    This sets up the database connection and creates tables
+    This only sets up the database configuration - tables are created
+    separately by create_tables() so starting the app stays cheap
     """
     try:
         # Check for forced database URL first (used by scraper)
@@ -28,10 +29,36 @@ def init_database(app):
         app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
         
         # Initialize the database with the app
+        # No connection is opened here, SQLAlchemy connects on first use
         db.init_app(app)
         
-        # Create all tables
+        return True
+        
+    except Exception as e:
+        print(f"Error initializing database: {e}")
+        return False
+
+def create_tables(app):
+    """
+    Create all the tables for our models
+    This is run explicitly (init_db.py or `flask init-db`), never on startup
+    """
+    try:
+        # Make sure every model is imported so SQLAlchemy knows about its table
+        import models.job  # noqa: F401
+        import models.job_archive  # noqa: F401
+        import models.job_similarity  # noqa: F401
+        import models.job_minhash  # noqa: F401
+        import models.saved_search  # noqa: F401
+        import models.staging_load  # noqa: F401
+        import models.job_rollup  # noqa: F401
+        import models.job_enrichment  # noqa: F401
+        
         with app.app_context():
+            # Optionally create jobs as a partitioned table first (PostgreSQL only)
+            if app.config.get('JOBS_PARTITIONED'):
+                from retention import create_partitioned_jobs_table
+                create_partitioned_jobs_table(db.engine)
             db.create_all()
             print("Database initialized successfully!")
             print("All tables created!")
@@ -39,7 +66,7 @@ def init_database(app):
         return True
         
     except Exception as e:
-        print(f"Error initializing database: {e}")
+        print(f"Error creating tables: {e}")
         return False
 
 def test_database_connection():
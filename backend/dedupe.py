@@ -0,0 +1,323 @@
+import re
+import hashlib
+from datetime import datetime
+from sqlalchemy import select, delete, insert, update, or_, and_
+
+from config import Config
+from models.job import Job, job_row_to_dict
+from models.job_minhash import JobSignature, JobSignatureBand
+from events import publish_job_changes
+
+# numpy is optional - without it duplicates are simply not detected
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Near-duplicate detection (MinHash + LSH)
+# Reposts rarely match exactly ("Sr. Actuarial Analyst" vs "Senior Actuarial
+# Analyst", the same role posted for several cities), so every job gets a
+# MinHash signature of the word shingles of its title, company and description.
+# The share of equal values in two signatures estimates how much the shingle
+# sets overlap (Jaccard similarity).
+#
+# Comparing a new job with every other job would get slower as the table grows,
+# so signatures are cut into bands and each band is hashed into a bucket
+# (job_signature_bands table). Only jobs sharing at least one bucket with the
+# new job are compared - a handful of rows found with one index lookup.
+#
+# A duplicate gets canonical_id = id of the original (the oldest job of the
+# group); originals keep canonical_id NULL. Listings can hide duplicates with
+# ?hide_duplicates=true (see apply_job_filters).
+
+NUM_PERM = 120  # values per signature
+# 20 bands x 6 rows: two jobs 70% similar share a bucket 92% of the time, 80%
+# similar 99.9% of the time; jobs 30% similar only 1.5% of the time
+BANDS = 20
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 3  # words per description shingle
+
+# Two jobs are duplicates when their signatures are this similar and their
+# titles share at least half their words (so two different roles with the same
+# boilerplate description aren't merged)
+TITLE_MIN_OVERLAP = 0.5
+
+# Buckets shared by more jobs than this (e.g. empty descriptions) are skipped
+# when clustering, so one bad bucket can't make it quadratic
+MAX_BUCKET_SIZE = 500
+
+if np is not None:
+    # One hash function per signature value (multiply-add-shift hashing)
+    # Fixed seed: signatures must stay comparable across runs and processes
+    _random = np.random.RandomState(1)
+    _A = _random.randint(0, 2 ** 64, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)  # odd multipliers
+    _B = _random.randint(0, 2 ** 64, size=NUM_PERM, dtype=np.uint64)
+
+# Spellings that should count as the same word
+ABBREVIATIONS = {
+    'sr': 'senior', 'snr': 'senior', 'jr': 'junior', 'jnr': 'junior',
+    'mgr': 'manager', 'assoc': 'associate', 'asst': 'assistant',
+    'dir': 'director', 'vp': 'vice president', 'avp': 'assistant vice president',
+    'ii': '2', 'iii': '3', 'iv': '4'
+}
+
+def normalize_tokens(text):
+    """
+    Lowercase words with abbreviations spelled out
+    """
+    words = []
+    for word in re.findall(r'[a-z0-9]+', (text or '').lower()):
+        words.extend(ABBREVIATIONS.get(word, word).split())
+    return words
+
+def job_shingles(title, company, description):
+    """
+    The set of features compared between two jobs
+    """
+    title_words = normalize_tokens(title)
+    description_words = normalize_tokens(description)
+    shingles = {'title:' + word for word in title_words}
+    shingles.update('title:' + ' '.join(pair) for pair in zip(title_words, title_words[1:]))
+    shingles.add('company:' + ' '.join(normalize_tokens(company)))
+    if len(description_words) < SHINGLE_SIZE:
+        shingles.update('description:' + word for word in description_words)
+    for i in range(len(description_words) - SHINGLE_SIZE + 1):
+        shingles.add('description:' + ' '.join(description_words[i:i + SHINGLE_SIZE]))
+    return shingles
+
+def _hash32(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=4).digest(), 'little')
+
+def job_signature(title, company, description):
+    """
+    MinHash signature (NUM_PERM uint32 values) of a job
+    """
+    hashes = np.array([_hash32(shingle) for shingle in job_shingles(title, company, description)], dtype=np.uint64)
+    # Hash function i is (a_i * x + b_i) mod 2^64, top 32 bits; keep the smallest
+    # (numpy uint64 arithmetic wraps around, which is the "mod 2^64")
+    values = (np.outer(_A, hashes) + _B[:, None]) >> np.uint64(32)
+    return values.min(axis=1).astype('<u4')
+
+def band_buckets(signature):
+    """
+    [(band, bucket)] - the LSH buckets a signature falls into
+    """
+    buckets = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes()
+        digest = hashlib.blake2b(chunk, digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, 'little', signed=True)))
+    return buckets
+
+def signature_similarity(a, b):
+    """
+    Estimated Jaccard similarity of two jobs from their signatures
+    """
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+def title_overlap(a, b):
+    a, b = set(a), set(b)
+    return len(a & b) / max(len(a | b), 1)
+
+def _is_duplicate(signature, title_words, other_signature, other_title_words, threshold):
+    score = signature_similarity(signature, other_signature)
+    if score >= threshold and title_overlap(title_words, other_title_words) >= TITLE_MIN_OVERLAP:
+        return score
+    return None
+
+def _load_candidates(session, buckets, chunk_size=500):
+    """
+    For the given (band, bucket) pairs: the jobs in each bucket, and
+    {job id: (signature, title words, canonical id)} for those jobs
+    """
+    members = {}
+    for offset in range(0, len(buckets), chunk_size):
+        by_band = {}
+        for band, bucket in buckets[offset:offset + chunk_size]:
+            by_band.setdefault(band, []).append(bucket)
+        # band = ? AND bucket IN (...) per band: an index lookup on every
+        # database (SQLite scans the table for a (band, bucket) IN (...) list)
+        rows = session.execute(
+            select(JobSignatureBand.band, JobSignatureBand.bucket, JobSignatureBand.job_id)
+            .where(or_(*(
+                and_(JobSignatureBand.band == band, JobSignatureBand.bucket.in_(bucket_list))
+                for band, bucket_list in by_band.items()
+            )))
+        )
+        for band, bucket, job_id in rows:
+            members.setdefault((band, bucket), []).append(job_id)
+
+    candidate_ids = sorted({job_id for job_ids in members.values() for job_id in job_ids})
+    details = {}
+    for offset in range(0, len(candidate_ids), chunk_size):
+        # Joined to jobs, so deleted/archived jobs are never matched
+        rows = session.execute(
+            select(JobSignature.job_id, JobSignature.signature, Job.title, Job.canonical_id)
+            .join(Job, Job.id == JobSignature.job_id)
+            .where(JobSignature.job_id.in_(candidate_ids[offset:offset + chunk_size]))
+        )
+        for job_id, signature, title, canonical_id in rows:
+            details[job_id] = (np.frombuffer(signature, dtype='<u4'), normalize_tokens(title), canonical_id)
+    return members, details
+
+def flag_duplicates(session, jobs, threshold=None):
+    """
+    Check newly added jobs against the existing ones (and each other)
+    The jobs must be flushed already (they need their ids). Sets
+    canonical_id on the duplicates and stores the signatures - the caller
+    commits. Returns how many of the jobs were duplicates.
+    """
+    if np is None or not jobs:
+        return 0
+    threshold = Config.DUPLICATE_THRESHOLD if threshold is None else threshold
+
+    signed = []
+    for job in jobs:
+        signature = job_signature(job.title, job.company, job.description)
+        signed.append((job, signature, band_buckets(signature), normalize_tokens(job.title)))
+
+    all_buckets = sorted({bucket for _, _, buckets, _ in signed for bucket in buckets})
+    members, details = _load_candidates(session, all_buckets)
+
+    flagged = 0
+    for job, signature, buckets, title_words in signed:
+        best = None
+        candidate_ids = {job_id for bucket in buckets for job_id in members.get(bucket, [])}
+        for candidate_id in candidate_ids - {job.id}:
+            if candidate_id not in details:
+                continue
+            other_signature, other_title_words, other_canonical = details[candidate_id]
+            score = _is_duplicate(signature, title_words, other_signature, other_title_words, threshold)
+            if score is not None and (best is None or score > best[1]):
+                best = (other_canonical or candidate_id, score)
+        if best is not None:
+            job.canonical_id = best[0]
+            flagged += 1
+            print(f"Job {job.id} looks like a duplicate of job {best[0]} ({best[1]:.0%} similar)")
+
+        # Later jobs in this batch can match this one too
+        details[job.id] = (signature, title_words, job.canonical_id)
+        for bucket in buckets:
+            members.setdefault(bucket, []).append(job.id)
+
+    # Store the signatures (replacing old ones if a job is re-checked)
+    job_ids = [job.id for job, _, _, _ in signed]
+    session.execute(delete(JobSignatureBand).where(JobSignatureBand.job_id.in_(job_ids)))
+    session.execute(delete(JobSignature).where(JobSignature.job_id.in_(job_ids)))
+    session.execute(insert(JobSignature.__table__), [
+        {'job_id': job.id, 'signature': signature.tobytes()} for job, signature, _, _ in signed
+    ])
+    session.execute(insert(JobSignatureBand.__table__), [
+        {'band': band, 'bucket': bucket, 'job_id': job.id}
+        for job, _, buckets, _ in signed for band, bucket in buckets
+    ])
+    return flagged
+
+def remove_signatures(session, job_ids):
+    """
+    Drop the signatures and buckets of deleted/archived jobs (doesn't commit)
+    Called in the transaction that removes the jobs - the tables have no
+    foreign keys, and a stale bucket would keep turning up as a candidate
+    """
+    job_ids = list(job_ids)
+    if job_ids:
+        session.execute(delete(JobSignatureBand).where(JobSignatureBand.job_id.in_(job_ids)))
+        session.execute(delete(JobSignature).where(JobSignature.job_id.in_(job_ids)))
+
+def cluster_duplicates(session, threshold=None, chunk_size=2000):
+    """
+    Batch mode: group the whole jobs table into duplicate clusters
+    Rebuilds every signature and bucket, links jobs that really are similar
+    (union-find), and points every duplicate at the oldest job of its group.
+    Returns (number of duplicates, number of jobs whose canonical_id changed)
+    """
+    if np is None:
+        raise RuntimeError("Duplicate detection needs numpy (pip install numpy)")
+    threshold = Config.DUPLICATE_THRESHOLD if threshold is None else threshold
+
+    # 1. Signatures and buckets of every job
+    signatures, title_words, buckets = {}, {}, {}
+    current = {}
+    statement = (
+        select(Job.id, Job.title, Job.company, Job.description, Job.canonical_id)
+        .order_by(Job.id).execution_options(yield_per=chunk_size)
+    )
+    for row in session.execute(statement):
+        signature = job_signature(row.title, row.company, row.description)
+        signatures[row.id] = signature
+        title_words[row.id] = normalize_tokens(row.title)
+        current[row.id] = row.canonical_id
+        for bucket in band_buckets(signature):
+            buckets.setdefault(bucket, []).append(row.id)
+    print(f"Signed {len(signatures)} jobs")
+
+    # 2. Union-find over the candidate pairs that pass the real comparison
+    parent = {}
+
+    def find(job_id):
+        root = job_id
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while job_id != root:
+            parent[job_id], job_id = root, parent.get(job_id, job_id)
+        return root
+
+    for job_ids in buckets.values():
+        if len(job_ids) < 2:
+            continue
+        if len(job_ids) > MAX_BUCKET_SIZE:
+            print(f"Skipping a bucket shared by {len(job_ids)} jobs")
+            continue
+        for i, a in enumerate(job_ids):
+            for b in job_ids[i + 1:]:
+                root_a, root_b = find(a), find(b)
+                if root_a != root_b and _is_duplicate(
+                    signatures[a], title_words[a], signatures[b], title_words[b], threshold
+                ) is not None:
+                    # The oldest job (smallest id) stays the original
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    # 3. Write the canonical ids that changed
+    now = datetime.utcnow()
+    changes = []
+    duplicates = 0
+    for job_id in signatures:
+        root = find(job_id)
+        canonical_id = root if root != job_id else None
+        duplicates += canonical_id is not None
+        if current[job_id] != canonical_id:
+            changes.append({'id': job_id, 'canonical_id': canonical_id, 'updated_at': now})
+    for offset in range(0, len(changes), chunk_size):
+        # ORM bulk UPDATE by primary key (one executemany)
+        session.execute(update(Job), changes[offset:offset + chunk_size])
+
+    # 4. Replace the signature tables (plain table inserts, no ORM bookkeeping)
+    session.execute(delete(JobSignatureBand))
+    session.execute(delete(JobSignature))
+    job_ids = list(signatures)
+    for offset in range(0, len(job_ids), chunk_size):
+        session.execute(insert(JobSignature.__table__), [
+            {'job_id': job_id, 'signature': signatures[job_id].tobytes()}
+            for job_id in job_ids[offset:offset + chunk_size]
+        ])
+    band_rows = []
+    for (band, bucket), bucket_ids in buckets.items():
+        band_rows.extend({'band': band, 'bucket': bucket, 'job_id': job_id} for job_id in bucket_ids)
+        if len(band_rows) >= chunk_size * BANDS:
+            session.execute(insert(JobSignatureBand.__table__), band_rows)
+            band_rows = []
+    if band_rows:
+        session.execute(insert(JobSignatureBand.__table__), band_rows)
+    session.commit()
+
+    # Tell caches and in-memory engines about the jobs that changed
+    changed_ids = [change['id'] for change in changes]
+    for offset in range(0, len(changed_ids), chunk_size):
+        rows = session.execute(
+            select(*Job.__table__.columns).where(Job.id.in_(changed_ids[offset:offset + chunk_size]))
+        ).all()
+        publish_job_changes([('update', job_row_to_dict(row)) for row in rows])
+    session.rollback()  # end the read transaction
+
+    print(f"Found {duplicates} duplicates, {len(changes)} jobs changed")
+    return duplicates, len(changes)
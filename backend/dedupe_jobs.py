@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Duplicate Grouping Script
+Compares every job with its likely duplicates (MinHash + LSH, see dedupe.py)
+and points each duplicate at the oldest job of its group via canonical_id
+New jobs are checked when they are added - run this after changing
+DUPLICATE_THRESHOLD, after a bulk import, or to fill in existing data
+"""
+
+import os
+import sys
+import argparse
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+def dedupe_jobs(threshold=None):
+    """
+    Regroup every job into duplicate clusters
+    """
+    try:
+        from db import db
+        from app import create_app
+        from dedupe import cluster_duplicates
+
+        # Create the Flask app
+        app = create_app()
+
+        with app.app_context():
+            duplicates, changed = cluster_duplicates(db.session, threshold=threshold)
+
+        print(f"\nDuplicate grouping completed! {duplicates} duplicates, {changed} jobs changed")
+        return True
+
+    except Exception as e:
+        print(f"Error grouping duplicates: {e}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Find near-duplicate jobs and link them to their original')
+    parser.add_argument('--threshold', type=float, default=None, help='Similarity needed (default: DUPLICATE_THRESHOLD)')
+    args = parser.parse_args()
+
+    dedupe_jobs(args.threshold)
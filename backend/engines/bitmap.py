@@ -0,0 +1,181 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Compressed bitmaps (roaring-style) for sets of job ids
+# The id space is cut into chunks of 65536 ids. Each chunk that has any ids
+# in it gets a "container" holding the low 16 bits of those ids:
+# - a sorted uint16 array while the chunk has at most 4096 ids (2 bytes per id)
+# - a 65536-bit bitmap (1024 uint64 words = 8 KB) once it has more
+# so sparse sets stay small and dense sets stay fast to intersect.
+
+ARRAY_LIMIT = 4096
+BITMAP_WORDS = 1024
+
+# Number of set bits in every possible byte (for counting bitmap containers)
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64) if np is not None else None
+
+def _is_array(container):
+    return container.dtype == np.uint16
+
+def _to_bitmap(values):
+    bitmap = np.zeros(BITMAP_WORDS, dtype=np.uint64)
+    np.bitwise_or.at(bitmap, values >> 6, np.left_shift(np.uint64(1), (values & 63).astype(np.uint64)))
+    return bitmap
+
+def _to_array(bitmap):
+    bits = np.unpackbits(bitmap.astype('<u8', copy=False).view(np.uint8), bitorder='little')
+    return np.flatnonzero(bits).astype(np.uint16)
+
+def _bits_set(bitmap, values):
+    """
+    Boolean mask: is each of the (uint16) values set in the bitmap?
+    """
+    words = bitmap[values >> 6]
+    return ((words >> (values & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+def _cardinality(container):
+    if _is_array(container):
+        return len(container)
+    return int(_POPCOUNT[container.view(np.uint8)].sum())
+
+def _shrink(container):
+    """
+    Use the smaller representation for a container
+    """
+    if not _is_array(container) and _cardinality(container) <= ARRAY_LIMIT:
+        return _to_array(container)
+    if _is_array(container) and len(container) > ARRAY_LIMIT:
+        return _to_bitmap(container)
+    return container
+
+def _and(a, b):
+    if _is_array(a) and _is_array(b):
+        return np.intersect1d(a, b, assume_unique=True)
+    if _is_array(a):
+        return a[_bits_set(b, a)]
+    if _is_array(b):
+        return b[_bits_set(a, b)]
+    return _shrink(a & b)
+
+def _and_count(a, b):
+    if _is_array(a) and _is_array(b):
+        return len(np.intersect1d(a, b, assume_unique=True))
+    if _is_array(a):
+        return int(np.count_nonzero(_bits_set(b, a)))
+    if _is_array(b):
+        return int(np.count_nonzero(_bits_set(a, b)))
+    return _cardinality(a & b)
+
+def _or(a, b):
+    if _is_array(a) and _is_array(b):
+        return _shrink(np.union1d(a, b).astype(np.uint16))
+    a_bits = _to_bitmap(a) if _is_array(a) else a
+    b_bits = _to_bitmap(b) if _is_array(b) else b
+    return a_bits | b_bits
+
+class RoaringBitmap:
+    """
+    A set of non-negative integers (job ids) stored as compressed containers
+    Supports add/discard, & and | with another bitmap, and counting
+    the size of an intersection without building it
+    """
+
+    def __init__(self, containers=None):
+        if np is None:
+            raise RuntimeError("Bitmap indexes need numpy (pip install numpy)")
+        # high 16 bits of the id -> container with the low 16 bits
+        self.containers = containers or {}
+
+    @classmethod
+    def from_ids(cls, ids):
+        ids = np.unique(np.asarray(ids, dtype=np.int64))
+        containers = {}
+        if len(ids):
+            highs = ids >> 16
+            chunk_highs, starts = np.unique(highs, return_index=True)
+            ends = list(starts[1:]) + [len(ids)]
+            for high, start, end in zip(chunk_highs, starts, ends):
+                containers[int(high)] = _shrink((ids[start:end] & 0xFFFF).astype(np.uint16))
+        return cls(containers)
+
+    def add(self, job_id):
+        high, low = job_id >> 16, np.uint16(job_id & 0xFFFF)
+        container = self.containers.get(high)
+        if container is None:
+            self.containers[high] = np.array([low], dtype=np.uint16)
+        elif _is_array(container):
+            position = np.searchsorted(container, low)
+            if position == len(container) or container[position] != low:
+                self.containers[high] = _shrink(np.insert(container, position, low))
+        else:
+            container[low >> 6] |= np.uint64(1) << np.uint64(low & 63)
+
+    def discard(self, job_id):
+        high, low = job_id >> 16, np.uint16(job_id & 0xFFFF)
+        container = self.containers.get(high)
+        if container is None:
+            return
+        if _is_array(container):
+            position = np.searchsorted(container, low)
+            if position < len(container) and container[position] == low:
+                container = np.delete(container, position)
+        else:
+            container[low >> 6] &= ~(np.uint64(1) << np.uint64(low & 63))
+            container = _shrink(container)
+        if _cardinality(container):
+            self.containers[high] = container
+        else:
+            del self.containers[high]
+
+    def __contains__(self, job_id):
+        container = self.containers.get(job_id >> 16)
+        if container is None:
+            return False
+        low = np.array([job_id & 0xFFFF], dtype=np.uint16)
+        if _is_array(container):
+            position = np.searchsorted(container, low[0])
+            return position < len(container) and container[position] == low[0]
+        return bool(_bits_set(container, low)[0])
+
+    def __len__(self):
+        return sum(_cardinality(container) for container in self.containers.values())
+
+    def __and__(self, other):
+        containers = {}
+        for high in self.containers.keys() & other.containers.keys():
+            container = _and(self.containers[high], other.containers[high])
+            if _cardinality(container):
+                containers[high] = container
+        return RoaringBitmap(containers)
+
+    def __or__(self, other):
+        # Copies, because add()/discard() change bitmap containers in place
+        containers = {high: container.copy() for high, container in self.containers.items()}
+        for high, container in other.containers.items():
+            containers[high] = _or(containers[high], container) if high in containers else container.copy()
+        return RoaringBitmap(containers)
+
+    def intersection_count(self, other):
+        """
+        len(self & other), without building the intersection
+        """
+        return sum(
+            _and_count(self.containers[high], other.containers[high])
+            for high in self.containers.keys() & other.containers.keys()
+        )
+
+    def copy(self):
+        return RoaringBitmap({high: container.copy() for high, container in self.containers.items()})
+
+    def to_list(self):
+        ids = []
+        for high in sorted(self.containers):
+            container = self.containers[high]
+            lows = container if _is_array(container) else _to_array(container)
+            ids.extend((high << 16) + int(low) for low in lows)
+        return ids
+
+    def nbytes(self):
+        return sum(container.nbytes for container in self.containers.values())
@@ -0,0 +1,464 @@
+import sys
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func
+
+# NumPy is optional - without it the columnar engine is simply not available
+# and get_jobs keeps using SQL
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# In-memory columnar read model
+# Keeps the whole (active) job catalog in compact arrays:
+# - dates as int64 microseconds since 1970
+# - company/location/job_type/experience_level/salary_range as int32 codes into
+#   a list of unique strings (each distinct value is stored once)
+# - tags as (row, tag id) pairs
+# and answers the get_jobs filters/sorting/pagination with NumPy operations,
+# using sort permutations that are computed once and reused.
+
+EPOCH = datetime(1970, 1, 1)
+NO_DATE = 2 ** 63 - 1  # stored for a missing expires_at ("never")
+DATE_COLUMNS = ('posting_date', 'created_at', 'updated_at', 'expires_at')
+INTERNED_COLUMNS = ('company', 'location', 'job_type', 'experience_level', 'salary_range')
+
+def to_micros(value):
+    """
+    datetime or ISO string -> microseconds since 1970 (None stays None)
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+def from_micros(value):
+    """
+    Microseconds since 1970 -> ISO string, like Job.to_dict()
+    """
+    if value == NO_DATE:
+        return None
+    return (EPOCH + timedelta(microseconds=int(value))).isoformat()
+
+class StringInterner:
+    """
+    Gives every distinct string a small integer code (code -1 means None)
+    """
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+        self.lowered = []
+
+    def code(self, value):
+        if value is None:
+            return -1
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+            self.lowered.append(value.lower())
+        return code
+
+    def value(self, code):
+        return None if code < 0 else self.values[code]
+
+    def substring_table(self, term):
+        """
+        Boolean lookup table: table[code] is True if that value contains term
+        (case-insensitive, like ILIKE '%term%'). The extra False at the end is
+        what code -1 (None) picks up, because NULL never matches ILIKE.
+        """
+        term = term.lower()
+        table = np.zeros(len(self.values) + 1, dtype=bool)
+        for code, lowered in enumerate(self.lowered):
+            if term in lowered:
+                table[code] = True
+        return table
+
+    def rank_table(self):
+        """
+        rank[code] = position of the value in alphabetical order (for sorting)
+        """
+        order = sorted(range(len(self.values)), key=lambda code: self.values[code])
+        rank = np.empty(len(self.values) + 1, dtype=np.int64)
+        rank[np.array(order, dtype=np.int64)] = np.arange(len(order))
+        rank[-1] = -1  # None sorts first
+        return rank
+
+def _grow(array, capacity, fill):
+    """
+    Return a copy of array with room for `capacity` items
+    """
+    grown = np.full(capacity, fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+class ColumnarCatalog:
+    """
+    The job catalog stored column by column
+    Rows are appended (capacity doubles when full); updated jobs are
+    rewritten in place and deleted jobs are only marked dead, until
+    compact() rebuilds the arrays.
+    """
+
+    def __init__(self, capacity=1024):
+        if np is None:
+            raise RuntimeError("The columnar read engine needs numpy (pip install numpy)")
+        self.lock = threading.RLock()
+        self.size = 0
+        self.capacity = capacity
+        self.dead_rows = 0
+        self.position = {}  # job id -> row number
+
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.canonical_ids = np.full(capacity, -1, dtype=np.int64)  # -1: not a duplicate
+        self.dates = {name: np.full(capacity, NO_DATE, dtype=np.int64) for name in DATE_COLUMNS}
+        self.codes = {name: np.full(capacity, -1, dtype=np.int32) for name in INTERNED_COLUMNS}
+        self.vocab = {name: StringInterner() for name in INTERNED_COLUMNS}
+
+        # Free text columns are plain lists (only read when building a page)
+        self.titles = []
+        self.descriptions = []
+
+        # Tags: the list of tag ids of every row, plus the same data as two
+        # flat arrays of (row, tag id) pairs for vectorized filtering
+        self.tag_vocab = StringInterner()
+        self.row_tags = []
+        self.pair_count = 0
+        self.pair_rows = np.zeros(capacity, dtype=np.int32)
+        self.pair_tags = np.zeros(capacity, dtype=np.int32)
+
+        # Newest updated_at we have seen (used to fetch changes made elsewhere)
+        self.high_water = 0
+
+        # Caches rebuilt lazily after changes
+        self._sort_cache = {}
+        self._search_texts = None
+
+    # ----------------------------
+    # Writes
+    # ----------------------------
+    def _append_row(self):
+        if self.size == self.capacity:
+            self.capacity *= 2
+            self.ids = _grow(self.ids, self.capacity, 0)
+            self.alive = _grow(self.alive, self.capacity, False)
+            self.canonical_ids = _grow(self.canonical_ids, self.capacity, -1)
+            for name in DATE_COLUMNS:
+                self.dates[name] = _grow(self.dates[name], self.capacity, NO_DATE)
+            for name in INTERNED_COLUMNS:
+                self.codes[name] = _grow(self.codes[name], self.capacity, -1)
+        row = self.size
+        self.size += 1
+        self.titles.append(None)
+        self.descriptions.append(None)
+        self.row_tags.append(())
+        return row
+
+    def _add_tag_pairs(self, row, tag_ids):
+        needed = self.pair_count + len(tag_ids)
+        if needed > len(self.pair_rows):
+            capacity = max(needed, len(self.pair_rows) * 2)
+            self.pair_rows = _grow(self.pair_rows, capacity, -1)
+            self.pair_tags = _grow(self.pair_tags, capacity, 0)
+        self.pair_rows[self.pair_count:needed] = row
+        self.pair_tags[self.pair_count:needed] = tag_ids
+        self.pair_count = needed
+
+    def _retire_tag_pairs(self, row):
+        # Old pairs of a rewritten/deleted row are marked with row -1
+        if self.row_tags[row]:
+            pairs = self.pair_rows[:self.pair_count]
+            pairs[pairs == row] = -1
+
+    def _invalidate(self):
+        self._sort_cache = {}
+        self._search_texts = None
+
+    def upsert(self, job):
+        """
+        Add or replace a job (a Job.to_dict() style dict)
+        """
+        with self.lock:
+            row = self.position.get(job['id'])
+            if row is None:
+                row = self._append_row()
+                self.position[job['id']] = row
+            else:
+                self._retire_tag_pairs(row)
+
+            self.ids[row] = job['id']
+            self.alive[row] = True
+            canonical_id = job.get('canonical_id')
+            self.canonical_ids[row] = -1 if canonical_id is None else canonical_id
+            for name in DATE_COLUMNS:
+                micros = to_micros(job.get(name))
+                self.dates[name][row] = NO_DATE if micros is None else micros
+            for name in INTERNED_COLUMNS:
+                self.codes[name][row] = self.vocab[name].code(job.get(name))
+            self.titles[row] = job.get('title') or ''
+            self.descriptions[row] = job.get('description')
+
+            tags = job.get('tags') or []
+            if isinstance(tags, str):
+                tags = tags.split(', ')
+            tag_ids = tuple(self.tag_vocab.code(tag) for tag in tags)
+            self.row_tags[row] = tag_ids
+            if tag_ids:
+                self._add_tag_pairs(row, tag_ids)
+
+            if self.dates['updated_at'][row] != NO_DATE:
+                self.high_water = max(self.high_water, int(self.dates['updated_at'][row]))
+            self._invalidate()
+
+    def remove(self, job_id):
+        """
+        Mark a job as deleted
+        """
+        with self.lock:
+            row = self.position.pop(job_id, None)
+            if row is None:
+                return
+            self._retire_tag_pairs(row)
+            self.alive[row] = False
+            self.row_tags[row] = ()
+            self.titles[row] = ''
+            self.descriptions[row] = None
+            self.dead_rows += 1
+            self._invalidate()
+
+    def apply_changes(self, changes):
+        """
+        Change hook (see events.py): keep the catalog in step with the database
+        """
+        with self.lock:
+            for action, job in changes:
+                if action in ('create', 'update'):
+                    self.upsert(job)
+                else:
+                    self.remove(job['id'])
+            # Too many dead rows - rebuild the arrays without them
+            if self.dead_rows > 1000 and self.dead_rows > self.size // 4:
+                self.compact()
+
+    def compact(self):
+        """
+        Rebuild all arrays without the dead rows
+        """
+        with self.lock:
+            fresh = ColumnarCatalog(capacity=max(1024, len(self.position)))
+            for row in sorted(self.position.values()):
+                fresh.upsert(self.row_dict(row))
+            fresh.high_water = self.high_water
+            for name, value in vars(fresh).items():
+                if name != 'lock':
+                    setattr(self, name, value)
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def row_dict(self, row):
+        """
+        Build the same dict Job.to_dict() returns, from the columns
+        """
+        return {
+            'id': int(self.ids[row]),
+            'title': self.titles[row],
+            'company': self.vocab['company'].value(self.codes['company'][row]),
+            'location': self.vocab['location'].value(self.codes['location'][row]),
+            'posting_date': from_micros(self.dates['posting_date'][row]),
+            'job_type': self.vocab['job_type'].value(self.codes['job_type'][row]),
+            'tags': [self.tag_vocab.values[tag_id] for tag_id in self.row_tags[row]],
+            'description': self.descriptions[row],
+            'salary_range': self.vocab['salary_range'].value(self.codes['salary_range'][row]),
+            'experience_level': self.vocab['experience_level'].value(self.codes['experience_level'][row]),
+            'created_at': from_micros(self.dates['created_at'][row]),
+            'updated_at': from_micros(self.dates['updated_at'][row]),
+            'expires_at': from_micros(self.dates['expires_at'][row]),
+            'canonical_id': int(self.canonical_ids[row]) if self.canonical_ids[row] >= 0 else None
+        }
+
+    def _sort_permutation(self, sort_by):
+        """
+        Row order for a sort option, computed once until the data changes
+        """
+        permutation = self._sort_cache.get(sort_by)
+        if permutation is not None:
+            return permutation
+
+        n = self.size
+        field, _, direction = sort_by.rpartition('_')
+        if field == 'posting_date':
+            keys = self.dates['posting_date'][:n]
+        elif field == 'company':
+            keys = self.vocab['company'].rank_table()[self.codes['company'][:n]]
+        else:
+            keys = np.unique(np.array(self.titles, dtype=object), return_inverse=True)[1]
+        # Negating (instead of reversing) keeps equal values in row order, like SQL does
+        if direction == 'desc':
+            keys = -keys.astype(np.int64)
+        permutation = np.argsort(keys, kind='stable')
+        self._sort_cache[sort_by] = permutation
+        return permutation
+
+    def _search_rows(self, term):
+        """
+        Rows whose title, company or description contains term (case-insensitive)
+        The lowercase text of every row is built once, so a search is one
+        `in` check per row (steady even when almost every row matches)
+        """
+        if self._search_texts is None:
+            self._search_texts = [
+                f"{self.titles[row]}\x00{self.vocab['company'].value(self.codes['company'][row]) or ''}\x00{self.descriptions[row] or ''}".lower()
+                for row in range(self.size)
+            ]
+        term = term.lower()
+        return np.fromiter([term in text for text in self._search_texts], dtype=bool, count=self.size)
+
+    def warm_up(self):
+        """
+        Build the sort permutations and search texts now instead of on the first request
+        """
+        from models.job_queries import SORT_OPTIONS
+        with self.lock:
+            for sort_by in SORT_OPTIONS:
+                self._sort_permutation(sort_by)
+            self._search_rows('')
+
+    def matching_rows(self, params, now=None):
+        """
+        Boolean mask of the rows that pass the same filters as apply_job_filters()
+        """
+        from retention import retention_cutoff
+
+        n = self.size
+        now = now or datetime.utcnow()
+        mask = self.alive[:n].copy()
+
+        # Active jobs only (see retention.py)
+        mask &= self.dates['expires_at'][:n] > to_micros(now)
+        cutoff = retention_cutoff(now)
+        if cutoff is not None:
+            mask &= self.dates['posting_date'][:n] >= to_micros(cutoff)
+        active = mask.copy()
+
+        for name in ('job_type', 'location'):
+            value = params.get(name)
+            if value and value.lower() != 'all':
+                mask &= self.vocab[name].substring_table(value)[self.codes[name][:n]]
+
+        tags = params.get('tags')
+        if tags and tags.lower() != 'all':
+            pair_rows = self.pair_rows[:self.pair_count]
+            pair_tags = self.pair_tags[:self.pair_count]
+            live_pairs = pair_rows >= 0
+            for tag in (tag.strip() for tag in tags.split(',')):
+                pair_hits = self.tag_vocab.substring_table(tag)[pair_tags] & live_pairs
+                rows_with_tag = np.zeros(n, dtype=bool)
+                rows_with_tag[pair_rows[pair_hits]] = True
+                mask &= rows_with_tag
+
+        search = params.get('search')
+        if search:
+            mask &= self._search_rows(search)
+
+        # Hide near-duplicates whose original is still listed (see dedupe.py)
+        if params.get('hide_duplicates'):
+            for row in np.flatnonzero(mask & (self.canonical_ids[:n] >= 0)):
+                original_row = self.position.get(int(self.canonical_ids[row]))
+                if original_row is not None and active[original_row]:
+                    mask[row] = False
+
+        return mask
+
+    def query(self, params, now=None):
+        """
+        Answer a get_jobs request: returns (total count, list of job dicts for the page)
+        """
+        from models.job_queries import SORT_OPTIONS
+
+        with self.lock:
+            mask = self.matching_rows(params, now)
+            sort_by = params.get('sort')
+            if sort_by not in SORT_OPTIONS:
+                sort_by = 'posting_date_desc'
+            permutation = self._sort_permutation(sort_by)
+            ordered = permutation[mask[permutation]]
+
+            per_page = max(params['per_page'], 0)
+            start = max((params['page'] - 1) * per_page, 0)
+            page_rows = ordered[start:start + per_page]
+            return len(ordered), [self.row_dict(row) for row in page_rows]
+
+    def memory_usage(self):
+        """
+        Approximate bytes used by the catalog (arrays + strings)
+        """
+        with self.lock:
+            arrays = [self.ids, self.alive, self.canonical_ids, self.pair_rows, self.pair_tags,
+                      *self.dates.values(), *self.codes.values()]
+            total = sum(array.nbytes for array in arrays)
+            strings = self.titles + self.descriptions + self.tag_vocab.values
+            for interner in self.vocab.values():
+                strings += interner.values
+            total += sum(sys.getsizeof(value) for value in strings if value is not None)
+            total += sys.getsizeof(self.row_tags) + sum(sys.getsizeof(tags) for tags in self.row_tags)
+            if self._search_texts is not None:
+                total += sys.getsizeof(self._search_texts) + sum(sys.getsizeof(text) for text in self._search_texts)
+            return total
+
+    def __len__(self):
+        return len(self.position)
+
+# ----------------------------
+# Loading and keeping in sync
+# ----------------------------
+def load_catalog(session, batch_size=5000):
+    """
+    Build a catalog from every active job in the database
+    """
+    from models.job import Job, job_row_to_dict
+    from retention import active_jobs_filter
+
+    count = session.execute(select(func.count(Job.id))).scalar_one()
+    catalog = ColumnarCatalog(capacity=max(1024, count))
+    statement = select(*Job.__table__.columns).where(active_jobs_filter()).execution_options(yield_per=batch_size)
+    for row in session.execute(statement):
+        catalog.upsert(job_row_to_dict(row))
+    catalog.warm_up()
+    return catalog
+
+def sync_catalog(catalog, session):
+    """
+    Pick up changes made by other processes (other workers, the scraper)
+    Returns False if jobs were deleted elsewhere and a full reload is needed
+    """
+    from models.job import Job, job_row_to_dict
+    from retention import active_jobs_filter
+
+    # New and edited jobs: everything updated since the newest change we've seen
+    since = EPOCH + timedelta(microseconds=catalog.high_water)
+    changed = session.execute(select(*Job.__table__.columns).where(Job.updated_at >= since)).all()
+    if changed:
+        catalog.apply_changes([('update', job_row_to_dict(row)) for row in changed])
+
+    # Deletes don't leave anything to fetch - compare counts instead
+    now = datetime.utcnow()
+    db_count = session.execute(select(func.count(Job.id)).where(active_jobs_filter(now))).scalar_one()
+    return db_count == int(catalog.matching_rows({}, now).sum())
+
+def get_columnar_catalog(app):
+    """
+    The columnar catalog for this app, or None if it isn't ready yet
+    (or numpy isn't installed - then get_jobs just keeps using SQL)
+    """
+    if np is None:
+        return None
+    from engines.manager import get_engine
+    return get_engine(app, 'columnar catalog', load_catalog, sync_catalog)
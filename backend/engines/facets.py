@@ -0,0 +1,318 @@
+import time
+import threading
+from collections import Counter
+from datetime import datetime
+from functools import reduce
+
+from sqlalchemy import select, func
+
+from engines.bitmap import RoaringBitmap, np
+from models.job_queries import split_tags
+
+# Drill-down facet counts
+# For the current filter selection, how many jobs would each job type,
+# location and tag give? Every facet is counted with all the *other* filters
+# applied (so picking "Contract" still shows how many "Full-time" jobs there are).
+#
+# FacetIndex keeps one compressed bitmap of job ids per facet value and
+# answers with bitmap intersections instead of one GROUP BY per facet.
+# count_facets_with_sql() gives the same answer with SQL, and is used while
+# the index is loading or when numpy isn't installed.
+
+# params key -> response key
+FACETS = {
+    'job_type': 'job_types',
+    'location': 'locations',
+    'tags': 'tags'
+}
+
+# The set of active (not expired) jobs is recomputed this often,
+# so jobs drop out of the counts as they pass their retention date
+ACTIVE_REFRESH_SECONDS = 60
+
+def _parse_date(value):
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+def _selected(value):
+    return bool(value) and value.lower() != 'all'
+
+class FacetIndex:
+    """
+    value -> bitmap of job ids, for every job type, location and tag
+    """
+
+    def __init__(self):
+        if np is None:
+            raise RuntimeError("The facet index needs numpy (pip install numpy)")
+        self.lock = threading.RLock()
+        self.bitmaps = {facet: {} for facet in FACETS}
+        # job id -> (job_type, location, tags) it is indexed under, so it can be removed again
+        self.job_values = {}
+        # job id -> (posting_date, expires_at), for the retention rules
+        self.job_dates = {}
+        # duplicate job id -> id of its original (see dedupe.py)
+        self.job_canonical = {}
+        # Newest updated_at we have seen (used to fetch changes made elsewhere)
+        self.high_water = None
+        self._active = None
+        self._active_at = 0.0
+        self._originals = None
+
+    # ----------------------------
+    # Writes
+    # ----------------------------
+    def _values(self, job):
+        return {
+            'job_type': [job['job_type']] if job.get('job_type') else [],
+            'location': [job['location']] if job.get('location') else [],
+            'tags': split_tags(job.get('tags'))
+        }
+
+    def _is_active(self, dates, now, cutoff):
+        posting_date, expires_at = dates
+        if expires_at is not None and expires_at <= now:
+            return False
+        if cutoff is not None and (posting_date is None or posting_date < cutoff):
+            return False
+        return True
+
+    def _remove(self, job_id):
+        values = self.job_values.pop(job_id, None)
+        self.job_dates.pop(job_id, None)
+        self.job_canonical.pop(job_id, None)
+        self._originals = None
+        if values is None:
+            return
+        for facet, facet_values in values.items():
+            for value in facet_values:
+                bitmap = self.bitmaps[facet].get(value)
+                if bitmap is not None:
+                    bitmap.discard(job_id)
+                    if not len(bitmap):
+                        del self.bitmaps[facet][value]
+        if self._active is not None:
+            self._active.discard(job_id)
+
+    def upsert(self, job):
+        from retention import retention_cutoff
+        with self.lock:
+            job_id = job['id']
+            self._remove(job_id)
+            values = self._values(job)
+            for facet, facet_values in values.items():
+                for value in facet_values:
+                    self.bitmaps[facet].setdefault(value, RoaringBitmap()).add(job_id)
+            self.job_values[job_id] = values
+
+            dates = (_parse_date(job.get('posting_date')), _parse_date(job.get('expires_at')))
+            self.job_dates[job_id] = dates
+            if job.get('canonical_id') is not None:
+                self.job_canonical[job_id] = job['canonical_id']
+            now = datetime.utcnow()
+            if self._active is not None and self._is_active(dates, now, retention_cutoff(now)):
+                self._active.add(job_id)
+
+            updated_at = _parse_date(job.get('updated_at'))
+            if updated_at is not None and (self.high_water is None or updated_at > self.high_water):
+                self.high_water = updated_at
+
+    def remove(self, job_id):
+        with self.lock:
+            self._remove(job_id)
+
+    def apply_changes(self, changes):
+        """
+        Change listener (see events.py)
+        """
+        for action, job in changes:
+            if action in ('create', 'update'):
+                self.upsert(job)
+            else:
+                self.remove(job['id'])
+
+    def bulk_load(self, jobs):
+        """
+        Index many jobs at once (much faster than upsert() one by one)
+        """
+        with self.lock:
+            ids_by_value = {facet: {} for facet in FACETS}
+            for job in jobs:
+                values = self._values(job)
+                for facet, facet_values in values.items():
+                    for value in facet_values:
+                        ids_by_value[facet].setdefault(value, []).append(job['id'])
+                self.job_values[job['id']] = values
+                self.job_dates[job['id']] = (job.get('posting_date'), job.get('expires_at'))
+                if job.get('canonical_id') is not None:
+                    self.job_canonical[job['id']] = job['canonical_id']
+                updated_at = job.get('updated_at')
+                if updated_at is not None and (self.high_water is None or updated_at > self.high_water):
+                    self.high_water = updated_at
+            for facet, values in ids_by_value.items():
+                for value, ids in values.items():
+                    self.bitmaps[facet][value] = RoaringBitmap.from_ids(ids)
+            self._active = None
+            self._originals = None
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def _active_jobs(self):
+        """
+        Bitmap of the jobs that listings show right now
+        """
+        from retention import retention_cutoff
+        if self._active is None or time.monotonic() - self._active_at > ACTIVE_REFRESH_SECONDS:
+            now = datetime.utcnow()
+            cutoff = retention_cutoff(now)
+            self._active = RoaringBitmap.from_ids([
+                job_id for job_id, dates in self.job_dates.items() if self._is_active(dates, now, cutoff)
+            ])
+            self._active_at = time.monotonic()
+            self._originals = None
+        return self._active
+
+    def _listed_jobs(self, hide_duplicates):
+        """
+        The active jobs, without the duplicates of active jobs if asked to
+        """
+        active = self._active_jobs()
+        if not hide_duplicates:
+            return active
+        if self._originals is None:
+            self._originals = active.copy()
+            for job_id, canonical_id in self.job_canonical.items():
+                if canonical_id in active:
+                    self._originals.discard(job_id)
+        return self._originals
+
+    def _matching(self, facet, term):
+        """
+        Jobs with a value that contains term (case-insensitive, like the ILIKE filters)
+        """
+        term = term.lower()
+        bitmaps = [bitmap for value, bitmap in self.bitmaps[facet].items() if term in value.lower()]
+        return reduce(lambda a, b: a | b, bitmaps, RoaringBitmap())
+
+    def counts(self, params, search_ids=None):
+        """
+        Facet counts for a get_jobs filter selection
+        search_ids is a bitmap of the jobs matching params['search'] (the
+        free-text search isn't indexed here - the caller gets it from SQL)
+        """
+        with self.lock:
+            # One bitmap per selected filter
+            selections = {}
+            for facet in ('job_type', 'location'):
+                if _selected(params.get(facet)):
+                    selections[facet] = self._matching(facet, params[facet])
+            if _selected(params.get('tags')):
+                tag_bitmaps = [self._matching('tags', tag.strip()) for tag in params['tags'].split(',')]
+                selections['tags'] = reduce(lambda a, b: a & b, tag_bitmaps)
+            if search_ids is not None:
+                selections['search'] = search_ids
+
+            def scope(excluding=None):
+                result = self._listed_jobs(params.get('hide_duplicates'))
+                for name, bitmap in selections.items():
+                    if name != excluding:
+                        result = result & bitmap
+                return result
+
+            response = {'total': len(scope())}
+            for facet, key in FACETS.items():
+                jobs_in_scope = scope(excluding=facet)
+                counts = {}
+                for value, bitmap in self.bitmaps[facet].items():
+                    count = bitmap.intersection_count(jobs_in_scope)
+                    if count:
+                        counts[value] = count
+                response[key] = counts
+            return response
+
+    def memory_usage(self):
+        with self.lock:
+            return sum(bitmap.nbytes() for values in self.bitmaps.values() for bitmap in values.values())
+
+    def __len__(self):
+        return len(self.job_values)
+
+# ----------------------------
+# Loading and syncing
+# ----------------------------
+FACET_COLUMNS = ('id', 'job_type', 'location', 'tags', 'posting_date', 'expires_at', 'updated_at', 'canonical_id')
+
+def _facet_select():
+    from models.job import Job
+    return select(*(getattr(Job, name) for name in FACET_COLUMNS))
+
+def load_facet_index(session):
+    """
+    Build the index from every job in the database (expired ones too -
+    they are only left out of the counts)
+    """
+    index = FacetIndex()
+    rows = session.execute(_facet_select().execution_options(yield_per=10000))
+    index.bulk_load(dict(row._mapping) for row in rows)
+    return index
+
+def sync_facet_index(index, session):
+    """
+    Pick up changes made by other processes (other workers, the scraper)
+    Returns False if jobs were deleted elsewhere and a full reload is needed
+    """
+    from models.job import Job
+    if index.high_water is not None:
+        changed = session.execute(_facet_select().where(Job.updated_at >= index.high_water)).all()
+        for row in changed:
+            index.upsert(dict(row._mapping))
+    return session.execute(select(func.count(Job.id))).scalar_one() == len(index)
+
+def get_facet_index(app):
+    """
+    The facet index for this app, or None if it isn't ready yet (or numpy isn't installed)
+    """
+    if np is None or not app.config['FACET_INDEX_ENABLED']:
+        return None
+    from engines.manager import get_engine
+    return get_engine(app, 'facet index', load_facet_index, sync_facet_index)
+
+def search_job_ids(session, search):
+    """
+    Bitmap of the active jobs whose title, company or description contains search
+    """
+    from models.job import Job
+    from models.job_queries import apply_job_filters
+    ids = session.execute(apply_job_filters(select(Job.id), {'search': search})).scalars().all()
+    return RoaringBitmap.from_ids(ids)
+
+def count_facets_with_sql(session, params):
+    """
+    The same counts as FacetIndex.counts(), with one query per facet
+    """
+    from models.job import Job
+    from models.job_queries import apply_job_filters
+
+    def without(facet):
+        return {name: value for name, value in params.items() if name != facet}
+
+    response = {'total': session.execute(apply_job_filters(select(func.count(Job.id)), params)).scalar_one()}
+    for facet in ('job_type', 'location'):
+        column = getattr(Job, facet)
+        rows = session.execute(
+            apply_job_filters(select(column, func.count(Job.id)), without(facet))
+            .where(column.isnot(None)).group_by(column)
+        ).all()
+        response[FACETS[facet]] = {value: count for value, count in rows if value and count}
+
+    # Tags are stored as one comma separated string, so they are counted here
+    tag_counts = Counter()
+    for tags, count in session.execute(
+        apply_job_filters(select(Job.tags, func.count(Job.id)), without('tags')).group_by(Job.tags)
+    ):
+        for tag in set(split_tags(tags)):
+            tag_counts[tag] += count
+    response['tags'] = dict(tag_counts)
+    return response
@@ -0,0 +1,89 @@
+import time
+import threading
+
+# Background loading for the in-memory engines (engines/*)
+# Every engine is built the same way: load it from the database in a thread
+# the first time it is asked for, keep it current with the job change hook
+# (events.py) and catch up with other processes every few seconds.
+
+class EngineManager:
+    """
+    Owns one in-memory engine for one process
+
+    load(session) builds the engine from the database
+    sync(engine, session) applies changes made elsewhere and returns False
+    if the engine can't catch up and has to be reloaded
+    The engine needs an apply_changes(changes) method and a __len__
+    """
+
+    def __init__(self, app, name, load, sync):
+        self.app = app
+        self.name = name
+        self.load = load
+        self.sync = sync
+        self.engine = None
+        self.loading = False
+        self.last_sync = 0.0
+        self.lock = threading.Lock()
+
+    def _load(self):
+        from db import db
+        from events import add_change_listener, remove_change_listener
+        try:
+            with self.app.app_context():
+                start = time.perf_counter()
+                engine = self.load(db.session)
+                db.session.remove()
+            if self.engine is not None:
+                remove_change_listener(self.engine.apply_changes)
+            self.engine = engine
+            add_change_listener(engine.apply_changes)
+            self.last_sync = time.monotonic()
+            print(f"{self.name.capitalize()} loaded: {len(engine)} jobs in {(time.perf_counter() - start) * 1000:.0f} ms")
+        except Exception as e:
+            print(f"Error loading {self.name}: {e}")
+        finally:
+            self.loading = False
+
+    def start_loading(self):
+        with self.lock:
+            if self.loading:
+                return
+            self.loading = True
+        threading.Thread(target=self._load, name=self.name.replace(' ', '-'), daemon=True).start()
+
+    def get(self):
+        """
+        The engine, or None while it is still loading (callers use SQL meanwhile)
+        Must be called inside an app context
+        """
+        if self.engine is None:
+            self.start_loading()
+            return None
+
+        # Every few seconds, catch up with writes from other processes
+        interval = self.app.config['READ_ENGINE_SYNC_SECONDS']
+        if time.monotonic() - self.last_sync > interval and self.lock.acquire(blocking=False):
+            needs_reload = False
+            try:
+                self.last_sync = time.monotonic()
+                from db import db
+                needs_reload = not self.sync(self.engine, db.session)
+            except Exception as e:
+                print(f"Error syncing {self.name}: {e}")
+            finally:
+                self.lock.release()
+            if needs_reload:
+                print(f"{self.name.capitalize()} out of date - reloading")
+                self.start_loading()
+        return self.engine
+
+def get_engine(app, name, load, sync):
+    """
+    The engine called `name` for this app (one manager per app), or None if it isn't ready yet
+    """
+    key = name.replace(' ', '_')
+    manager = app.extensions.get(key)
+    if manager is None:
+        manager = app.extensions.setdefault(key, EngineManager(app, name, load, sync))
+    return manager.get()
@@ -0,0 +1,343 @@
+import time
+import queue
+import threading
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import select, func, insert
+
+from models.job_queries import job_matches
+
+# Saved-search alerts ("percolation")
+# Instead of running every saved search against the catalog, each new job is
+# run against the saved searches. The filters are substring matches (like the
+# ILIKE filters of GET /api/jobs), so every saved search is anchored on one of
+# its filter values, and that value is indexed under one of its trigrams (3
+# letters): a job can only match a search if the job's text for that filter
+# contains that trigram. We pick the trigram that is rarest in the current
+# jobs, so most searches are never looked at for most jobs. Many searches
+# share a value ("london", "pricing actuary"), so each value is checked once
+# per job, and only the searches anchored on a value the job contains (the
+# candidates) have their other filters checked (the same checks as
+# job_matches) - once for all searches with the same filters.
+
+# Which text of a job each filter looks at
+FILTER_FIELDS = ('job_type', 'location', 'tags', 'search')
+
+SAMPLE_JOBS = 5000  # recent jobs used to estimate how common every trigram is
+SYNC_SECONDS = 10  # how often a running percolator looks for searches saved by other processes
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def job_texts(job):
+    """
+    The lowercase text of a job (Job.to_dict() style) for every filter
+    """
+    tags = job.get('tags')
+    if isinstance(tags, list):
+        tags = ', '.join(tags)
+    return {
+        'job_type': (job.get('job_type') or '').lower(),
+        'location': (job.get('location') or '').lower(),
+        'tags': (tags or '').lower(),
+        # Newlines so no trigram spans two fields
+        'search': '\n'.join(job.get(name) or '' for name in ('title', 'company', 'description')).lower()
+    }
+
+def search_conditions(params):
+    """
+    [(field, lowercase term)] - everything a job must contain to match
+    """
+    conditions = []
+    for field in ('job_type', 'location'):
+        value = params.get(field)
+        if value and value.lower() != 'all':
+            conditions.append((field, value.lower()))
+    tags = params.get('tags')
+    if tags and tags.lower() != 'all':
+        conditions.extend(('tags', tag.strip().lower()) for tag in tags.split(','))
+    if params.get('search'):
+        conditions.append(('search', params['search'].lower()))
+    return conditions
+
+class Percolator:
+    """
+    In-memory index of the saved searches, queried with one job at a time
+    """
+
+    def __init__(self, trigram_counts=None):
+        self.lock = threading.RLock()
+        self.searches = {}  # saved search id -> filters
+        self.conditions = {}  # saved search id -> tuple(search_conditions(filters))
+        self.anchors = {}  # saved search id -> (field, term, trigram) it is indexed under, or None
+        self.anchored = {}  # (field, term) -> conditions -> set of ids anchored on it
+        self.index = {field: {} for field in FILTER_FIELDS}  # field -> trigram -> set of terms
+        # Searches without a usable trigram (no filters, or only terms shorter
+        # than 3 letters) are checked against every job: conditions -> set of ids
+        self.always_check = {}
+        # field -> Counter of trigrams in the sample jobs (how selective each trigram is)
+        self.trigram_counts = trigram_counts or {field: Counter() for field in FILTER_FIELDS}
+        self.max_id = 0
+
+    def _anchor(self, params):
+        best = None
+        for field, term in search_conditions(params):
+            for trigram in trigrams(term):
+                count = self.trigram_counts[field][trigram]
+                if best is None or count < best[0]:
+                    best = (count, field, term, trigram)
+        return None if best is None else best[1:]
+
+    def add(self, search_id, params):
+        with self.lock:
+            self.remove(search_id)
+            self.searches[search_id] = params
+            conditions = tuple(sorted(set(search_conditions(params))))
+            self.conditions[search_id] = conditions
+            anchor = self._anchor(params)
+            self.anchors[search_id] = anchor
+            if anchor is None:
+                self.always_check.setdefault(conditions, set()).add(search_id)
+            else:
+                field, term, trigram = anchor
+                self.anchored.setdefault((field, term), {}).setdefault(conditions, set()).add(search_id)
+                self.index[field].setdefault(trigram, set()).add(term)
+            self.max_id = max(self.max_id, search_id)
+
+    def remove(self, search_id):
+        with self.lock:
+            if search_id not in self.searches:
+                return
+            del self.searches[search_id]
+            conditions = self.conditions.pop(search_id)
+            anchor = self.anchors.pop(search_id)
+            if anchor is None:
+                _discard(self.always_check, conditions, search_id)
+            else:
+                field, term, trigram = anchor
+                groups = self.anchored[(field, term)]
+                _discard(groups, conditions, search_id)
+                if not groups:
+                    del self.anchored[(field, term)]
+                    terms = self.index[field][trigram]
+                    terms.discard(term)
+                    if not terms:
+                        del self.index[field][trigram]
+
+    def candidate_groups(self, texts):
+        """
+        {conditions: ids} of the searches that could match a job (a superset
+        of the real matches): those whose anchor value the job contains
+        """
+        groups = [self.always_check]
+        for field, text in texts.items():
+            field_index = self.index[field]
+            if not field_index:
+                continue
+            terms = set()
+            for trigram in trigrams(text):
+                terms.update(field_index.get(trigram, ()))
+            groups.extend(self.anchored[(field, term)] for term in terms if term in text)
+        return groups
+
+    def candidates(self, job, texts=None):
+        """
+        Ids of the saved searches that could match the job
+        """
+        with self.lock:
+            groups = self.candidate_groups(texts or job_texts(job))
+            return {search_id for group in groups for ids in group.values() for search_id in ids}
+
+    def match(self, job, now=None):
+        """
+        Ids of the saved searches the job matches
+        Same result as job_matches(job, filters) for every search, but the
+        job's text is lowercased once and only the candidates are checked
+        """
+        # Expired jobs match nothing (checked once, with no filters)
+        if not job_matches(job, {}, now):
+            return []
+        texts = job_texts(job)
+        found = {}  # (field, term) -> does the job contain it (searches share terms)
+
+        def contains(condition):
+            if condition not in found:
+                found[condition] = condition[1] in texts[condition[0]]
+            return found[condition]
+
+        matched = set()
+        with self.lock:
+            for group in self.candidate_groups(texts):
+                for conditions, ids in group.items():
+                    if all(contains(condition) for condition in conditions):
+                        matched |= ids
+        return sorted(matched)
+
+    def match_batch(self, jobs):
+        """
+        [(saved search id, job id)] for a batch of jobs
+        """
+        now = datetime.utcnow()
+        return [(search_id, job['id']) for job in jobs for search_id in self.match(job, now)]
+
+    def __len__(self):
+        return len(self.searches)
+
+def _discard(groups, conditions, search_id):
+    ids = groups[conditions]
+    ids.discard(search_id)
+    if not ids:
+        del groups[conditions]
+
+# ----------------------------
+# Loading, syncing and writing matches
+# ----------------------------
+def count_trigrams(jobs):
+    """
+    In how many of the jobs every trigram appears, per filter field
+    """
+    counts = {field: Counter() for field in FILTER_FIELDS}
+    for job in jobs:
+        for field, text in job_texts(job).items():
+            counts[field].update(trigrams(text))
+    return counts
+
+def load_percolator(session):
+    """
+    Build the percolator from the saved_searches table
+    """
+    from models.job import Job
+    from models.saved_search import SavedSearch
+
+    columns = (Job.job_type, Job.location, Job.tags, Job.title, Job.company, Job.description)
+    sample = session.execute(select(*columns).order_by(Job.id.desc()).limit(SAMPLE_JOBS)).all()
+    percolator = Percolator(count_trigrams(dict(row._mapping) for row in sample))
+    for saved_search in session.execute(select(SavedSearch)).scalars():
+        percolator.add(saved_search.id, saved_search.filters())
+    return percolator
+
+def sync_percolator(percolator, session):
+    """
+    Add searches saved by other processes
+    Returns False if searches were deleted elsewhere and a full reload is needed
+    """
+    from models.saved_search import SavedSearch
+    for saved_search in session.execute(select(SavedSearch).where(SavedSearch.id > percolator.max_id)).scalars():
+        percolator.add(saved_search.id, saved_search.filters())
+    return session.execute(select(func.count(SavedSearch.id))).scalar_one() == len(percolator)
+
+def _insert_ignoring_duplicates(session, table, rows):
+    """
+    INSERT that skips rows whose primary key already exists
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        session.execute(insert(table).prefix_with('IGNORE'), rows)  # MySQL
+        return
+    session.execute(dialect_insert(table).on_conflict_do_nothing(), rows)
+
+def percolate_jobs(session, percolator, jobs):
+    """
+    Match jobs (Job.to_dict() style dicts) against the saved searches and
+    add them to the matching inboxes. The caller commits.
+    Returns the number of matches.
+    """
+    from models.saved_search import SavedSearchMatch
+    matches = percolator.match_batch(jobs)
+    if matches:
+        now = datetime.utcnow()
+        _insert_ignoring_duplicates(session, SavedSearchMatch.__table__, [
+            {'saved_search_id': search_id, 'job_id': job_id, 'matched_at': now}
+            for search_id, job_id in matches
+        ])
+    return len(matches)
+
+# ----------------------------
+# Background matching for the API
+# ----------------------------
+class SavedSearchAlerts:
+    """
+    Matches jobs created/edited through the API against the saved searches
+    The change listener only queues; a background thread matches the queued
+    jobs in batches and writes the inbox rows. Jobs added by other processes
+    (the scraper) are matched by those processes (see percolate_jobs).
+    """
+
+    BATCH_SIZE = 500
+
+    def __init__(self, app):
+        self.app = app
+        self.queue = queue.Queue()
+        self.thread = None
+        self.percolator = None
+        self.synced_at = 0.0
+        self.lock = threading.Lock()
+
+    def apply_changes(self, changes):
+        """
+        Change listener (see events.py) - only queues, never blocks the request
+        """
+        jobs = [job for action, job in changes if action in ('create', 'update')]
+        if not jobs:
+            return
+        for job in jobs:
+            self.queue.put(job)
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='saved-search-alerts', daemon=True)
+                self.thread.start()
+
+    def current_percolator(self, session):
+        """
+        The percolator, loaded on first use and synced every SYNC_SECONDS
+        """
+        if self.percolator is None:
+            self.percolator = load_percolator(session)
+            self.synced_at = time.monotonic()
+        elif time.monotonic() - self.synced_at > SYNC_SECONDS:
+            self.synced_at = time.monotonic()
+            if not sync_percolator(self.percolator, session):
+                self.percolator = load_percolator(session)
+        return self.percolator
+
+    def _run(self):
+        from db import db
+        while True:
+            try:
+                jobs = [self.queue.get(timeout=30)]
+            except queue.Empty:
+                return  # idle - the next change starts a new thread
+            # Take whatever else is waiting, up to a batch
+            while len(jobs) < self.BATCH_SIZE:
+                try:
+                    jobs.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self.app.app_context():
+                    percolator = self.current_percolator(db.session)
+                    if len(percolator):
+                        matched = percolate_jobs(db.session, percolator, jobs)
+                        db.session.commit()
+                        if matched:
+                            print(f"Saved searches: {matched} new matches for {len(jobs)} jobs")
+                    db.session.remove()
+            except Exception as e:
+                print(f"Error matching saved searches: {e}")
+
+def init_saved_search_alerts(app):
+    """
+    Subscribe saved-search matching to job changes (no work happens until a job changes)
+    """
+    from events import add_change_listener
+    if not app.config['SAVED_SEARCH_ALERTS']:
+        return None
+    alerts = SavedSearchAlerts(app)
+    app.extensions['saved_search_alerts'] = alerts
+    add_change_listener(alerts.apply_changes)
+    return alerts
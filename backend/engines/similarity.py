@@ -0,0 +1,283 @@
+import os
+import re
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import select, delete, insert
+
+from models.job_queries import split_tags
+
+# numpy and scipy are optional - without them similar jobs can't be computed,
+# but GET /api/jobs/<id>/similar still serves whatever is in the table
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = None
+    sparse = None
+
+# "Similar jobs"
+# Every job becomes a sparse TF-IDF vector of the words in its title and
+# description and of its tags. Two jobs are similar when their vectors point
+# the same way (cosine similarity = dot product of the normalised vectors).
+#
+# build_similarities() computes the top-K neighbours of every job in one batch:
+# the matrix of all vectors is multiplied with its own transpose one block of
+# rows at a time, spread over a pool of processes, and the results are written
+# to the job_similarities table. The fitted model (vocabulary, idf weights and
+# vectors) is saved to a file so the API can then add new and edited jobs
+# incrementally (SimilarityUpdater in engines/similarity_updates.py) without
+# redoing the whole batch.
+
+TOKEN = re.compile(r'[a-z0-9][a-z0-9+#]*')
+STOP_WORDS = frozenset(
+    'a an and are as at be by for from has have in is it its of on or our the their this to we will with '
+    'you your who what which within about all any can more not other such than that these they us'.split()
+)
+
+# How much a word counts depending on where it appears
+FIELD_WEIGHTS = {'title': 2.0, 'tags': 3.0, 'description': 1.0}
+
+MIN_DF = 2  # ignore words that appear in only one job (they can't link two jobs)
+MAX_DF_RATIO = 0.5  # ignore words in more than half of all jobs (they link everything)
+MIN_SCORE = 0.05  # neighbours less similar than this aren't worth storing
+
+# Rows of the similarity matrix computed at once: block size x max(jobs, terms)
+BLOCK_CELLS = 25_000_000
+
+def job_terms(job):
+    """
+    Weighted term counts of a job: {term: weight}
+    """
+    terms = {}
+    for field in ('title', 'description'):
+        for token in TOKEN.findall((job.get(field) or '').lower()):
+            if token not in STOP_WORDS and len(token) > 1:
+                terms[token] = terms.get(token, 0.0) + FIELD_WEIGHTS[field]
+    for tag in split_tags(job.get('tags')):
+        term = 'tag:' + tag.lower()
+        terms[term] = terms.get(term, 0.0) + FIELD_WEIGHTS['tags']
+    return terms
+
+def _tf(weight):
+    # Sublinear term frequency - the 10th "python" adds less than the first
+    return 1.0 + math.log(weight)
+
+def _normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms).dot(matrix).tocsr().astype(np.float32)
+
+class SimilarityModel:
+    """
+    Fitted TF-IDF vocabulary plus the vector of every job
+    """
+
+    def __init__(self, vocabulary, idf, matrix, job_ids):
+        if np is None:
+            raise RuntimeError("Similar jobs need numpy and scipy (pip install numpy scipy)")
+        self.vocabulary = vocabulary  # term -> column
+        self.idf = idf
+        self.matrix = matrix  # one normalised row per job (csr, float32)
+        self.job_ids = job_ids
+        self.row_of = {int(job_id): row for row, job_id in enumerate(job_ids)}
+
+        # Changes since the batch: rows that no longer count, and vectors of new/edited jobs
+        self.alive = np.ones(len(job_ids), dtype=bool)
+        self.extra = {}
+
+    @classmethod
+    def fit(cls, jobs):
+        """
+        Build the vocabulary and vectors from a list of job dicts
+        """
+        job_ids = np.array([job['id'] for job in jobs], dtype=np.int64)
+        term_counts = [job_terms(job) for job in jobs]
+
+        document_frequency = {}
+        for terms in term_counts:
+            for term in terms:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        max_df = max(MIN_DF, int(len(jobs) * MAX_DF_RATIO))
+        vocabulary_terms = sorted(term for term, df in document_frequency.items() if MIN_DF <= df <= max_df)
+        vocabulary = {term: column for column, term in enumerate(vocabulary_terms)}
+        idf = np.array([
+            math.log((1 + len(jobs)) / (1 + document_frequency[term])) + 1.0 for term in vocabulary_terms
+        ], dtype=np.float32)
+
+        rows, columns, values = [], [], []
+        for row, terms in enumerate(term_counts):
+            for term, weight in terms.items():
+                column = vocabulary.get(term)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+                    values.append(_tf(weight) * idf[column])
+        matrix = sparse.csr_matrix((values, (rows, columns)), shape=(len(jobs), len(vocabulary)), dtype=np.float32)
+        return cls(vocabulary, idf, _normalize_rows(matrix), job_ids)
+
+    def vectorize(self, job):
+        """
+        Normalised 1 x V vector for a job (words outside the vocabulary are ignored)
+        """
+        columns, values = [], []
+        for term, weight in job_terms(job).items():
+            column = self.vocabulary.get(term)
+            if column is not None:
+                columns.append(column)
+                values.append(_tf(weight) * self.idf[column])
+        vector = sparse.csr_matrix((values, ([0] * len(columns), columns)), shape=(1, len(self.vocabulary)), dtype=np.float32)
+        return _normalize_rows(vector)
+
+    def upsert(self, job):
+        row = self.row_of.get(job['id'])
+        if row is not None:
+            self.alive[row] = False
+        self.extra[job['id']] = self.vectorize(job)
+        return self.extra[job['id']]
+
+    def remove(self, job_id):
+        row = self.row_of.get(job_id)
+        if row is not None:
+            self.alive[row] = False
+        self.extra.pop(job_id, None)
+
+    def neighbours(self, vector, k, exclude_id=None):
+        """
+        The k most similar jobs to a vector: [(job id, score)]
+        """
+        scores = np.asarray(self.matrix.dot(vector.T).todense()).ravel()
+        scores[~self.alive] = 0.0
+        candidates = {}
+        if len(scores):
+            top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k + 1]
+            candidates = {int(self.job_ids[row]): float(scores[row]) for row in top if scores[row] >= MIN_SCORE}
+        for job_id, other in self.extra.items():
+            score = float(other.multiply(vector).sum())
+            if score >= MIN_SCORE:
+                candidates[job_id] = score
+        candidates.pop(exclude_id, None)
+        return sorted(candidates.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+    def save(self, path):
+        terms = np.array(sorted(self.vocabulary, key=self.vocabulary.get), dtype=str)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f, terms=terms, idf=self.idf, job_ids=self.job_ids,
+                data=self.matrix.data, indices=self.matrix.indices, indptr=self.matrix.indptr,
+                shape=np.array(self.matrix.shape)
+            )
+        os.replace(tmp_path, path)  # readers never see a half-written file
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as saved:
+            vocabulary = {str(term): column for column, term in enumerate(saved['terms'])}
+            matrix = sparse.csr_matrix((saved['data'], saved['indices'], saved['indptr']), shape=tuple(saved['shape']))
+            return cls(vocabulary, saved['idf'], matrix, saved['job_ids'])
+
+    def __len__(self):
+        return int(self.alive.sum()) + len(self.extra)
+
+# ----------------------------
+# Batch: top-K neighbours of every job
+# ----------------------------
+# The worker processes get the matrix once (when the pool starts)
+_worker_matrix = None
+
+def _init_worker(matrix):
+    global _worker_matrix
+    _worker_matrix = matrix
+
+def _top_k_block(start, end, k):
+    """
+    Top-k neighbours of rows start..end: (start, neighbour rows, scores), -1 = none
+    """
+    # Sparse matrix x dense block is much faster than sparse x sparse here,
+    # because the result (block x all jobs) is mostly non-zero anyway
+    block = _worker_matrix[start:end].toarray()
+    scores = np.asarray(_worker_matrix @ block.T).T
+    scores[np.arange(end - start), np.arange(start, end)] = 0.0  # a job isn't its own neighbour
+    k = min(k, scores.shape[1])
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+    top[top_scores < MIN_SCORE] = -1
+    return start, top, top_scores
+
+def compute_neighbours(model, k, workers=None, block_size=None):
+    """
+    Top-k neighbours (as row numbers) for every row of the model's matrix
+    """
+    n = model.matrix.shape[0]
+    neighbours = np.full((n, k), -1, dtype=np.int64)
+    scores = np.zeros((n, k), dtype=np.float32)
+    if n < 2:
+        return neighbours, scores
+
+    block_size = block_size or max(16, min(1000, BLOCK_CELLS // max(n, model.matrix.shape[1])))
+    blocks = [(start, min(start + block_size, n)) for start in range(0, n, block_size)]
+    workers = workers or os.cpu_count() or 1
+
+    def store(result):
+        start, top, top_scores = result
+        neighbours[start:start + len(top), :top.shape[1]] = top
+        scores[start:start + len(top), :top.shape[1]] = top_scores
+
+    if workers <= 1 or len(blocks) == 1:
+        _init_worker(model.matrix)
+        for start, end in blocks:
+            store(_top_k_block(start, end, k))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model.matrix,)) as pool:
+            futures = [pool.submit(_top_k_block, start, end, k) for start, end in blocks]
+            for future in futures:
+                store(future.result())
+    return neighbours, scores
+
+def _job_select():
+    from models.job import Job
+    from retention import active_jobs_filter
+    return select(Job.id, Job.title, Job.tags, Job.description).where(active_jobs_filter())
+
+def build_similarities(session, model_path, k=10, workers=None, block_size=None, chunk_size=2000):
+    """
+    Recompute the similar jobs of every active job and replace the job_similarities table
+    Returns the number of rows written
+    """
+    from models.job_similarity import JobSimilarity
+
+    start = time.perf_counter()
+    jobs = [dict(row._mapping) for row in session.execute(_job_select())]
+    model = SimilarityModel.fit(jobs)
+    print(f"Vectorised {len(jobs)} jobs ({len(model.vocabulary)} terms) in {time.perf_counter() - start:.1f} s")
+
+    start = time.perf_counter()
+    neighbours, scores = compute_neighbours(model, k, workers, block_size)
+    print(f"Computed top-{k} neighbours in {time.perf_counter() - start:.1f} s")
+
+    start = time.perf_counter()
+    now = datetime.utcnow()
+    # Replace everything in one transaction, so readers never see a half-empty table
+    session.execute(delete(JobSimilarity))
+    written = 0
+    for first in range(0, len(jobs), chunk_size):
+        rows = [
+            {'job_id': int(model.job_ids[row]), 'similar_job_id': int(model.job_ids[other]),
+             'score': float(score), 'computed_at': now}
+            for row in range(first, min(first + chunk_size, len(jobs)))
+            for other, score in zip(neighbours[row], scores[row]) if other >= 0
+        ]
+        if rows:
+            session.execute(insert(JobSimilarity), rows)
+            written += len(rows)
+    session.commit()
+    print(f"Stored {written} similar-job rows in {time.perf_counter() - start:.1f} s")
+
+    model.save(model_path)
+    return written
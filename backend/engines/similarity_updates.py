@@ -0,0 +1,140 @@
+import os
+import queue
+import threading
+from datetime import datetime
+from importlib.util import find_spec
+
+from sqlalchemy import select, delete, insert, func, or_
+
+# Incremental "similar jobs" updates (the batch side is engines/similarity.py)
+# This module is what create_app() imports: it only registers the change
+# listener, and numpy/scipy are loaded the first time a job actually changes
+# (by engines/similarity.py) - so building the app doesn't pay for them.
+
+# Without numpy and scipy there is no model to update (checked without importing them)
+HAS_NUMPY_AND_SCIPY = find_spec('numpy') is not None and find_spec('scipy') is not None
+
+class SimilarityUpdater:
+    """
+    Keeps job_similarities up to date between batch runs
+    The change listener only queues the changed jobs; a background thread
+    scores them against the saved model and updates their rows (and the
+    rows of their new neighbours). Jobs written by other processes are
+    picked up by the next batch run.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.queue = queue.Queue()
+        self.thread = None
+        self.model = None
+        self.model_mtime = None
+        self.lock = threading.Lock()
+
+    def apply_changes(self, changes):
+        """
+        Change listener (see events.py) - only queues, never blocks the request
+        """
+        for change in changes:
+            self.queue.put(change)
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name='similar-jobs-updater', daemon=True)
+                self.thread.start()
+
+    def _current_model(self):
+        """
+        The saved model, reloaded whenever a batch run writes a new one
+        """
+        path = self.app.config['SIMILARITY_MODEL_PATH']
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        if mtime != self.model_mtime:
+            from engines.similarity import SimilarityModel
+            self.model = SimilarityModel.load(path)
+            self.model_mtime = mtime
+        return self.model
+
+    def _run(self):
+        from db import db
+        while True:
+            try:
+                action, job = self.queue.get(timeout=30)
+            except queue.Empty:
+                return  # idle - the next change starts a new thread
+            try:
+                with self.app.app_context():
+                    model = self._current_model()
+                    if model is None:
+                        continue  # no batch run yet - nothing to update
+                    if action in ('create', 'update'):
+                        self.update_job(db.session, model, job)
+                    else:
+                        self.remove_job(db.session, model, job['id'])
+                    db.session.commit()
+            except Exception as e:
+                print(f"Error updating similar jobs for job {job.get('id')}: {e}")
+
+    def remove_job(self, session, model, job_id):
+        from models.job_similarity import JobSimilarity
+        model.remove(job_id)
+        session.execute(delete(JobSimilarity).where(
+            or_(JobSimilarity.job_id == job_id, JobSimilarity.similar_job_id == job_id)
+        ))
+
+    def update_job(self, session, model, job):
+        from models.job_similarity import JobSimilarity
+        k = self.app.config['SIMILAR_JOBS_K']
+        job_id = job['id']
+        self.remove_job(session, model, job_id)
+
+        vector = model.upsert(job)
+        neighbours = model.neighbours(vector, k, exclude_id=job_id)
+        if not neighbours:
+            return
+        now = datetime.utcnow()
+        session.execute(insert(JobSimilarity), [
+            {'job_id': job_id, 'similar_job_id': other, 'score': score, 'computed_at': now}
+            for other, score in neighbours
+        ])
+
+        # The new job may also belong in its neighbours' lists
+        scores = dict(neighbours)
+        lists = session.execute(
+            select(JobSimilarity.job_id, func.count(), func.min(JobSimilarity.score))
+            .where(JobSimilarity.job_id.in_(list(scores)))
+            .group_by(JobSimilarity.job_id)
+        ).all()
+        list_sizes = {other: (count, lowest) for other, count, lowest in lists}
+        for other, score in neighbours:
+            count, lowest = list_sizes.get(other, (0, None))
+            if count >= k and score <= lowest:
+                continue
+            session.execute(insert(JobSimilarity).values(
+                job_id=other, similar_job_id=job_id, score=score, computed_at=now
+            ))
+            if count >= k:
+                # Drop the least similar job to keep the list at k
+                weakest = session.execute(
+                    select(JobSimilarity.similar_job_id)
+                    .where(JobSimilarity.job_id == other)
+                    .order_by(JobSimilarity.score, JobSimilarity.similar_job_id)
+                    .limit(1)
+                ).scalar()
+                session.execute(delete(JobSimilarity).where(
+                    JobSimilarity.job_id == other, JobSimilarity.similar_job_id == weakest
+                ))
+
+def init_similar_jobs(app):
+    """
+    Subscribe the incremental updater to job changes (no work happens until a job changes)
+    """
+    from events import add_change_listener
+    if not HAS_NUMPY_AND_SCIPY or not app.config['SIMILAR_JOBS_INCREMENTAL']:
+        return None
+    updater = SimilarityUpdater(app)
+    app.extensions['similar_jobs_updater'] = updater
+    add_change_listener(updater.apply_changes)
+    return updater
@@ -0,0 +1,446 @@
+import os
+import json
+import mmap
+import time
+import bisect
+import struct
+import hashlib
+import threading
+from datetime import datetime
+
+from sqlalchemy import select
+
+from engines.columnar import np, to_micros, from_micros, NO_DATE, DATE_COLUMNS, INTERNED_COLUMNS, StringInterner
+
+# Read-only catalog snapshots for stateless API nodes
+# A builder (build_snapshot.py, or flask build-snapshot) writes the whole jobs
+# table into one binary file:
+#   magic | header length | JSON header | column arrays
+# - ids, canonical ids and dates as fixed-width int64 arrays (rows in id order)
+# - company/location/job_type/experience_level/salary_range as int32 codes
+#   into a list of their distinct values
+# - text (titles, descriptions, tags, the distinct values) in string pools:
+#   all the UTF-8 bytes one after the other, plus an offsets array that says
+#   where every row's string starts and ends
+# - lowercase copies of the searchable text, for the ILIKE filters
+# - one row order (permutation) per sort option, computed at build time
+# - the filter options, in the header
+# API nodes (READ_ENGINE=snapshot) memory-map the file and answer get_jobs,
+# get_job and get_filters from it: the arrays are read straight from the
+# mapped pages (nothing is parsed or copied when a snapshot is opened) and
+# every worker process on the machine shares the same pages in the OS page
+# cache. Only the rows of the page being returned are decoded.
+#
+# Each build is a new file; CURRENT names the one in use and is replaced with
+# a rename, so readers see the old snapshot or the new one, never half of
+# one. Readers look at CURRENT every SNAPSHOT_CHECK_SECONDS and swap to a new
+# file by replacing one reference - a request keeps using the snapshot it
+# started with. Expiry and the age limit (retention.py) are checked when
+# the request is answered, so they don't need a rebuild.
+
+MAGIC = b'JOBSNAP\x00'
+FORMAT_VERSION = 1
+ALIGNMENT = 64  # every array starts on a cache line
+CURRENT_FILE = 'CURRENT'
+TEXT_COLUMNS = ('title', 'description', 'tags')
+SEARCH_SEPARATOR = '\x00'  # between the fields (and rows) of the search text, so a match never spans two
+MAX_CACHED_TERMS = 256  # filter results kept per snapshot (they never change)
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def _string_pool(values):
+    """
+    (UTF-8 bytes of all values, offsets array with len(values) + 1 entries)
+    None is stored as an empty string (see the _null arrays)
+    """
+    encoded = [(value or '').encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+def _search_pool(values):
+    """String pool of lowercase text with a separator after every row"""
+    return _string_pool([value.lower() + SEARCH_SEPARATOR for value in values])
+
+def _sort_keys(sort_by, dates, codes, vocab, titles):
+    field, _, direction = sort_by.rpartition('_')
+    if field == 'posting_date':
+        keys = dates['posting_date']
+    elif field == 'company':
+        keys = vocab['company'].rank_table()[codes['company']]
+    else:
+        keys = np.unique(np.array(titles, dtype=object), return_inverse=True)[1]
+    # Same order as the columnar engine: negating keeps equal values in row order
+    if direction == 'desc':
+        keys = -keys.astype(np.int64)
+    return np.argsort(keys, kind='stable').astype(np.int32)
+
+# ----------------------------
+# Building
+# ----------------------------
+def snapshot_arrays(jobs):
+    """
+    Every array of a snapshot, for a list of job rows (mappings of the
+    jobs columns) sorted by id
+    """
+    from models.job_queries import SORT_OPTIONS
+
+    arrays = {
+        'ids': np.array([job['id'] for job in jobs], dtype=np.int64),
+        'canonical_ids': np.array([-1 if job['canonical_id'] is None else job['canonical_id'] for job in jobs],
+                                  dtype=np.int64),
+    }
+    dates = {}
+    for name in DATE_COLUMNS:
+        dates[name] = np.array([NO_DATE if job[name] is None else to_micros(job[name]) for job in jobs], dtype=np.int64)
+        arrays[name] = dates[name]
+
+    codes = {}
+    vocab = {}
+    for name in INTERNED_COLUMNS:
+        vocab[name] = StringInterner()
+        codes[name] = np.array([vocab[name].code(job[name]) for job in jobs], dtype=np.int32)
+        arrays[name + '_codes'] = codes[name]
+        arrays[name + '_values'], arrays[name + '_values_offsets'] = _string_pool(vocab[name].values)
+
+    for name in TEXT_COLUMNS:
+        values = [job[name] for job in jobs]
+        arrays[name], arrays[name + '_offsets'] = _string_pool(values)
+        arrays[name + '_null'] = np.array([value is None for value in values], dtype=bool)
+
+    # Lowercase text for the search and tags filters (ILIKE '%term%')
+    arrays['search'], arrays['search_offsets'] = _search_pool(
+        SEARCH_SEPARATOR.join((job['title'] or '', job['company'] or '', job['description'] or '')) for job in jobs
+    )
+    arrays['tags_search'], arrays['tags_search_offsets'] = _search_pool(job['tags'] or '' for job in jobs)
+
+    titles = [job['title'] or '' for job in jobs]
+    for sort_by in SORT_OPTIONS:
+        arrays['sort_' + sort_by] = _sort_keys(sort_by, dates, codes, vocab, titles)
+    return arrays
+
+def write_snapshot(path, header, arrays):
+    """
+    Write a snapshot file: magic, header length, JSON header, then the arrays
+    (header['arrays'] says where each one is, relative to the first)
+    """
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = [array.dtype.str, offset, len(array)]
+        offset = _align(offset + array.nbytes)
+    header = dict(header, format=FORMAT_VERSION, arrays=layout, data_size=offset)
+    header_bytes = json.dumps(header).encode('utf-8')
+
+    with open(path, 'wb') as snapshot_file:
+        snapshot_file.write(MAGIC + struct.pack('<Q', len(header_bytes)) + header_bytes)
+        data_start = _align(snapshot_file.tell())
+        for name, array in arrays.items():
+            snapshot_file.write(b'\x00' * (data_start + layout[name][1] - snapshot_file.tell()))
+            snapshot_file.write(array.tobytes())
+        snapshot_file.write(b'\x00' * (data_start + offset - snapshot_file.tell()))
+        snapshot_file.flush()
+        os.fsync(snapshot_file.fileno())
+
+def current_snapshot_name(directory):
+    """File name of the snapshot in use (from CURRENT), or None"""
+    try:
+        with open(os.path.join(directory, CURRENT_FILE)) as current_file:
+            return current_file.read().strip() or None
+    except OSError:
+        return None
+
+def build_snapshot(session, directory, force=False):
+    """
+    Write a snapshot of the jobs table and make it the current one
+    Returns the new file's path, or None if the current snapshot already
+    has this data (unless `force`)
+    """
+    from events import db_fingerprint
+    from models.job import Job
+    from models.job_queries import query_filter_options
+
+    if np is None:
+        raise RuntimeError("Catalog snapshots need numpy (pip install numpy)")
+    os.makedirs(directory, exist_ok=True)
+    fingerprint = db_fingerprint(fresh=True)
+    current = current_snapshot_name(directory)
+    if not force and fingerprint is not None and current is not None:
+        try:
+            if CatalogSnapshot(os.path.join(directory, current)).header.get('fingerprint') == fingerprint:
+                return None
+        except (OSError, ValueError) as e:
+            print(f"Current snapshot {current} can't be read ({e}) - building a new one")
+
+    start = time.perf_counter()
+    jobs = [row._mapping for row in session.execute(select(*Job.__table__.columns).order_by(Job.id))]
+    header = {
+        'created_at': time.time(),
+        'fingerprint': fingerprint,
+        'rows': len(jobs),
+        'filters': query_filter_options(session),
+    }
+    session.rollback()  # end the read transaction
+    arrays = snapshot_arrays(jobs)
+
+    # Write under a temporary name, then rename - nobody opens half a file
+    name = f"catalog-{time.strftime('%Y%m%d-%H%M%S')}-{hashlib.sha1(str(fingerprint).encode()).hexdigest()[:8]}.snap"
+    path = os.path.join(directory, name)
+    write_snapshot(path + '.tmp', header, arrays)
+    os.replace(path + '.tmp', path)
+    with open(os.path.join(directory, CURRENT_FILE + '.tmp'), 'w') as current_file:
+        current_file.write(name)
+    os.replace(os.path.join(directory, CURRENT_FILE + '.tmp'), os.path.join(directory, CURRENT_FILE))
+
+    # The previous file stays: a node may have read CURRENT but not opened it yet
+    for old_name in os.listdir(directory):
+        if old_name.endswith('.snap') and old_name not in (name, current):
+            os.remove(os.path.join(directory, old_name))
+    print(f"Catalog snapshot {name}: {len(jobs)} jobs, {os.path.getsize(path) / 1e6:.1f} MB "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return path
+
+# ----------------------------
+# Reading
+# ----------------------------
+class CatalogSnapshot:
+    """
+    One memory-mapped snapshot file (read-only)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as snapshot_file:
+            self.map = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        (header_length,) = struct.unpack('<Q', self.map[len(MAGIC):len(MAGIC) + 8])
+        header_end = len(MAGIC) + 8 + header_length
+        self.header = json.loads(self.map[len(MAGIC) + 8:header_end])
+        if self.header.get('format') != FORMAT_VERSION:
+            raise ValueError(f"{path} has snapshot format {self.header.get('format')}, expected {FORMAT_VERSION}")
+        data_start = _align(header_end)
+        if len(self.map) < data_start + self.header['data_size']:
+            raise ValueError(f"{path} is truncated")
+
+        # Views of the mapped file - no copies
+        self.arrays = {}
+        self.starts = {}  # where each array starts in the file (for the string pools)
+        for name, (dtype, offset, count) in self.header['arrays'].items():
+            self.starts[name] = data_start + offset
+            self.arrays[name] = np.frombuffer(self.map, dtype=np.dtype(dtype), count=count, offset=data_start + offset)
+        self.rows = self.header['rows']
+        self.ids = self.arrays['ids']
+        self._vocab = {}  # column -> its distinct values (lowercase), decoded the first time they are filtered on
+        self._term_cache = {}
+
+    # ----------------------------
+    # Strings
+    # ----------------------------
+    def _string(self, pool, index):
+        offsets = self.arrays[pool + '_offsets']
+        start = self.starts[pool]
+        return self.map[start + int(offsets[index]):start + int(offsets[index + 1])].decode('utf-8')
+
+    def text(self, name, row):
+        """title, description or tags of a row (None where the column is NULL)"""
+        if self.arrays[name + '_null'][row]:
+            return None
+        return self._string(name, row)
+
+    def value(self, name, row):
+        """An interned column (company, location, ...) of a row"""
+        code = self.arrays[name + '_codes'][row]
+        return None if code < 0 else self._string(name + '_values', code)
+
+    def vocab(self, name):
+        values = self._vocab.get(name)
+        if values is None:
+            count = len(self.arrays[name + '_values_offsets']) - 1
+            values = self._vocab[name] = [self._string(name + '_values', code).lower() for code in range(count)]
+        return values
+
+    def _rows_containing(self, pool, term):
+        """
+        Boolean mask of the rows whose lowercase text in `pool` contains term
+        Runs mmap.find over the pool, jumping to the next row after every hit
+        """
+        cached = self._term_cache.get((pool, term))
+        if cached is not None:
+            return cached
+        needle = term.lower().encode('utf-8')
+        mask = np.zeros(self.rows, dtype=bool)
+        if SEARCH_SEPARATOR.encode() not in needle:
+            offsets = memoryview(self.arrays[pool + '_offsets'])  # plain ints are faster to bisect
+            start = self.starts[pool]
+            end = start + offsets[-1]
+            position = self.map.find(needle, start, end)
+            while position != -1:
+                row = bisect.bisect_right(offsets, position - start) - 1
+                mask[row] = True
+                position = self.map.find(needle, start + offsets[row + 1], end)
+        if len(self._term_cache) >= MAX_CACHED_TERMS:
+            self._term_cache.clear()
+        self._term_cache[(pool, term)] = mask
+        return mask
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+    def row_dict(self, row):
+        """
+        Build the same dict Job.to_dict() returns, from the mapped arrays
+        """
+        from models.job import format_job_field
+
+        canonical_id = int(self.arrays['canonical_ids'][row])
+        return {
+            'id': int(self.ids[row]),
+            'title': self.text('title', row),
+            'company': self.value('company', row),
+            'location': self.value('location', row),
+            'posting_date': from_micros(self.arrays['posting_date'][row]),
+            'job_type': self.value('job_type', row),
+            'tags': format_job_field('tags', self.text('tags', row)),
+            'description': self.text('description', row),
+            'salary_range': self.value('salary_range', row),
+            'experience_level': self.value('experience_level', row),
+            'created_at': from_micros(self.arrays['created_at'][row]),
+            'updated_at': from_micros(self.arrays['updated_at'][row]),
+            'expires_at': from_micros(self.arrays['expires_at'][row]),
+            'canonical_id': canonical_id if canonical_id >= 0 else None
+        }
+
+    def row_of(self, job_id):
+        """Row number of a job id, or None (rows are sorted by id)"""
+        row = int(np.searchsorted(self.ids, job_id))
+        return row if row < self.rows and self.ids[row] == job_id else None
+
+    def get(self, job_id):
+        """Answer a get_job request: the job dict, or None if it isn't in the snapshot"""
+        row = self.row_of(job_id)
+        return None if row is None else self.row_dict(row)
+
+    def filter_options(self):
+        """Answer a get_filters request (computed when the snapshot was built)"""
+        return self.header['filters']
+
+    def matching_rows(self, params, now=None):
+        """
+        Boolean mask of the rows that pass the same filters as apply_job_filters()
+        """
+        from retention import retention_cutoff
+
+        now = now or datetime.utcnow()
+        # Active jobs only (see retention.py)
+        mask = self.arrays['expires_at'] > to_micros(now)
+        cutoff = retention_cutoff(now)
+        if cutoff is not None:
+            mask &= self.arrays['posting_date'] >= to_micros(cutoff)
+        active = mask.copy()
+
+        for name in ('job_type', 'location'):
+            value = params.get(name)
+            if value and value.lower() != 'all':
+                term = value.lower()
+                # table[code] is True if that value matches; the extra False is what code -1 (NULL) picks up
+                table = np.array([term in lowered for lowered in self.vocab(name)] + [False], dtype=bool)
+                mask &= table[self.arrays[name + '_codes']]
+
+        tags = params.get('tags')
+        if tags and tags.lower() != 'all':
+            for tag in (tag.strip() for tag in tags.split(',')):
+                if tag:
+                    mask &= self._rows_containing('tags_search', tag)
+                else:
+                    mask &= ~self.arrays['tags_null']  # ILIKE '%%' matches everything but NULL
+
+        search = params.get('search')
+        if search:
+            mask &= self._rows_containing('search', search)
+
+        # Hide near-duplicates whose original is still listed (see dedupe.py)
+        if params.get('hide_duplicates'):
+            for row in np.flatnonzero(mask & (self.arrays['canonical_ids'] >= 0)):
+                original_row = self.row_of(int(self.arrays['canonical_ids'][row]))
+                if original_row is not None and active[original_row]:
+                    mask[row] = False
+
+        return mask
+
+    def query(self, params, now=None):
+        """
+        Answer a get_jobs request: returns (total count, list of job dicts for the page)
+        """
+        from models.job_queries import SORT_OPTIONS
+
+        mask = self.matching_rows(params, now)
+        sort_by = params.get('sort')
+        if sort_by not in SORT_OPTIONS:
+            sort_by = 'posting_date_desc'
+        permutation = self.arrays['sort_' + sort_by]
+        ordered = permutation[mask[permutation]]
+
+        per_page = max(params['per_page'], 0)
+        start = max((params['page'] - 1) * per_page, 0)
+        return len(ordered), [self.row_dict(row) for row in ordered[start:start + per_page]]
+
+    def __len__(self):
+        return self.rows
+
+class SnapshotReader:
+    """
+    The snapshot a process answers from, swapped when CURRENT names a new file
+    """
+
+    def __init__(self, directory, check_seconds=1.0):
+        self.directory = directory
+        self.check_seconds = check_seconds
+        self.snapshot = None
+        self.name = None
+        self.last_check = None
+        self.lock = threading.Lock()
+
+    def _refresh(self):
+        name = current_snapshot_name(self.directory)
+        if name is None or name == self.name:
+            return
+        try:
+            snapshot = CatalogSnapshot(os.path.join(self.directory, name))
+        except (OSError, ValueError) as e:
+            print(f"Error opening catalog snapshot {name}: {e}")
+            return
+        # One assignment: requests that already hold the old snapshot finish with it,
+        # and its file stays mapped until the last of them lets go
+        self.snapshot = snapshot
+        self.name = name
+        print(f"Catalog snapshot {name} in use ({len(snapshot)} jobs)")
+
+    def current(self):
+        """
+        The newest snapshot, or None if none has been built yet
+        (opening one only maps it, so this never waits for a load)
+        """
+        now = time.monotonic()
+        if (self.last_check is None or now - self.last_check >= self.check_seconds) and self.lock.acquire(blocking=False):
+            try:
+                self.last_check = now
+                self._refresh()
+            finally:
+                self.lock.release()
+        return self.snapshot
+
+def get_catalog_snapshot(app):
+    """
+    The current catalog snapshot for this app, or None if there isn't one
+    (or numpy isn't installed - then the endpoints just keep using SQL)
+    """
+    if np is None:
+        return None
+    reader = app.extensions.get('catalog_snapshot')
+    if reader is None:
+        reader = app.extensions.setdefault(
+            'catalog_snapshot', SnapshotReader(app.config['SNAPSHOT_DIR'], app.config['SNAPSHOT_CHECK_SECONDS'])
+        )
+    return reader.current()
@@ -0,0 +1,295 @@
+import re
+import heapq
+import bisect
+import threading
+from datetime import datetime
+
+from sqlalchemy import select, func, or_
+
+from models.job_queries import split_tags
+
+# Autocomplete for the search box
+# For every field we keep a sorted list of (key, value) pairs, where the keys
+# are the value lowercased from each word start on ("senior pricing actuary",
+# "pricing actuary", "actuary"), so typing "pric" finds "Senior Pricing Actuary".
+# All keys starting with a prefix sit next to each other in the sorted list
+# (found with bisect), and the top-K values for a prefix - by how many jobs
+# have them - are remembered until one of those values changes.
+
+FIELDS = ('title', 'company', 'location', 'tags')
+
+TOP_K = 10  # most suggestions returned for one prefix
+MAX_KEY_LENGTH = 64  # longer keys are cut (nobody types that much)
+MAX_WORD_STARTS = 8  # keys per value
+MAX_CACHED_PREFIXES = 50000
+
+_WORD_START = re.compile(r'(?<!\w)\w')
+
+def normalize(text):
+    return ' '.join(text.lower().split())
+
+def value_keys(value):
+    """
+    The keys a value can be found under (one per word start)
+    """
+    text = normalize(value)
+    starts = [match.start() for match in _WORD_START.finditer(text)][:MAX_WORD_STARTS] or [0]
+    return {text[start:start + MAX_KEY_LENGTH] for start in starts}
+
+def _rank(item):
+    count, value = item
+    return (-count, value)
+
+class FieldIndex:
+    """
+    Prefix index for one field
+    """
+
+    def __init__(self):
+        self.counts = {}  # value -> number of jobs with it
+        self.keys = []  # sorted (key, value) pairs
+        self.alphabet = set()  # characters used in keys (for typo variants)
+        self._top = {}  # prefix -> top-K [(count, value)]
+
+    def _forget_prefixes(self, value):
+        for key in value_keys(value):
+            for length in range(1, len(key) + 1):
+                self._top.pop(key[:length], None)
+        self._top.pop('', None)
+
+    def change(self, value, delta):
+        """
+        Add delta jobs to a value's count (inserting or removing its keys when needed)
+        """
+        old = self.counts.get(value, 0)
+        new = old + delta
+        if new > 0:
+            self.counts[value] = new
+        else:
+            self.counts.pop(value, None)
+
+        if old <= 0 < new:
+            for key in value_keys(value):
+                bisect.insort(self.keys, (key, value))
+                self.alphabet.update(key)
+        elif new <= 0 < old:
+            for key in value_keys(value):
+                position = bisect.bisect_left(self.keys, (key, value))
+                if position < len(self.keys) and self.keys[position] == (key, value):
+                    del self.keys[position]
+        self._forget_prefixes(value)
+
+    def bulk_load(self, counts):
+        self.counts = {value: count for value, count in counts.items() if count > 0}
+        self.keys = sorted((key, value) for value in self.counts for key in value_keys(value))
+        self.alphabet = {char for key, _ in self.keys for char in key}
+        self._top = {}
+
+    def has_prefix(self, prefix):
+        position = bisect.bisect_left(self.keys, (prefix,))
+        return position < len(self.keys) and self.keys[position][0].startswith(prefix)
+
+    def top(self, prefix):
+        """
+        Top-K [(count, value)] among the values with a key starting with prefix
+        """
+        cached = self._top.get(prefix)
+        if cached is not None:
+            return cached
+
+        start = bisect.bisect_left(self.keys, (prefix,))
+        end = bisect.bisect_left(self.keys, (prefix + '\U0010ffff',))
+        values = {value for _, value in self.keys[start:end]}
+        best = heapq.nsmallest(TOP_K, ((self.counts[value], value) for value in values), key=_rank)
+
+        if len(self._top) >= MAX_CACHED_PREFIXES:
+            self._top.clear()
+        self._top[prefix] = best
+        return best
+
+    def typo_variants(self, prefix):
+        """
+        Prefixes within one edit (delete, swap, replace, insert) of prefix that exist in the index
+        """
+        variants = set()
+        for i in range(len(prefix)):
+            variants.add(prefix[:i] + prefix[i + 1:])
+            if i + 1 < len(prefix):
+                variants.add(prefix[:i] + prefix[i + 1] + prefix[i] + prefix[i + 2:])
+            for char in self.alphabet:
+                variants.add(prefix[:i] + char + prefix[i + 1:])
+        for i in range(len(prefix) + 1):
+            for char in self.alphabet:
+                variants.add(prefix[:i] + char + prefix[i:])
+        variants.discard(prefix)
+        return [variant for variant in variants if variant and self.has_prefix(variant)]
+
+class SuggestIndex:
+    """
+    Prefix indexes for titles, companies, locations and tags
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.fields = {field: FieldIndex() for field in FIELDS}
+        # job id -> {field: [values]} it was counted under
+        self.job_values = {}
+        # Newest updated_at we have seen (used to fetch changes made elsewhere)
+        self.high_water = None
+
+    def _values(self, job):
+        values = {field: [job[field]] if job.get(field) else [] for field in ('title', 'company', 'location')}
+        values['tags'] = sorted(set(split_tags(job.get('tags'))))
+        return values
+
+    def _track(self, updated_at):
+        if isinstance(updated_at, str):
+            updated_at = datetime.fromisoformat(updated_at)
+        if updated_at is not None and (self.high_water is None or updated_at > self.high_water):
+            self.high_water = updated_at
+
+    def _remove(self, job_id):
+        for field, values in self.job_values.pop(job_id, {}).items():
+            for value in values:
+                self.fields[field].change(value, -1)
+
+    def upsert(self, job):
+        with self.lock:
+            self._remove(job['id'])
+            values = self._values(job)
+            for field, field_values in values.items():
+                for value in field_values:
+                    self.fields[field].change(value, 1)
+            self.job_values[job['id']] = values
+            self._track(job.get('updated_at'))
+
+    def remove(self, job_id):
+        with self.lock:
+            self._remove(job_id)
+
+    def apply_changes(self, changes):
+        """
+        Change listener (see events.py)
+        """
+        for action, job in changes:
+            if action in ('create', 'update'):
+                self.upsert(job)
+            else:
+                self.remove(job['id'])
+
+    def bulk_load(self, jobs):
+        with self.lock:
+            counts = {field: {} for field in FIELDS}
+            for job in jobs:
+                values = self._values(job)
+                for field, field_values in values.items():
+                    for value in field_values:
+                        counts[field][value] = counts[field].get(value, 0) + 1
+                self.job_values[job['id']] = values
+                self._track(job.get('updated_at'))
+            for field, field_counts in counts.items():
+                self.fields[field].bulk_load(field_counts)
+
+    def suggest(self, query, field=None, limit=TOP_K, typos=False):
+        """
+        Up to `limit` suggestions for what the user has typed so far
+        field limits them to one of FIELDS; typos=True also matches
+        prefixes one typo away (ranked after the exact matches)
+        """
+        prefix = normalize(query)
+        fields = [field] if field else list(FIELDS)
+        limit = max(0, min(limit, TOP_K))
+        if not prefix or not limit:
+            return []
+
+        with self.lock:
+            exact = [(count, value, name) for name in fields for count, value in self.fields[name].top(prefix)]
+            suggestions = [
+                {'value': value, 'field': name, 'count': count, 'typo': False}
+                for count, value, name in sorted(exact, key=lambda item: (-item[0], item[1]))[:limit]
+            ]
+
+            # Only look for typos when the exact matches don't fill the list
+            if typos and len(suggestions) < limit and len(prefix) >= 3:
+                seen = {(item['field'], item['value']) for item in suggestions}
+                fuzzy = {}
+                for name in fields:
+                    for variant in self.fields[name].typo_variants(prefix):
+                        for count, value in self.fields[name].top(variant):
+                            if (name, value) not in seen:
+                                fuzzy[(name, value)] = count
+                ranked = sorted(fuzzy.items(), key=lambda item: (-item[1], item[0][1]))
+                suggestions += [
+                    {'value': value, 'field': name, 'count': count, 'typo': True}
+                    for (name, value), count in ranked[:limit - len(suggestions)]
+                ]
+            return suggestions
+
+    def __len__(self):
+        return len(self.job_values)
+
+# ----------------------------
+# Loading and syncing
+# ----------------------------
+SUGGEST_COLUMNS = ('id', 'title', 'company', 'location', 'tags', 'updated_at')
+
+def _suggest_select():
+    from models.job import Job
+    return select(*(getattr(Job, name) for name in SUGGEST_COLUMNS))
+
+def load_suggest_index(session):
+    """
+    Build the index from every job in the database
+    (expired jobs leave it when archive_jobs.py removes them)
+    """
+    index = SuggestIndex()
+    rows = session.execute(_suggest_select().execution_options(yield_per=10000))
+    index.bulk_load(dict(row._mapping) for row in rows)
+    return index
+
+def sync_suggest_index(index, session):
+    """
+    Pick up changes made by other processes (other workers, the scraper)
+    Returns False if jobs were deleted elsewhere and a full reload is needed
+    """
+    from models.job import Job
+    if index.high_water is not None:
+        for row in session.execute(_suggest_select().where(Job.updated_at >= index.high_water)).all():
+            index.upsert(dict(row._mapping))
+    return session.execute(select(func.count(Job.id))).scalar_one() == len(index)
+
+def get_suggest_index(app):
+    """
+    The suggest index for this app, or None while it is loading
+    """
+    from engines.manager import get_engine
+    return get_engine(app, 'suggest index', load_suggest_index, sync_suggest_index)
+
+def suggest_with_sql(session, query, field=None, limit=TOP_K):
+    """
+    Exact-prefix suggestions straight from the database (used while the index loads)
+    """
+    from models.job import Job
+    prefix = normalize(query)
+    limit = max(0, min(limit, TOP_K))
+    if not prefix or not limit:
+        return []
+
+    results = []
+    for name in ([field] if field else FIELDS):
+        column = getattr(Job, name)
+        # The value starts with the prefix, or one of its words does
+        matches = or_(column.ilike(f'{prefix}%'), column.ilike(f'% {prefix}%'))
+        rows = session.execute(
+            select(column, func.count(Job.id)).where(matches).group_by(column)
+        ).all()
+        counts = {}
+        for value, count in rows:
+            values = split_tags(value) if name == 'tags' else [value]
+            for item in set(values):
+                if any(key.startswith(prefix) for key in value_keys(item)):
+                    counts[item] = counts.get(item, 0) + count
+        results += [(count, value, name) for value, count in counts.items()]
+
+    results.sort(key=lambda item: (-item[0], item[1]))
+    return [{'value': value, 'field': name, 'count': count, 'typo': False} for count, value, name in results[:limit]]
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Job Enrichment Script
+Derives the job type, seniority and tags of jobs from their title and
+description (see enrichment.py) and stores them in the enriched_* columns
+and the job_enriched_tags table
+Run it once to work through existing jobs, with --all after changing the
+rules, and from cron for jobs written with plain SQL - API writes and
+scraper loads are enriched by themselves
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+def enrich(everything=False, workers=None, chunk_size=None):
+    """
+    Enrich the jobs that need it (or all of them)
+    """
+    try:
+        from db import db
+        from app import create_app
+        from enrichment import enrich_jobs
+
+        # Create the Flask app
+        app = create_app()
+
+        with app.app_context():
+            start = time.perf_counter()
+            enriched = enrich_jobs(
+                db.session,
+                workers=workers or app.config['ENRICHMENT_WORKERS'] or None,
+                chunk_size=chunk_size or app.config['ENRICHMENT_CHUNK_SIZE'],
+                everything=everything
+            )
+
+        print(f"\nEnrichment completed! {enriched} jobs in {time.perf_counter() - start:.1f} s")
+        return True
+
+    except Exception as e:
+        print(f"Error enriching jobs: {e}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Derive job type, seniority and tags from the job descriptions')
+    parser.add_argument('--all', dest='everything', action='store_true', help='Enrich every job again, not only new and changed ones')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: ENRICHMENT_WORKERS, 0 = one per CPU)')
+    parser.add_argument('--chunk-size', type=int, default=None, help='Jobs per chunk (default: ENRICHMENT_CHUNK_SIZE)')
+    args = parser.parse_args()
+
+    enrich(args.everything, args.workers, args.chunk_size)
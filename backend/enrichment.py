@@ -0,0 +1,379 @@
+import os
+import re
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import select, delete, insert, or_, exists, bindparam
+
+# Enrichment: derive tags, seniority and job type from a job's title and description
+# Clients and the scraper fill tags, job_type and experience_level with
+# whatever they have - often a default. The classifiers here read the text
+# instead and store what they find in separate columns (enriched_job_type,
+# enriched_seniority, enriched_at on jobs, and the job_enriched_tags table),
+# so the original values are never overwritten.
+#
+# Three kinds of rules, all matched on whole words:
+# - keywords ('python') and phrases ('power bi', 'head of') - looked up in
+#   dicts while walking the text's words once, however many rules there are
+# - patterns (regular expressions) for what words can't express: "R" as a
+#   language is only recognised in upper case, and "5+ years" becomes a seniority
+# A match in the title counts TITLE_WEIGHT times as much as one in the description.
+#
+# enrich_jobs() works through the backlog in chunks spread over a process
+# pool (enrich_jobs.py / flask enrich-jobs); after that only new and changed
+# jobs are enriched - by EnrichmentUpdater right after API writes, by the
+# bulk loader while it inserts, and by the next enrich_jobs() run otherwise.
+
+TOKEN = re.compile(r'[a-z0-9][a-z0-9+#&]*')
+TITLE_WEIGHT = 3
+MAX_TAGS = 8  # most tags kept per job (the strongest ones)
+DEFAULT_JOB_TYPE = 'Full-time'  # most postings never say it
+UNKNOWN_SENIORITY = 'Not Specified'
+
+# Tags and the keywords/phrases that give them
+TAG_RULES = {
+    'Life': ['life insurance', 'life assurance', 'life actuary', 'life reinsurance', 'annuity', 'annuities',
+             'mortality', 'longevity'],
+    'Health': ['health', 'healthcare', 'health insurance', 'medical', 'medicare', 'medicaid', 'morbidity'],
+    'P&C': ['p&c', 'property & casualty', 'property and casualty', 'casualty', 'general insurance', 'non-life'],
+    'Pricing': ['pricing', 'ratemaking', 'rate filing', 'rate filings', 'rating plans'],
+    'Reserving': ['reserving', 'reserves', 'ibnr', 'loss reserves'],
+    'Valuation': ['valuation', 'valuations'],
+    'Pension': ['pension', 'pensions', 'retirement', 'defined benefit', 'erisa'],
+    'Reinsurance': ['reinsurance', 'reinsurer', 'retrocession'],
+    'Capital': ['economic capital', 'capital modelling', 'capital modeling', 'solvency ii', 'solvency'],
+    'IFRS 17': ['ifrs 17', 'ifrs17', 'ldti'],
+    'Modeling': ['modeling', 'modelling', 'predictive model', 'predictive models', 'projections'],
+    'Risk': ['risk management', 'enterprise risk', 'erm', 'risk'],
+    'Analytics': ['analytics', 'data analysis'],
+    'Data Science': ['data science', 'data scientist'],
+    'Machine Learning': ['machine learning', 'ml', 'deep learning'],
+    'Python': ['python', 'pandas', 'numpy'],
+    'R': ['rstudio', 'tidyverse'],  # plus the upper case pattern below
+    'SQL': ['sql', 'postgresql', 'mysql', 't-sql'],
+    'SAS': ['sas'],
+    'Excel': ['excel', 'spreadsheets'],
+    'VBA': ['vba', 'macros'],
+    'Power BI': ['power bi', 'powerbi'],
+    'Tableau': ['tableau'],
+    'Alteryx': ['alteryx'],
+    'Prophet': ['prophet'],
+    'AXIS': ['axis'],
+}
+
+# Seniority levels, most senior first (the first one wins a tie)
+SENIORITY_RULES = {
+    'Executive': ['chief', 'chief actuary', 'vp', 'vice president', 'head of', 'director', 'cfo', 'cro'],
+    'Senior Level': ['senior', 'sr', 'lead', 'principal', 'manager', 'fsa', 'fcas', 'fia', 'fellow'],
+    'Mid Level': ['mid level', 'experienced', 'asa', 'acas', 'consultant'],
+    'Entry Level': ['junior', 'jr', 'entry level', 'graduate', 'grad', 'trainee', 'intern', 'internship',
+                    'student', 'apprentice', 'apprenticeship'],
+}
+
+# Job types, the most specific first
+JOB_TYPE_RULES = {
+    'Internship': ['intern', 'internship', 'summer analyst', 'co-op', 'placement year'],
+    'Part-time': ['part time', 'parttime'],
+    'Freelance': ['freelance', 'freelancer', 'self employed'],
+    'Contract': ['contract', 'contractor', 'fixed term', 'interim', 'day rate'],
+    'Temporary': ['temporary', 'temp', 'maternity cover', 'seasonal'],
+    'Full-time': ['full time', 'fulltime', 'permanent'],
+}
+
+CLASSIFIERS = {'tags': TAG_RULES, 'seniority': SENIORITY_RULES, 'job_type': JOB_TYPE_RULES}
+
+# (classifier, label, pattern) - matched on the text as written, not lower-cased
+PATTERNS = [
+    ('tags', 'R', re.compile(r"(?<![\w&'.])R(?![\w&'])")),
+]
+# "3+ years", "5-7 years of experience": the smallest number decides the level
+YEARS_PATTERN = re.compile(r'\b(\d{1,2})\s*\+?\s*(?:(?:-|to)\s*\d{1,2}\s*\+?\s*)?years?\b')
+YEARS_WEIGHT = 2
+YEARS_LEVELS = [(2, 'Entry Level'), (5, 'Mid Level'), (10, 'Senior Level'), (100, 'Executive')]
+
+def _build_rules():
+    """
+    Turn the rule tables into the lookups the matcher walks the words with
+    keywords: word -> [(classifier, label)]
+    phrases: first word -> [(the other words, classifier, label)]
+    """
+    keywords, phrases = {}, {}
+    for classifier, rules in CLASSIFIERS.items():
+        for label, expressions in rules.items():
+            for expression in expressions:
+                words = tuple(TOKEN.findall(expression.lower()))
+                if len(words) == 1:
+                    keywords.setdefault(words[0], []).append((classifier, label))
+                else:
+                    phrases.setdefault(words[0], []).append((words[1:], classifier, label))
+    return keywords, phrases
+
+KEYWORDS, PHRASES = _build_rules()
+
+# Every label by its lower case name, so ?enriched_tags=python finds "Python"
+LABELS = {label.lower(): label for rules in CLASSIFIERS.values() for label in rules}
+
+def canonical_label(value):
+    """The label as the classifiers store it ('power bi' -> 'Power BI'), or the value unchanged"""
+    return LABELS.get(value.strip().lower(), value.strip())
+
+def match_labels(text):
+    """
+    The (classifier, label) pairs whose keywords, phrases or patterns appear in `text`
+    """
+    if not text:
+        return set()
+    found = set()
+    words = TOKEN.findall(text.lower())
+    count = len(words)
+    for position, word in enumerate(words):
+        hits = KEYWORDS.get(word)
+        if hits is not None:
+            found.update(hits)
+        candidates = PHRASES.get(word)
+        if candidates is not None:
+            for rest, classifier, label in candidates:
+                end = position + 1 + len(rest)
+                if end <= count and tuple(words[position + 1:end]) == rest:
+                    found.add((classifier, label))
+    for classifier, label, pattern in PATTERNS:
+        if pattern.search(text):
+            found.add((classifier, label))
+    return found
+
+def years_level(text):
+    """The seniority the text's "N years" asks for, or None"""
+    if not text:
+        return None
+    years = [int(match.group(1)) for match in YEARS_PATTERN.finditer(text.lower())]
+    if not years:
+        return None
+    return next(level for limit, level in YEARS_LEVELS if min(years) < limit)
+
+def _best(scores, rules):
+    # Highest score; ties go to the label listed first in the rule table
+    if not scores:
+        return None
+    return max(rules, key=lambda label: scores.get(label, 0))
+
+def classify_job(title, description):
+    """
+    The derived values of one job:
+    {'enriched_job_type': ..., 'enriched_seniority': ..., 'enriched_tags': [...]}
+    """
+    scores = {classifier: {} for classifier in CLASSIFIERS}
+    for text, weight in ((title, TITLE_WEIGHT), (description, 1)):
+        for classifier, label in match_labels(text):
+            scores[classifier][label] = scores[classifier].get(label, 0) + weight
+    level = years_level(description)
+    if level is not None:
+        scores['seniority'][level] = scores['seniority'].get(level, 0) + YEARS_WEIGHT
+
+    tags = sorted(scores['tags'], key=lambda label: (-scores['tags'][label], label))[:MAX_TAGS]
+    return {
+        'enriched_job_type': _best(scores['job_type'], JOB_TYPE_RULES) or DEFAULT_JOB_TYPE,
+        'enriched_seniority': _best(scores['seniority'], SENIORITY_RULES) or UNKNOWN_SENIORITY,
+        'enriched_tags': sorted(tags),
+    }
+
+def classify_chunk(rows):
+    """
+    Classify (id, title, description) rows - what the worker processes run
+    Returns [(id, derived values)]
+    """
+    return [(job_id, classify_job(title, description)) for job_id, title, description in rows]
+
+# ----------------------------
+# Storing the results
+# ----------------------------
+def store_enrichment(session, results, now=None):
+    """
+    Write classify_chunk() results: the columns and the job's tags (doesn't commit)
+    updated_at is left alone - deriving values isn't a change to the job
+    """
+    from models.job import Job
+    from models.job_enrichment import JobEnrichedTag
+    if not results:
+        return
+    now = now or datetime.utcnow()
+    jobs = Job.__table__
+    session.execute(
+        jobs.update()
+        .where(jobs.c.id == bindparam('job_id'))
+        .values(enriched_job_type=bindparam('derived_job_type'), enriched_seniority=bindparam('derived_seniority'),
+                enriched_at=bindparam('derived_at'), updated_at=jobs.c.updated_at),
+        [{'job_id': job_id, 'derived_job_type': values['enriched_job_type'],
+          'derived_seniority': values['enriched_seniority'], 'derived_at': now} for job_id, values in results]
+    )
+    job_ids = [job_id for job_id, values in results]
+    session.execute(delete(JobEnrichedTag).where(JobEnrichedTag.job_id.in_(job_ids)))
+    insert_enriched_tags(session, [(job_id, values['enriched_tags']) for job_id, values in results])
+
+def insert_enriched_tags(session, job_tags):
+    """Insert the tags of [(job id, tags)] (plain table insert)"""
+    from models.job_enrichment import JobEnrichedTag
+    rows = [{'tag': tag, 'job_id': job_id} for job_id, tags in job_tags for tag in tags]
+    if rows:
+        session.execute(insert(JobEnrichedTag), rows)
+
+def enrich_new_job(job, now=None):
+    """
+    Fill in the derived columns of a Job that hasn't been flushed yet (bulk_load.py)
+    Returns its tags - store them with insert_enriched_tags() once it has an id
+    """
+    values = classify_job(job.title, job.description)
+    # The same timestamp, so the job doesn't look changed since it was enriched
+    job.updated_at = job.enriched_at = now or datetime.utcnow()
+    job.enriched_job_type = values['enriched_job_type']
+    job.enriched_seniority = values['enriched_seniority']
+    return values['enriched_tags']
+
+def remove_enrichment(session, job_ids):
+    """Drop the tags of deleted/archived jobs (doesn't commit)"""
+    from models.job_enrichment import JobEnrichedTag
+    if job_ids:
+        session.execute(delete(JobEnrichedTag).where(JobEnrichedTag.job_id.in_(list(job_ids))))
+
+# ----------------------------
+# The pipeline
+# ----------------------------
+def _pending_filter():
+    # Never enriched, or changed since
+    from models.job import Job
+    return or_(Job.enriched_at.is_(None), Job.enriched_at < Job.updated_at)
+
+def enrich_jobs(session, workers=None, chunk_size=2000, everything=False, job_ids=None):
+    """
+    Enrich the jobs that need it - or every job with everything=True (after
+    changing the rules). job_ids limits the run to those jobs.
+    Chunks of chunk_size jobs are read here, classified in a pool of `workers`
+    processes (default: one per CPU) and written back one transaction each,
+    while the next chunks are already being classified.
+    Returns how many jobs were enriched.
+    """
+    from models.job import Job
+    from models.job_enrichment import JobEnrichedTag
+
+    # Only the ids first - the rows are read a chunk at a time
+    condition = None if everything else _pending_filter()
+    id_query = select(Job.id).order_by(Job.id)
+    if condition is not None:
+        id_query = id_query.where(condition)
+    if job_ids is not None:
+        id_query = id_query.where(Job.id.in_(list(job_ids)))
+    ids = session.execute(id_query).scalars().all()
+    session.commit()
+
+    # Tags of jobs deleted by other processes (API deletes clean up right away)
+    if everything:
+        session.execute(delete(JobEnrichedTag).where(~exists().where(Job.id == JobEnrichedTag.job_id)))
+        session.commit()
+    if not ids:
+        return 0
+
+    def read_chunk(first):
+        chunk_ids = ids[first:first + chunk_size]
+        # An id range (one index range scan), with the same condition - a
+        # job changed in between just gets enriched in this run already
+        query = select(Job.id, Job.title, Job.description).where(Job.id.between(chunk_ids[0], chunk_ids[-1]))
+        if condition is not None:
+            query = query.where(condition)
+        if job_ids is not None:
+            query = query.where(Job.id.in_(chunk_ids))
+        rows = [tuple(row) for row in session.execute(query)]
+        session.commit()  # don't hold a read transaction while the workers run
+        return rows
+
+    def write(results):
+        store_enrichment(session, results)
+        session.commit()
+        return len(results)
+
+    starts = range(0, len(ids), chunk_size)
+    workers = workers or os.cpu_count() or 1
+    enriched = 0
+    if workers <= 1 or len(starts) == 1:
+        for first in starts:
+            enriched += write(classify_chunk(read_chunk(first)))
+        return enriched
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep every worker busy, but don't read the whole table into memory
+        pending = []
+        for first in starts:
+            pending.append(pool.submit(classify_chunk, read_chunk(first)))
+            if len(pending) >= workers * 2:
+                enriched += write(pending.pop(0).result())
+        for future in pending:
+            enriched += write(future.result())
+    return enriched
+
+# ----------------------------
+# Incremental updates
+# ----------------------------
+class EnrichmentUpdater:
+    """
+    Enriches jobs created or edited through the API in the background
+    The change listener only remembers the ids; the thread waits
+    ENRICHMENT_DEBOUNCE_SECONDS so a burst of writes is enriched in one go
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.changed = set()  # created/updated job ids
+        self.removed = set()  # deleted/archived job ids
+        self.thread = None
+        self.lock = threading.Lock()
+        self.stats = {'runs': 0, 'jobs': 0, 'errors': 0}
+
+    def apply_changes(self, changes):
+        """
+        Change listener (see events.py)
+        """
+        with self.lock:
+            for action, job in changes:
+                if action in ('create', 'update'):
+                    self.changed.add(job['id'])
+                    self.removed.discard(job['id'])
+                else:
+                    self.removed.add(job['id'])
+                    self.changed.discard(job['id'])
+            if self.thread is None and (self.changed or self.removed):
+                self.thread = threading.Thread(target=self._run, name='job-enrichment', daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        from db import db
+        while True:
+            time.sleep(self.app.config['ENRICHMENT_DEBOUNCE_SECONDS'])
+            with self.lock:
+                changed, self.changed = self.changed, set()
+                removed, self.removed = self.removed, set()
+                if not changed and not removed:
+                    self.thread = None  # the next change starts a new thread
+                    return
+            try:
+                with self.app.app_context():
+                    remove_enrichment(db.session, removed)
+                    db.session.commit()
+                    # Jobs the loader already enriched are skipped (they aren't pending)
+                    self.stats['jobs'] += enrich_jobs(db.session, workers=1, job_ids=changed)
+                    db.session.remove()
+                self.stats['runs'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"Error enriching {len(changed)} jobs - enrich_jobs.py picks them up later: {e}")
+
+def init_enrichment(app):
+    """
+    Enrich jobs as they are created or edited (if ENRICHMENT_INCREMENTAL)
+    """
+    from events import add_change_listener
+    if not app.config['ENRICHMENT_INCREMENTAL']:
+        return None
+    updater = EnrichmentUpdater(app)
+    app.extensions['job_enrichment'] = updater
+    add_change_listener(updater.apply_changes)
+    return updater
@@ -0,0 +1,140 @@
+import time
+import threading
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+# Dataset version tracking and change notifications
+# Every committed change to the jobs table bumps a version number.
+# Caches (like the compressed response cache) put this version in their keys,
+# so anything cached for an older version of the data is simply never used again.
+# In-memory engines (engines/*) also subscribe to the changes themselves so they
+# can update incrementally instead of reloading everything.
+
+_lock = threading.Lock()
+_local_version = 0
+
+# Functions called with a list of (action, job dict) after every committed change
+# action is 'create', 'update', 'delete' or 'archive'; the dict is Job.to_dict()
+_listeners = []
+
+# Changes made by other processes (other workers, the scraper) are picked up
+# by looking at a cheap fingerprint of the jobs table every few seconds
+_db_fingerprint = None
+_fingerprint_checked_at = 0.0
+FINGERPRINT_CHECK_SECONDS = 2.0
+
+def bump_version():
+    """
+    Record that the jobs table changed in this process
+    Call this after writes that don't go through the ORM session (e.g. bulk UPDATE statements)
+    """
+    global _local_version
+    with _lock:
+        _local_version += 1
+        return _local_version
+
+def local_version():
+    """
+    How many times the jobs table changed in this process (no database access)
+    """
+    return _local_version
+
+def add_change_listener(listener):
+    """
+    Call listener(changes) after every committed change to the jobs table
+    changes is a list of (action, job dict) tuples
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+def remove_change_listener(listener):
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+def publish_job_changes(changes):
+    """
+    Tell everyone that jobs were created/updated/deleted
+    The ORM hooks below call this automatically; code that writes with
+    UPDATE/DELETE statements directly must call it after committing
+    """
+    bump_version()
+    if not changes:
+        return
+    for listener in list(_listeners):
+        try:
+            listener(changes)
+        except Exception as e:
+            # A broken listener must never break the write that triggered it
+            print(f"Error in job change listener {getattr(listener, '__name__', listener)}: {e}")
+
+def _read_db_fingerprint():
+    """
+    Row count and newest updated_at - changes whenever a job is added, edited or removed
+    """
+    from db import db
+    from models.job import Job
+    count, last_update = db.session.query(func.count(Job.id), func.max(Job.updated_at)).one()
+    return f"{count}-{last_update.isoformat() if hasattr(last_update, 'isoformat') else last_update}"
+
+def db_fingerprint(fresh=False):
+    """
+    The fingerprint of the jobs table, read again at most every
+    FINGERPRINT_CHECK_SECONDS (or now if `fresh`) - None if it couldn't be read
+    Must be called inside an app context
+    """
+    global _db_fingerprint, _fingerprint_checked_at
+    now = time.monotonic()
+    if fresh or now - _fingerprint_checked_at > FINGERPRINT_CHECK_SECONDS:
+        try:
+            _db_fingerprint = _read_db_fingerprint()
+        except Exception as e:
+            print(f"Could not read dataset fingerprint: {e}")
+            _db_fingerprint = None
+        _fingerprint_checked_at = now
+    return _db_fingerprint
+
+def dataset_version():
+    """
+    Get the current version of the jobs data as a string
+    Must be called inside an app context
+    """
+    return f"{_local_version}:{db_fingerprint()}"
+
+# ----------------------------
+# ORM session hooks
+# ----------------------------
+# Any session (the Flask db.session, the scraper's own session, ...) that
+# flushes Job objects remembers them, and publishes the changes once it commits.
+
+def _collect_job_changes(session):
+    from models.job import Job
+    changes = []
+    for obj in session.new:
+        if isinstance(obj, Job):
+            changes.append(('create', obj))
+    for obj in session.dirty:
+        if isinstance(obj, Job) and session.is_modified(obj):
+            changes.append(('update', obj))
+    for obj in session.deleted:
+        if isinstance(obj, Job):
+            changes.append(('delete', obj))
+    return changes
+
+@event.listens_for(Session, 'after_flush')
+def _after_flush(session, flush_context):
+    # At this point new jobs have their ids, so we can serialize them
+    changes = _collect_job_changes(session)
+    if changes:
+        session.info.setdefault('job_changes', []).extend(
+            (action, obj.to_dict()) for action, obj in changes
+        )
+
+@event.listens_for(Session, 'after_commit')
+def _after_commit(session):
+    changes = session.info.pop('job_changes', None)
+    if changes is not None:
+        publish_job_changes(changes)
+
+@event.listens_for(Session, 'after_rollback')
+def _after_rollback(session):
+    session.info.pop('job_changes', None)
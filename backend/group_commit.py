@@ -0,0 +1,141 @@
+import time
+import queue
+import threading
+
+# Group commit for POST /api/jobs (opt-in with GROUP_COMMIT_ENABLED=true)
+# Normally every new job is its own transaction, and every commit waits for
+# the database to write to disk (fsync). When many jobs are posted at once,
+# the request threads hand their jobs to one writer thread instead: it
+# collects the jobs that arrive within GROUP_COMMIT_MAX_DELAY_MS (or until it
+# has GROUP_COMMIT_MAX_ROWS) and saves them in one transaction. Every request
+# still waits for its own job and gets its own id or error back.
+# It only helps when requests run in parallel (threads, or asgi.py) - with one
+# request at a time per process each batch is a single job.
+
+WAIT_SECONDS = 30  # longest a request waits for the writer
+
+class PendingJob:
+    """
+    One job waiting to be written, and the answer for the request that sent it
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.done = threading.Event()
+        self.job = None  # Job.to_dict() once saved
+        self.error = None
+
+    def finish(self, job=None, error=None):
+        self.job = job
+        self.error = error
+        self.done.set()
+
+class GroupCommitWriter:
+    """
+    Writes the jobs of concurrent requests in shared transactions
+    """
+
+    def __init__(self, app, max_delay_ms=5, max_rows=100):
+        self.app = app
+        self.max_delay = max_delay_ms / 1000
+        self.max_rows = max_rows
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.jobs = 0
+
+    def submit(self, fields):
+        """
+        Save a job (Job column values) and return its to_dict()
+        Blocks until the batch it went into is committed; raises if that failed
+        """
+        pending = PendingJob(fields)
+        with self.lock:
+            self.queue.put(pending)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='group-commit-writer', daemon=True)
+                self.thread.start()
+        if not pending.done.wait(WAIT_SECONDS):
+            # The writer may still save it later, but this request gives up
+            raise TimeoutError('Timed out waiting for the group commit writer')
+        if pending.error is not None:
+            raise pending.error
+        return pending.job
+
+    def _next_batch(self):
+        """
+        The jobs of the next transaction, or None when idle (the thread then stops)
+        """
+        try:
+            batch = [self.queue.get(timeout=30)]
+        except queue.Empty:
+            with self.lock:
+                if self.queue.empty():
+                    self.thread = None  # the next submit() starts a new thread
+                    return None
+            batch = [self.queue.get_nowait()]
+        # Wait a little for more jobs, counted from the first one
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_rows:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            with self.app.app_context():
+                self.write(batch)
+
+    def write(self, batch):
+        """
+        Save the batch in one transaction. If that fails, every job is
+        retried on its own so one bad job doesn't fail the whole batch.
+        """
+        from db import db
+        from models.job import Job
+        from dedupe import flag_duplicates  # loads numpy - only once jobs are posted
+        try:
+            jobs = [Job(**pending.fields) for pending in batch]
+            db.session.add_all(jobs)
+            db.session.flush()  # gives the jobs their ids
+            flag_duplicates(db.session, jobs)
+            # Before the commit, which would expire the objects (one SELECT each to reload)
+            job_dicts = [job.to_dict() for job in jobs]
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            if len(batch) > 1:
+                print(f"Group commit of {len(batch)} jobs failed ({e}), saving them one by one")
+                for pending in batch:
+                    self.write([pending])
+            else:
+                batch[0].finish(error=e)
+            return
+        finally:
+            db.session.remove()
+        self.batches += 1
+        self.jobs += len(batch)
+        for pending, job_dict in zip(batch, job_dicts):
+            pending.finish(job=job_dict)
+
+def init_group_commit(app):
+    """
+    Start routing POST /api/jobs through the group commit writer (if enabled)
+    The writer thread is only started by the first job
+    """
+    if not app.config['GROUP_COMMIT_ENABLED']:
+        return None
+    writer = GroupCommitWriter(
+        app,
+        max_delay_ms=app.config['GROUP_COMMIT_MAX_DELAY_MS'],
+        max_rows=app.config['GROUP_COMMIT_MAX_ROWS']
+    )
+    app.extensions['group_commit'] = writer
+    return writer
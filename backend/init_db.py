@@ -17,20 +17,19 @@ def init_database():
     """
     try:
         # Import the database functions
-        from db import init_database
+        from db import create_tables
         from app import create_app
         
-        # Create the Flask app
+        # Create the Flask app (this does not touch the database)
         app = create_app()
         
-        # Initialize the database
-        with app.app_context():
-            success = init_database(app)
-            if success:
-                print("Database tables created successfully!")
-            else:
-                print("Failed to create database tables")
-                return False
+        # Create the tables - this is the only place the schema gets created
+        success = create_tables(app)
+        if success:
+            print("Database tables created successfully!")
+        else:
+            print("Failed to create database tables")
+            return False
         
         print("\nDatabase initialization completed!")
         print("You can now run the main application with: python app.py")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Staging File Loader
+Loads the files written by the scraper (scraper/staging/run-*.ndjson) into
+the jobs table in large batches - see bulk_load.py
+Files that were loaded before are skipped, so it is safe to run it on the
+whole staging directory every time (e.g. from cron after the scraper)
+"""
+
+import os
+import sys
+import glob
+import argparse
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+DEFAULT_STAGING_DIR = os.environ.get(
+    'SCRAPER_STAGING_DIR', os.path.join(backend_dir, '..', 'scraper', 'staging')
+)
+
+def staging_files(paths):
+    """The .ndjson files among `paths` (directories are searched), oldest run first"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(glob.glob(os.path.join(path, '*.ndjson')))
+        else:
+            files.append(path)
+    return files
+
+def load_staging(paths=None, batch_size=None, force=False, saved_searches=True):
+    """
+    Load staging files into the database
+    """
+    try:
+        from db import db
+        from app import create_app
+        from bulk_load import load_staging_file
+        from engines.percolator import load_percolator
+
+        # Create the Flask app
+        app = create_app()
+
+        files = staging_files(paths or [DEFAULT_STAGING_DIR])
+        if not files:
+            print("No staging files found")
+            return True
+
+        with app.app_context():
+            # New jobs go into the inboxes of the saved searches they match
+            percolator = None
+            if saved_searches:
+                try:
+                    percolator = load_percolator(db.session)
+                except Exception as e:
+                    db.session.rollback()
+                    print(f"Saved searches not matched ({e})")
+
+            inserted = 0
+            for path in files:
+                counts = load_staging_file(
+                    db.session, path,
+                    batch_size=batch_size or app.config['BULK_LOAD_BATCH_SIZE'],
+                    force=force,
+                    percolator=percolator
+                )
+                if counts:
+                    inserted += counts['inserted']
+
+        print(f"\nLoading completed! {inserted} new jobs from {len(files)} files")
+        return True
+
+    except Exception as e:
+        print(f"Error loading staging files: {e}")
+        return False
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Load scraper staging files into the jobs table')
+    parser.add_argument('paths', nargs='*', help='Staging files or directories (default: scraper/staging)')
+    parser.add_argument('--batch-size', type=int, default=None, help='Jobs per transaction (default: BULK_LOAD_BATCH_SIZE)')
+    parser.add_argument('--force', action='store_true', help='Load files again even if they were loaded before')
+    parser.add_argument('--no-saved-searches', action='store_true', help="Don't match the new jobs against saved searches")
+    args = parser.parse_args()
+
+    if not load_staging(args.paths, args.batch_size, args.force, saved_searches=not args.no_saved_searches):
+        sys.exit(1)
@@ -1,7 +1,33 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Date
+from sqlalchemy import Column, Integer, String, Text, DateTime, Date, Index, text
 from datetime import datetime
 from db import db
 
+# The keys returned by Job.to_dict(), in order
+JOB_FIELDS = [
+    'id', 'title', 'company', 'location', 'posting_date', 'job_type', 'tags',
+    'description', 'salary_range', 'experience_level', 'created_at', 'updated_at',
+    'expires_at', 'canonical_id'
+]
+
+def format_job_field(name, value):
+    """
+    Format one column value for JSON
+    Dates become ISO strings and tags become a list
+    """
+    if name == 'tags':
+        return value.split(', ') if value else []
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def job_row_to_dict(row):
+    """
+    Same as Job.to_dict() but for a plain result row
+    (e.g. from an UPDATE ... RETURNING statement)
+    """
+    mapping = row._mapping
+    return {name: format_job_field(name, mapping[name]) for name in JOB_FIELDS if name in mapping}
+
 # Use Flask-SQLAlchemy's db.Model
 class Job(db.Model):
     """
@@ -51,73 +77,63 @@ class Job(db.Model):
     
     # When this record was last updated
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    """
-    This is the Job model - it represents a table in our database
-    Each job posting will be stored as a row in this table
-    """
-    
-    # Tell SQLAlchemy what table name to use
-    __tablename__ = 'jobs'
     
-    # Define all the columns in our jobs table
-    # Each column stores a different piece of information about a job
-    
-    # Primary key - unique identifier for each job
-    id = Column(Integer, primary_key=True)
-    
-    # Job title (e.g., "Senior Actuary", "Actuarial Analyst")
-    title = Column(String(200), nullable=False)
-    
-    # Company name (e.g., "ABC Insurance", "XYZ Corp")
-    company = Column(String(100), nullable=False)
-    
-    # Job location (e.g., "New York, NY", "Remote", "London, UK")
-    location = Column(String(100), nullable=False)
-    
-    # When the job was posted (date)
-    posting_date = Column(DateTime, nullable=False)
-    
-    # Type of job (e.g., "Full-time", "Part-time", "Contract")
-    job_type = Column(String(50), default='Full-time')
-    
-    # Tags/keywords for the job (e.g., "Life", "Health", "Pricing")
-    # Store as comma-separated string for simplicity
-    tags = Column(Text)
-    
-    # Detailed job description
-    description = Column(Text)
-    
-    # Salary information (e.g., "$80,000 - $120,000")
-    salary_range = Column(String(100))
-    
-    # Experience level required (e.g., "Entry Level", "Senior")
-    experience_level = Column(String(50))
-    
-    # When this record was created in our database
-    created_at = Column(DateTime, default=datetime.utcnow)
-    
-    # When this record was last updated
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Optional: when this posting stops being shown (NULL = only the age limit applies)
+    # See retention.py - expired jobs are hidden from listings and later archived
+    expires_at = Column(DateTime, nullable=True)
+    
+    # Near-duplicate detection (see dedupe.py): the id of the job this one is a
+    # repost of, or NULL when it is an original
+    canonical_id = Column(Integer, nullable=True)
+    
+    # Derived from the title and description by enrichment.py (the columns
+    # above keep whatever the client or the scraper sent). NULL until enriched;
+    # the derived tags are in the job_enriched_tags table
+    enriched_job_type = Column(String(50), nullable=True)
+    enriched_seniority = Column(String(50), nullable=True)
+    # When they were derived - older than updated_at means the job changed since
+    enriched_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        # Newest-first listing (the default sort) walks this index
+        Index('ix_jobs_posting_date', 'posting_date'),
+        # Lets in-memory read engines fetch "everything changed since X" cheaply
+        Index('ix_jobs_updated_at', 'updated_at'),
+        # Listings only show active jobs: expires_at IS NULL OR expires_at > now
+        # (retention.py). The two partial indexes below cover the two halves -
+        # jobs that never expire, newest first, and jobs with an expiry by when
+        # they expire - so the database can combine them (a BitmapOr on
+        # PostgreSQL) instead of reading rows that are already expired
+        Index(
+            'ix_jobs_active_posting_date', 'posting_date',
+            postgresql_where=text('expires_at IS NULL'),
+            sqlite_where=text('expires_at IS NULL')
+        ),
+        # The jobs with an expiry - the live ones for listings (expires_at > now),
+        # the expired ones for the archiver (expires_at <= now)
+        Index(
+            'ix_jobs_expires_at', 'expires_at',
+            postgresql_where=text('expires_at IS NOT NULL'),
+            sqlite_where=text('expires_at IS NOT NULL')
+        ),
+        # Only duplicates are in it (most jobs are originals)
+        Index(
+            'ix_jobs_canonical_id', 'canonical_id',
+            postgresql_where=text('canonical_id IS NOT NULL'),
+            sqlite_where=text('canonical_id IS NOT NULL')
+        ),
+        # GET /api/jobs?enriched_job_type= / ?enriched_seniority= filters
+        Index('ix_jobs_enriched_job_type', 'enriched_job_type'),
+        Index('ix_jobs_enriched_seniority', 'enriched_seniority'),
+    )
 
-    def to_dict(self):
+    def to_dict(self, fields=None):
         """
         Convert the job object to a dictionary
         This makes it easy to send job data to the frontend as JSON
+        Pass a list of `fields` to only include (and only read) those columns
         """
-        return {
-            'id': self.id,
-            'title': self.title,
-            'company': self.company,
-            'location': self.location,
-            'posting_date': self.posting_date.isoformat() if self.posting_date else None,
-            'job_type': self.job_type,
-            'tags': self.tags.split(', ') if self.tags else [],
-            'description': self.description,
-            'salary_range': self.salary_range,
-            'experience_level': self.experience_level,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+        return {name: format_job_field(name, getattr(self, name)) for name in (fields or JOB_FIELDS)}
 
     @classmethod
     def from_dict(cls, data):
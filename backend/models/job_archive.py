@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from datetime import datetime
+from db import db
+
+class JobArchive(db.Model):
+    """
+    Expired job postings
+    retention.py moves rows here from the jobs table so listings only
+    ever have to look at current postings. Same columns as Job plus archived_at.
+    """
+
+    __tablename__ = 'jobs_archive'
+
+    # Same id the job had in the jobs table (not auto-generated)
+    id = Column(Integer, primary_key=True, autoincrement=False)
+
+    title = Column(String(200), nullable=False)
+    company = Column(String(100), nullable=False)
+    location = Column(String(100), nullable=False)
+    posting_date = Column(DateTime, nullable=False)
+    job_type = Column(String(50))
+    tags = Column(Text)
+    description = Column(Text)
+    salary_range = Column(String(100))
+    experience_level = Column(String(50))
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    expires_at = Column(DateTime)
+    canonical_id = Column(Integer)
+    enriched_job_type = Column(String(50))
+    enriched_seniority = Column(String(50))
+    enriched_at = Column(DateTime)
+
+    # When the archiver moved this row out of the jobs table
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index('ix_jobs_archive_posting_date', 'posting_date'),
+    )
+
+    def __repr__(self):
+        return f"<JobArchive(id={self.id}, title='{self.title}', company='{self.company}')>"
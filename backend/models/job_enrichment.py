@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Index
+from db import db
+
+class JobEnrichedTag(db.Model):
+    """
+    One tag the enrichment pipeline derived from a job's title and description
+    (see enrichment.py). The job's derived job type and seniority are columns
+    of the jobs table; tags get their own table so GET /api/jobs?enriched_tags=
+    is an index lookup instead of a LIKE over every row.
+    """
+
+    __tablename__ = 'job_enriched_tags'
+
+    # (tag, job_id) - tag first, so "every job with this tag" is a primary key range
+    tag = Column(String(50), primary_key=True)
+    job_id = Column(Integer, primary_key=True, autoincrement=False)
+
+    __table_args__ = (
+        # For replacing or removing a job's tags
+        Index('ix_job_enriched_tags_job_id', 'job_id'),
+    )
+
+    def __repr__(self):
+        return f"<JobEnrichedTag(tag={self.tag!r}, job_id={self.job_id})>"
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, SmallInteger, BigInteger, LargeBinary, Index
+from db import db
+
+class JobSignature(db.Model):
+    """
+    MinHash signature of a job (see dedupe.py)
+    Kept so a new job can be compared with its candidate duplicates
+    without re-reading and re-hashing their descriptions
+    """
+
+    __tablename__ = 'job_signatures'
+
+    job_id = Column(Integer, primary_key=True, autoincrement=False)
+
+    # NUM_PERM little-endian uint32 values
+    signature = Column(LargeBinary, nullable=False)
+
+    def __repr__(self):
+        return f"<JobSignature(job_id={self.job_id})>"
+
+class JobSignatureBand(db.Model):
+    """
+    LSH index: one row per (band, bucket) a job's signature falls into
+    Jobs sharing any bucket are the only candidates compared as duplicates
+    """
+
+    __tablename__ = 'job_signature_bands'
+
+    # (band, bucket) first in the primary key, so finding candidates is an index lookup
+    band = Column(SmallInteger, primary_key=True, autoincrement=False)
+    bucket = Column(BigInteger, primary_key=True, autoincrement=False)
+    job_id = Column(Integer, primary_key=True, autoincrement=False)
+
+    __table_args__ = (
+        # For removing a job's rows
+        Index('ix_job_signature_bands_job_id', 'job_id'),
+    )
+
+    def __repr__(self):
+        return f"<JobSignatureBand(band={self.band}, bucket={self.bucket}, job_id={self.job_id})>"
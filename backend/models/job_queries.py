@@ -0,0 +1,272 @@
+from datetime import datetime
+from sqlalchemy import or_, desc, asc, exists, select
+from sqlalchemy.orm import aliased
+from models.job import Job
+from models.job_enrichment import JobEnrichedTag
+from retention import active_jobs_filter, retention_cutoff
+from query_guard import over_cost_budget
+from enrichment import canonical_label
+
+# Shared query building for the job listing endpoints
+# Both the Flask routes (routes/job_routes.py) and the async app (asgi.py)
+# use these helpers so the two always return exactly the same results
+
+# Job types we always offer in the filter dropdown, even if no job uses them yet
+COMPREHENSIVE_JOB_TYPES = [
+    'Full-time',
+    'Part-time',
+    'Contract',
+    'Internship',
+    'Temporary',
+    'Freelance',
+    'Remote',
+    'Hybrid',
+    'On-site'
+]
+
+def _get_int(args, name, default):
+    """
+    Read an integer query parameter, falling back to the default
+    when it is missing or not a number (same as Flask's type=int)
+    """
+    value = args.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+def parse_job_list_args(args):
+    """
+    Read the list parameters sent by the frontend
+    `args` can be Flask's request.args or a plain dict
+    """
+    return {
+        # Both at least 1 (admission control answers 400 to smaller values; when
+        # it is off they are raised to 1, never sent to SQL as LIMIT -1 or OFFSET -5)
+        'page': max(1, _get_int(args, 'page', 1)),  # Which page to show
+        'per_page': max(1, _get_int(args, 'per_page', 5)),  # How many jobs per page
+        'job_type': args.get('job_type'),  # Filter by job type
+        'location': args.get('location'),  # Filter by location
+        'tags': args.get('tags'),  # Filter by tags
+        'search': args.get('search'),  # Search text
+        'sort': args.get('sort', 'posting_date_desc'),  # How to sort
+        # Leave out near-duplicates of jobs that are listed (see dedupe.py)
+        'hide_duplicates': str(args.get('hide_duplicates', 'false')).lower() == 'true',
+        # Values derived from the description (see enrichment.py) - exact matches
+        'enriched_job_type': args.get('enriched_job_type'),
+        'enriched_seniority': args.get('enriched_seniority'),
+        'enriched_tags': args.get('enriched_tags')
+    }
+
+ENRICHED_FILTERS = ('enriched_job_type', 'enriched_seniority', 'enriched_tags')
+
+def uses_enriched_filters(params):
+    """
+    Does the request filter on enriched values? The in-memory read engines
+    don't hold them, so such requests are answered with SQL
+    """
+    return any(params.get(name) for name in ENRICHED_FILTERS)
+
+def apply_job_filters(query, params):
+    """
+    Add the WHERE clauses for the selected filters
+    Works with Job.query as well as with select(Job)
+    """
+    job_type = params.get('job_type')
+    location = params.get('location')
+    tags = params.get('tags')
+    search = params.get('search')
+
+    # Never list expired postings (see retention.py)
+    query = query.filter(active_jobs_filter())
+
+    # Only apply a filter if the user actually selected something
+
+    # Filter by job type (e.g., Full-time, Part-time)
+    if job_type and job_type.lower() != 'all':
+        query = query.filter(Job.job_type.ilike(f'%{job_type}%'))
+
+    # Filter by location (e.g., New York, Remote)
+    if location and location.lower() != 'all':
+        query = query.filter(Job.location.ilike(f'%{location}%'))
+
+    # Filter by tags (e.g., Life, Health, Pricing)
+    if tags and tags.lower() != 'all':
+        # Split tags by comma and search for each one
+        tag_list = [tag.strip() for tag in tags.split(',')]
+        for tag in tag_list:
+            query = query.filter(Job.tags.ilike(f'%{tag}%'))
+
+    # Search in title, company, and description
+    if search:
+        # Use OR to search in multiple fields
+        search_filter = or_(
+            Job.title.ilike(f'%{search}%'),
+            Job.company.ilike(f'%{search}%'),
+            Job.description.ilike(f'%{search}%')
+        )
+        query = query.filter(search_filter)
+
+    # Derived job type, seniority and tags (enrichment.py) - exact values, so
+    # these use the indexes on the columns and on job_enriched_tags
+    for name in ('enriched_job_type', 'enriched_seniority'):
+        if params.get(name):
+            query = query.filter(getattr(Job, name) == canonical_label(params[name]))
+    if params.get('enriched_tags'):
+        for tag in params['enriched_tags'].split(','):
+            if tag.strip():
+                query = query.filter(Job.id.in_(
+                    select(JobEnrichedTag.job_id).where(JobEnrichedTag.tag == canonical_label(tag))
+                ))
+
+    # Hide near-duplicates, unless their original is no longer listed
+    if params.get('hide_duplicates'):
+        original = aliased(Job)
+        query = query.filter(or_(
+            Job.canonical_id.is_(None),
+            ~exists().where(original.id == Job.canonical_id, active_jobs_filter(job=original))
+        ))
+
+    return query
+
+def _contains(value, term):
+    # Python version of column.ilike('%term%')
+    return value is not None and term.lower() in value.lower()
+
+def _parse_iso(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+def job_matches(job, params, now=None, check_active=True):
+    """
+    Python version of apply_job_filters() for one job dict (Job.to_dict() style)
+    Used where there is no query to add the filters to, e.g. the live change
+    stream. hide_duplicates can only look at the job itself here: duplicates
+    are left out even if their original is no longer listed. The enriched_*
+    filters are ignored (job dicts don't carry the derived values).
+    """
+    if check_active:
+        now = now or datetime.utcnow()
+        expires_at = _parse_iso(job.get('expires_at'))
+        if expires_at is not None and expires_at <= now:
+            return False
+        cutoff = retention_cutoff(now)
+        posting_date = _parse_iso(job.get('posting_date'))
+        if cutoff is not None and (posting_date is None or posting_date < cutoff):
+            return False
+
+    for name in ('job_type', 'location'):
+        value = params.get(name)
+        if value and value.lower() != 'all' and not _contains(job.get(name), value):
+            return False
+
+    tags = params.get('tags')
+    if tags and tags.lower() != 'all':
+        job_tags = job.get('tags')
+        if isinstance(job_tags, list):
+            job_tags = ', '.join(job_tags)
+        if not all(_contains(job_tags, tag.strip()) for tag in tags.split(',')):
+            return False
+
+    search = params.get('search')
+    if search and not any(_contains(job.get(name), search) for name in ('title', 'company', 'description')):
+        return False
+
+    if params.get('hide_duplicates') and job.get('canonical_id') is not None:
+        return False
+    return True
+
+# Sort options the frontend can ask for
+SORT_OPTIONS = {
+    'posting_date_desc': desc(Job.posting_date),  # Newest jobs first
+    'posting_date_asc': asc(Job.posting_date),  # Oldest jobs first
+    'title_asc': asc(Job.title),  # Job titles A-Z
+    'title_desc': desc(Job.title),  # Job titles Z-A
+    'company_asc': asc(Job.company),  # Company names A-Z
+    'company_desc': desc(Job.company)  # Company names Z-A
+}
+
+def apply_job_sort(query, sort_by):
+    """
+    Apply sorting based on what the user selected
+    Unknown values fall back to newest jobs first
+    """
+    return query.order_by(SORT_OPTIONS.get(sort_by, SORT_OPTIONS['posting_date_desc']))
+
+def build_page_response(jobs_dict, total_count, page, per_page):
+    """
+    Build the paginated response body that get_jobs returns
+    """
+    # Calculate pagination info
+    total_pages = (total_count + per_page - 1) // per_page if per_page > 0 else 0
+    return {
+        'jobs': jobs_dict,
+        'total': total_count,
+        'pages': total_pages,
+        'current_page': page,
+        'per_page': per_page,
+        'has_next': page < total_pages,
+        'has_prev': page > 1
+    }
+
+def query_job_page(query, params):
+    """
+    Run a filtered, sorted, paginated job list query (Job.query based)
+    Returns (job dicts of the page, total number of matching jobs)
+    """
+    query = apply_job_sort(apply_job_filters(query, params), params['sort'])
+    offset = (params['page'] - 1) * params['per_page']
+    if over_cost_budget(query):
+        # Counting every match would cost too much (query_guard.py) - fetch one
+        # job more than the page instead: the total is then only a lower bound,
+        # but still tells whether there is a next page
+        jobs = query.offset(offset).limit(params['per_page'] + 1).all()
+        total_count = offset + len(jobs)
+        jobs = jobs[:params['per_page']]
+    else:
+        total_count = query.count()
+        jobs = query.offset(offset).limit(params['per_page']).all()
+    return [job.to_dict() for job in jobs], total_count
+
+def split_tags(tags):
+    """
+    Individual tags of a tags string (or of a list like Job.to_dict() returns)
+    """
+    if not tags:
+        return []
+    if isinstance(tags, str):
+        tags = [tags]
+    return [tag.strip() for value in tags for tag in value.split(',') if tag.strip()]
+
+def build_filter_options(db_job_types, locations, tag_values):
+    """
+    Combine the raw distinct values from the database into the
+    filter options returned by get_filters
+    """
+    # Combine comprehensive list with database job types
+    all_job_types = list(set(COMPREHENSIVE_JOB_TYPES + [job_type for job_type in db_job_types if job_type]))
+    all_job_types.sort()  # Sort alphabetically
+
+    locations = [location for location in locations if location]
+
+    # Split every tags string by comma and collect each tag
+    all_tags = set()
+    for tags in tag_values:
+        all_tags.update(split_tags(tags))
+
+    return {
+        'job_types': all_job_types,
+        'locations': locations,
+        'tags': sorted(all_tags)
+    }
+
+def query_filter_options(session):
+    """
+    Read the distinct job types, locations and tags strings from the database
+    (only the columns we need, not the whole jobs table) and build the filter options
+    """
+    db_job_types = [row[0] for row in session.query(Job.job_type).distinct().all()]
+    locations = [row[0] for row in session.query(Job.location).distinct().all()]
+    tag_values = [row[0] for row in session.query(Job.tags).distinct().all()]
+    return build_filter_options(db_job_types, locations, tag_values)
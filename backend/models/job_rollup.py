@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Date, Index
+from db import db
+
+class JobRollup(db.Model):
+    """
+    How many jobs were posted on one day with one value of a dimension
+    e.g. (2024-05-01, 'company', 'Aon', 12) or (2024-05-01, 'all', '', 340)
+    Kept up to date by rollups.py - the stats endpoints only read this table
+    """
+
+    __tablename__ = 'job_rollups'
+
+    # company, tag, job_type, location, experience_level, salary_band or all (every job)
+    dimension = Column(String(20), primary_key=True)
+    value = Column(String(200), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    jobs = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # The primary key serves "one value over time"; this one serves
+        # "every value of a dimension in a date range" and refreshing a day
+        Index('ix_job_rollups_dimension_day', 'dimension', 'day'),
+    )
+
+    def __repr__(self):
+        return f"<JobRollup({self.dimension}={self.value!r}, day={self.day}, jobs={self.jobs})>"
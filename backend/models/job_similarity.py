@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, Float, DateTime
+from datetime import datetime
+from db import db
+
+class JobSimilarity(db.Model):
+    """
+    Precomputed "similar jobs": the top-K most similar jobs for every job
+    Filled by build_similarities.py (see engines/similarity.py), so
+    GET /api/jobs/<id>/similar is a single primary key range lookup
+    """
+
+    __tablename__ = 'job_similarities'
+
+    # The primary key (job_id, similar_job_id) is also the index the lookup uses
+    job_id = Column(Integer, primary_key=True, autoincrement=False)
+    similar_job_id = Column(Integer, primary_key=True, autoincrement=False)
+
+    # Cosine similarity of the two jobs' TF-IDF vectors (0 to 1)
+    score = Column(Float, nullable=False)
+
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<JobSimilarity(job_id={self.job_id}, similar_job_id={self.similar_job_id}, score={self.score:.3f})>"
@@ -0,0 +1,72 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from datetime import datetime
+from db import db
+
+# The filters a saved search can have - the same names as GET /api/jobs
+SAVED_SEARCH_FILTERS = ['job_type', 'location', 'tags', 'search']
+
+class SavedSearch(db.Model):
+    """
+    A stored job search ("alert me about new Pricing jobs in London")
+    New jobs are matched against every saved search by the percolator
+    (engines/percolator.py) and the matches land in saved_search_matches
+    """
+
+    __tablename__ = 'saved_searches'
+
+    id = Column(Integer, primary_key=True)
+
+    # A name the user gave the search
+    name = Column(String(200), nullable=False)
+
+    # Same meaning as the GET /api/jobs parameters (NULL = not filtered)
+    job_type = Column(String(50))
+    location = Column(String(200))
+    tags = Column(String(500))  # comma separated, every tag must match
+    search = Column(String(200))  # text to find in title, company or description
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def filters(self):
+        """
+        The search as GET /api/jobs parameters
+        """
+        return {name: getattr(self, name) for name in SAVED_SEARCH_FILTERS if getattr(self, name)}
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'job_type': self.job_type,
+            'location': self.location,
+            'tags': self.tags,
+            'search': self.search,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f"<SavedSearch(id={self.id}, name='{self.name}')>"
+
+class SavedSearchMatch(db.Model):
+    """
+    The inbox of a saved search: one row per job that matched it
+    """
+
+    __tablename__ = 'saved_search_matches'
+
+    # The primary key also makes matching the same job twice a no-op
+    saved_search_id = Column(Integer, primary_key=True, autoincrement=False)
+    job_id = Column(Integer, primary_key=True, autoincrement=False)
+
+    matched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # When the user marked it as read (NULL = unread)
+    read_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # The inbox is read newest first
+        Index('ix_saved_search_matches_inbox', 'saved_search_id', 'matched_at'),
+    )
+
+    def __repr__(self):
+        return f"<SavedSearchMatch(saved_search_id={self.saved_search_id}, job_id={self.job_id})>"
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from db import db
+
+class StagingLoad(db.Model):
+    """
+    A scraper staging file that was loaded (see bulk_load.py)
+    The checksum makes loading the same file again a no-op
+    """
+
+    __tablename__ = 'staging_loads'
+
+    id = Column(Integer, primary_key=True)
+
+    # SHA-256 of the file's contents - the same contents are only loaded once
+    sha256 = Column(String(64), nullable=False, unique=True)
+
+    # File name and scraper run (from the manifest) - for people, not used for matching
+    file_name = Column(String(200), nullable=False)
+    run = Column(String(100))
+
+    # What happened to the lines of the file
+    records = Column(Integer, nullable=False, default=0)
+    inserted = Column(Integer, nullable=False, default=0)
+    duplicates = Column(Integer, nullable=False, default=0)
+    rejected = Column(Integer, nullable=False, default=0)
+
+    loaded_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<StagingLoad(file_name='{self.file_name}', inserted={self.inserted})>"
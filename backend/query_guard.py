@@ -0,0 +1,284 @@
+import re
+import time
+import json
+import threading
+import contextvars
+from contextlib import contextmanager
+from flask import request, jsonify
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# Query guard: limits on how long, and how much, one request may ask of the database
+# - Statement timeouts per endpoint (STATEMENT_TIMEOUT_MS, with the defaults
+#   in ENDPOINT_TIMEOUTS_MS). PostgreSQL enforces them itself (SET LOCAL
+#   statement_timeout at the start of every transaction of the request);
+#   SQLite gets a progress handler that interrupts a statement once it has
+#   run too long. Either way the request answers 503 with a Retry-After header
+#   and code 'query_timeout' instead of a generic 500, so clients know they
+#   can try again.
+# - GET requests run in read-only transactions (SET TRANSACTION READ ONLY,
+#   PRAGMA query_only on SQLite), so a read endpoint can never write.
+# - A cost guard for the job list: the first time a shape of query is seen
+#   (the SQL without its values - which filters are used) it is EXPLAINed and
+#   its estimated cost remembered. Shapes above QUERY_COST_BUDGET are degraded
+#   (the exact total is skipped, see query_job_page) or rejected with 422,
+#   depending on QUERY_COST_GUARD.
+# Only requests get limits: background threads, scripts and the CLI commands
+# run as before.
+
+# Per-endpoint statement timeouts in milliseconds (anything else: STATEMENT_TIMEOUT_MS)
+ENDPOINT_TIMEOUTS_MS = {
+    'jobs.get_jobs': 3000,
+    'jobs.get_job': 1000,
+    'jobs.get_filters': 5000,
+    'jobs.get_facets': 3000,
+    'jobs.suggest': 1000,
+}
+SQLITE_PROGRESS_STEPS = 1000  # SQLite VM instructions between two timeout checks
+MAX_COST_SHAPES = 1000  # query shapes whose cost is remembered
+TABLE_SIZE_SECONDS = 60  # how long SQLite table sizes (for the cost estimate) are reused
+POSTGRES_QUERY_CANCELED = '57014'
+
+class QueryTimeout(Exception):
+    """A statement ran longer than the request's statement timeout"""
+    code = 'query_timeout'
+
+class QueryTooExpensive(Exception):
+    """The query's estimated cost is above QUERY_COST_BUDGET (QUERY_COST_GUARD=reject)"""
+    code = 'query_too_expensive'
+
+class QueryBudget:
+    """
+    The limits of one request, and what happened to them
+    """
+
+    def __init__(self, endpoint, timeout_ms, read_only, cost_guard='off', cost_budget=0):
+        self.endpoint = endpoint
+        self.timeout_ms = timeout_ms
+        self.read_only = read_only
+        self.cost_guard = cost_guard
+        self.cost_budget = cost_budget
+        self.statement_deadline = None  # time.monotonic() the running SQLite statement must finish by
+        self.error = None  # 'query_timeout' or 'query_too_expensive'
+        self.degraded = False
+
+# The budget of the request being handled in this thread/task (None outside requests)
+_current_budget = contextvars.ContextVar('query_budget', default=None)
+
+def current_budget():
+    return _current_budget.get()
+
+@contextmanager
+def query_budget(budget):
+    """Apply `budget` to every statement run inside the with block"""
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+def budget_for(config, endpoint, method):
+    """The QueryBudget of a request to `endpoint` (settings: config.py)"""
+    timeouts = dict(ENDPOINT_TIMEOUTS_MS, **(config.get('STATEMENT_TIMEOUTS_MS') or {}))
+    timeout_ms = timeouts.get(endpoint, config['STATEMENT_TIMEOUT_MS'])
+    if not config['STATEMENT_TIMEOUTS_ENABLED']:
+        timeout_ms = 0
+    return QueryBudget(endpoint, timeout_ms, read_only=method in ('GET', 'HEAD') and config['READ_ONLY_GETS'],
+                       cost_guard=config['QUERY_COST_GUARD'], cost_budget=config['QUERY_COST_BUDGET'])
+
+# ----------------------------
+# Timeouts and read-only transactions
+# ----------------------------
+def _sqlite_progress():
+    # Returning non-zero makes SQLite stop the statement ("interrupted")
+    budget = _current_budget.get()
+    if budget is not None and budget.statement_deadline is not None and time.monotonic() > budget.statement_deadline:
+        return 1
+    return 0
+
+@event.listens_for(Engine, 'connect')
+def _install_progress_handler(dbapi_connection, connection_record):
+    # Only the standard sqlite3 driver runs statements in the calling thread (aiosqlite uses its own)
+    if hasattr(dbapi_connection, 'set_progress_handler') and not hasattr(dbapi_connection, 'await_'):
+        dbapi_connection.set_progress_handler(_sqlite_progress, SQLITE_PROGRESS_STEPS)
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_statement_clock(conn, cursor, statement, parameters, context, executemany):
+    budget = _current_budget.get()
+    if budget is not None and budget.timeout_ms:
+        budget.statement_deadline = time.monotonic() + budget.timeout_ms / 1000
+
+@event.listens_for(Session, 'after_begin')
+def _limit_transaction(session, transaction, connection):
+    budget = _current_budget.get()
+    if budget is None:
+        return
+    dialect = connection.dialect.name
+    if dialect == 'postgresql':
+        if budget.read_only:
+            connection.exec_driver_sql('SET TRANSACTION READ ONLY')
+        if budget.timeout_ms:
+            connection.exec_driver_sql(f'SET LOCAL statement_timeout = {int(budget.timeout_ms)}')
+    elif dialect == 'sqlite' and budget.read_only:
+        # query_only stays on the connection - reset when it goes back to the pool
+        connection.exec_driver_sql('PRAGMA query_only = 1')
+        connection.connection.info['query_only'] = True
+
+@event.listens_for(Engine, 'checkin')
+def _reset_query_only(dbapi_connection, connection_record):
+    if connection_record is not None and connection_record.info.pop('query_only', False):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA query_only = 0')
+        cursor.close()
+
+def is_timeout_error(error):
+    """Was this DBAPI error a statement timeout (PostgreSQL) or an interrupted statement (SQLite)?"""
+    code = getattr(error, 'pgcode', None) or getattr(error, 'sqlstate', None)
+    return code == POSTGRES_QUERY_CANCELED or 'statement timeout' in str(error) or str(error) == 'interrupted'
+
+@event.listens_for(Engine, 'handle_error')
+def _raise_query_timeout(context):
+    budget = _current_budget.get()
+    if budget is not None and budget.timeout_ms and is_timeout_error(context.original_exception):
+        budget.error = QueryTimeout.code
+        raise QueryTimeout(f"{budget.endpoint}: statement ran longer than {budget.timeout_ms} ms") from context.original_exception
+
+# ----------------------------
+# Cost guard
+# ----------------------------
+_shape_costs = {}
+_table_sizes = {}
+_cost_lock = threading.Lock()
+
+def _explain_sqlite(connection, sql, parameters):
+    """
+    SQLite's plans have no costs - estimate the rows read instead: the size of
+    every table the plan scans (SCAN), or reads a range of (SEARCH ... > ?,
+    counted as the whole table: an upper bound). Lookups of single values
+    (SEARCH ... = ?) count as free
+    """
+    cost = 0
+    for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + sql, parameters):
+        match = re.match(r'(SCAN|SEARCH) (?:TABLE )?(\w+)(.*)', row[-1])
+        if match and (match.group(1) == 'SCAN' or '>' in match.group(3) or '<' in match.group(3)):
+            cost += _sqlite_table_size(connection, match.group(2))
+    return cost
+
+def _sqlite_table_size(connection, name):
+    cached = _table_sizes.get(name)
+    if cached is not None and time.monotonic() - cached[1] < TABLE_SIZE_SECONDS:
+        return cached[0]
+    try:
+        # max(rowid) is one index lookup, count(*) would be another full scan
+        size = connection.exec_driver_sql(f'SELECT max(rowid) FROM "{name}"').scalar() or 0
+    except Exception:
+        size = 0  # an alias or a subquery, not a table
+    _table_sizes[name] = (size, time.monotonic())
+    return size
+
+def estimate_cost(session, statement):
+    """
+    The planner's estimated cost of a statement (PostgreSQL: total cost;
+    SQLite: estimated rows read), or None on other databases
+    """
+    connection = session.connection()
+    dialect = connection.dialect
+    compiled = statement.compile(dialect=dialect)
+    parameters = compiled.params
+    if compiled.positional:
+        parameters = tuple(parameters[name] for name in compiled.positiontup)
+    if dialect.name == 'postgresql':
+        plan = connection.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + compiled.string, parameters).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']['Total Cost']
+    if dialect.name == 'sqlite':
+        return _explain_sqlite(connection, compiled.string, parameters)
+    return None
+
+def over_cost_budget(query):
+    """
+    True if this shape of query is estimated to cost more than the request's
+    QUERY_COST_BUDGET - raises QueryTooExpensive instead with QUERY_COST_GUARD=reject
+    Only the first query of each shape is EXPLAINed. Outside requests always False.
+    """
+    return statement_over_cost_budget(query.session, query.statement)
+
+def statement_over_cost_budget(session, statement):
+    """
+    over_cost_budget() for a select() statement and the (sync) session to
+    EXPLAIN it with - asgi.py calls it through AsyncSession.run_sync()
+    """
+    budget = _current_budget.get()
+    if budget is None or budget.cost_guard == 'off' or not budget.cost_budget:
+        return False
+    shape = str(statement.compile(dialect=session.get_bind().dialect))
+    cost = _shape_costs.get(shape)
+    if cost is None:
+        cost = estimate_cost(session, statement)
+        with _cost_lock:
+            if len(_shape_costs) >= MAX_COST_SHAPES:
+                _shape_costs.clear()
+            _shape_costs[shape] = cost
+    if cost is None or cost <= budget.cost_budget:
+        return False
+    if budget.cost_guard == 'reject':
+        budget.error = QueryTooExpensive.code
+        raise QueryTooExpensive(f"{budget.endpoint}: estimated cost {cost:.0f} is above {budget.cost_budget:.0f}")
+    budget.degraded = True
+    return True
+
+def page_degraded():
+    """Did the cost guard degrade the query of this request?"""
+    budget = _current_budget.get()
+    return budget is not None and budget.degraded
+
+# ----------------------------
+# Responses
+# ----------------------------
+def error_body(code):
+    """
+    (status, body, Retry-After seconds or None) to answer a request with
+    after a QueryTimeout or QueryTooExpensive (their `code`)
+    Timeouts are 503 + Retry-After: the same request can work when the database is less busy
+    """
+    if code == QueryTimeout.code:
+        return 503, {'error': 'The request took too long - try again, or narrow the search',
+                     'code': code, 'retryable': True}, 1
+    return 422, {'error': 'This search is too expensive - add more filters',
+                 'code': code, 'retryable': False}, None
+
+def error_response(code):
+    """error_body() as a Flask response"""
+    status, body, retry_after = error_body(code)
+    response = jsonify(body)
+    response.status_code = status
+    if retry_after is not None:
+        response.headers['Retry-After'] = str(retry_after)
+    return response
+
+def init_query_guard(app):
+    """
+    Give every request its statement timeout, read-only transaction and cost budget
+    """
+    @app.before_request
+    def start_budget():
+        budget = budget_for(app.config, request.endpoint, request.method)
+        request.environ['query_budget.token'] = _current_budget.set(budget)
+
+    @app.after_request
+    def budget_error_response(response):
+        # The views turn every exception into a 500 - answer timeouts and rejections properly
+        budget = _current_budget.get()
+        if budget is not None and budget.error is not None and response.status_code == 500:
+            return error_response(budget.error)
+        return response
+
+    @app.teardown_request
+    def end_budget(error=None):
+        token = request.environ.pop('query_budget.token', None)
+        if token is not None:
+            _current_budget.reset(token)
+
+    return True
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Stats Rollups Script
+Counts every job posting (current and archived) again and rewrites the
+job_rollups table behind GET /api/stats/... (see rollups.py)
+Run it once after creating the table, and after writing jobs with plain SQL -
+API writes and scraper loads keep the rollups up to date by themselves
+"""
+
+import os
+import sys
+import time
+
+# Add the backend directory to the Python path
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, backend_dir)
+
+def rebuild():
+    """
+    Recompute all rollups in one transaction
+    """
+    try:
+        from db import db
+        from app import create_app
+        from rollups import rebuild_rollups
+
+        # Create the Flask app
+        app = create_app()
+
+        with app.app_context():
+            start = time.perf_counter()
+            rows = rebuild_rollups(db.session)
+            db.session.commit()
+
+        print(f"\nRollups rebuilt! {rows} rows in {time.perf_counter() - start:.1f} s")
+        return True
+
+    except Exception as e:
+        print(f"Error rebuilding rollups: {e}")
+        return False
+
+if __name__ == "__main__":
+    rebuild()
@@ -0,0 +1,197 @@
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, delete, or_, and_, text, literal, inspect, DateTime
+from sqlalchemy.schema import CreateTable
+
+from config import Config
+from models.job import Job, job_row_to_dict
+from models.job_archive import JobArchive
+from events import publish_job_changes
+
+# Posting retention
+# A job is active while it is younger than JOB_RETENTION_DAYS (by posting_date)
+# and its own expires_at (if it has one) is still in the future.
+# Listings only show active jobs; archive_expired_jobs() later moves the
+# expired rows to the jobs_archive table in small batches.
+
+def retention_cutoff(now=None, retention_days=None):
+    """
+    Oldest posting_date that is still shown (None = no age limit)
+    """
+    if retention_days is None:
+        retention_days = Config.JOB_RETENTION_DAYS
+    if not retention_days or retention_days <= 0:
+        return None
+    return (now or datetime.utcnow()) - timedelta(days=retention_days)
+
+def active_jobs_filter(now=None, retention_days=None, job=Job):
+    """
+    WHERE clause for jobs that should still be listed
+    The posting_date bound also lets PostgreSQL skip old partitions
+    `job` can be an aliased(Job) when the query uses the table twice
+    """
+    now = now or datetime.utcnow()
+    clauses = [or_(job.expires_at.is_(None), job.expires_at > now)]
+    cutoff = retention_cutoff(now, retention_days)
+    if cutoff is not None:
+        clauses.append(job.posting_date >= cutoff)
+    return and_(*clauses)
+
+def expired_jobs_filter(now=None, retention_days=None):
+    """
+    WHERE clause for jobs that should be archived
+    """
+    now = now or datetime.utcnow()
+    clauses = [and_(Job.expires_at.isnot(None), Job.expires_at <= now)]
+    cutoff = retention_cutoff(now, retention_days)
+    if cutoff is not None:
+        clauses.append(Job.posting_date < cutoff)
+    return or_(*clauses)
+
+def archive_expired_jobs(session, batch_size=500, pause_seconds=0.05, max_batches=None, retention_days=None):
+    """
+    Move expired jobs to the jobs_archive table
+    Works in small transactions (batch_size rows each) with a short pause in
+    between, so the API never waits long on locks held by the archiver.
+    Returns how many jobs were archived.
+    """
+    from dedupe import remove_signatures
+    is_postgres = session.get_bind().dialect.name == 'postgresql'
+    job_columns = [column.name for column in Job.__table__.columns]
+    total_archived = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        now = datetime.utcnow()
+
+        # Pick the next batch of expired jobs
+        batch_query = (
+            select(*Job.__table__.columns)
+            .where(expired_jobs_filter(now, retention_days))
+            .order_by(Job.id)
+            .limit(batch_size)
+        )
+        if is_postgres:
+            # Skip rows someone else is editing right now instead of waiting for them
+            batch_query = batch_query.with_for_update(skip_locked=True)
+        rows = session.execute(batch_query).all()
+        if not rows:
+            session.rollback()
+            break
+
+        ids = [row.id for row in rows]
+        newest_posting_date = max(row.posting_date for row in rows)
+
+        # Copy them to the archive and delete them, in the same transaction
+        session.execute(
+            insert(JobArchive).from_select(
+                job_columns + ['archived_at'],
+                select(*Job.__table__.columns, literal(now, DateTime)).where(Job.id.in_(ids))
+            )
+        )
+        # The posting_date bound lets a partitioned table only touch the old partitions
+        session.execute(
+            delete(Job).where(Job.id.in_(ids), Job.posting_date <= newest_posting_date),
+            execution_options={'synchronize_session': False}
+        )
+        # Archived jobs are no longer duplicate candidates (see dedupe.py)
+        remove_signatures(session, ids)
+        session.commit()
+        publish_job_changes([('archive', job_row_to_dict(row)) for row in rows])
+
+        total_archived += len(ids)
+        batches += 1
+        print(f"Archived {len(ids)} jobs (total {total_archived})")
+
+        if len(ids) < batch_size:
+            break
+        time.sleep(pause_seconds)
+
+    return total_archived
+
+# ----------------------------
+# PostgreSQL range partitioning
+# ----------------------------
+def _month_start(date):
+    return datetime(date.year, date.month, 1)
+
+def _next_month(date):
+    return datetime(date.year + (date.month // 12), date.month % 12 + 1, 1)
+
+def is_partitioned(engine):
+    """
+    Is the jobs table a partitioned table? (always False outside PostgreSQL)
+    """
+    if engine.dialect.name != 'postgresql':
+        return False
+    with engine.connect() as connection:
+        result = connection.execute(text(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('jobs')"
+        ))
+        return result.first() is not None
+
+def ensure_partitions(engine, months_back=0, months_ahead=3):
+    """
+    Create the monthly partitions of the jobs table that don't exist yet
+    Run this regularly (the archive command does) so new postings never
+    land in the default partition
+    """
+    if not is_partitioned(engine):
+        return 0
+
+    month = _month_start(datetime.utcnow())
+    for _ in range(months_back):
+        month = _month_start(month - timedelta(days=1))
+
+    created = 0
+    for _ in range(months_back + months_ahead + 1):
+        end = _next_month(month)
+        name = f"jobs_y{month.year}m{month.month:02d}"
+        try:
+            with engine.begin() as connection:
+                exists = connection.execute(text("SELECT to_regclass(:name)"), {'name': name}).scalar()
+                if exists is None:
+                    connection.execute(text(
+                        f"CREATE TABLE {name} PARTITION OF jobs "
+                        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+                    ))
+                    created += 1
+                    print(f"Created partition {name}")
+        except Exception as e:
+            # Usually means rows for that month already sit in the default partition
+            print(f"Could not create partition {name}: {e}")
+        month = end
+
+    return created
+
+def create_partitioned_jobs_table(engine, months_ahead=3):
+    """
+    Create the jobs table as a PostgreSQL table partitioned by posting_date
+    (one partition per month plus a default one). Only works on an empty
+    database - run it before create_all() creates a normal jobs table.
+    """
+    if engine.dialect.name != 'postgresql':
+        print("Partitioning is only supported on PostgreSQL - creating a normal jobs table")
+        return False
+    if inspect(engine).has_table('jobs'):
+        print("jobs table already exists - not partitioning it")
+        return False
+
+    # Same columns as the model, but the partition key has to be part of the primary key
+    ddl = str(CreateTable(Job.__table__).compile(dialect=engine.dialect)).strip().rstrip(';')
+    ddl = ddl.replace('PRIMARY KEY (id)', 'PRIMARY KEY (id, posting_date)')
+    ddl += ' PARTITION BY RANGE (posting_date)'
+
+    with engine.begin() as connection:
+        connection.execute(text(ddl))
+        connection.execute(text('CREATE TABLE jobs_default PARTITION OF jobs DEFAULT'))
+
+    # Indexes created on the parent are created on every partition too
+    for index in Job.__table__.indexes:
+        index.create(engine)
+
+    # Partitions for the retention window and the next few months
+    retention_months = (Config.JOB_RETENTION_DAYS // 30) + 1 if Config.JOB_RETENTION_DAYS > 0 else 1
+    ensure_partitions(engine, months_back=retention_months, months_ahead=months_ahead)
+    print("Created partitioned jobs table")
+    return True
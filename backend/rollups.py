@@ -0,0 +1,198 @@
+import re
+import time
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from sqlalchemy import select, delete, insert, union_all, or_, and_
+
+from models.job_queries import split_tags
+
+# Rollups: daily job counts for the market reports (GET /api/stats/...)
+# job_rollups has one row per (dimension, value, day) with the number of jobs
+# posted that day - per company, tag, job type, location, experience level,
+# salary band, and 'all' for every job. A year of one company is then at most
+# 365 small rows instead of a scan over the jobs table.
+#
+# The counts of a day are always recomputed as a whole from the jobs posted
+# that day (jobs and jobs_archive, so archiving expired postings keeps them in
+# the history). That makes every refresh idempotent: it doesn't matter how a
+# job was written (ORM, UPDATE ... RETURNING, another process), only which
+# days were touched.
+# - API writes: the change listener (events.py) collects the posting days and
+#   a background thread refreshes them, ROLLUPS_DEBOUNCE_SECONDS later
+# - scraper loads (bulk_load.py): refreshed in the same transaction as the batch
+# - everything (first run, or after writing with plain SQL): rebuild_rollups.py
+
+DIMENSIONS = ('company', 'tag', 'job_type', 'location', 'experience_level', 'salary_band')
+ALL = 'all'  # dimension of the total per day (value '')
+SALARY_BAND_WIDTH = 20000  # salary bands are $0-20k, $20k-40k, ... of the lower end of the range
+MAX_VALUE_LENGTH = 200  # JobRollup.value
+DAYS_PER_QUERY = 50  # days refreshed with one query
+INSERT_CHUNK = 5000
+
+# The first amount of a salary range: "$80,000 - $120,000" -> 80000, "90k" -> 90000
+SALARY_PATTERN = re.compile(r'(\d[\d,]*(?:\.\d+)?)\s*([kK])?')
+ROLLUP_COLUMNS = ('posting_date', 'company', 'tags', 'job_type', 'location', 'experience_level', 'salary_range')
+
+def salary_band(salary_range):
+    """
+    '80000-100000' for a yearly salary starting between 80k and 100k,
+    None if there is no amount (or it looks hourly/daily)
+    """
+    match = SALARY_PATTERN.search(salary_range or '')
+    if match is None:
+        return None
+    amount = float(match.group(1).replace(',', '')) * (1000 if match.group(2) else 1)
+    if amount < 1000:
+        return None
+    low = int(amount // SALARY_BAND_WIDTH * SALARY_BAND_WIDTH)
+    return f'{low}-{low + SALARY_BAND_WIDTH}'
+
+def rollup_keys(job):
+    """
+    The (dimension, value) pairs a job is counted under
+    job: a result row mapping or a Job.to_dict()
+    """
+    get = job.get
+    keys = {(ALL, '')}
+    for name in ('company', 'job_type', 'location', 'experience_level'):
+        if get(name):
+            keys.add((name, get(name)[:MAX_VALUE_LENGTH]))
+    for tag in split_tags(get('tags')):
+        keys.add(('tag', tag[:MAX_VALUE_LENGTH]))
+    band = salary_band(get('salary_range'))
+    if band is not None:
+        keys.add(('salary_band', band))
+    return keys
+
+def posting_day(value):
+    """Day of a posting_date (datetime or ISO string)"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.date() if isinstance(value, datetime) else value
+
+def _posted_jobs(condition_for):
+    """
+    SELECT of the rollup columns of every posting, current and archived
+    condition_for(table) adds a WHERE clause (or returns None)
+    """
+    from models.job import Job
+    from models.job_archive import JobArchive
+    parts = []
+    for model in (Job, JobArchive):
+        statement = select(*[getattr(model, name) for name in ROLLUP_COLUMNS])
+        condition = condition_for(model)
+        if condition is not None:
+            statement = statement.where(condition)
+        parts.append(statement)
+    return union_all(*parts)
+
+def _insert_counts(session, counts):
+    from models.job_rollup import JobRollup
+    rows = [{'day': day, 'dimension': dimension, 'value': value, 'jobs': jobs}
+            for (day, dimension, value), jobs in counts.items()]
+    for start in range(0, len(rows), INSERT_CHUNK):
+        session.execute(insert(JobRollup), rows[start:start + INSERT_CHUNK])
+
+def refresh_rollups(session, days):
+    """
+    Recompute the rollups of some days (doesn't commit)
+    Returns how many rollup rows were written
+    """
+    from models.job_rollup import JobRollup
+    days = sorted(set(days))
+    written = 0
+    for start in range(0, len(days), DAYS_PER_QUERY):
+        chunk = days[start:start + DAYS_PER_QUERY]
+        midnights = [datetime.combine(day, datetime.min.time()) for day in chunk]
+        statement = _posted_jobs(lambda model: or_(*[
+            and_(model.posting_date >= midnight, model.posting_date < midnight + timedelta(days=1))
+            for midnight in midnights
+        ]))
+        counts = Counter()
+        for row in session.execute(statement).mappings():
+            day = posting_day(row['posting_date'])
+            for dimension, value in rollup_keys(row):
+                counts[(day, dimension, value)] += 1
+        session.execute(delete(JobRollup).where(
+            JobRollup.dimension.in_(DIMENSIONS + (ALL,)), JobRollup.day.in_(chunk)
+        ))
+        _insert_counts(session, counts)
+        written += len(counts)
+    return written
+
+def rebuild_rollups(session, batch_size=5000):
+    """
+    Throw the rollups away and count every posting again (doesn't commit)
+    Returns how many rollup rows were written
+    """
+    from models.job_rollup import JobRollup
+    counts = Counter()
+    statement = _posted_jobs(lambda model: None)
+    for row in session.execute(statement.execution_options(yield_per=batch_size)).mappings():
+        day = posting_day(row['posting_date'])
+        for dimension, value in rollup_keys(row):
+            counts[(day, dimension, value)] += 1
+    session.execute(delete(JobRollup))
+    _insert_counts(session, counts)
+    return len(counts)
+
+class RollupMaintainer:
+    """
+    Refreshes the days touched by API writes in the background
+    The change listener only remembers the days; the thread waits
+    ROLLUPS_DEBOUNCE_SECONDS so a burst of writes costs one refresh per day
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.days = set()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.stats = {'refreshes': 0, 'days': 0, 'errors': 0}
+
+    def apply_changes(self, changes):
+        """
+        Change listener (see events.py) - archiving moves a posting without changing the counts
+        """
+        days = {posting_day(job['posting_date']) for action, job in changes
+                if action != 'archive' and job.get('posting_date')}
+        if not days:
+            return
+        with self.lock:
+            self.days |= days
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='job-rollups', daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        from db import db
+        while True:
+            time.sleep(self.app.config['ROLLUPS_DEBOUNCE_SECONDS'])
+            with self.lock:
+                days, self.days = self.days, set()
+                if not days:
+                    self.thread = None  # the next change starts a new thread
+                    return
+            try:
+                with self.app.app_context():
+                    refresh_rollups(db.session, days)
+                    db.session.commit()
+                    db.session.remove()
+                self.stats['refreshes'] += 1
+                self.stats['days'] += len(days)
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"Error refreshing job rollups ({len(days)} days) - run rebuild_rollups.py if it persists: {e}")
+
+def init_rollups(app):
+    """
+    Keep the rollups up to date with API writes (if ROLLUPS_ENABLED)
+    """
+    from events import add_change_listener
+    if not app.config['ROLLUPS_ENABLED']:
+        return None
+    maintainer = RollupMaintainer(app)
+    app.extensions['job_rollups'] = maintainer
+    add_change_listener(maintainer.apply_changes)
+    return maintainer
@@ -1,8 +1,17 @@
-from flask import Blueprint, request, jsonify
-from sqlalchemy import or_, desc, asc
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import update, delete, select
+from sqlalchemy.orm import load_only
 from datetime import datetime
-from models.job import Job
+from models.job import Job, JOB_FIELDS, job_row_to_dict
+from models.job_queries import (
+    parse_job_list_args, build_page_response, query_job_page, query_filter_options,
+    uses_enriched_filters
+)
 from db import db
+from events import publish_job_changes, local_version
+from single_flight import SingleFlightTimeout
+from query_guard import QueryTimeout, QueryTooExpensive, error_response, page_degraded
+from static_shards import serve_static_shard
 
 # Create a blueprint for all our job-related routes
 # A blueprint is like a container for related routes
@@ -15,101 +24,172 @@ def get_jobs():
     This is the main endpoint that the frontend calls to get job listings
     """
     try:
+        # ?ids=1,2,3 asks for specific jobs instead of a filtered page
+        if request.args.get('ids') is not None:
+            body, status = fetch_jobs_by_ids(request.args.get('ids').split(','), request.args.get('fields'))
+            return jsonify(body), status
+        
         # Get all the parameters from the URL query string
         # These are sent by the frontend when making requests
-        page = request.args.get('page', 1, type=int)  # Which page to show
-        per_page = request.args.get('per_page', 5, type=int)  # How many jobs per page
-        job_type = request.args.get('job_type')  # Filter by job type
-        location = request.args.get('location')  # Filter by location
-        tags = request.args.get('tags')  # Filter by tags
-        search = request.args.get('search')  # Search text
-        sort_by = request.args.get('sort', 'posting_date_desc')  # How to sort
-        
-        # Start with a basic query to get all jobs
-        query = Job.query
-        
-        # Apply filters one by one
-        # Only apply a filter if the user actually selected something
-        
-        # Filter by job type (e.g., Full-time, Part-time)
-        if job_type and job_type.lower() != 'all':
-            query = query.filter(Job.job_type.ilike(f'%{job_type}%'))
-        
-        # Filter by location (e.g., New York, Remote)
-        if location and location.lower() != 'all':
-            query = query.filter(Job.location.ilike(f'%{location}%'))
-        
-        # Filter by tags (e.g., Life, Health, Pricing)
-        if tags and tags.lower() != 'all':
-            # Split tags by comma and search for each one
-            tag_list = [tag.strip() for tag in tags.split(',')]
-            for tag in tag_list:
-                query = query.filter(Job.tags.ilike(f'%{tag}%'))
-        
-        # Search in title, company, and description
-        if search:
-            # Use OR to search in multiple fields
-            search_filter = or_(
-                Job.title.ilike(f'%{search}%'),
-                Job.company.ilike(f'%{search}%'),
-                Job.description.ilike(f'%{search}%')
-            )
-            query = query.filter(search_filter)
-        
-        # Apply sorting based on what the user selected
-        if sort_by == 'posting_date_desc':
-            # Newest jobs first
-            query = query.order_by(desc(Job.posting_date))
-        elif sort_by == 'posting_date_asc':
-            # Oldest jobs first
-            query = query.order_by(asc(Job.posting_date))
-        elif sort_by == 'title_asc':
-            # Job titles A-Z
-            query = query.order_by(asc(Job.title))
-        elif sort_by == 'title_desc':
-            # Job titles Z-A
-            query = query.order_by(desc(Job.title))
-        elif sort_by == 'company_asc':
-            # Company names A-Z
-            query = query.order_by(asc(Job.company))
-        elif sort_by == 'company_desc':
-            # Company names Z-A
-            query = query.order_by(desc(Job.company))
-        else:
-            # Default sorting: newest jobs first
-            query = query.order_by(desc(Job.posting_date))
-        
-        # Count total jobs before pagination (for debugging)
-        total_count = query.count()
-        print(f"Total jobs found: {total_count}")
+        params = parse_job_list_args(request.args)
+        page = params['page']
+        per_page = params['per_page']
+        
+        # Optional in-memory read engine - answers without touching the database
+        # (falls back to SQL below while it is still loading, or for enriched filters)
+        in_memory = not uses_enriched_filters(params)
+        if in_memory and current_app.config['READ_ENGINE'] == 'columnar':
+            from engines.columnar import get_columnar_catalog
+            catalog = get_columnar_catalog(current_app._get_current_object())
+            if catalog is not None:
+                total_count, jobs_dict = catalog.query(params)
+                return jsonify(build_page_response(jobs_dict, total_count, page, per_page)), 200
+        
+        # Or a memory-mapped snapshot file (used until the first one has been built)
+        snapshot = get_snapshot() if in_memory else None
+        if snapshot is not None:
+            total_count, jobs_dict = snapshot.query(params)
+            return jsonify(build_page_response(jobs_dict, total_count, page, per_page)), 200
+        
+        # The hottest pages are pre-rendered files (static_shards.py) - send one if it is up to date
+        response = serve_static_shard('jobs', params)
+        if response is not None:
+            return response
+        
+        def query_jobs():
+            # Start with a basic query to get all jobs, apply the filters and
+            # sorting the user selected and cut out the page (models/job_queries.py)
+            jobs_dict, total_count = query_job_page(Job.query, params)
+            print(f"Total jobs found: {total_count}")
+            print(f"Returning {len(jobs_dict)} jobs for page {page} (per_page: {per_page})")
+            
+            # Return the response with all the pagination info
+            body = build_page_response(jobs_dict, total_count, page, per_page)
+            if page_degraded():
+                body['total_is_estimate'] = True  # the query guard skipped the exact count
+            return body, 200
+        
+        # Identical requests running at the same time share one run of the queries
+        return shared_json_response(('jobs.get_jobs', tuple(sorted(params.items()))), query_jobs)
         
-        # Apply pagination to the query
-        # This splits the results into pages
-        offset = (page - 1) * per_page
-        jobs = query.offset(offset).limit(per_page).all()
-        
-        # Calculate pagination info
-        total_pages = (total_count + per_page - 1) // per_page
-        has_next = page < total_pages
-        has_prev = page > 1
+    except Exception as e:
+        print(f"Error getting jobs: {e}")
+        return jsonify({'error': 'Failed to get jobs'}), 500
+
+def get_snapshot():
+    """
+    The catalog snapshot to answer from (READ_ENGINE=snapshot, see
+    engines/snapshot.py), or None to use the database
+    """
+    if current_app.config['READ_ENGINE'] != 'snapshot':
+        return None
+    from engines.snapshot import get_catalog_snapshot
+    return get_catalog_snapshot(current_app._get_current_object())
+
+def shared_json_response(key, build):
+    """
+    Run build() -> (body, status) once for all identical requests that
+    arrive while it runs, and give each of them the same JSON bytes
+    (see single_flight.py)
+    """
+    flights = current_app.extensions.get('single_flight')
+    
+    def run():
+        body, status = build()
+        return jsonify(body).get_data(), status
+    
+    if flights is None:
+        data, status = run()
+    else:
+        try:
+            # Requests after a write here get a fresh result, never one that started before it
+            data, status = flights.do(key + (local_version(),), run,
+                                      current_app.config['SINGLE_FLIGHT_TIMEOUT_SECONDS'])
+        except SingleFlightTimeout as e:
+            print(f"Error: {e}")
+            response = jsonify({'error': 'The server is busy, try again shortly'})
+            response.status_code = 503
+            response.headers['Retry-After'] = '1'
+            return response
+        except (QueryTimeout, QueryTooExpensive) as e:
+            # Also reaches the requests that waited for the shared run (query_guard.py)
+            print(f"Error: {e}")
+            return error_response(e.code)
+    return current_app.response_class(data, status=status, mimetype='application/json')
+
+def fetch_jobs_by_ids(raw_ids, raw_fields=None):
+    """
+    Load many jobs with a single IN query
+    Jobs come back in the order they were asked for, and ids that don't
+    exist get an inline {'id': ..., 'error': ...} entry in their place
+    (an id asked for twice fills both places, but 'found' and 'missing'
+    count every distinct id once)
+    Returns (body, status code)
+    """
+    # Read the ids (they can come from the URL as strings or from JSON as numbers)
+    try:
+        ids = [int(str(job_id).strip()) for job_id in raw_ids if str(job_id).strip()]
+    except ValueError:
+        return {'error': 'ids must be a comma separated list of integers'}, 400
+    
+    if not ids:
+        return {'error': 'No ids given'}, 400
+    
+    max_ids = current_app.config['JOBS_BATCH_MAX_IDS']
+    if len(ids) > max_ids:
+        return {'error': f'Too many ids - at most {max_ids} jobs can be fetched at once'}, 400
+    
+    # Optional projection: only return (and only read) some of the fields
+    fields = None
+    if raw_fields:
+        if isinstance(raw_fields, str):
+            raw_fields = raw_fields.split(',')
+        fields = [field.strip() for field in raw_fields if field.strip()]
+        unknown = [field for field in fields if field not in JOB_FIELDS]
+        if unknown:
+            return {'error': f"Unknown fields: {', '.join(unknown)}"}, 400
+        # Always include the id so the client can match results up
+        fields = ['id'] + [field for field in fields if field != 'id']
+    
+    # One query for all the jobs (each id once, in the order asked for)
+    distinct_ids = list(dict.fromkeys(ids))
+    query = Job.query.filter(Job.id.in_(distinct_ids))
+    if fields:
+        query = query.options(load_only(*[getattr(Job, field) for field in fields]))
+    jobs_by_id = {job.id: job.to_dict(fields) for job in query.all()}
+    
+    # Put the results back in the order they were requested
+    results = [
+        jobs_by_id[job_id] if job_id in jobs_by_id else {'id': job_id, 'error': 'Job not found'}
+        for job_id in ids
+    ]
+    missing = [job_id for job_id in distinct_ids if job_id not in jobs_by_id]
+    
+    print(f"Fetched {len(jobs_by_id)} of {len(distinct_ids)} jobs by id")
+    
+    return {
+        'jobs': results,
+        'missing': missing,
+        'found': len(jobs_by_id)
+    }, 200
+
+@job_bp.route('/api/jobs/batch', methods=['POST'])
+def get_jobs_batch():
+    """
+    Get many jobs by id in one request
+    Body: {"ids": [3, 1, 2], "fields": ["title", "company"]}  (fields is optional)
+    Same as GET /api/jobs?ids=3,1,2&fields=title,company but for long id lists
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        if not isinstance(data.get('ids'), list):
+            return jsonify({'error': 'ids must be a list'}), 400
         
-        # Convert job objects to dictionaries for JSON response
-        jobs_dict = [job.to_dict() for job in jobs]
-        print(f"Returning {len(jobs_dict)} jobs for page {page} (per_page: {per_page})")
-        
-        # Return the response with all the pagination info
-        return jsonify({
-            'jobs': jobs_dict,
-            'total': total_count,
-            'pages': total_pages,
-            'current_page': page,
-            'per_page': per_page,
-            'has_next': has_next,
-            'has_prev': has_prev
-        }), 200
+        body, status = fetch_jobs_by_ids(data['ids'], data.get('fields'))
+        return jsonify(body), status
         
     except Exception as e:
-        print(f"Error getting jobs: {e}")
+        print(f"Error getting jobs batch: {e}")
         return jsonify({'error': 'Failed to get jobs'}), 500
 
 @job_bp.route('/api/jobs/<int:job_id>', methods=['GET'])
@@ -119,6 +199,12 @@ def get_job(job_id):
     This is used when the frontend wants to show details of one specific job
     """
     try:
+        # Jobs newer than the snapshot are still looked up in the database
+        snapshot = get_snapshot()
+        job_dict = snapshot.get(job_id) if snapshot is not None else None
+        if job_dict is not None:
+            return jsonify(job_dict), 200
+        
         # Try to find the job with the given ID
         job = Job.query.get_or_404(job_id)
         
@@ -129,6 +215,39 @@ def get_job(job_id):
         print(f"Error getting job {job_id}: {e}")
         return jsonify({'error': str(e)}), 500
 
+@job_bp.route('/api/jobs/<int:job_id>/similar', methods=['GET'])
+def get_similar_jobs(job_id):
+    """
+    Get the jobs most similar to this one (precomputed, see engines/similarity.py)
+    Optional ?limit= (default and max SIMILAR_JOBS_K)
+    """
+    try:
+        from models.job_similarity import JobSimilarity
+        from retention import active_jobs_filter
+        max_similar = current_app.config['SIMILAR_JOBS_K']
+        limit = min(max(request.args.get('limit', max_similar, type=int), 0), max_similar)
+
+        # One lookup on the job_similarities primary key, joined to the (still active) jobs
+        rows = (
+            db.session.query(Job, JobSimilarity.score)
+            .join(JobSimilarity, JobSimilarity.similar_job_id == Job.id)
+            .filter(JobSimilarity.job_id == job_id, active_jobs_filter())
+            .order_by(JobSimilarity.score.desc(), Job.id)
+            .limit(limit)
+            .all()
+        )
+
+        # No neighbours might also mean there is no such job
+        if not rows and db.session.get(Job, job_id) is None:
+            return jsonify({'error': 'Job not found'}), 404
+
+        similar = [dict(job.to_dict(), score=round(score, 4)) for job, score in rows]
+        return jsonify({'job_id': job_id, 'similar': similar}), 200
+
+    except Exception as e:
+        print(f"Error getting similar jobs for job {job_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @job_bp.route('/api/jobs', methods=['POST'])
 def create_job():
     """
@@ -143,8 +262,14 @@ def create_job():
         if not data or not data.get('title') or not data.get('company') or not data.get('location'):
             return jsonify({'error': 'Title, company, and location are required'}), 400
         
-        # Create a new job object
-        new_job = Job(
+        # Optional expiry date for the posting (ISO format)
+        try:
+            expires_at = parse_optional_date(data.get('expires_at'))
+        except ValueError:
+            return jsonify({'error': 'expires_at must be an ISO date'}), 400
+        
+        # The values of the new job
+        fields = dict(
             title=data.get('title'),
             company=data.get('company'),
             location=data.get('location'),
@@ -153,19 +278,33 @@ def create_job():
             salary_range=data.get('salary_range', 'Not specified'),
             description=data.get('description', ''),
             tags=data.get('tags', ''),
-            posting_date=datetime.now()
+            posting_date=datetime.now(),
+            expires_at=expires_at
         )
         
-        # Add the job to the database
-        db.session.add(new_job)
-        db.session.commit()
-        
-        print(f"Created new job: {new_job.title} at {new_job.company}")
+        writer = current_app.extensions.get('group_commit')
+        if writer is not None:
+            # Saved together with the other jobs posted right now (see group_commit.py)
+            job_dict = writer.submit(fields)
+        else:
+            # Add the job to the database
+            new_job = Job(**fields)
+            db.session.add(new_job)
+            db.session.flush()  # gives the job its id
+            
+            # Mark it if it is a repost of a job we already have (see dedupe.py)
+            # (imported here: dedupe loads numpy, which workers shouldn't pay for on startup)
+            from dedupe import flag_duplicates
+            flag_duplicates(db.session, [new_job])
+            db.session.commit()
+            job_dict = new_job.to_dict()
+        
+        print(f"Created new job: {job_dict['title']} at {job_dict['company']}")
         
         # Return the created job
         return jsonify({
             'message': 'Job created successfully',
-            'job': new_job.to_dict()
+            'job': job_dict
         }), 201
         
     except Exception as e:
@@ -218,21 +357,147 @@ def update_job(job_id):
         print(f"Error updating job {job_id}: {e}")
         return jsonify({'error': str(e)}), 500
 
+# Fields a PATCH request is allowed to change
+PATCHABLE_FIELDS = [
+    'title', 'company', 'location', 'job_type', 'experience_level',
+    'salary_range', 'description', 'tags', 'expires_at'
+]
+
+def parse_optional_date(value):
+    """
+    Parse an optional ISO date sent by the client (None/empty stays None)
+    Raises ValueError if it can't be parsed
+    """
+    if not value:
+        return None
+    return datetime.fromisoformat(str(value).replace('Z', ''))
+
+def read_expected_version(data):
+    """
+    Get the version (updated_at) the client thinks the job is at
+    It can be sent as an If-Match header or as updated_at in the body
+    Returns None if the client didn't send one
+    """
+    expected = request.headers.get('If-Match') or (data or {}).get('updated_at')
+    if not expected:
+        return None
+    # ETags are quoted, ISO dates from JavaScript may end with Z
+    expected = expected.strip().strip('"').replace('Z', '')
+    return datetime.fromisoformat(expected)
+
+def version_conflict_or_missing(job_id):
+    """
+    Called when an UPDATE/DELETE matched no rows: was the job missing,
+    or did its version not match? (only runs on this failure path)
+    """
+    exists = db.session.execute(select(Job.id).where(Job.id == job_id)).first()
+    if exists is None:
+        return jsonify({'error': 'Resource not found'}), 404
+    return jsonify({'error': 'Job was changed by someone else - reload it and try again'}), 409
+
+@job_bp.route('/api/jobs/<int:job_id>', methods=['PATCH'])
+def patch_job(job_id):
+    """
+    Update only the fields that were sent, in one UPDATE ... RETURNING statement
+    Send the job's updated_at (If-Match header or in the body) to make sure
+    nobody else changed it in the meantime - returns 409 if they did
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        
+        try:
+            expected_version = read_expected_version(data)
+        except ValueError:
+            return jsonify({'error': 'updated_at / If-Match must be an ISO date'}), 400
+        
+        # Only the supplied columns go into the UPDATE
+        changes = {field: data[field] for field in PATCHABLE_FIELDS if field in data}
+        if not changes:
+            return jsonify({'error': f"Nothing to update - send at least one of: {', '.join(PATCHABLE_FIELDS)}"}), 400
+        
+        # Title, company and location can't be blanked out
+        for field in ('title', 'company', 'location'):
+            if field in changes and not changes[field]:
+                return jsonify({'error': f'{field} cannot be empty'}), 400
+        
+        # Tags can be sent as a list, we store them comma separated
+        if isinstance(changes.get('tags'), list):
+            changes['tags'] = ', '.join(changes['tags'])
+        
+        # expires_at can be set to a date, or to null to remove the expiry
+        if 'expires_at' in changes:
+            try:
+                changes['expires_at'] = parse_optional_date(changes['expires_at'])
+            except ValueError:
+                return jsonify({'error': 'expires_at must be an ISO date'}), 400
+        
+        changes['updated_at'] = datetime.utcnow()
+        
+        # Single round trip: no SELECT before the UPDATE
+        statement = update(Job).where(Job.id == job_id)
+        if expected_version is not None:
+            statement = statement.where(Job.updated_at == expected_version)
+        statement = statement.values(**changes).returning(*Job.__table__.columns)
+        
+        row = db.session.execute(statement, execution_options={'synchronize_session': False}).first()
+        if row is None:
+            db.session.rollback()
+            return version_conflict_or_missing(job_id)
+        
+        db.session.commit()
+        
+        job_dict = job_row_to_dict(row)
+        publish_job_changes([('update', job_dict)])
+        print(f"Patched job {job_id}: {', '.join(field for field in changes if field != 'updated_at')}")
+        
+        response = jsonify({
+            'message': 'Job updated successfully',
+            'job': job_dict
+        })
+        # The new version, for the next If-Match
+        response.headers['ETag'] = f'"{job_dict["updated_at"]}"'
+        return response, 200
+        
+    except Exception as e:
+        # Rollback on error
+        db.session.rollback()
+        print(f"Error patching job {job_id}: {e}")
+        return jsonify({'error': 'Failed to update job'}), 500
+
 @job_bp.route('/api/jobs/<int:job_id>', methods=['DELETE'])
 def delete_job(job_id):
     """
     Delete a job
     This is called when the user clicks the delete button
+    Runs a single DELETE ... RETURNING (no SELECT first); an optional
+    If-Match header makes it only delete the version the client saw
     """
     try:
-        # Find the job to delete
-        job = Job.query.get_or_404(job_id)
-        
-        # Delete it from the database
-        db.session.delete(job)
+        try:
+            expected_version = read_expected_version(None)
+        except ValueError:
+            return jsonify({'error': 'If-Match must be an ISO date'}), 400
+        
+        # Delete it from the database in one statement
+        statement = delete(Job).where(Job.id == job_id)
+        if expected_version is not None:
+            statement = statement.where(Job.updated_at == expected_version)
+        statement = statement.returning(*Job.__table__.columns)
+        
+        row = db.session.execute(statement, execution_options={'synchronize_session': False}).first()
+        if row is None:
+            db.session.rollback()
+            return version_conflict_or_missing(job_id)
+        
+        # Its near-duplicate signature goes with it (see dedupe.py)
+        from dedupe import remove_signatures
+        remove_signatures(db.session, [job_id])
         db.session.commit()
+        publish_job_changes([('delete', job_row_to_dict(row))])
         
-        print(f"Deleted job {job_id}: {job.title}")
+        print(f"Deleted job {job_id}: {row.title}")
         
         # Return success message
         return jsonify({'message': 'Job deleted successfully'}), 200
@@ -250,58 +515,92 @@ def get_filters():
     This helps the frontend populate the filter dropdowns
     """
     try:
-        # Provide comprehensive job types instead of just what's in the database
-        # This ensures users can filter by all possible job types
-        comprehensive_job_types = [
-            'Full-time',
-            'Part-time',
-            'Contract',
-            'Internship',
-            'Temporary',
-            'Freelance',
-            'Remote',
-            'Hybrid',
-            'On-site'
-        ]
-        
-        # Get all unique job types from the database (for existing jobs)
-        db_job_types = db.session.query(Job.job_type).distinct().all()
-        db_job_types = [job_type[0] for job_type in db_job_types if job_type[0]]
-        
-        # Combine comprehensive list with database job types
-        all_job_types = list(set(comprehensive_job_types + db_job_types))
-        all_job_types.sort()  # Sort alphabetically
-        
-        # Get all unique locations
-        locations = db.session.query(Job.location).distinct().all()
-        locations = [location[0] for location in locations if location[0]]
-        
-        # Get all unique tags
-        all_tags = []
-        jobs = Job.query.all()
-        for job in jobs:
-            if job.tags:
-                # Split tags by comma and add each one
-                tags = [tag.strip() for tag in job.tags.split(',')]
-                all_tags.extend(tags)
-        
-        # Remove duplicates and sort
-        unique_tags = sorted(list(set(all_tags)))
-        
-        print(f"Filter options - Job types: {len(all_job_types)}, Locations: {len(locations)}, Tags: {len(unique_tags)}")
-        print(f"Available job types: {all_job_types}")
-        
-        # Return all the filter options
-        return jsonify({
-            'job_types': all_job_types,
-            'locations': locations,
-            'tags': unique_tags
-        }), 200
+        snapshot = get_snapshot()
+        if snapshot is not None:
+            return jsonify(snapshot.filter_options()), 200
+        
+        response = serve_static_shard('filters', {})
+        if response is not None:
+            return response
+        
+        def query_filters():
+            # Get the distinct job types, locations and tags from the database and
+            # combine them with the comprehensive job types list
+            options = query_filter_options(db.session)
+            all_job_types = options['job_types']
+            
+            print(f"Filter options - Job types: {len(all_job_types)}, Locations: {len(options['locations'])}, Tags: {len(options['tags'])}")
+            print(f"Available job types: {all_job_types}")
+            
+            # Return all the filter options
+            return options, 200
+        
+        # Many FilterBars loading at once share one run of the queries
+        return shared_json_response(('jobs.get_filters',), query_filters)
         
     except Exception as e:
         print(f"Error getting filters: {e}")
         return jsonify({'error': str(e)}), 500
 
+@job_bp.route('/api/jobs/facets', methods=['GET'])
+def get_facets():
+    """
+    How many jobs each filter option would give within the current selection
+    Takes the same filter parameters as get_jobs; every facet is counted with
+    the other filters applied, e.g. {"total": 12, "job_types": {"Contract": 3, ...},
+    "locations": {...}, "tags": {...}}. Options with no jobs are left out.
+    """
+    try:
+        from engines.facets import get_facet_index, search_job_ids, count_facets_with_sql
+        params = parse_job_list_args(request.args)
+
+        # Use the bitmap index when it is ready (and can apply the filters), otherwise count with SQL
+        index = get_facet_index(current_app._get_current_object()) if not uses_enriched_filters(params) else None
+        if index is not None:
+            search_ids = search_job_ids(db.session, params['search']) if params['search'] else None
+            facets = index.counts(params, search_ids)
+        else:
+            facets = count_facets_with_sql(db.session, params)
+
+        return jsonify(facets), 200
+
+    except Exception as e:
+        print(f"Error getting facets: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@job_bp.route('/api/suggest', methods=['GET'])
+def suggest():
+    """
+    Autocomplete for the search box
+    ?q=pric returns the most common titles, companies, locations and tags
+    with a word starting with "pric". Optional: field=title|company|location|tags,
+    limit (max 10) and typos=true to also allow one typo.
+    """
+    try:
+        from engines.suggest import FIELDS, TOP_K, get_suggest_index, suggest_with_sql
+        query = request.args.get('q', '')
+        field = request.args.get('field') or None
+        limit = request.args.get('limit', TOP_K, type=int)
+        typos = request.args.get('typos', 'false').lower() == 'true'
+
+        if field == 'tag':
+            field = 'tags'
+        if field is not None and field not in FIELDS:
+            return jsonify({'error': f"field must be one of: {', '.join(FIELDS)}"}), 400
+
+        # Use the in-memory index when it is ready, otherwise ask the database
+        index = get_suggest_index(current_app._get_current_object())
+        if index is not None:
+            suggestions = index.suggest(query, field, limit, typos)
+        else:
+            suggestions = suggest_with_sql(db.session, query, field, limit)
+
+        return jsonify({'query': query, 'suggestions': suggestions}), 200
+
+    except Exception as e:
+        print(f"Error getting suggestions: {e}")
+        return jsonify({'error': str(e)}), 500
+
 # Error handlers for common HTTP errors
 @job_bp.errorhandler(404)
 def not_found(error):
@@ -0,0 +1,153 @@
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import update, delete, func
+from datetime import datetime
+from models.job import Job
+from models.job_queries import build_page_response
+from models.saved_search import SavedSearch, SavedSearchMatch, SAVED_SEARCH_FILTERS
+from db import db
+
+# Saved searches and their inboxes of matching jobs
+# Matching happens when jobs are added (see engines/percolator.py)
+saved_search_bp = Blueprint('saved_searches', __name__)
+
+def _percolator():
+    """
+    The running percolator of this process, if it has been loaded
+    """
+    alerts = current_app.extensions.get('saved_search_alerts')
+    return alerts.percolator if alerts is not None else None
+
+@saved_search_bp.route('/api/saved-searches', methods=['GET'])
+def get_saved_searches():
+    """
+    List the saved searches, with how many unread matches each has
+    """
+    try:
+        unread = dict(
+            db.session.query(SavedSearchMatch.saved_search_id, func.count())
+            .filter(SavedSearchMatch.read_at.is_(None))
+            .group_by(SavedSearchMatch.saved_search_id)
+            .all()
+        )
+        searches = SavedSearch.query.order_by(SavedSearch.id).all()
+        return jsonify([dict(search.to_dict(), unread=unread.get(search.id, 0)) for search in searches]), 200
+
+    except Exception as e:
+        print(f"Error getting saved searches: {e}")
+        return jsonify({'error': 'Failed to get saved searches'}), 500
+
+@saved_search_bp.route('/api/saved-searches', methods=['POST'])
+def create_saved_search():
+    """
+    Save a search - body: {"name": ..., "job_type", "location", "tags", "search"}
+    (the same filters as GET /api/jobs; at least one is needed)
+    From now on every new job that matches it goes to its inbox
+    """
+    try:
+        data = request.get_json() or {}
+        filters = {name: str(data[name]).strip() for name in SAVED_SEARCH_FILTERS if data.get(name)}
+        filters = {name: value for name, value in filters.items() if value and value.lower() != 'all'}
+        if not data.get('name') or not filters:
+            return jsonify({'error': 'A name and at least one filter are required'}), 400
+
+        saved_search = SavedSearch(name=data['name'], **filters)
+        db.session.add(saved_search)
+        db.session.commit()
+
+        percolator = _percolator()
+        if percolator is not None:
+            percolator.add(saved_search.id, saved_search.filters())
+
+        print(f"Saved search {saved_search.id}: {saved_search.name}")
+        return jsonify({'message': 'Search saved', 'saved_search': saved_search.to_dict()}), 201
+
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error saving search: {e}")
+        return jsonify({'error': 'Failed to save search'}), 500
+
+@saved_search_bp.route('/api/saved-searches/<int:search_id>', methods=['DELETE'])
+def delete_saved_search(search_id):
+    """
+    Delete a saved search and its inbox
+    """
+    try:
+        deleted = db.session.execute(delete(SavedSearch).where(SavedSearch.id == search_id)).rowcount
+        if not deleted:
+            db.session.rollback()
+            return jsonify({'error': 'Saved search not found'}), 404
+        db.session.execute(delete(SavedSearchMatch).where(SavedSearchMatch.saved_search_id == search_id))
+        db.session.commit()
+
+        percolator = _percolator()
+        if percolator is not None:
+            percolator.remove(search_id)
+
+        return jsonify({'message': 'Saved search deleted'}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error deleting saved search {search_id}: {e}")
+        return jsonify({'error': 'Failed to delete saved search'}), 500
+
+@saved_search_bp.route('/api/saved-searches/<int:search_id>/matches', methods=['GET'])
+def get_saved_search_matches(search_id):
+    """
+    The inbox: jobs that matched the search, newest match first
+    Optional ?unread=true, page and per_page like GET /api/jobs
+    """
+    try:
+        if db.session.get(SavedSearch, search_id) is None:
+            return jsonify({'error': 'Saved search not found'}), 404
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+
+        # Jobs deleted since they matched simply drop out of the join
+        query = (
+            db.session.query(Job, SavedSearchMatch.matched_at, SavedSearchMatch.read_at)
+            .join(SavedSearchMatch, SavedSearchMatch.job_id == Job.id)
+            .filter(SavedSearchMatch.saved_search_id == search_id)
+        )
+        if request.args.get('unread', 'false').lower() == 'true':
+            query = query.filter(SavedSearchMatch.read_at.is_(None))
+        total_count = query.count()
+        rows = (
+            query.order_by(SavedSearchMatch.matched_at.desc(), Job.id.desc())
+            .offset((page - 1) * per_page).limit(per_page).all()
+        )
+
+        jobs_dict = [
+            dict(job.to_dict(), matched_at=matched_at.isoformat(), read=read_at is not None)
+            for job, matched_at, read_at in rows
+        ]
+        return jsonify(build_page_response(jobs_dict, total_count, page, per_page)), 200
+
+    except Exception as e:
+        print(f"Error getting matches of saved search {search_id}: {e}")
+        return jsonify({'error': 'Failed to get matches'}), 500
+
+@saved_search_bp.route('/api/saved-searches/<int:search_id>/matches/read', methods=['POST'])
+def mark_matches_read(search_id):
+    """
+    Mark matches as read - body {"job_ids": [...]}, or no body for all of them
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        statement = (
+            update(SavedSearchMatch)
+            .where(SavedSearchMatch.saved_search_id == search_id, SavedSearchMatch.read_at.is_(None))
+            .values(read_at=datetime.utcnow())
+        )
+        if data.get('job_ids') is not None:
+            statement = statement.where(SavedSearchMatch.job_id.in_([int(job_id) for job_id in data['job_ids']]))
+        marked = db.session.execute(statement).rowcount
+        db.session.commit()
+        return jsonify({'marked_read': marked}), 200
+
+    except (TypeError, ValueError):
+        db.session.rollback()
+        return jsonify({'error': 'job_ids must be a list of numbers'}), 400
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error marking matches of saved search {search_id} as read: {e}")
+        return jsonify({'error': 'Failed to mark matches as read'}), 500
@@ -0,0 +1,161 @@
+from flask import Blueprint, request, jsonify
+from sqlalchemy import select, func
+from datetime import datetime, date, timedelta
+from models.job_rollup import JobRollup
+from rollups import ALL, DIMENSIONS
+from db import db
+
+# Market reports: job postings counted per day, company, tag, ...
+# Everything here reads the job_rollups table (see rollups.py), never the jobs table
+stats_bp = Blueprint('stats', __name__)
+
+# URL names of the dimensions that can be ranked: /api/stats/companies, ...
+RANKED_DIMENSIONS = {
+    'companies': 'company',
+    'tags': 'tag',
+    'job-types': 'job_type',
+    'locations': 'location',
+    'experience-levels': 'experience_level',
+}
+INTERVALS = ('day', 'week', 'month')
+DEFAULT_RANGE_DAYS = 365
+MAX_LIMIT = 500
+
+def parse_date_range(args):
+    """
+    The from/to dates of a stats request (ISO dates, both included)
+    Defaults to the last DEFAULT_RANGE_DAYS days; raises ValueError if they can't be read
+    """
+    end = date.fromisoformat(args['to']) if args.get('to') else datetime.utcnow().date()
+    start = date.fromisoformat(args['from']) if args.get('from') else end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if start > end:
+        raise ValueError('from must not be after to')
+    return start, end
+
+def interval_start(day, interval):
+    """First day of the day/week (Monday)/month that `day` falls in"""
+    if interval == 'week':
+        return day - timedelta(days=day.weekday())
+    if interval == 'month':
+        return day.replace(day=1)
+    return day
+
+def interval_starts(start, end, interval):
+    """Every interval in the range, so intervals without postings show up as 0"""
+    starts = []
+    current = interval_start(start, interval)
+    while current <= end:
+        starts.append(current)
+        if interval == 'month':
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            current += timedelta(days=7 if interval == 'week' else 1)
+    return starts
+
+@stats_bp.route('/api/stats/postings', methods=['GET'])
+def get_posting_stats():
+    """
+    Job postings over time
+    ?from=&to= (ISO dates, default: the last year), ?interval=day|week|month,
+    and optionally one of company=, tag=, job_type=, location=, experience_level=
+    """
+    try:
+        try:
+            start, end = parse_date_range(request.args)
+        except ValueError as e:
+            return jsonify({'error': f'Invalid date range: {e}'}), 400
+        interval = request.args.get('interval', 'day')
+        if interval not in INTERVALS:
+            return jsonify({'error': f"interval must be one of: {', '.join(INTERVALS)}"}), 400
+
+        # Only one dimension at a time - the rollups count each one separately
+        filters = [name for name in DIMENSIONS if request.args.get(name)]
+        if len(filters) > 1:
+            return jsonify({'error': f"Filter by at most one of: {', '.join(DIMENSIONS)}"}), 400
+        dimension = filters[0] if filters else ALL
+        value = request.args.get(dimension, '') if filters else ''
+
+        rows = db.session.execute(
+            select(JobRollup.day, JobRollup.jobs)
+            .where(JobRollup.dimension == dimension, JobRollup.value == value, JobRollup.day.between(start, end))
+        ).all()
+        series = dict.fromkeys(interval_starts(start, end, interval), 0)
+        for day, jobs in rows:
+            series[interval_start(day, interval)] += jobs
+
+        return jsonify({
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'interval': interval,
+            'dimension': dimension,
+            'value': value or None,
+            'total': sum(series.values()),
+            'series': [{'date': day.isoformat(), 'jobs': jobs} for day, jobs in series.items()]
+        }), 200
+
+    except Exception as e:
+        print(f"Error getting posting stats: {e}")
+        return jsonify({'error': 'Failed to get stats'}), 500
+
+@stats_bp.route('/api/stats/salaries', methods=['GET'])
+def get_salary_stats():
+    """
+    How many postings fall in each salary band (by the lower end of the range)
+    ?from=&to= as for /api/stats/postings
+    """
+    try:
+        try:
+            start, end = parse_date_range(request.args)
+        except ValueError as e:
+            return jsonify({'error': f'Invalid date range: {e}'}), 400
+
+        rows = db.session.execute(
+            select(JobRollup.value, func.sum(JobRollup.jobs))
+            .where(JobRollup.dimension == 'salary_band', JobRollup.day.between(start, end))
+            .group_by(JobRollup.value)
+        ).all()
+        bands = sorted(
+            ({'min': int(band.split('-')[0]), 'max': int(band.split('-')[1]), 'jobs': int(jobs)} for band, jobs in rows),
+            key=lambda band: band['min']
+        )
+        return jsonify({'from': start.isoformat(), 'to': end.isoformat(), 'bands': bands}), 200
+
+    except Exception as e:
+        print(f"Error getting salary stats: {e}")
+        return jsonify({'error': 'Failed to get stats'}), 500
+
+@stats_bp.route('/api/stats/<name>', methods=['GET'])
+def get_ranked_stats(name):
+    """
+    The values of one dimension with the most postings
+    /api/stats/companies, tags, job-types, locations or experience-levels
+    ?from=&to= as for /api/stats/postings, ?limit= (default 20)
+    """
+    try:
+        dimension = RANKED_DIMENSIONS.get(name)
+        if dimension is None:
+            return jsonify({'error': f"Unknown stats - use one of: postings, salaries, {', '.join(RANKED_DIMENSIONS)}"}), 404
+        try:
+            start, end = parse_date_range(request.args)
+        except ValueError as e:
+            return jsonify({'error': f'Invalid date range: {e}'}), 400
+        limit = min(max(request.args.get('limit', 20, type=int), 1), MAX_LIMIT)
+
+        jobs = func.sum(JobRollup.jobs).label('jobs')
+        rows = db.session.execute(
+            select(JobRollup.value, jobs)
+            .where(JobRollup.dimension == dimension, JobRollup.day.between(start, end))
+            .group_by(JobRollup.value)
+            .order_by(jobs.desc(), JobRollup.value)
+            .limit(limit)
+        ).all()
+        return jsonify({
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'dimension': dimension,
+            'values': [{'value': value, 'jobs': int(count)} for value, count in rows]
+        }), 200
+
+    except Exception as e:
+        print(f"Error getting {name} stats: {e}")
+        return jsonify({'error': 'Failed to get stats'}), 500
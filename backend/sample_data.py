@@ -19,14 +19,22 @@ def create_sample_jobs():
     """
     try:
         # Import the database and models
-        from db import db
+        from db import db, test_database_connection
         from models.job import Job
         from app import create_app
+        from dedupe import flag_duplicates
         
         # Create the Flask app
         app = create_app()
         
         with app.app_context():
+            # Test database connection first
+            if not test_database_connection():
+                print("Database connection failed!")
+                print("Please check your database configuration")
+                return
+            print("Database connection successful!")
+            
             # Check if jobs already exist
             existing_jobs = Job.query.count()
             if existing_jobs > 0:
@@ -101,6 +109,8 @@ def create_sample_jobs():
                 try:
                     job = Job(**job_data)
                     db.session.add(job)
+                    db.session.flush()
+                    flag_duplicates(db.session, [job])
                     db.session.commit()
                     print(f"Added job {i}: {job_data['title']} at {job_data['company']}")
                     jobs_added += 1
@@ -122,14 +132,8 @@ def main():
     print("=" * 50)
     
     try:
-        # Test database connection first
-        from db import test_database_connection
-        if test_database_connection():
-            print("Database connection successful!")
-            create_sample_jobs()
-        else:
-            print("Database connection failed!")
-            print("Please check your database configuration")
+        # The connection is tested inside create_sample_jobs, once the app exists
+        create_sample_jobs()
             
     except Exception as e:
         print(f"Error: {e}")
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+
+# Single-flight request coalescing
+# When many identical requests arrive at the same time (everyone opening the
+# front page, every FilterBar loading the filter options), only the first one
+# runs the database queries. The others wait for it and get the same result,
+# already serialised to JSON. Keys are the endpoint plus its normalised
+# parameters plus the dataset version, so a request that arrives after a write
+# never gets a result from before it. Nothing is cached: once a query is done
+# the next request runs it again.
+
+class SingleFlightTimeout(Exception):
+    """
+    Waited too long for the identical request that is running
+    """
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls in threads (the Flask app)
+    """
+
+    def __init__(self):
+        self.calls = {}  # key -> _Call running right now
+        self.lock = threading.Lock()
+        self.stats = {'executed': 0, 'shared': 0, 'timeouts': 0}
+
+    def do(self, key, function, timeout):
+        """
+        Return function(), or the result of the call with the same key that
+        is already running. Its exception is raised in every waiting caller;
+        a caller that waits longer than `timeout` seconds gets SingleFlightTimeout.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+                self.stats['executed'] += 1
+            else:
+                call.waiters += 1
+                self.stats['shared'] += 1
+
+        if leader:
+            try:
+                call.result = function()
+            except Exception as e:
+                call.error = e
+            finally:
+                with self.lock:
+                    del self.calls[key]
+                call.done.set()
+        elif not call.done.wait(timeout):
+            with self.lock:
+                self.stats['timeouts'] += 1
+            raise SingleFlightTimeout(f"Timed out after {timeout} s waiting for the same request")
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+class AsyncSingleFlight:
+    """
+    The same for coroutines on one event loop (asgi.py)
+    """
+
+    def __init__(self):
+        self.calls = {}  # key -> asyncio.Task running right now
+        self.stats = {'executed': 0, 'shared': 0, 'timeouts': 0}
+
+    async def do(self, key, make_coroutine, timeout):
+        task = self.calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(make_coroutine())
+            self.calls[key] = task
+            task.add_done_callback(lambda _: self.calls.pop(key, None))
+            self.stats['executed'] += 1
+        else:
+            self.stats['shared'] += 1
+        try:
+            # shield: a caller that gives up (or disconnects) doesn't cancel the query for the others
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            raise SingleFlightTimeout(f"Timed out after {timeout} s waiting for the same request")
+
+def init_single_flight(app):
+    """
+    Coalesce identical concurrent list/filter requests (SINGLE_FLIGHT_ENABLED)
+    """
+    if not app.config['SINGLE_FLIGHT_ENABLED']:
+        return None
+    flights = SingleFlight()
+    app.extensions['single_flight'] = flights
+    return flights
@@ -0,0 +1,20 @@
+import os
+import hashlib
+
+# The parts of the staging file format that the scraper's writer
+# (scraper/staging.py) and the loader (bulk_load.py) must agree on.
+# Both import them from here, so they can't drift apart: a manifest the
+# loader can't find, or a checksum computed differently, would make it load
+# half-finished runs or load the same file twice.
+
+def manifest_path(path):
+    """run-X.ndjson -> run-X.manifest.json"""
+    return os.path.splitext(path)[0] + '.manifest.json'
+
+def file_sha256(path):
+    """Checksum of a staging file (stored in its manifest and in staging_loads)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as staging_file:
+        for block in iter(lambda: staging_file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,315 @@
+import os
+import gzip
+import json
+import time
+import shutil
+import hashlib
+import threading
+from collections import Counter
+from urllib.parse import parse_qsl
+from flask import current_app, request, send_file, jsonify
+
+from events import add_change_listener, db_fingerprint, local_version
+from compression import choose_encoding
+
+# Brotli is optional - without it only .gz copies are written
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Pre-rendered ("static") JSON for the hottest read requests
+# Most traffic is the first pages of the job list in the default order and
+# the filter options, and they only change when jobs are written. So after
+# every change we render them once - the first STATIC_SHARDS_PAGES pages of
+# the lists in STATIC_SHARDS_QUERIES, of the STATIC_SHARDS_POPULAR most
+# requested other lists, and the filter options - into JSON files (plus
+# .gz/.br copies) and send those files straight from disk. With a server
+# that supports it (gunicorn's wsgi.file_wrapper, or http.response.pathsend
+# in asgi.py) the kernel copies the file to the socket (sendfile).
+#
+# Every build goes into its own directory named after the data it was built
+# from (the fingerprint of the jobs table, see events.py), and CURRENT names
+# the directory in use. A file is only sent while the table still has that
+# fingerprint and this process hasn't written since: anything else - and
+# every request that isn't pre-rendered - runs the normal query.
+
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+MAX_TRACKED_QUERIES = 1000  # list queries counted for STATIC_SHARDS_POPULAR
+ENCODING_SUFFIXES = {'gzip': '.gz', 'br': '.br'}
+
+def shard_key(kind, params):
+    """
+    The same key for every request with the same (parsed) parameters
+    kind: 'jobs' (params from parse_job_list_args) or 'filters'
+    """
+    return kind + ':' + json.dumps(sorted(params.items()))
+
+def list_params(query_string):
+    """Parsed GET /api/jobs parameters of a query string like 'per_page=5&sort=title_asc'"""
+    from models.job_queries import parse_job_list_args
+    return parse_job_list_args(dict(parse_qsl(query_string)))
+
+class ShardStore:
+    """
+    The pre-rendered files of one process, and the background rebuilds
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.root = app.config['STATIC_SHARDS_DIR']
+        self.manifest = None  # the build in use
+        self.verified_local_version = None  # local_version() when it was known to match the data
+        self.popular = Counter()  # list queries (without the page) -> requests
+        self.lock = threading.Lock()
+        self.rebuild_wanted = False
+        self.thread = None
+        self.stats = {'hits': 0, 'misses': 0, 'builds': 0}
+
+    # ----------------------------
+    # Serving
+    # ----------------------------
+    def count_request(self, params):
+        """Remember that this list was asked for (for STATIC_SHARDS_POPULAR)"""
+        combo = shard_key('jobs', dict(params, page=1))
+        with self.lock:
+            if combo in self.popular or len(self.popular) < MAX_TRACKED_QUERIES:
+                self.popular[combo] += 1
+
+    def lookup(self, key):
+        """
+        The manifest entry of an up-to-date shard for this key, or None
+        Must be called inside an app context
+        """
+        manifest = self.manifest
+        if manifest is None:
+            self.stats['misses'] += 1
+            self.request_rebuild()  # first request: build (or pick up another process's build)
+            return None
+        entry = manifest['shards'].get(key)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        # Written since (here, or in another process), or too old for the retention rules
+        if (self.verified_local_version != local_version()
+                or db_fingerprint() != manifest['fingerprint']
+                or time.time() - manifest['created_at'] > self.app.config['STATIC_SHARDS_MAX_AGE_SECONDS']):
+            self.stats['misses'] += 1
+            self.request_rebuild()
+            return None
+        self.stats['hits'] += 1
+        return entry
+
+    def shard_path(self, entry, accept_encoding):
+        """
+        (path, encoding or None) of the best copy of a shard for the client
+        """
+        path = os.path.join(self.root, self.manifest['version'], entry['file'])
+        encoding = choose_encoding(accept_encoding or '')
+        if encoding is not None and encoding in entry['encodings']:
+            return path + ENCODING_SUFFIXES[encoding], encoding
+        return path, None
+
+    # ----------------------------
+    # Building
+    # ----------------------------
+    def request_rebuild(self):
+        """
+        Rebuild in the background, after STATIC_SHARDS_DEBOUNCE_SECONDS
+        (changes that come in the meantime are covered by the same build)
+        """
+        with self.lock:
+            self.rebuild_wanted = True
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='static-shards', daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.app.config['STATIC_SHARDS_DEBOUNCE_SECONDS'])
+            with self.lock:
+                if not self.rebuild_wanted:
+                    self.thread = None  # the next request_rebuild() starts a new thread
+                    return
+                self.rebuild_wanted = False
+            try:
+                with self.app.app_context():
+                    if not self.build():
+                        self.request_rebuild()  # the data changed while rendering - try again
+            except Exception as e:
+                print(f"Error building static shards: {e}")
+
+    def queries(self):
+        """The list queries to render: the configured ones, then the most popular others"""
+        combos = [list_params(query) for query in self.app.config['STATIC_SHARDS_QUERIES'].split(';') if query.strip()]
+        keys = {shard_key('jobs', params) for params in combos}
+        with self.lock:
+            popular = [key for key, hits in self.popular.most_common() if hits > 1 and key not in keys]
+        for key in popular[:self.app.config['STATIC_SHARDS_POPULAR']]:
+            combos.append(dict(json.loads(key.split(':', 1)[1])))
+        return combos
+
+    def build(self):
+        """
+        Render every shard for the current data (or adopt a build another
+        process just made). Returns False if the data changed meanwhile.
+        Must be called inside an app context
+        """
+        from db import db
+        from models.job import Job
+        from models.job_queries import query_job_page, build_page_response, query_filter_options
+
+        config = self.app.config
+        started_version = local_version()
+        fingerprint = db_fingerprint(fresh=True)
+        if fingerprint is None:
+            return True  # no database - nothing to render
+
+        current = self._read_manifest(self._current_version())
+        if (current is not None and current['fingerprint'] == fingerprint
+                and time.time() - current['created_at'] < config['STATIC_SHARDS_MAX_AGE_SECONDS']):
+            self._use(current, started_version)
+            return True
+
+        version = f"{int(time.time())}-{hashlib.sha1(fingerprint.encode()).hexdigest()[:12]}"
+        build_dir = os.path.join(self.root, '.tmp-' + version + f'-{os.getpid()}')
+        os.makedirs(build_dir, exist_ok=True)
+        shards = {}
+        try:
+            def write(key, body):
+                data = current_app.json.response(body).get_data()
+                name = hashlib.sha1(key.encode()).hexdigest()[:16] + '.json'
+                encodings = self._write_files(os.path.join(build_dir, name), data)
+                shards[key] = {'file': name, 'size': len(data), 'encodings': encodings,
+                               'etag': hashlib.blake2b(data, digest_size=12).hexdigest()}
+
+            write(shard_key('filters', {}), query_filter_options(db.session))
+            for params in self.queries():
+                for page in range(1, config['STATIC_SHARDS_PAGES'] + 1):
+                    page_params = dict(params, page=page)
+                    jobs_dict, total_count = query_job_page(Job.query, page_params)
+                    write(shard_key('jobs', page_params),
+                          build_page_response(jobs_dict, total_count, page, page_params['per_page']))
+                    if page * page_params['per_page'] >= total_count:
+                        break  # no more pages
+            db.session.rollback()  # end the read transaction before checking again
+
+            # Jobs written while we rendered - the files may mix old and new data
+            if db_fingerprint(fresh=True) != fingerprint or local_version() != started_version:
+                shutil.rmtree(build_dir, ignore_errors=True)
+                return False
+
+            manifest = {'version': version, 'fingerprint': fingerprint, 'created_at': time.time(), 'shards': shards}
+            with open(os.path.join(build_dir, MANIFEST_FILE), 'w') as manifest_file:
+                json.dump(manifest, manifest_file)
+            if os.path.exists(os.path.join(self.root, version)):
+                # Another process built the same data in the same second - use its files
+                shutil.rmtree(build_dir, ignore_errors=True)
+                manifest = self._read_manifest(version) or manifest
+            else:
+                os.rename(build_dir, os.path.join(self.root, version))
+        except Exception:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            raise
+
+        # Point CURRENT at the new build (rename, so readers never see half a file)
+        with open(os.path.join(self.root, CURRENT_FILE + '.tmp'), 'w') as current_file:
+            current_file.write(version)
+        os.replace(os.path.join(self.root, CURRENT_FILE + '.tmp'), os.path.join(self.root, CURRENT_FILE))
+        self._use(manifest, started_version)
+        self.stats['builds'] += 1
+        self._remove_old_builds(keep={version, current['version'] if current else None})
+        print(f"Static shards: {len(shards)} files built ({version})")
+        return True
+
+    def _write_files(self, path, data):
+        """Write the JSON and its compressed copies - returns the encodings written"""
+        with open(path, 'wb') as shard_file:
+            shard_file.write(data)
+        encodings = []
+        if self.app.config['STATIC_SHARDS_PRECOMPRESS']:
+            # Done once per build, so use the best (slowest) levels
+            copies = {'gzip': gzip.compress(data, compresslevel=9)}
+            if brotli is not None:
+                copies['br'] = brotli.compress(data, quality=11)
+            for encoding, compressed in copies.items():
+                if len(compressed) < len(data):
+                    with open(path + ENCODING_SUFFIXES[encoding], 'wb') as shard_file:
+                        shard_file.write(compressed)
+                    encodings.append(encoding)
+        return encodings
+
+    def _use(self, manifest, local_version_seen):
+        self.manifest = manifest
+        self.verified_local_version = local_version_seen
+
+    def _current_version(self):
+        try:
+            with open(os.path.join(self.root, CURRENT_FILE)) as current_file:
+                return current_file.read().strip()
+        except OSError:
+            return None
+
+    def _read_manifest(self, version):
+        if not version:
+            return None
+        try:
+            with open(os.path.join(self.root, version, MANIFEST_FILE)) as manifest_file:
+                return json.load(manifest_file)
+        except (OSError, ValueError):
+            return None
+
+    def _remove_old_builds(self, keep):
+        # The previous build stays - a response may still be sending one of its files
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if os.path.isdir(path) and name not in keep and not name.startswith('.tmp-'):
+                shutil.rmtree(path, ignore_errors=True)
+
+def serve_static_shard(kind, params):
+    """
+    The pre-rendered response for this request, or None to run the query
+    (kind and params as in shard_key)
+    """
+    store = current_app.extensions.get('static_shards')
+    if store is None:
+        return None
+    if kind == 'jobs':
+        store.count_request(params)
+    entry = store.lookup(shard_key(kind, params))
+    if entry is None:
+        return None
+    path, encoding = store.shard_path(entry, request.headers.get('Accept-Encoding'))
+    # send_file hands the open file to the server (sendfile when it can) and answers If-None-Match
+    response = send_file(path, mimetype='application/json', etag=entry['etag'] + (encoding or ''),
+                         conditional=True, max_age=0)
+    response.vary.add('Accept-Encoding')
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['X-Static-Shard'] = 'hit'
+    return response
+
+def init_static_shards(app):
+    """
+    Pre-render the hottest responses (if STATIC_SHARDS_ENABLED)
+    The first build runs in the background when the first request asks for a shard
+    """
+    if not app.config['STATIC_SHARDS_ENABLED']:
+        return None
+    os.makedirs(app.config['STATIC_SHARDS_DIR'], exist_ok=True)
+    store = ShardStore(app)
+    app.extensions['static_shards'] = store
+
+    def rebuild_after_change(changes):
+        store.request_rebuild()
+    add_change_listener(rebuild_after_change)
+
+    # Files served, queries run instead, and the build in use
+    @app.route('/api/static-shards/stats')
+    def static_shard_stats():
+        manifest = store.manifest
+        return jsonify(dict(store.stats, version=manifest['version'] if manifest else None,
+                            shards=len(manifest['shards']) if manifest else 0))
+
+    return store
@@ -0,0 +1,289 @@
+import time
+import json
+import asyncio
+import threading
+from collections import deque, OrderedDict
+from datetime import datetime, timedelta
+
+from config import Config
+from events import add_change_listener, remove_change_listener
+from models.job_queries import job_matches
+
+# Live job changes for GET /api/jobs/stream (Server-Sent Events, see asgi.py)
+# Every committed change in this process reaches the broker through the
+# events.py change listeners; changes made by other processes (the scraper,
+# other workers) are picked up by one background task that looks for jobs
+# with a newer updated_at every STREAM_POLL_SECONDS.
+#
+# Each open stream is an asyncio queue plus a sleeping coroutine - no thread
+# per connection - so thousands of idle clients are cheap. The last
+# STREAM_REPLAY_SIZE events are kept so a client that reconnects with
+# Last-Event-ID gets what it missed.
+
+# Overlap when polling, so a transaction that commits a little after it set
+# updated_at is still seen (events already sent are skipped)
+POLL_OVERLAP = timedelta(seconds=5)
+POLL_BATCH = 1000
+
+# Queued for every client every STREAM_HEARTBEAT_SECONDS (one timer for all
+# connections instead of one each)
+HEARTBEAT = 'heartbeat'
+
+class Subscription:
+    """
+    One open stream: its filters and the queue of events waiting to be sent
+    """
+
+    def __init__(self, params, queue_size, after_id):
+        self.params = params
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.after_id = after_id  # events up to this id were sent already (replay)
+        self.overflowed = False  # the client reads too slowly - it gets a resync
+        self.closed = False
+
+    def filter_key(self):
+        # Subscriptions with the same filters share the matching work
+        return tuple(sorted((name, str(value)) for name, value in self.params.items()))
+
+    def offer(self, event):
+        if event[0] <= self.after_id or self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def close(self):
+        self.closed = True
+        try:
+            self.queue.put_nowait(None)  # wake up next_event()
+        except asyncio.QueueFull:
+            pass
+
+    def heartbeat(self):
+        if self.queue.empty():
+            self.queue.put_nowait(HEARTBEAT)
+
+    async def next_event(self):
+        """
+        The next event, HEARTBEAT, or None once the subscription is closed
+        """
+        return await self.queue.get()
+
+class JobEventBroker:
+    """
+    Numbers job changes, keeps the replay buffer and fans events out to the
+    open streams. publish() can be called from any thread (the Flask routes
+    run in a thread pool); the fan-out itself runs on the event loop.
+    """
+
+    def __init__(self, loop, replay_size=1000, queue_size=100):
+        self.loop = loop
+        self.lock = threading.Lock()
+        # Event ids are "<epoch>-<number>"; the epoch changes on restart so old ids are recognised
+        self.epoch = str(int(time.time()))
+        self.last_id = 0
+        self.replay = deque(maxlen=replay_size)
+        self.queue_size = queue_size
+        self.subscribers = set()
+        # job id -> updated_at of the last event sent for it (so the poller skips what we sent already)
+        self.latest = OrderedDict()
+        self.latest_size = replay_size * 4
+        self.poller = None
+        self.heartbeats = None
+
+    def event_id(self, number):
+        return f"{self.epoch}-{number}"
+
+    def _remember(self, job_id, marker):
+        self.latest[job_id] = marker
+        self.latest.move_to_end(job_id)
+        if len(self.latest) > self.latest_size:
+            self.latest.popitem(last=False)
+
+    def mark_seen(self, jobs):
+        """
+        Remember jobs as already sent (the state they were in when the stream started)
+        """
+        with self.lock:
+            for job in jobs:
+                self._remember(job['id'], job.get('updated_at'))
+
+    def publish(self, changes):
+        """
+        Change listener (see events.py): number the changes and send them out
+        """
+        events = []
+        with self.lock:
+            for action, job in changes:
+                if action == 'archive':
+                    action = 'delete'  # archived jobs leave the listings like deleted ones
+                marker = 'deleted' if action == 'delete' else job.get('updated_at')
+                if self.latest.get(job['id']) == marker:
+                    continue
+                self._remember(job['id'], marker)
+                self.last_id += 1
+                # (number, action, job, SSE message) - formatted once for every client
+                event = (self.last_id, action, job, self._format(self.last_id, action, job))
+                self.replay.append(event)
+                events.append(event)
+        if events and self.subscribers:
+            try:
+                self.loop.call_soon_threadsafe(self._fan_out, events)
+            except RuntimeError:
+                pass  # the event loop has shut down
+
+    def _fan_out(self, events):
+        now = datetime.utcnow()
+        matches = {}
+        for subscription in list(self.subscribers):
+            key = subscription.filter_key()
+            if key not in matches:
+                matches[key] = [
+                    event for event in events
+                    # A deleted job only has to have matched the filters, active or not
+                    if job_matches(event[2], subscription.params, now, check_active=event[1] != 'delete')
+                ]
+            for event in matches[key]:
+                subscription.offer(event)
+
+    def subscribe(self, params, last_event_id=None):
+        """
+        Open a stream. Returns (subscription, backlog) where backlog is the
+        list of missed events for Last-Event-ID, or None when they are no
+        longer in the replay buffer (the client should reload instead)
+        """
+        with self.lock:
+            backlog = self._replay_since(last_event_id) if last_event_id else []
+            # Events published from now on are queued; older ones come from the backlog
+            subscription = Subscription(params, self.queue_size, self.last_id)
+            self.subscribers.add(subscription)
+        if backlog:
+            backlog = [
+                event for event in backlog
+                if job_matches(event[2], params, check_active=event[1] != 'delete')
+            ]
+        return subscription, backlog
+
+    def _replay_since(self, last_event_id):
+        epoch, _, number = last_event_id.partition('-')
+        if epoch != self.epoch or not number.isdigit():
+            return None
+        number = int(number)
+        if number > self.last_id:
+            return None
+        if number == self.last_id:
+            return []
+        oldest = self.replay[0][0] if self.replay else self.last_id + 1
+        if number < oldest - 1:
+            return None  # some of the missed events were dropped already
+        return [event for event in self.replay if event[0] > number]
+
+    def unsubscribe(self, subscription):
+        subscription.close()
+        self.subscribers.discard(subscription)
+
+    def _format(self, number, action, job):
+        """
+        One SSE message: id, event type (create/update/delete) and the job as JSON
+        """
+        data = json.dumps(job, sort_keys=True)
+        return f"id: {self.event_id(number)}\nevent: {action}\ndata: {data}\n\n".encode('utf-8')
+
+    def stats(self):
+        return {
+            'subscribers': len(self.subscribers),
+            'last_event_id': self.event_id(self.last_id),
+            'replay_events': len(self.replay)
+        }
+
+async def send_heartbeats(broker, interval):
+    """
+    Wake every idle stream now and then so it can send a keep-alive
+    """
+    while True:
+        await asyncio.sleep(interval)
+        for subscription in list(broker.subscribers):
+            subscription.heartbeat()
+
+async def poll_database(broker, session_factory, interval):
+    """
+    Publish jobs created/changed by other processes (one query per interval)
+    """
+    from sqlalchemy import select, func, or_, and_
+    from models.job import Job, job_row_to_dict
+
+    async with session_factory() as session:
+        high_water = (await session.execute(select(func.max(Job.updated_at)))).scalar_one()
+        if high_water is not None:
+            # The first polls look back POLL_OVERLAP - these rows are not news
+            rows = (await session.execute(
+                select(Job.id, Job.updated_at).where(Job.updated_at >= high_water - POLL_OVERLAP)
+            )).all()
+            broker.mark_seen(job_row_to_dict(row) for row in rows)
+    # (updated_at, id) of the last row read when a poll returned a full batch
+    cursor = None
+    while True:
+        if cursor is None:
+            await asyncio.sleep(interval)
+        try:
+            async with session_factory() as session:
+                statement = select(*Job.__table__.columns).order_by(Job.updated_at, Job.id).limit(POLL_BATCH)
+                if cursor is not None:
+                    statement = statement.where(or_(
+                        Job.updated_at > cursor[0], and_(Job.updated_at == cursor[0], Job.id > cursor[1])
+                    ))
+                elif high_water is not None:
+                    statement = statement.where(Job.updated_at >= high_water - POLL_OVERLAP)
+                rows = (await session.execute(statement)).all()
+        except Exception as e:
+            print(f"Error polling for job changes: {e}")
+            cursor = None
+            continue
+
+        changes = []
+        for row in rows:
+            # Jobs created since the last look are new, the rest were edited
+            created = high_water is None or (row.created_at is not None and row.created_at >= high_water)
+            changes.append(('create' if created else 'update', job_row_to_dict(row)))
+        broker.publish(changes)
+
+        cursor = (rows[-1].updated_at, rows[-1].id) if len(rows) == POLL_BATCH else None
+        if rows and rows[-1].updated_at is not None and (high_water is None or rows[-1].updated_at > high_water):
+            high_water = rows[-1].updated_at
+
+_broker = None
+
+def get_broker(session_factory):
+    """
+    The broker for this process, created on the first stream request
+    (it needs the running event loop)
+    """
+    global _broker
+    if _broker is None:
+        _broker = JobEventBroker(
+            asyncio.get_running_loop(),
+            replay_size=Config.STREAM_REPLAY_SIZE,
+            queue_size=Config.STREAM_QUEUE_SIZE
+        )
+        add_change_listener(_broker.publish)
+        loop = asyncio.get_running_loop()
+        _broker.poller = loop.create_task(poll_database(_broker, session_factory, Config.STREAM_POLL_SECONDS))
+        _broker.heartbeats = loop.create_task(send_heartbeats(_broker, Config.STREAM_HEARTBEAT_SECONDS))
+        print("Job change stream started")
+    return _broker
+
+async def stop_broker():
+    """
+    Stop the change poller (on server shutdown)
+    """
+    global _broker
+    if _broker is not None:
+        remove_change_listener(_broker.publish)
+        for task in (_broker.poller, _broker.heartbeats):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        _broker = None
@@ -71,6 +71,34 @@ export const jobAPI = {
     }
   },
 
+  // Get the jobs most similar to this one (each has a similarity score)
+  getSimilarJobs: async (jobId, limit = 5) => {
+    try {
+      // Make a GET request to /api/jobs/{id}/similar
+      const response = await api.get(`/jobs/${jobId}/similar`, { params: { limit } });
+      
+      // Return the list of similar jobs
+      return response.data.similar;
+      
+    } catch (error) {
+      throw error;
+    }
+  },
+
+  // Get many jobs by ID in one request (results keep the order of jobIds)
+  getJobsByIds: async (jobIds, fields = null) => {
+    try {
+      // Make a POST request to /api/jobs/batch with the list of IDs
+      const response = await api.post('/jobs/batch', fields ? { ids: jobIds, fields } : { ids: jobIds });
+      
+      // Return the jobs (missing IDs come back as { id, error })
+      return response.data;
+      
+    } catch (error) {
+      throw error;
+    }
+  },
+
   // Create a new job
   createJob: async (jobData) => {
     try {
@@ -99,6 +127,23 @@ export const jobAPI = {
     }
   },
 
+  // Update only some fields of a job
+  // Pass the job's updated_at so the server can reject the change (409)
+  // if someone else edited the job in the meantime
+  patchJob: async (jobId, changes, updatedAt = null) => {
+    try {
+      // Make a PATCH request to /api/jobs/{id} with just the changed fields
+      const headers = updatedAt ? { 'If-Match': `"${updatedAt}"` } : {};
+      const response = await api.patch(`/jobs/${jobId}`, changes, { headers });
+      
+      // Return the response data (contains the updated job)
+      return response.data;
+      
+    } catch (error) {
+      throw error;
+    }
+  },
+
   // Delete a job
   deleteJob: async (jobId) => {
     try {
@@ -122,6 +167,34 @@ export const jobAPI = {
       // Return the filter options
       return response.data;
       
+    } catch (error) {
+      throw error;
+    }
+  },
+
+  // Get how many jobs each filter option would give with the current filters
+  getFacets: async (params = {}) => {
+    try {
+      // Make a GET request to /api/jobs/facets with the same parameters as getJobs
+      const response = await api.get('/jobs/facets', { params });
+      
+      // Return the counts ({ total, job_types, locations, tags })
+      return response.data;
+      
+    } catch (error) {
+      throw error;
+    }
+  },
+
+  // Get autocomplete suggestions for what the user has typed so far
+  getSuggestions: async (query, params = {}) => {
+    try {
+      // Make a GET request to /api/suggest?q=...
+      const response = await api.get('/suggest', { params: { q: query, ...params } });
+      
+      // Return the list of { value, field, count, typo }
+      return response.data.suggestions;
+      
     } catch (error) {
       throw error;
     }
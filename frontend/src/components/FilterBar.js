@@ -1,7 +1,13 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { jobAPI } from '../api';
 import './FilterBar.css';
 
+// Wait this long after the last change before asking for new counts,
+// so typing in the search box sends one request instead of one per key
+const FACETS_DELAY_MS = 250;
+// Same for the autocomplete suggestions
+const SUGGESTIONS_DELAY_MS = 250;
+
 const FilterBar = ({ 
   filters, 
   onSearchChange, 
@@ -15,11 +21,35 @@ const FilterBar = ({
   const [jobTypes, setJobTypes] = useState([]);
   const [locations, setLocations] = useState([]);
   const [tags, setTags] = useState([]);
+  
+  // How many jobs each option gives with the current filters
+  const [facets, setFacets] = useState(null);
+  
+  // Autocomplete suggestions for the search box
+  const [suggestions, setSuggestions] = useState([]);
+
+  // Number of the latest facet request - answers to older ones are dropped
+  const facetsRequest = useRef(0);
+  // Same for the suggestions
+  const suggestionsRequest = useRef(0);
 
   // Load filter options when component loads
   useEffect(() => {
     loadFilterOptions();
   }, []);
+  
+  // Reload the counts when the filters stop changing for FACETS_DELAY_MS
+  useEffect(() => {
+    const timer = setTimeout(loadFacets, FACETS_DELAY_MS);
+    return () => clearTimeout(timer);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [filters.search, filters.job_type, filters.location, filters.tags]);
+  
+  // Reload the suggestions when the user stops typing for SUGGESTIONS_DELAY_MS
+  useEffect(() => {
+    const timer = setTimeout(() => loadSuggestions(filters.search || ''), SUGGESTIONS_DELAY_MS);
+    return () => clearTimeout(timer);
+  }, [filters.search]);
 
   // Function to load filter options from API
   const loadFilterOptions = async () => {
@@ -36,6 +66,52 @@ const FilterBar = ({
       console.error('Error loading filter options:', error);
     }
   };
+  
+  // Function to load the facet counts for the current filters
+  const loadFacets = async () => {
+    const requestNumber = ++facetsRequest.current;
+    try {
+      const data = await jobAPI.getFacets({
+        search: filters.search || undefined,
+        job_type: filters.job_type,
+        location: filters.location,
+        tags: filters.tags
+      });
+      // A newer request was sent while this one was on its way - ignore it
+      if (requestNumber !== facetsRequest.current) return;
+      setFacets(data);
+    } catch (error) {
+      if (requestNumber !== facetsRequest.current) return;
+      // Counts are only a hint - the dropdowns still work without them
+      console.error('Error loading facet counts:', error);
+      setFacets(null);
+    }
+  };
+  
+  // Function to load search suggestions (only after 2 characters)
+  const loadSuggestions = async (query) => {
+    const requestNumber = ++suggestionsRequest.current;
+    if (query.trim().length < 2) {
+      setSuggestions([]);
+      return;
+    }
+    try {
+      const data = await jobAPI.getSuggestions(query, { limit: 8, typos: true });
+      // Suggestions for what the user typed earlier - ignore them
+      if (requestNumber !== suggestionsRequest.current) return;
+      setSuggestions(data);
+    } catch (error) {
+      if (requestNumber !== suggestionsRequest.current) return;
+      console.error('Error loading suggestions:', error);
+      setSuggestions([]);
+    }
+  };
+  
+  // Option label with its count, e.g. "Contract (12)"
+  const optionLabel = (facet, value) => {
+    if (!facets || !facets[facet]) return value;
+    return `${value} (${facets[facet][value] || 0})`;
+  };
 
   // Check if any filters are active
   const hasActiveFilters = () => {
@@ -82,7 +158,14 @@ const FilterBar = ({
               placeholder="Search jobs, companies..."
               value={filters.search || ''}
               onChange={(e) => onSearchChange(e.target.value)}
+              list="search-suggestions"
+              autoComplete="off"
             />
+            <datalist id="search-suggestions">
+              {suggestions.map((suggestion, index) => (
+                <option key={index} value={suggestion.value}>{suggestion.field}</option>
+              ))}
+            </datalist>
             {filters.search && (
               <button 
                 className="search-clear-btn" 
@@ -107,7 +190,7 @@ const FilterBar = ({
           >
             <option value="All">All Types</option>
             {jobTypes.map((type, index) => (
-              <option key={index} value={type}>{type}</option>
+              <option key={index} value={type}>{optionLabel('job_types', type)}</option>
             ))}
           </select>
         </div>
@@ -123,7 +206,7 @@ const FilterBar = ({
           >
             <option value="All">All Locations</option>
             {locations.map((location, index) => (
-              <option key={index} value={location}>{location}</option>
+              <option key={index} value={location}>{optionLabel('locations', location)}</option>
             ))}
           </select>
         </div>
@@ -139,7 +222,7 @@ const FilterBar = ({
           >
             <option value="All">All Tags</option>
             {tags.map((tag, index) => (
-              <option key={index} value={tag}>{tag}</option>
+              <option key={index} value={tag}>{optionLabel('tags', tag)}</option>
             ))}
           </select>
         </div>
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Scraper Browser Profile Benchmark
+Opens the same ActuaryList pages with the full browser profile (every
+image, font and tracker, a new browser each run), the light profile, and
+the light profile on a warm browser. Prints browser startup time, load
+time and bytes per page for each.
+
+Usage: cd scraper && python bench_browser.py --pages 5
+       (needs Chrome and network access; stop the warm browser afterwards
+       with python scrape_simple_fast.py --stop-browser)
+"""
+
+import time
+import argparse
+
+from browser import get_driver, release_driver, wait_for_page, PageLoadStats
+
+BASE_URL = "https://www.actuarylist.com/"
+
+def run(profile, warm, pages):
+    start = time.perf_counter()
+    driver = get_driver(profile, warm=warm)
+    startup = time.perf_counter() - start
+    stats = PageLoadStats()
+    try:
+        for page in range(1, pages + 1):
+            stats.start(driver)
+            driver.get(BASE_URL if page == 1 else f"{BASE_URL}?page={page}")
+            wait_for_page(driver)
+            stats.finish(driver)
+    finally:
+        release_driver(driver)
+    seconds = sum(page[0] for page in stats.pages) / len(stats.pages)
+    size = sum(page[1] for page in stats.pages) / len(stats.pages)
+    return startup, seconds, size
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the scraper browser profiles')
+    parser.add_argument('--pages', type=int, default=5, help='Pages to open with each profile')
+    args = parser.parse_args()
+
+    print("Job Listing Web App - Scraper Browser Profile Benchmark")
+    print("=" * 60)
+    results = []
+    # The first warm run may have to start the browser - the second one shows the reuse
+    for name, profile, warm in [('full, new browser', 'full', False), ('light, new browser', 'light', False),
+                                ('light, warm browser', 'light', True), ('light, warm browser', 'light', True)]:
+        results.append((name,) + run(profile, warm, args.pages))
+
+    print(f"{'profile':22} {'startup s':>10} {'s/page':>8} {'KB/page':>9}")
+    for name, startup, seconds, size in results:
+        print(f"{name:22} {startup:10.2f} {seconds:8.2f} {size / 1024:9.0f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+import os
+import json
+import time
+import shutil
+import signal
+import socket
+import subprocess
+
+# Browser setup for the scraper
+# The scraper only reads the DOM, so the "light" profile tells Chrome not to
+# download images, fonts, media and trackers, and hands the page over as soon
+# as the HTML is parsed (eager page load) instead of waiting for every
+# resource. A "warm" browser is a Chrome that keeps running between scraper
+# runs (started once, reused by every scheduled run), so a run doesn't pay
+# for browser startup and reuses its cache and cookies.
+#
+# Selenium is imported inside the functions (like in scrape_simple_fast.py).
+
+# Resources blocked by the light profile (Chrome's Network.setBlockedURLs patterns)
+BLOCKED_URL_PATTERNS = [
+    # Images
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.avif',
+    # Fonts
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    # Audio/video
+    '*.mp4', '*.webm', '*.mp3', '*.m4a',
+    # Analytics and ads
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*facebook.net*', '*hotjar.com*', '*clarity.ms*', '*segment.com*', '*intercom.io*',
+]
+
+# Stylesheets are kept by default: without them hidden elements become
+# visible and end up in card.text. Set SCRAPER_BLOCK_STYLESHEETS=true to drop them too.
+BLOCK_STYLESHEETS = os.environ.get('SCRAPER_BLOCK_STYLESHEETS', 'false').lower() == 'true'
+
+# Where the warm browser listens and keeps its profile (cache, cookies)
+WARM_BROWSER_ADDRESS = os.environ.get('SCRAPER_BROWSER_ADDRESS', '127.0.0.1:9222')
+WARM_PROFILE_DIR = os.environ.get(
+    'SCRAPER_PROFILE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.browser-profile')
+)
+CHROME_BINARIES = ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome']
+
+# Something on a page that means the job list is there (ActuaryList's,
+# sources pass their own Source.ready_selector)
+READY_SELECTOR = "img[src*='logo'], [class*='job-card'], [class*='job-listing']"
+PAGE_TIMEOUT = 10  # seconds to wait for the job list
+# Longest wait for the old page to go away (the scraper used to always sleep this long)
+NAVIGATION_TIMEOUT = 3
+
+def chrome_flags(light=True):
+    flags = ["--headless", "--disable-gpu", "--window-size=1920,1080"]
+    if light:
+        flags += [
+            "--blink-settings=imagesEnabled=false",
+            "--disable-extensions",
+            "--mute-audio",
+            "--no-first-run",
+        ]
+    return flags
+
+def blocked_url_patterns():
+    return BLOCKED_URL_PATTERNS + (['*.css'] if BLOCK_STYLESHEETS else [])
+
+# ----------------------------
+# Warm browser
+# ----------------------------
+def _split_address(address):
+    host, port = address.rsplit(':', 1)
+    return host, int(port)
+
+def browser_running(address=WARM_BROWSER_ADDRESS):
+    """Is a browser listening for remote control on this address?"""
+    try:
+        with socket.create_connection(_split_address(address), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+def start_warm_browser(address=WARM_BROWSER_ADDRESS, profile_dir=WARM_PROFILE_DIR):
+    """
+    Start a Chrome that outlives this process (light flags, remote debugging on
+    `address`, profile in `profile_dir`). Its pid goes to profile_dir/browser.pid
+    """
+    binary = os.environ.get('SCRAPER_CHROME_BINARY') or next(
+        (path for path in map(shutil.which, CHROME_BINARIES) if path), None
+    )
+    if binary is None:
+        raise RuntimeError("Chrome not found - set SCRAPER_CHROME_BINARY")
+    host, port = _split_address(address)
+    os.makedirs(profile_dir, exist_ok=True)
+    process = subprocess.Popen(
+        [binary, *chrome_flags(light=True),
+         f"--remote-debugging-address={host}", f"--remote-debugging-port={port}",
+         f"--user-data-dir={profile_dir}", "about:blank"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True  # keeps running when the scraper exits
+    )
+    with open(os.path.join(profile_dir, 'browser.pid'), 'w') as pid_file:
+        pid_file.write(str(process.pid))
+
+    deadline = time.monotonic() + 15
+    while not browser_running(address):
+        if process.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError(f"Warm browser did not start on {address}")
+        time.sleep(0.1)
+    print(f"🔥 Warm browser started on {address} (pid {process.pid})")
+    return process.pid
+
+def stop_warm_browser(profile_dir=WARM_PROFILE_DIR):
+    """Stop the warm browser started by start_warm_browser()"""
+    pid_path = os.path.join(profile_dir, 'browser.pid')
+    try:
+        with open(pid_path) as pid_file:
+            pid = int(pid_file.read())
+        os.kill(pid, signal.SIGTERM)
+        print(f" Warm browser stopped (pid {pid})")
+    except (OSError, ValueError):
+        print(" No warm browser running")
+    finally:
+        if os.path.exists(pid_path):
+            os.remove(pid_path)
+
+# ----------------------------
+# Driver
+# ----------------------------
+def get_driver(profile='light', warm=False):
+    """
+    A Chrome WebDriver
+    profile: 'light' (blocks non-essential resources, eager page load) or
+             'full' (loads everything, like a normal browser)
+    warm: attach to the warm browser (started now if it isn't running)
+          instead of starting a new one
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    light = profile == 'light'
+    chrome_options = Options()
+    # Network events in the performance log tell us the bytes each page needed
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    if light:
+        chrome_options.page_load_strategy = 'eager'  # return once the DOM is ready
+
+    if warm:
+        if not browser_running():
+            start_warm_browser()
+        chrome_options.debugger_address = WARM_BROWSER_ADDRESS
+    else:
+        for flag in chrome_flags(light):
+            chrome_options.add_argument(flag)
+
+    driver = webdriver.Chrome(options=chrome_options)
+    driver.warm = warm
+    if light:
+        # Requests for these never leave the browser
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_url_patterns()})
+    return driver
+
+def release_driver(driver):
+    """
+    Done with the driver: quit a one-off browser, leave a warm one running
+    """
+    if getattr(driver, 'warm', False):
+        try:
+            driver.get('about:blank')  # free the page, keep the browser
+        except Exception:
+            pass
+        # Only stop chromedriver - quit() could close the shared browser
+        driver.service.stop()
+    else:
+        driver.quit()
+
+def browser_alive(driver):
+    """Does the browser still answer? (False after Chrome crashed or was killed)"""
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+def wait_for_page(driver, previous=None, timeout=PAGE_TIMEOUT, ready_selector=None):
+    """
+    Wait until the job list is on the page (instead of sleeping a fixed time)
+    ready_selector: CSS selector of something that means it is there (default READY_SELECTOR)
+    previous: an element of the page we navigated away from - waited on to
+    disappear first (at most NAVIGATION_TIMEOUT), so we don't mistake the old
+    page for the new one
+    """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions
+    from selenium.common.exceptions import TimeoutException
+
+    if previous is not None:
+        try:
+            WebDriverWait(driver, NAVIGATION_TIMEOUT).until(expected_conditions.staleness_of(previous))
+        except TimeoutException:
+            pass  # the page may have updated the list in place
+    try:
+        WebDriverWait(driver, timeout).until(
+            lambda d: d.execute_script("return document.readyState") != 'loading'
+            and d.find_elements(By.CSS_SELECTOR, ready_selector or READY_SELECTOR)
+        )
+    except TimeoutException:
+        print(f" Page not ready after {timeout} s - scraping what is there")
+
+# ----------------------------
+# Per-page load time and bytes
+# ----------------------------
+def bytes_transferred(driver):
+    """
+    Bytes downloaded since the last call (read from the performance log)
+    """
+    total = 0
+    for entry in driver.get_log('performance'):
+        message = json.loads(entry['message'])['message']
+        if message['method'] == 'Network.loadingFinished':
+            total += message['params'].get('encodedDataLength', 0)
+    return total
+
+class PageLoadStats:
+    """
+    Load time and bytes of every page the scraper opens
+    """
+
+    def __init__(self):
+        self.pages = []  # (seconds, bytes)
+        self.started = None
+
+    def start(self, driver):
+        bytes_transferred(driver)  # drop what came before
+        self.started = time.perf_counter()
+
+    def finish(self, driver):
+        seconds = time.perf_counter() - self.started
+        size = bytes_transferred(driver)
+        self.pages.append((seconds, size))
+        print(f" Page loaded in {seconds:.2f} s, {size / 1024:.0f} KB")
+
+    def report(self):
+        if not self.pages:
+            return
+        seconds = sum(page[0] for page in self.pages) / len(self.pages)
+        size = sum(page[1] for page in self.pages) / len(self.pages)
+        print(f"📊 {len(self.pages)} pages: {seconds:.2f} s and {size / 1024:.0f} KB per page on average")
@@ -0,0 +1,154 @@
+import re
+from datetime import datetime
+
+# Normalization and dedupe - the stage every source feeds (see sources/base.py)
+# Turns the raw fields a source read from a card into the Job columns the
+# staging file and the loader expect, skips things that aren't real jobs, and
+# drops jobs already seen in this run (on any source). Jobs that are already
+# in the database are dropped later by the loader (backend/bulk_load.py).
+
+# Skip if the job title is actually a company name (common mistake)
+COMPANY_NAMES = [
+    'guardian life', 'swiss re', 'hannover re', 'liberty mutual',
+    'munich re', 'state farm', 'metlife', 'travelers', 'deloitte',
+    'aig', 'wtw', 'scor', 'qbe', 'bupa', 'kpmg', 'isio', 'legal & general'
+]
+GENERIC_COMPANIES = ['logo', 'filters', 'filter', 'search', 'about']
+PAGE_ELEMENTS = ['filters', 'filter', 'find handpicked actuarial jobs', 'search jobs']
+LOCATION_WORDS = ['🇺🇸', '🇬🇧', '🇮🇳', '🇨🇦', '🇩🇪', '🇸🇬', '🇦🇺', 'USA', 'UK', 'Canada']
+
+# Tags guessed from the card's text when the source gives none
+TAG_KEYWORDS = [
+    "health", "life", "pricing", "modelling", "modeling", "p&c",
+    "property", "casualty", "python", "r", "sql", "sas", "data science",
+    "machine learning", "risk", "pension", "retirement", "analytics",
+    "fellow", "associate", "analyst", "actuary", "senior", "manager",
+    "excel", "vba", "power bi", "tableau", "alteryx", "prophet", "axis"
+]
+
+def has_word(text_lower, word):
+    """Is `word` in the text as a whole word? ("r" in "reserving" is not)"""
+    return re.search(r'(?<![\w&])' + re.escape(word) + r'(?![\w&])', text_lower) is not None
+
+def clean_location_text(location):
+    """Clean location text by removing emojis and salary information"""
+    if not location:
+        return location
+
+    # Remove emojis and special characters
+    cleaned = re.sub(r'[^\w\s\-.,()]', '', location)
+
+    # Remove salary-related patterns
+    salary_patterns = [
+        r'\$[\d,]+(?:-\$[\d,]+)?',  # $50k-$100k
+        r'💰\s*\$[\d,]+(?:-\$[\d,]+)?',  # 💰 $50k-$100k
+        r'[\d,]+k-[\d,]+k',  # 50k-100k
+        r'[\d,]+k\+',  # 50k+
+        r'£[\d,]+(?:-£[\d,]+)?',  # £50k-£100k
+        r'[\d,]+-[\d,]+',  # 50-100
+    ]
+
+    for pattern in salary_patterns:
+        cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
+
+    # Clean up extra whitespace
+    cleaned = re.sub(r'\s+', ' ', cleaned)
+    cleaned = cleaned.strip()
+
+    # Handle specific cases
+    if cleaned.lower() in ['usa', 'us', 'united states']:
+        cleaned = 'USA'
+    elif cleaned.lower() in ['uk', 'united kingdom']:
+        cleaned = 'UK'
+    elif cleaned.lower() in ['remote', 'work from home', 'wfh']:
+        cleaned = 'Remote'
+
+    return cleaned
+
+def skip_reason(title, company):
+    """Why this isn't a real job, or None if it looks like one"""
+    # Skip if title is too generic or too long (likely not a real job)
+    if len(title) < 5 or len(title) > 150 or title.count(' ') < 1 or title.count(' ') > 12:
+        return f"generic title: {title}"
+    # Skip if company name is too generic
+    if len(company) < 2 or len(company) > 80 or company.lower() in GENERIC_COMPANIES:
+        return f"generic company: {company}"
+    if title.lower() in COMPANY_NAMES:
+        return f"company name as job title: {title}"
+    if any(x in title for x in LOCATION_WORDS):
+        return f"location as job title: {title}"
+    if any(element in title.lower() for element in PAGE_ELEMENTS):
+        return f"page element as job title: {title}"
+    return None
+
+def job_type_from_text(text_lower):
+    if has_word(text_lower, "intern") or has_word(text_lower, "internship"):
+        return "Intern"
+    if "part-time" in text_lower or "part time" in text_lower:
+        return "Part-time"
+    if has_word(text_lower, "contract"):
+        return "Contract"
+    return "Full-time"
+
+def experience_from_text(text_lower):
+    if any(has_word(text_lower, word) for word in ["senior", "sr", "lead", "director", "vp"]):
+        return "Senior Level"
+    if any(has_word(text_lower, word) for word in ["associate", "mid", "experienced"]):
+        return "Mid Level"
+    if any(has_word(text_lower, word) for word in ["junior", "entry", "graduate", "intern"]):
+        return "Entry Level"
+    return "Not Specified"
+
+class JobNormalizer:
+    """
+    Raw card fields -> staged jobs, without repeats within a run
+    """
+
+    def __init__(self):
+        self.seen = set()  # (title, company) of the jobs kept so far
+
+    def normalize(self, raw, source):
+        """
+        The Job columns (plus the source's name) for one raw card, or None
+        if it should be skipped
+        """
+        title = (raw.get('title') or '').strip()
+        company = (raw.get('company') or '').strip()
+        # Skip if we don't have essential info
+        if not title or not company:
+            return None
+        reason = skip_reason(title, company)
+        if reason is not None:
+            print(f" Skipping {reason}")
+            return None
+
+        text_lower = (raw.get('text') or ' '.join(str(value) for value in raw.values() if value)).lower()
+        tags = raw.get('tags') or [keyword.title() for keyword in TAG_KEYWORDS if has_word(text_lower, keyword)]
+        posting_date = raw.get('posting_date') or datetime.utcnow()
+        return {
+            'title': title,
+            'company': company,
+            'location': clean_location_text(raw.get('location')) or "Remote",
+            'posting_date': posting_date.isoformat(),
+            'job_type': raw.get('job_type') or job_type_from_text(text_lower),
+            'tags': ", ".join(tags) if tags else "Not Specified",
+            'salary_range': raw.get('salary_range') or "Not Specified",
+            'experience_level': raw.get('experience_level') or experience_from_text(text_lower),
+            'description': raw.get('description') or "",
+            'source': source
+        }
+
+    def normalize_page(self, raws, source):
+        """The new jobs of one page (repeats of jobs seen in this run are dropped)"""
+        jobs = []
+        for raw in raws:
+            job = self.normalize(raw, source)
+            if job is None:
+                continue
+            key = (job['title'].lower(), job['company'].lower())
+            if key in self.seen:
+                print(f"⏭️ Skipping duplicate: {job['title']} at {job['company']}")
+                continue
+            self.seen.add(key)
+            jobs.append(job)
+        return jobs
@@ -0,0 +1,194 @@
+import time
+import queue
+import threading
+
+from browser import get_driver, release_driver, wait_for_page, browser_alive, PageLoadStats
+
+# The scraper's scheduler: runs every source at once over one pool of browsers
+# - Fetch workers are threads with a browser each (started when a worker gets
+#   its first page). They open a page, find the cards and read their raw
+#   fields - the only work that needs the browser.
+# - This thread hands out the pages: the source with the highest priority
+#   goes first, as long as it stays within its own rate limit
+#   (requests_per_minute) and max_concurrency. A slow or throttled site
+#   never holds up the others.
+# - Everything else happens here, one page at a time for all sources:
+#   normalization and dedupe (normalize.py), the staging file (staging.py)
+#   and the work queue (work_queue.py), so none of them needs locks.
+
+IDLE_WAIT = 0.05  # shortest sleep while waiting for a rate limit slot
+
+class Scheduler:
+    """
+    Scrapes the pages of the work queue's run for a list of sources
+    """
+
+    def __init__(self, sources, work_queue, staging, normalizer, workers=None, profile='light', keep_browser=False):
+        self.sources = sorted(sources, key=lambda source: -source.priority)
+        self.work_queue = work_queue
+        self.staging = staging
+        self.normalizer = normalizer
+        # Enough browsers for every source to use its full concurrency
+        self.workers = workers or sum(source.max_concurrency for source in sources)
+        self.profile = profile
+        self.keep_browser = keep_browser
+
+        self.tasks = queue.Queue()
+        self.results = queue.Queue()
+        self.stats = [PageLoadStats() for _ in range(self.workers)]
+        self.in_flight = {source.name: 0 for source in sources}
+        self.next_slot = {source.name: 0.0 for source in sources}  # time.monotonic() of the next allowed page load
+
+    # ----------------------------
+    # Fetch workers
+    # ----------------------------
+    def _worker(self, number):
+        driver = None
+        stats = self.stats[number]
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                break
+            source, item = task
+            try:
+                if driver is None:
+                    # Only the first worker can use the warm browser (one page at a time per browser)
+                    driver = get_driver(self.profile, warm=self.keep_browser and number == 0)
+                stats.start(driver)
+                driver.get(item['url'])
+                wait_for_page(driver, ready_selector=source.ready_selector)
+                stats.finish(driver)
+
+                cards = source.find_cards(driver)
+                raws = []
+                for card in cards:
+                    try:
+                        raw = source.parse_card(card)
+                    except Exception as e:
+                        print(f" [{source.name}] Error parsing job card: {e}")
+                        continue
+                    if raw:
+                        raws.append(raw)
+                # A browser that died while we read the cards means the page isn't done
+                if not browser_alive(driver):
+                    raise RuntimeError("The browser stopped responding")
+                self.results.put((source, item, raws, len(cards), None))
+            except Exception as e:
+                self.results.put((source, item, None, 0, e))
+                if driver is not None and not browser_alive(driver):
+                    print(f" [{source.name}] Browser crashed - the next page gets a new one")
+                    try:
+                        release_driver(driver)
+                    except Exception:
+                        pass
+                    driver = None
+        if driver is not None:
+            release_driver(driver)
+
+    # ----------------------------
+    # Scheduling
+    # ----------------------------
+    def _can_start(self, source, now):
+        return (self.in_flight[source.name] < source.max_concurrency
+                and self.next_slot[source.name] <= now)
+
+    def _dispatch(self, busy):
+        """
+        Hand out pages while there are free workers - returns how many
+        """
+        started = 0
+        while busy + started < self.workers:
+            now = time.monotonic()
+            for source in self.sources:  # highest priority first
+                if not self._can_start(source, now):
+                    continue
+                item = self.work_queue.claim(source.name)
+                if item is None:
+                    continue
+                self.next_slot[source.name] = now + 60.0 / source.requests_per_minute
+                self.in_flight[source.name] += 1
+                print(f" [{source.name}] Scraping page {item['page']}/{source.max_pages} (try {item['attempts']})")
+                self.tasks.put((source, item))
+                started += 1
+                break
+            else:
+                return started
+        return started
+
+    def _next_wake(self):
+        """
+        Seconds until a page could be handed out (a rate limit slot opens or a
+        failed page may be retried), or None if nothing is waiting
+        """
+        now = time.monotonic()
+        waits = [
+            max(self.next_slot[source.name] - now, 0.0) for source in self.sources
+            if self.in_flight[source.name] < source.max_concurrency and self.work_queue.has_pending(source.name)
+        ]
+        retry_in = self.work_queue.next_retry_in()
+        if retry_in is not None:
+            waits.append(retry_in)
+        return max(min(waits), IDLE_WAIT) if waits else None
+
+    def _handle(self, result):
+        source, item, raws, card_count, error = result
+        self.in_flight[source.name] -= 1
+        page = item['page']
+        if error is not None:
+            retry_in = self.work_queue.fail(item, error)
+            if retry_in is None:
+                print(f" [{source.name}] Giving up on page {page} after {item['attempts']} tries: {error}")
+            else:
+                print(f" [{source.name}] Page {page} failed ({error}) - retrying in {retry_in:.0f} s")
+            # Still queue the next page: pages are independent, one bad page shouldn't stop the run
+            if page < source.max_pages:
+                self.work_queue.add(source.name, page + 1, source.page_url(page + 1))
+            return
+
+        jobs = self.normalizer.normalize_page(raws, source.name)
+        self.staging.append(source.name, page, jobs)
+        self.work_queue.done(item, len(jobs))
+        print(f" [{source.name}] Staged {len(jobs)} jobs from page {page} ({card_count} cards).")
+        if source.has_next_page(page, card_count):
+            self.work_queue.add(source.name, page + 1, source.page_url(page + 1))
+        elif not card_count:
+            print(f" [{source.name}] No job elements found on page {page}. Stopping.")
+        else:
+            print(f" [{source.name}] Reached maximum page limit ({source.max_pages}).")
+
+    def run(self):
+        """
+        Scrape until no source has pages left (failed pages included)
+        """
+        threads = [threading.Thread(target=self._worker, args=(number,), name=f'scrape-worker-{number}', daemon=True)
+                   for number in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        busy = 0
+        try:
+            while True:
+                busy += self._dispatch(busy)
+                wake = self._next_wake() if busy < self.workers else None
+                if busy == 0:
+                    if wake is None:
+                        break  # nothing running and nothing waiting: done
+                    time.sleep(wake)
+                    continue
+                try:
+                    result = self.results.get(timeout=wake)
+                except queue.Empty:
+                    continue
+                busy -= 1
+                self._handle(result)
+        finally:
+            for _ in threads:
+                self.tasks.put(None)
+            for thread in threads:
+                thread.join()
+
+    def report(self):
+        """Load time and size of all pages, over every worker"""
+        combined = PageLoadStats()
+        for stats in self.stats:
+            combined.pages += stats.pages
+        combined.report()
@@ -0,0 +1,125 @@
+from sources.base import Source
+
+# ActuaryList (https://www.actuarylist.com/) - the scraper's first source
+
+# Look for job cards - they appear to be individual job listings
+# More specific selectors to avoid page headers and navigation
+JOB_CARD_SELECTOR = (
+    "div:has(img[src*='logo']):has(h2, h3, h4), " +
+    "div:has(img[src*='logo']):has([class*='title']), " +
+    "div:has(img[src*='logo']):has(strong), " +
+    "[class*='job-card'], " +
+    "[class*='job-listing'], " +
+    "article:has(img[src*='logo'])"
+)
+# Alternative selectors for job-specific content
+FALLBACK_JOB_CARD_SELECTOR = (
+    "div:has(img[src*='logo']):has(text), " +
+    "div:has([class*='company']):has([class*='title']), " +
+    "div:has([class*='employer']):has([class*='position'])"
+)
+
+# Text of the page's own boxes (header, filters, pagination) that also match the selectors
+NAVIGATION_TEXT = [
+    'find handpicked actuarial jobs', 'filters', 'search jobs', 'about', 'blog', 'country', 'city',
+    'experience', 'sector', 'tags', 'showing', 'next', 'previous'
+]
+FLAGS = ['🇺🇸', '🇬🇧', '🇮🇳', '🇨🇦', '🇩🇪', '🇸🇬', '🇦🇺']
+CITIES = ['NY', 'MA', 'IL', 'TX', 'CA', 'London', 'Manchester', 'Toronto']
+
+class ActuaryListSource(Source):
+    name = 'actuarylist'
+    priority = 10
+    requests_per_minute = 20
+    max_concurrency = 1
+    max_pages = 10
+    ready_selector = "img[src*='logo'], [class*='job-card'], [class*='job-listing']"
+
+    base_url = "https://www.actuarylist.com/"
+
+    def page_url(self, page):
+        return self.base_url if page == 1 else self.base_url + f"?page={page}"
+
+    def find_cards(self, driver):
+        from selenium.webdriver.common.by import By
+
+        cards = driver.find_elements(By.CSS_SELECTOR, JOB_CARD_SELECTOR)
+        if not cards:
+            print(" No job elements found on this page.")
+            cards = driver.find_elements(By.CSS_SELECTOR, FALLBACK_JOB_CARD_SELECTOR)
+        if not cards:
+            print(" Still no job elements found. Page source preview:")
+            print(driver.page_source[:2000])
+        return cards
+
+    def parse_card(self, card):
+        from selenium.webdriver.common.by import By
+        from selenium.common.exceptions import NoSuchElementException
+
+        text = card.text
+        # Skip if card is too small (likely not a job)
+        if len(text.strip()) < 50:
+            return None
+        # Skip if card contains navigation or page elements
+        if any(x in text.lower() for x in NAVIGATION_TEXT):
+            return None
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+
+        # Job Title - look for headings
+        title = None
+        try:
+            title = card.find_element(By.CSS_SELECTOR, "h1, h2, h3, h4, [class*='title'], strong").text.strip()
+        except NoSuchElementException:
+            # Fallback: the first meaningful line
+            title = next((line for line in lines if len(line) > 5 and
+                          not any(x in line.lower() for x in ['logo', 'featured', 'apply', 'ago'])), None)
+
+        # Company - look for company name near logo or in text
+        company = None
+        try:
+            # Look for company logo alt text or nearby text
+            logo_el = card.find_element(By.CSS_SELECTOR, "img[src*='logo'], img[alt*='logo']")
+            company = logo_el.get_attribute("alt") or logo_el.get_attribute("title")
+        except NoSuchElementException:
+            try:
+                company = card.find_element(By.CSS_SELECTOR, "[class*='company'], [class*='employer']").text.strip()
+            except NoSuchElementException:
+                # Fallback: the first company-like line
+                company = next((line for line in lines if line != title and len(line) > 2 and
+                                not any(x in line.lower() for x in ['remote', 'posted', 'apply', 'ago', 'featured', '💰', '🇺🇸', '🇬🇧'])), None)
+
+        # Location - the location element, or a line with a flag or a city
+        location = None
+        try:
+            location = card.find_element(By.CSS_SELECTOR, "[class*='location'], [class*='place']").text.strip()
+        except NoSuchElementException:
+            location = next((line for line in lines if any(x in line for x in FLAGS + CITIES)), None)
+
+        # Description
+        try:
+            description = card.find_element(By.CSS_SELECTOR, ".description, p").text.strip()
+        except NoSuchElementException:
+            description = ""
+
+        # Tags shown on the card
+        tag_elements = card.find_elements(By.CSS_SELECTOR, "[class*='tag'], .tags span, [class*='skill']")
+        tags = [t.text.strip() for t in tag_elements if t.text.strip()]
+
+        # Salary Range - look for salary indicators
+        salary_range = None
+        try:
+            salary_el = card.find_element(By.XPATH, ".//*[contains(text(),'$') or contains(text(),'£') or contains(text(),'💰')]")
+            if any(x in salary_el.text for x in ['$', '£', '💰']):
+                salary_range = salary_el.text.strip()
+        except NoSuchElementException:
+            pass
+
+        return {
+            'title': title,
+            'company': company,
+            'location': location,
+            'description': description,
+            'tags': tags,
+            'salary_range': salary_range,
+            'text': text
+        }
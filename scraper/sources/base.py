@@ -0,0 +1,55 @@
+# Source adapters: everything the scraper needs to know about one job board
+# A source says which listing pages to open, how to find the job cards on a
+# page and how to read the raw fields out of a card. Everything after that -
+# cleaning the values, guessing job type/experience/tags, skipping junk and
+# duplicates - is shared by all sources (normalize.py), and the scheduler
+# (scheduler.py) runs all sources at once over one pool of browsers.
+#
+# To add a job board: subclass Source in sources/<name>.py, fill in the
+# class attributes and the methods below, and add it to SOURCES in
+# scrape_simple_fast.py.
+
+class Source:
+    """
+    A job board the scraper can read
+    """
+
+    # Unique short name (stored in the work queue and in every staged job)
+    name = None
+
+    # Higher runs first when several sources have pages waiting
+    priority = 0
+
+    # Politeness: at most this many page loads per minute and open at the
+    # same time for this site, whatever the number of browsers
+    requests_per_minute = 20
+    max_concurrency = 1
+
+    # Stop after this many listing pages
+    max_pages = 10
+
+    # CSS selector of something that means the job list is on the page
+    # (browser.wait_for_page waits for it)
+    ready_selector = None
+
+    def page_url(self, page):
+        """URL of listing page `page` (1, 2, ...)"""
+        raise NotImplementedError
+
+    def find_cards(self, driver):
+        """The job card elements of the page that is open in the driver"""
+        raise NotImplementedError
+
+    def parse_card(self, card):
+        """
+        The raw fields of one card, or None if it isn't a job
+        Keys (all optional except title and company): title, company,
+        location, description, tags (list), salary_range, posting_date
+        (datetime) and text (the card's whole text, used to guess the job
+        type, experience level and tags when they aren't given)
+        """
+        raise NotImplementedError
+
+    def has_next_page(self, page, cards):
+        """Should page + 1 be scraped after `page` returned `cards`?"""
+        return bool(cards) and page < self.max_pages
@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import time
+
+# The file format is shared with the loader (backend/staging_format.py)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+from staging_format import manifest_path, file_sha256
+
+# Staging files: what the scraper produces instead of writing to the database
+# Every run appends the jobs it parses to one NDJSON file (one JSON object per
+# line, the Job column names - see backend/bulk_load.py) next to a small
+# manifest that says which run wrote it, how many pages and jobs it has and
+# whether the run finished. The scraper never waits for the database this
+# way, and the files can be loaded later or somewhere else:
+#   python ../backend/load_staging.py staging/run-*.ndjson
+# Files are only ever appended to; a page's jobs are written (and fsynced) in
+# one go before the page is marked done in the work queue.
+
+STAGING_DIR = os.environ.get(
+    'SCRAPER_STAGING_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'staging')
+)
+
+def drop_torn_line(path):
+    """
+    Cut a half-written last line (a crash in the middle of a write) off the
+    file, so the next append starts on a line of its own
+    Returns how many bytes were removed
+    """
+    with open(path, 'rb+') as staging_file:
+        size = staging_file.seek(0, os.SEEK_END)
+        end = size
+        # Walk back in blocks until the last newline
+        while end > 0:
+            start = max(0, end - 65536)
+            staging_file.seek(start)
+            newline = staging_file.read(end - start).rfind(b'\n')
+            if newline != -1:
+                end = start + newline + 1
+                break
+            end = start
+        if end < size:
+            staging_file.truncate(end)
+            staging_file.flush()
+            os.fsync(staging_file.fileno())
+        return size - end
+
+class StagingWriter:
+    """
+    The staging file of one scraper run
+    Opening the file of a run that was interrupted appends to it (resume),
+    after cutting off a line the crash left half-written - the page it
+    belonged to was never marked done, so it is scraped again
+    """
+
+    def __init__(self, run_name, staging_dir=STAGING_DIR):
+        os.makedirs(staging_dir, exist_ok=True)
+        self.path = os.path.join(staging_dir, f'run-{run_name}.ndjson')
+        self.manifest = {
+            'run': run_name,
+            'file': os.path.basename(self.path),
+            'started_at': time.time(),
+            'finished_at': None,
+            'complete': False,
+            'pages': [],
+            'records': 0,
+        }
+        if os.path.exists(manifest_path(self.path)):
+            with open(manifest_path(self.path)) as manifest_file:
+                self.manifest.update(json.load(manifest_file))
+            self.manifest['complete'] = False
+        if os.path.exists(self.path):
+            torn = drop_torn_line(self.path)
+            if torn:
+                print(f"Removed a half-written line ({torn} bytes) from the end of {self.path}")
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def append(self, source, page, jobs):
+        """
+        Add the jobs of one page of a source (dicts of Job columns) and make sure they are on disk
+        """
+        lines = ''.join(json.dumps(dict(job, source=source, page=page), ensure_ascii=False) + '\n' for job in jobs)
+        self.file.write(lines)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        if f'{source}/{page}' not in self.manifest['pages']:
+            self.manifest['pages'].append(f'{source}/{page}')
+        self.manifest['records'] += len(jobs)
+        self._write_manifest()
+
+    def close(self, complete=True):
+        """
+        Close the file; `complete` marks the run as finished in the manifest
+        (then the checksum of the file is stored too)
+        """
+        self.file.close()
+        if complete:
+            self.manifest['complete'] = True
+            self.manifest['finished_at'] = time.time()
+            self.manifest['sha256'] = file_sha256(self.path)
+        self._write_manifest()
+
+    def _write_manifest(self):
+        # Write a temporary file and rename it, so a crash never leaves half a manifest
+        path = manifest_path(self.path)
+        with open(path + '.tmp', 'w') as manifest_file:
+            json.dump(self.manifest, manifest_file, indent=2)
+        os.replace(path + '.tmp', path)
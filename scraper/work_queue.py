@@ -0,0 +1,194 @@
+import os
+import time
+import sqlite3
+
+# Persisted work queue for scraper runs
+# Every page a run has to scrape (of every source, see sources/) is a row in
+# a small local SQLite file with its state: pending -> in_flight -> done, or
+# failed (retried later with backoff until MAX_ATTEMPTS). If the scraper or
+# Chrome dies, the next run finds the unfinished run, retries the pages that
+# were in flight and carries on with the pending ones - pages that are done
+# are never fetched again.
+# The queue is only used from the scheduler's thread (scheduler.py).
+# A run that finished normally is not resumed: the next run starts over
+# (new jobs appear on the first pages).
+
+QUEUE_PATH = os.environ.get(
+    'SCRAPER_QUEUE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scrape_queue.db')
+)
+MAX_ATTEMPTS = int(os.environ.get('SCRAPER_MAX_ATTEMPTS', 4))  # tries per page before giving up
+BACKOFF_SECONDS = float(os.environ.get('SCRAPER_BACKOFF_SECONDS', 30))  # wait after the first failure, doubled each time
+MAX_BACKOFF_SECONDS = 600
+
+PENDING = 'pending'
+IN_FLIGHT = 'in_flight'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    source TEXT NOT NULL,          -- Source.name
+    page INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL,          -- failed pages: when to try again (NULL = gave up)
+    last_error TEXT,
+    jobs_added INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (run_id, source, page)
+);
+"""
+
+def backoff(attempts):
+    """Seconds to wait before the next try of a page that failed `attempts` times"""
+    return min(BACKOFF_SECONDS * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS)
+
+class ScrapeQueue:
+    """
+    The pages of the current scraper run and their state
+    """
+
+    def __init__(self, path=QUEUE_PATH):
+        # Autocommit: every state change is on disk as soon as it's made
+        self.db = sqlite3.connect(path, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        columns = [row['name'] for row in self.db.execute("PRAGMA table_info(pages)")]
+        if columns and 'source' not in columns:
+            # Queue from before there were several sources - only unfinished progress is lost
+            self.db.executescript("DROP TABLE pages; UPDATE runs SET finished_at = started_at WHERE finished_at IS NULL;")
+        self.db.executescript(SCHEMA)
+        self.run_id = None
+
+    def start_run(self, first_pages, restart=False):
+        """
+        Resume the last run if it didn't finish, otherwise start a new one
+        first_pages: {source name: url of its first page} - queued if the run
+        doesn't have them yet (so a resumed run also picks up new sources)
+        Returns True when resuming.
+        """
+        now = time.time()
+        unfinished = self.db.execute(
+            "SELECT id FROM runs WHERE finished_at IS NULL ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        if unfinished is not None and not restart:
+            self.run_id = unfinished['id']
+            # The page that was being scraped when the last run died counts as a failed try
+            self.db.execute(
+                "UPDATE pages SET state = ?, last_error = 'interrupted', updated_at = ?, "
+                "next_attempt_at = CASE WHEN attempts < ? THEN ? END "
+                "WHERE run_id = ? AND state = ?",
+                (FAILED, now, MAX_ATTEMPTS, now, self.run_id, IN_FLIGHT)
+            )
+            resuming = True
+        else:
+            if unfinished is not None:
+                self.db.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (now, unfinished['id']))
+            self.run_id = self.db.execute("INSERT INTO runs (started_at) VALUES (?)", (now,)).lastrowid
+            resuming = False
+        for source, url in first_pages.items():
+            self.add(source, 1, url)
+        return resuming
+
+    def run_name(self):
+        """A name for the current run that stays unique even if this file is deleted"""
+        started_at = self.db.execute("SELECT started_at FROM runs WHERE id = ?", (self.run_id,)).fetchone()[0]
+        return time.strftime('%Y%m%d-%H%M%S', time.localtime(started_at)) + f'-{self.run_id}'
+
+    def add(self, source, page, url):
+        """Queue a page of a source (no-op if this run has it already)"""
+        self.db.execute(
+            "INSERT OR IGNORE INTO pages (run_id, source, page, url, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (self.run_id, source, page, url, time.time())
+        )
+
+    def claim(self, source):
+        """
+        The next page of `source` to scrape (lowest page number first), now
+        marked in flight, or None if nothing is ready
+        """
+        now = time.time()
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            item = self.db.execute(
+                "SELECT * FROM pages WHERE run_id = ? AND source = ? AND "
+                "(state = ? OR (state = ? AND next_attempt_at <= ?)) "
+                "ORDER BY page LIMIT 1",
+                (self.run_id, source, PENDING, FAILED, now)
+            ).fetchone()
+            if item is not None:
+                self.db.execute(
+                    "UPDATE pages SET state = ?, attempts = attempts + 1, updated_at = ? "
+                    "WHERE run_id = ? AND source = ? AND page = ?",
+                    (IN_FLIGHT, now, self.run_id, source, item['page'])
+                )
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        if item is None:
+            return None
+        item = dict(item)
+        item['attempts'] += 1
+        return item
+
+    def done(self, item, jobs_added):
+        self.db.execute(
+            "UPDATE pages SET state = ?, jobs_added = jobs_added + ?, last_error = NULL, next_attempt_at = NULL, "
+            "updated_at = ? WHERE run_id = ? AND source = ? AND page = ?",
+            (DONE, jobs_added, time.time(), self.run_id, item['source'], item['page'])
+        )
+
+    def fail(self, item, error):
+        """
+        Record a failed try - the page is retried after a backoff, or given
+        up on after MAX_ATTEMPTS tries. Returns the seconds until the retry (or None)
+        """
+        now = time.time()
+        retry_in = backoff(item['attempts']) if item['attempts'] < MAX_ATTEMPTS else None
+        self.db.execute(
+            "UPDATE pages SET state = ?, last_error = ?, next_attempt_at = ?, updated_at = ? "
+            "WHERE run_id = ? AND source = ? AND page = ?",
+            (FAILED, str(error)[:500], now + retry_in if retry_in is not None else None,
+             now, self.run_id, item['source'], item['page'])
+        )
+        return retry_in
+
+    def has_pending(self, source):
+        """Does `source` have pages that can be claimed right away?"""
+        return self.db.execute(
+            "SELECT 1 FROM pages WHERE run_id = ? AND source = ? AND "
+            "(state = ? OR (state = ? AND next_attempt_at <= ?)) LIMIT 1",
+            (self.run_id, source, PENDING, FAILED, time.time())
+        ).fetchone() is not None
+
+    def next_retry_in(self):
+        """Seconds until the next failed page may be retried, or None if there is none"""
+        row = self.db.execute(
+            "SELECT MIN(next_attempt_at) FROM pages WHERE run_id = ? AND state = ? AND next_attempt_at IS NOT NULL",
+            (self.run_id, FAILED)
+        ).fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def finish_run(self):
+        self.db.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), self.run_id))
+
+    def summary(self, source=None):
+        """{state: pages} and the jobs added by this run (of one source, or all)"""
+        where, params = "run_id = ?", (self.run_id,)
+        if source is not None:
+            where, params = "run_id = ? AND source = ?", (self.run_id, source)
+        counts = dict(self.db.execute(
+            f"SELECT state, COUNT(*) FROM pages WHERE {where} GROUP BY state", params
+        ).fetchall())
+        jobs = self.db.execute(f"SELECT SUM(jobs_added) FROM pages WHERE {where}", params).fetchone()[0]
+        return counts, jobs or 0
+
+    def close(self):
+        self.db.close()
@@ -174,9 +174,10 @@ def print_next_steps():
     print("=" * 60)
     print("1. Edit backend/.env file with your database settings")
     print("2. Make sure your database is running")
-    print("3. Start the backend: cd backend && python app.py")
-    print("4. Start the frontend: cd frontend && npm start")
-    print("5. Add sample data: cd backend && python sample_data.py")
+    print("3. Create the tables: cd backend && python init_db.py")
+    print("4. Start the backend: cd backend && python app.py")
+    print("5. Start the frontend: cd frontend && npm start")
+    print("6. Add sample data: cd backend && python sample_data.py")
     print("=" * 60)
     print("For more help, check the README.md file")
     print("=" * 60)